@@ -3,6 +3,7 @@ import sys
 import os
 import time
 import traceback
+import multiprocessing
 
 # --- PyQt5 Imports ---
 from PyQt5.QtWidgets import QApplication, QDialog
@@ -107,4 +108,6 @@ def main():
 
 
 if __name__ == '__main__':
+    # Image compression runs in worker processes; frozen builds need this to start them.
+    multiprocessing.freeze_support()
     main()
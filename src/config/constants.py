@@ -38,8 +38,48 @@ SOFT_WARNING_THREAD_THRESHOLD = 40
 MAX_FILE_THREADS_PER_POST_OR_WORKER = 10
 POST_WORKER_BATCH_THRESHOLD = 30
 POST_WORKER_NUM_BATCHES = 4
-POST_WORKER_BATCH_DELAY_SECONDS = 2.5
-MAX_POST_WORKERS_WHEN_COMMENT_FILTERING = 3
+API_PAGE_PREFETCH_WINDOW = 4  # Post-list pages requested ahead of the one being processed
+POST_CACHE_MAX_AGE_SECONDS = 24 * 60 * 60  # A cached post listing older than this is re-fetched in full
+ENRICHMENT_MAX_WORKERS = 4  # Concurrent post-body/comment requests made ahead of the post workers
+ENRICHMENT_WINDOW = 16  # Posts the enrichment stage may run ahead of the one being handed out
+PREFETCHED_COMMENTS_KEY = "_prefetched_comments"  # Post dict key holding comments fetched by the enrichment stage
+ASYNC_ENGINE_STEP_THREADS = 8  # Threads the async engine uses for post parsing/bookkeeping steps
+
+# --- Shared File Transfer Scheduler ---
+TRANSFER_MAX_CONCURRENT = 4  # Default until a download configures it from the thread settings
+TRANSFER_MAX_PER_HOST = 32  # Transfers allowed against a single host at once
+TRANSFER_PRIORITY_POST_ORDER = "post_order"
+TRANSFER_PRIORITY_SMALLEST_FIRST = "smallest_first"
+
+# --- Image Compression Stage ---
+IMAGE_COMPRESSION_MIN_BYTES = int(1.5 * 1024 * 1024)  # Smaller images are saved as downloaded
+IMAGE_COMPRESSION_FORMATS = {"WEBP": ".webp", "JPEG": ".jpg"}  # Pillow format name -> file extension
+IMAGE_COMPRESSION_DEFAULT_FORMAT = "WEBP"
+IMAGE_COMPRESSION_DEFAULT_QUALITY = 85
+IMAGE_TRANSCODE_MAX_WORKERS = None  # Encoder processes; None means one per CPU core
+IMAGE_TRANSCODE_QUEUE_DEPTH = 8  # Images queued or encoding before downloads wait for the encoders
+
+# --- CDN Node Spreading (n1.kemono.cr, n2.kemono.cr, ...) ---
+CDN_NODE_COUNT = 4  # Numbered file nodes tried per site
+CDN_NODE_MAX_CONCURRENT = 8  # Transfers sent to one node before spilling onto the next
+CDN_NODE_COOLDOWN_SECONDS = 30  # First bench time for a node that returns 429/5xx or drops the connection; doubles per repeat
+CDN_NODE_MAX_COOLDOWN_SECONDS = 600
+CDN_NODE_FILE_EXCLUSIONS_MAX = 10000  # Files remembered as missing (403/404) on particular nodes
+CDN_NODE_SPEED_SMOOTHING = 0.3  # Weight of the newest transfer in a node's running speed estimate
+
+# --- HTTP Connection Pooling ---
+HTTP_POOL_MAXSIZE = MAX_THREADS  # Keep-alive connections kept open per host, until a download sizes it from the thread settings
+HTTP_POOL_CONNECTIONS = 10  # Number of per-host pools cached by each session
+
+# --- Adaptive Rate Limiting (per host) ---
+RATE_LIMIT_INITIAL_RPS = 5.0  # Requests per second a host starts at
+RATE_LIMIT_MIN_RPS = 0.2
+RATE_LIMIT_MAX_RPS = 50.0
+RATE_LIMIT_BURST = 10  # Requests that may be sent back-to-back
+RATE_LIMIT_INCREASE_STEP = 0.1  # Added to the rate after each healthy response
+RATE_LIMIT_DECREASE_FACTOR = 0.5  # Rate multiplier after a 429/5xx
+RATE_LIMIT_BASE_BACKOFF_SECONDS = 2
+RATE_LIMIT_MAX_BACKOFF_SECONDS = 120
 
 # --- Multipart Download Settings ---
 MIN_SIZE_FOR_MULTIPART_DOWNLOAD = 10 * 1024 * 1024  # 10 MB
@@ -61,6 +101,10 @@ RESOLUTION_KEY = "window_resolution"
 UI_SCALE_KEY = "ui_scale_factor"
 SAVE_CREATOR_JSON_KEY = "saveCreatorJsonProfile"
 FETCH_FIRST_KEY = "fetchAllPostsFirst" 
+ASYNC_ENGINE_KEY = "useAsyncDownloadEngineV1"
+TRANSFER_PRIORITY_KEY = "transferPriorityV1"
+IMAGE_COMPRESSION_FORMAT_KEY = "imageCompressionFormatV1"
+IMAGE_COMPRESSION_QUALITY_KEY = "imageCompressionQualityV1"
 
 # --- UI Constants and Identifiers ---
 HTML_PREFIX = "<!HTML!>"
@@ -120,4 +164,30 @@ CREATOR_DOWNLOAD_DEFAULT_FOLDER_IGNORE_WORDS = {
 
 # --- Duplicate Handling Modes ---
 DUPLICATE_HANDLING_HASH = "hash"      
-DUPLICATE_HANDLING_KEEP_ALL = "keep_all"  
\ No newline at end of file
+DUPLICATE_HANDLING_KEEP_ALL = "keep_all"  
+HASH_INDEX_DIRNAME = "hash_indexes"  # In appdata: one database per download root with path, size, mtime and MD5 of saved files
+PROBE_CACHE_FILENAME = "file_probe_cache.db"  # In appdata: size, range support and ETag of file URLs
+PROBE_CACHE_MAX_AGE_SECONDS = 30 * 24 * 3600
+
+# --- Creator Index ---
+CREATOR_INDEX_FILENAME = "creator_index.db"  # In appdata: creators.json converted to an indexed table
+CREATOR_INDEX_READ_CHUNK = 1024 * 1024  # Characters of creators.json parsed per read while building the index
+
+# --- GUI Event Bus ---
+GUI_EVENT_QUEUE_MAX_SIZE = 5000  # Pending log lines + ordered events before worker threads are made to wait
+GUI_EVENT_BACKPRESSURE_MAX_WAIT = 2.0  # Longest a worker waits for room before queueing anyway
+
+# --- Log Sink ---
+LOG_FILE_NAME = "session.log"  # In appdata/logs; every log line, HTML stripped
+LOG_FILE_MAX_BYTES = 5 * 1024 * 1024
+LOG_FILE_BACKUP_COUNT = 3
+LOG_RING_BUFFER_LINES = 20000  # Lines kept in memory for re-filtering the log view
+LOG_VIEW_MAX_BLOCKS = 5000  # Lines the log widget holds before dropping the oldest
+LOG_RENDER_INTERVAL_MS = 200  # Pending log lines are rendered at most this often
+
+# --- Creator Profiles ---
+CREATOR_PROFILE_FLUSH_DELAY = 2.0  # Seconds profile changes may wait before being written to disk
+
+# --- Single PDF Compilation ---
+SINGLE_PDF_SPOOL_FILENAME = "tmp_single_pdf.spool"  # In appdata; posts collected for the single PDF, one JSON line each
+SINGLE_PDF_SORT_RUN_SIZE = 50000  # Spool index entries sorted in memory at a time before merging runs from disk
@@ -1,12 +1,20 @@
+import functools
+import os
+import sqlite3
+import threading
 import time
 import traceback
 from urllib.parse import urlparse
 import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import requests
-import cloudscraper 
 from ..utils.network_utils import extract_post_info, prepare_cookies_for_request
+from ..utils.session_pool import RequestCancelledError, get_session
+from ..utils.rate_limiter import get_retry_delay
+from ..utils.post_cache import PostListingCache
 from ..config.constants import (
-    STYLE_DATE_POST_TITLE
+    STYLE_DATE_POST_TITLE, API_PAGE_PREFETCH_WINDOW, POST_CACHE_MAX_AGE_SECONDS
 )
 
 
@@ -27,7 +35,6 @@ def fetch_posts_paginated(api_url_base, headers, offset, logger, cancellation_ev
     paginated_url = f'{api_url_base}?o={offset}&fields={fields_to_request}'
     
     max_retries = 3
-    retry_delay = 5
 
     for attempt in range(max_retries):
         if cancellation_event and cancellation_event.is_set():
@@ -39,11 +46,13 @@ def fetch_posts_paginated(api_url_base, headers, offset, logger, cancellation_ev
         logger(log_message)
 
         try:
-            response = requests.get(paginated_url, headers=headers, timeout=(15, 60), cookies=cookies_dict)
+            response = get_session(paginated_url).get(paginated_url, headers=headers, timeout=(15, 60), cookies=cookies_dict, cancellation_event=cancellation_event)
             response.raise_for_status()
             response.encoding = 'utf-8'  
             return response.json()
 
+        except RequestCancelledError:
+            raise RuntimeError("Fetch operation cancelled by user while waiting to send the request.")
         except requests.exceptions.RequestException as e:
             # Handle 403 error on the FIRST page as a rate limit/block
             if e.response is not None and e.response.status_code == 403 and offset == 0:
@@ -60,8 +69,8 @@ def fetch_posts_paginated(api_url_base, headers, offset, logger, cancellation_ev
             # Handle all other network errors with a retry
             logger(f"   ⚠️ Retryable network error on page fetch (Attempt {attempt + 1}): {e}")
             if attempt < max_retries - 1:
-                delay = retry_delay * (2 ** attempt)
-                logger(f"      Retrying in {delay} seconds...")
+                delay = get_retry_delay(paginated_url, attempt + 1)
+                logger(f"      Retrying in {delay:.1f} seconds...")
                 time.sleep(delay)
                 continue
             else:
@@ -70,8 +79,8 @@ def fetch_posts_paginated(api_url_base, headers, offset, logger, cancellation_ev
         except json.JSONDecodeError as e:
             logger(f"   ❌ Failed to decode JSON on page fetch (Attempt {attempt + 1}): {e}")
             if attempt < max_retries - 1:
-                delay = retry_delay * (2 ** attempt)
-                logger(f"      Retrying in {delay} seconds...")
+                delay = get_retry_delay(paginated_url, attempt + 1)
+                logger(f"      Retrying in {delay:.1f} seconds...")
                 time.sleep(delay)
                 continue
             else:
@@ -79,6 +88,155 @@ def fetch_posts_paginated(api_url_base, headers, offset, logger, cancellation_ev
 
     raise RuntimeError(f"Failed to fetch page {paginated_url} after all attempts.")
 
+def fetch_pages_pipelined(api_url_base, headers, start_offset, logger, cancellation_event=None, pause_event=None, cookies_dict=None, end_offset=None, page_size=50, window=API_PAGE_PREFETCH_WINDOW):
+    """
+    Generator that yields (offset, posts_batch) pages in order while keeping
+    up to `window` page requests in flight.
+
+    Pages are fetched with `fetch_posts_paginated`, so pause, cancellation and
+    retry behaviour are unchanged. The first empty page (which includes the
+    API's 400 end-of-list response) or non-list payload is yielded and ends
+    the iteration. A page shorter than `page_size` is the last one: no more
+    look-ahead requests are sent once any such page arrives, and it is
+    followed by an empty page without asking the API for one. Look-ahead
+    requests past the end are discarded and their log lines dropped. Errors
+    from a page are re-raised when that page's turn comes, never out of order.
+    """
+    in_flight = deque()
+    next_offset = start_offset
+    last_page_offset = [None]  # Lowest offset known to be the last page, set from the fetch threads
+    last_page_lock = threading.Lock()
+
+    def note_page_done(offset, future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        posts_batch = future.result()
+        if not isinstance(posts_batch, list) or len(posts_batch) < page_size:
+            with last_page_lock:
+                if last_page_offset[0] is None or offset < last_page_offset[0]:
+                    last_page_offset[0] = offset
+
+    def is_past_end(offset):
+        with last_page_lock:
+            return last_page_offset[0] is not None and offset > last_page_offset[0]
+
+    def make_page_logger(offset):
+        def page_logger(message):
+            if not is_past_end(offset):
+                logger(message)
+        return page_logger
+
+    pool = ThreadPoolExecutor(max_workers=max(1, window), thread_name_prefix='PageFetch_')
+    try:
+        while True:
+            while (len(in_flight) < window and (end_offset is None or next_offset <= end_offset)
+                   and not is_past_end(next_offset)):
+                if cancellation_event and cancellation_event.is_set():
+                    break
+                future = pool.submit(fetch_posts_paginated, api_url_base, headers, next_offset, make_page_logger(next_offset),
+                                     cancellation_event, pause_event, cookies_dict=cookies_dict)
+                future.add_done_callback(functools.partial(note_page_done, next_offset))
+                in_flight.append((next_offset, future))
+                next_offset += page_size
+            if not in_flight:
+                return
+            offset, future = in_flight.popleft()
+            posts_batch = future.result()
+            yield offset, posts_batch
+            if not isinstance(posts_batch, list) or not posts_batch:
+                return
+            if len(posts_batch) < page_size:
+                if end_offset is None or offset + page_size <= end_offset:
+                    yield offset + page_size, []
+                return
+    finally:
+        for _, pending_future in in_flight:
+            pending_future.cancel()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def fetch_pages_incremental(api_url_base, headers, logger, cache_path, service, user_id, cancellation_event=None, pause_event=None, cookies_dict=None, page_size=50):
+    """
+    Generator with the same (offset, posts_batch) contract as
+    `fetch_pages_pipelined`, backed by the on-disk post listing cache.
+
+    Pages are fetched from the network, newest first, until a page made up
+    entirely of already-cached, unedited posts is reached; the rest of the
+    listing is then replayed from the cache instead of being downloaded
+    again. A page whose posts have a different 'edited' value than the cache
+    keeps the refresh going. A listing last synced more than
+    POST_CACHE_MAX_AGE_SECONDS ago is fetched in full and replaces the cached
+    one, so edits and deletions further down are picked up too. Newly seen
+    posts are only written to the cache once the refresh connects with the
+    cached listing or reaches the end of the feed, so a cancelled or failed
+    refresh never leaves a gap in it.
+    """
+    try:
+        cache = PostListingCache(cache_path)
+    except sqlite3.Error as e:
+        logger(f"   ⚠️ Could not open post listing cache '{cache_path}': {e}. Fetching all pages.")
+        yield from fetch_pages_pipelined(api_url_base, headers, 0, logger, cancellation_event, pause_event,
+                                         cookies_dict=cookies_dict, page_size=page_size)
+        return
+
+    api_domain = urlparse(api_url_base).netloc.lower()
+    sync_state = cache.get_sync_state(api_domain, service, user_id)
+    known_edits = {}
+    if sync_state and sync_state['complete']:
+        cache_age = time.time() - (sync_state['last_synced'] or 0)
+        if cache_age < POST_CACHE_MAX_AGE_SECONDS:
+            known_edits = cache.get_known_post_edits(api_domain, service, user_id)
+        else:
+            logger(f"   ♻️ Post cache for this creator is {cache_age / 3600:.0f} hour(s) old. Refreshing the whole listing...")
+    if known_edits:
+        logger(f"   ♻️ Post cache: {len(known_edits)} known post(s), newest ID {sync_state['newest_post_id']} "
+               f"({sync_state['newest_published'] or 'unknown date'}). Checking for new posts...")
+
+    listing_posts, new_posts, refreshed_posts, seen_ids = [], [], [], set()
+    pages = fetch_pages_pipelined(api_url_base, headers, 0, logger, cancellation_event, pause_event,
+                                  cookies_dict=cookies_dict, page_size=page_size)
+    try:
+        for offset, posts_batch in pages:
+            if not isinstance(posts_batch, list):
+                yield offset, posts_batch
+                return
+            if not posts_batch:
+                # The whole listing was fetched, so it replaces the cached one.
+                if listing_posts:
+                    cache.replace_listing(api_domain, service, user_id, listing_posts)
+                yield offset, posts_batch
+                return
+
+            page_has_change = False
+            for post in posts_batch:
+                post_id = str(post.get('id'))
+                seen_ids.add(post_id)
+                listing_posts.append(post)
+                if post_id in known_edits:
+                    refreshed_posts.append(post)
+                    if (post.get('edited') or None) != known_edits[post_id]:
+                        page_has_change = True
+                else:
+                    new_posts.append(post)
+                    page_has_change = True
+
+            if known_edits and not page_has_change:
+                pages.close()
+                cache.commit_sync(api_domain, service, user_id, new_posts, refreshed_posts)
+                logger(f"   ♻️ Page {(offset // page_size) + 1} has no new or edited posts ({len(new_posts)} new this run). "
+                       "Loading the rest of the listing from the post cache.")
+                yield offset, posts_batch
+                cached_tail = cache.get_cached_posts(api_domain, service, user_id, exclude_ids=seen_ids)
+                next_offset = offset + page_size
+                for i in range(0, len(cached_tail), page_size):
+                    yield next_offset, cached_tail[i:i + page_size]
+                    next_offset += page_size
+                yield next_offset, []
+                return
+            yield offset, posts_batch
+    finally:
+        pages.close()
+        cache.close()
+
 def fetch_single_post_data(api_domain, service, user_id, post_id, headers, logger, cookies_dict=None):
     """
     --- MODIFIED FUNCTION ---
@@ -87,7 +245,7 @@ def fetch_single_post_data(api_domain, service, user_id, post_id, headers, logge
     post_api_url = f"https://{api_domain}/api/v1/{service}/user/{user_id}/post/{post_id}"
     logger(f"      Fetching full content for post ID {post_id}...")
 
-    scraper = cloudscraper.create_scraper()
+    scraper = get_session(api_domain, use_cloudscraper=True)
 
     try:
         response = scraper.get(post_api_url, headers=headers, timeout=(15, 300), cookies=cookies_dict)
@@ -115,7 +273,7 @@ def fetch_post_comments(api_domain, service, user_id, post_id, headers, logger,
     logger(f"   Fetching comments: {comments_api_url}")
     
     try:
-        response = requests.get(comments_api_url, headers=headers, timeout=(10, 30), cookies=cookies_dict)
+        response = get_session(comments_api_url).get(comments_api_url, headers=headers, timeout=(10, 30), cookies=cookies_dict)
         response.raise_for_status()
         response.encoding = 'utf-8'          
         return response.json()
@@ -138,7 +296,8 @@ def download_from_api(
     app_base_dir=None,
     manga_filename_style_for_sort_check=None,
     processed_post_ids=None,
-    fetch_all_first=False  
+    fetch_all_first=False,
+    use_post_cache=True
     ):
     parsed_input_url_for_domain = urlparse(api_url_input)
     api_domain = parsed_input_url_for_domain.netloc
@@ -176,7 +335,7 @@ def download_from_api(
         direct_post_api_url = f"https://{api_domain}/api/v1/{service}/user/{user_id}/post/{target_post_id}"
         logger(f"   Attempting direct fetch for target post: {direct_post_api_url}")
         try:
-            direct_response = requests.get(direct_post_api_url, headers=headers, timeout=(10, 30), cookies=cookies_for_api)
+            direct_response = get_session(direct_post_api_url).get(direct_post_api_url, headers=headers, timeout=(10, 30), cookies=cookies_for_api)
             direct_response.raise_for_status()
             direct_response.encoding = 'utf-8' 
             direct_post_data = direct_response.json()
@@ -206,6 +365,9 @@ def download_from_api(
     should_fetch_all = fetch_all_first or is_manga_mode_fetch_all_and_sort_oldest_first  
     api_base_url = f"https://{api_domain}/api/v1/{service}/user/{user_id}/posts"
     page_size = 50
+    post_cache_path = None
+    if use_post_cache and app_base_dir and not target_post_id and not end_page and not (start_page and start_page > 1):
+        post_cache_path = os.path.join(app_base_dir, "appdata", "post_listing_cache.db")
     if is_manga_mode_fetch_all_and_sort_oldest_first:
         logger(f"   Manga Mode (Style: {manga_filename_style_for_sort_check if manga_filename_style_for_sort_check else 'Default'} - Oldest First Sort Active): Fetching all posts to sort by date...")
         all_posts_for_manga_mode = []
@@ -217,24 +379,27 @@ def download_from_api(
             logger(f"   Manga Mode: Starting fetch from page 1 (offset 0).")
         if end_page:
             logger(f"   Manga Mode: Will fetch up to page {end_page}.")
-        while True:
-            if pause_event and pause_event.is_set():
-                logger("   Manga mode post fetching paused...")
-                while pause_event.is_set():
-                    if cancellation_event and cancellation_event.is_set():
-                        logger("   Manga mode post fetching cancelled while paused.")
-                        break
-                    time.sleep(0.5)
-                if not (cancellation_event and cancellation_event.is_set()): logger("   Manga mode post fetching resumed.")
-            if cancellation_event and cancellation_event.is_set():
-                logger("   Manga mode post fetching cancelled.")
-                break
-            current_page_num_manga = (current_offset_manga // page_size) + 1
-            if end_page and current_page_num_manga > end_page:
-                logger(f"   Manga Mode: Reached specified end page ({end_page}). Stopping post fetch.")
-                break
-            try:
-                posts_batch_manga = fetch_posts_paginated(api_base_url, headers, current_offset_manga, logger, cancellation_event, pause_event, cookies_dict=cookies_for_api)
+        manga_end_offset = (end_page - 1) * page_size if end_page else None
+        if post_cache_path:
+            manga_pages = fetch_pages_incremental(api_base_url, headers, logger, post_cache_path, service, user_id, cancellation_event, pause_event,
+                                                  cookies_dict=cookies_for_api, page_size=page_size)
+        else:
+            manga_pages = fetch_pages_pipelined(api_base_url, headers, current_offset_manga, logger, cancellation_event, pause_event,
+                                                cookies_dict=cookies_for_api, end_offset=manga_end_offset, page_size=page_size)
+        try:
+            for current_offset_manga, posts_batch_manga in manga_pages:
+                if pause_event and pause_event.is_set():
+                    logger("   Manga mode post fetching paused...")
+                    while pause_event.is_set():
+                        if cancellation_event and cancellation_event.is_set():
+                            logger("   Manga mode post fetching cancelled while paused.")
+                            break
+                        time.sleep(0.5)
+                    if not (cancellation_event and cancellation_event.is_set()): logger("   Manga mode post fetching resumed.")
+                if cancellation_event and cancellation_event.is_set():
+                    logger("   Manga mode post fetching cancelled.")
+                    break
+                current_page_num_manga = (current_offset_manga // page_size) + 1
                 if not isinstance(posts_batch_manga, list):
                     logger(f"❌ API Error (Manga Mode): Expected list of posts, got {type(posts_batch_manga)}.")
                     break
@@ -246,21 +411,21 @@ def download_from_api(
                         logger(f"   Manga Mode: No posts found within the specified page range ({start_page or 1}-{end_page}).")
                     break
                 all_posts_for_manga_mode.extend(posts_batch_manga)
-                
-                logger(f"MANGA_FETCH_PROGRESS:{len(all_posts_for_manga_mode)}:{current_page_num_manga}")
 
-                current_offset_manga += page_size
-                time.sleep(0.6)
-            except RuntimeError as e:
-                if "cancelled by user" in str(e).lower():
-                    logger(f"ℹ️ Manga mode pagination stopped due to cancellation: {e}")
-                else:
-                    logger(f"❌ {e}\n   Aborting manga mode pagination.")
-                break
-            except Exception as e:
-                logger(f"❌ Unexpected error during manga mode fetch: {e}")
-                traceback.print_exc()
-                break
+                logger(f"MANGA_FETCH_PROGRESS:{len(all_posts_for_manga_mode)}:{current_page_num_manga}")
+            else:
+                if end_page and not (cancellation_event and cancellation_event.is_set()):
+                    logger(f"   Manga Mode: Reached specified end page ({end_page}). Stopping post fetch.")
+        except RuntimeError as e:
+            if "cancelled by user" in str(e).lower():
+                logger(f"ℹ️ Manga mode pagination stopped due to cancellation: {e}")
+            else:
+                logger(f"❌ {e}\n   Aborting manga mode pagination.")
+        except Exception as e:
+            logger(f"❌ Unexpected error during manga mode fetch: {e}")
+            traceback.print_exc()
+        finally:
+            manga_pages.close()
         
         if cancellation_event and cancellation_event.is_set(): return
         
@@ -312,67 +477,71 @@ def download_from_api(
         current_offset = (start_page - 1) * page_size
         current_page_num = start_page
         logger(f"   Starting from page {current_page_num} (calculated offset {current_offset}).")
-    while True:
-        if pause_event and pause_event.is_set():
-            logger("   Post fetching loop paused...")
-            while pause_event.is_set():
-                if cancellation_event and cancellation_event.is_set():
-                    logger("   Post fetching loop cancelled while paused.")
-                    break
-                time.sleep(0.5)
-            if not (cancellation_event and cancellation_event.is_set()): logger("   Post fetching loop resumed.")
-        if cancellation_event and cancellation_event.is_set():
-            logger("   Post fetching loop cancelled.")
-            break
-        if target_post_id and processed_target_post_flag:
-            break
-        if not target_post_id and end_page and current_page_num > end_page:
-            logger(f"✅ Reached specified end page ({end_page}) for creator feed. Stopping.")
-            break
-        try:
-            posts_batch = fetch_posts_paginated(api_base_url, headers, current_offset, logger, cancellation_event, pause_event, cookies_dict=cookies_for_api)
+    feed_end_offset = (end_page - 1) * page_size if end_page and not target_post_id else None
+    if post_cache_path:
+        feed_pages = fetch_pages_incremental(api_base_url, headers, logger, post_cache_path, service, user_id, cancellation_event, pause_event,
+                                             cookies_dict=cookies_for_api, page_size=page_size)
+    else:
+        feed_pages = fetch_pages_pipelined(api_base_url, headers, current_offset, logger, cancellation_event, pause_event,
+                                           cookies_dict=cookies_for_api, end_offset=feed_end_offset, page_size=page_size)
+    pending_offset = current_offset
+    try:
+        for current_offset, posts_batch in feed_pages:
+            pending_offset = current_offset + page_size
+            current_page_num = (current_offset // page_size) + 1
+            if pause_event and pause_event.is_set():
+                logger("   Post fetching loop paused...")
+                while pause_event.is_set():
+                    if cancellation_event and cancellation_event.is_set():
+                        logger("   Post fetching loop cancelled while paused.")
+                        break
+                    time.sleep(0.5)
+                if not (cancellation_event and cancellation_event.is_set()): logger("   Post fetching loop resumed.")
+            if cancellation_event and cancellation_event.is_set():
+                logger("   Post fetching loop cancelled.")
+                break
             if not isinstance(posts_batch, list):
                 logger(f"❌ API Error: Expected list of posts, got {type(posts_batch)} at page {current_page_num} (offset {current_offset}).")
                 break
-        except RuntimeError as e:
-            if "cancelled by user" in str(e).lower():
-                logger(f"ℹ️ Pagination stopped due to cancellation: {e}")
-            else:
-                logger(f"❌ {e}\n   Aborting pagination at page {current_page_num} (offset {current_offset}).")
-            break
-        except Exception as e:
-            logger(f"❌ Unexpected error fetching page {current_page_num} (offset {current_offset}): {e}")
-            traceback.print_exc()
-            break
-        if processed_post_ids:
-            original_count = len(posts_batch)
-            posts_batch = [post for post in posts_batch if post.get('id') not in processed_post_ids]
-            skipped_count = original_count - len(posts_batch)
-            if skipped_count > 0:
-                logger(f"   Skipped {skipped_count} already processed post(s) from page {current_page_num}.")
-        
-        if not posts_batch:
+            if processed_post_ids:
+                original_count = len(posts_batch)
+                posts_batch = [post for post in posts_batch if post.get('id') not in processed_post_ids]
+                skipped_count = original_count - len(posts_batch)
+                if skipped_count > 0:
+                    logger(f"   Skipped {skipped_count} already processed post(s) from page {current_page_num}.")
+            
+            if not posts_batch:
+                if target_post_id and not processed_target_post_flag:
+                    logger(f"❌ Target post {target_post_id} not found after checking all available pages (API returned no more posts at offset {current_offset}).")
+                elif not target_post_id:
+                    if current_page_num == (start_page or 1):
+                        logger(f"😕 No posts found on the first page checked (page {current_page_num}, offset {current_offset}).")
+                    else:
+                        logger(f"✅ Reached end of posts (no more content from API at offset {current_offset}).")
+                break
             if target_post_id and not processed_target_post_flag:
-                logger(f"❌ Target post {target_post_id} not found after checking all available pages (API returned no more posts at offset {current_offset}).")
+                matching_post = next((p for p in posts_batch if str(p.get('id')) == str(target_post_id)), None)
+                if matching_post:
+                    logger(f"🎯 Found target post {target_post_id} on page {current_page_num} (offset {current_offset}).")
+                    yield [matching_post]
+                    processed_target_post_flag = True
             elif not target_post_id:
-                if current_page_num == (start_page or 1):
-                    logger(f"😕 No posts found on the first page checked (page {current_page_num}, offset {current_offset}).")
-                else:
-                    logger(f"✅ Reached end of posts (no more content from API at offset {current_offset}).")
-            break
-        if target_post_id and not processed_target_post_flag:
-            matching_post = next((p for p in posts_batch if str(p.get('id')) == str(target_post_id)), None)
-            if matching_post:
-                logger(f"🎯 Found target post {target_post_id} on page {current_page_num} (offset {current_offset}).")
-                yield [matching_post]
-                processed_target_post_flag = True
-        elif not target_post_id:
-            yield posts_batch
-        if processed_target_post_flag:
-            break
-        current_offset += page_size
-        current_page_num += 1
-        time.sleep(0.6)
+                yield posts_batch
+            if processed_target_post_flag:
+                break
+        else:
+            if feed_end_offset is not None and not (cancellation_event and cancellation_event.is_set()):
+                logger(f"✅ Reached specified end page ({end_page}) for creator feed. Stopping.")
+    except RuntimeError as e:
+        if "cancelled by user" in str(e).lower():
+            logger(f"ℹ️ Pagination stopped due to cancellation: {e}")
+        else:
+            logger(f"❌ {e}\n   Aborting pagination at page {(pending_offset // page_size) + 1} (offset {pending_offset}).")
+    except Exception as e:
+        logger(f"❌ Unexpected error fetching page {(pending_offset // page_size) + 1} (offset {pending_offset}): {e}")
+        traceback.print_exc()
+    finally:
+        feed_pages.close()
     if target_post_id and not processed_target_post_flag and not (cancellation_event and cancellation_event.is_set()):
         logger(f"❌ Target post {target_post_id} could not be found after checking all relevant pages (final check after loop).")
 
@@ -0,0 +1,142 @@
+# --- Standard Library Imports ---
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, CancelledError, wait as wait_for_futures
+
+# --- Local Application Imports ---
+from ..config.constants import ASYNC_ENGINE_STEP_THREADS
+
+
+def _advance_steps(steps, value=None):
+    """
+    Runs a worker's `_process_steps` generator up to its next yield.
+
+    StopIteration cannot travel through an asyncio future, so the outcome is
+    returned as a tuple instead.
+
+    Returns:
+        tuple: (True, result_tuple) when the post is finished, or
+               (False, file_jobs) when it is waiting for its files.
+    """
+    try:
+        return False, (next(steps) if value is None else steps.send(value))
+    except StopIteration as finished:
+        return True, finished.value
+
+
+class AsyncDownloadEngine:
+    """
+    An asyncio-based alternative to the thread-per-post worker pool.
+
+    Each post is a coroutine on one event loop running in a background
+    thread. Parsing and bookkeeping steps of `PostProcessorWorker` run on a
+    small step pool, and file transfers are awaited on the shared transfer
+    scheduler (see transfer_scheduler.py). A post waiting for its files holds
+    no thread, so a run needs the scheduler's transfer threads plus a few
+    step threads instead of one thread for each running post.
+
+    Transfers still use the blocking requests-based download path, so
+    resume, multipart and per-host rate limiting behave exactly as in the
+    threaded pool. `submit_post` returns a `concurrent.futures.Future` with
+    the same 7-item result as `PostProcessorWorker.process`.
+
+    The scheduler only runs file jobs; it has no notion of a post. The event
+    loop is what lets a post's steps be suspended between "files submitted"
+    and "all files finished" without parking a thread, while the semaphore
+    bounds how many posts have files queued at once. Folding this into the
+    scheduler would mean reimplementing that suspension with chained future
+    callbacks, so the loop stays as the post layer on top of it.
+    """
+
+    def __init__(self, max_concurrent_posts, thread_name_prefix='AsyncEngine'):
+        self.max_concurrent_posts = max(1, int(max_concurrent_posts))
+        self.step_executor = ThreadPoolExecutor(
+            max_workers=min(self.max_concurrent_posts, ASYNC_ENGINE_STEP_THREADS),
+            thread_name_prefix=f'{thread_name_prefix}Step'
+        )
+        # Posts not finished yet; each future removes itself when done.
+        self.post_futures = set()
+        self.post_futures_lock = threading.Lock()
+        self.is_shutdown = False
+        self.loop = asyncio.new_event_loop()
+        loop_ready = threading.Event()
+        self.loop_thread = threading.Thread(
+            target=self._run_loop, args=(loop_ready,), daemon=True, name=f'{thread_name_prefix}Loop'
+        )
+        self.loop_thread.start()
+        loop_ready.wait()
+
+    def _run_loop(self, loop_ready):
+        asyncio.set_event_loop(self.loop)
+        # The semaphore must be created on the loop that uses it.
+        self.post_slots = asyncio.Semaphore(self.max_concurrent_posts)
+        self.loop.call_soon(loop_ready.set)
+        self.loop.run_forever()
+
+    def submit_post(self, worker):
+        """
+        Schedules a post for processing.
+
+        Args:
+            worker (PostProcessorWorker): The configured worker for the post.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the worker's result tuple.
+        """
+        if self.is_shutdown:
+            raise RuntimeError("cannot schedule new posts after shutdown")
+        future = asyncio.run_coroutine_threadsafe(self._run_post(worker), self.loop)
+        with self.post_futures_lock:
+            self.post_futures.add(future)
+        future.add_done_callback(self._forget_post_future)
+        return future
+
+    def _forget_post_future(self, future):
+        with self.post_futures_lock:
+            self.post_futures.discard(future)
+
+    async def _run_post(self, worker):
+        async with self.post_slots:
+            steps = worker._process_steps()
+            is_finished, value = await self.loop.run_in_executor(self.step_executor, _advance_steps, steps)
+            if is_finished:
+                return value
+            file_results = await asyncio.gather(
+                *(self._run_file_job(worker, file_job) for file_job in value), return_exceptions=True
+            )
+            file_results = [
+                CancelledError() if isinstance(result, asyncio.CancelledError) else result
+                for result in file_results
+            ]
+            is_finished, value = await self.loop.run_in_executor(self.step_executor, _advance_steps, steps, file_results)
+            return value
+
+    async def _run_file_job(self, worker, file_job):
+        if worker.check_cancel():
+            raise CancelledError()
+        return await asyncio.wrap_future(worker.submit_file_job(file_job))
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        """
+        Stops the engine, mirroring `ThreadPoolExecutor.shutdown`.
+
+        Args:
+            wait (bool): If True, blocks until running posts have finished.
+            cancel_futures (bool): If True, queued posts are cancelled and running
+                                   posts stop waiting for their files.
+        """
+        if self.is_shutdown:
+            return
+        self.is_shutdown = True
+        with self.post_futures_lock:
+            pending_futures = list(self.post_futures)
+        if cancel_futures:
+            for future in pending_futures:
+                future.cancel()
+        if wait:
+            wait_for_futures(pending_futures)
+        self.step_executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        if wait:
+            self.loop_thread.join()
+            self.loop.close()
@@ -1,6 +1,7 @@
 import time
 import cloudscraper
 import json
+from ..utils.session_pool import get_session
 
 def fetch_server_channels(server_id, logger=print, cookies_dict=None):
     """
@@ -10,7 +11,7 @@ def fetch_server_channels(server_id, logger=print, cookies_dict=None):
     api_url = f"https://kemono.cr/api/v1/discord/server/{server_id}"
     logger(f"   Fetching channels for server: {api_url}")
 
-    scraper = cloudscraper.create_scraper()
+    scraper = get_session(api_url, use_cloudscraper=True)
     headers = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
         'Referer': f'https://kemono.cr/discord/server/{server_id}',
@@ -33,9 +34,10 @@ def fetch_channel_messages(channel_id, logger=print, cancellation_event=None, pa
     """
     A generator that fetches all messages for a specific Discord channel, handling pagination.
     Uses cloudscraper and proper headers to bypass server protection.
+    Page requests are paced by the shared per-host rate limiter.
     """
-    scraper = cloudscraper.create_scraper()
     base_url = f"https://kemono.cr/api/v1/discord/channel/{channel_id}"
+    scraper = get_session(base_url, use_cloudscraper=True)
     headers = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
         'Referer': f'https://kemono.cr/discord/channel/{channel_id}',
@@ -64,7 +66,7 @@ def fetch_channel_messages(channel_id, logger=print, cancellation_event=None, pa
         logger(f"   Fetching messages from API: page starting at offset {offset}")
 
         try:
-            response = scraper.get(paginated_url, headers=headers, cookies=cookies_dict, timeout=30)
+            response = scraper.get(paginated_url, headers=headers, cookies=cookies_dict, timeout=30, cancellation_event=cancellation_event)
             response.raise_for_status()
             messages_batch = response.json()
 
@@ -80,7 +82,6 @@ def fetch_channel_messages(channel_id, logger=print, cancellation_event=None, pa
                 break
 
             offset += page_size
-            time.sleep(0.5) # Be respectful to the API
 
         except (cloudscraper.exceptions.CloudflareException, json.JSONDecodeError) as e:
             logger(f"   ❌ Error fetching messages at offset {offset}: {e}")
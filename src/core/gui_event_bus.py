@@ -0,0 +1,123 @@
+# --- Standard Library Imports ---
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+
+# --- Local Application Imports ---
+from ..config.constants import GUI_EVENT_BACKPRESSURE_MAX_WAIT, GUI_EVENT_QUEUE_MAX_SIZE
+
+# --- Module Constants ---
+LOG_BATCH_EVENT = 'log_batch'
+# Only the latest value of these matters, so they replace each other instead of queueing.
+_LATEST_ONLY_EVENTS = ('file_progress', 'file_download_status')
+
+
+class GuiEventBus(queue.Queue):
+    """
+    The queue workers use to reach the GUI, with coalescing and a size bound.
+
+    It is a `queue.Queue`, so workers and the multipart downloader keep
+    sending events with `put` exactly as before, but the queue is shaped
+    for a GUI that drains it once per frame (see `drain`):
+
+    - 'file_progress' keeps only the latest payload per file, and
+      'file_download_status' only the latest value; neither ever blocks.
+    - Consecutive 'progress' log lines are merged into one LOG_BATCH_EVENT
+      whose payload is the list of lines, so they can be appended in bulk.
+    - All other events keep their order. Log lines and ordered events count
+      towards `maxsize`; when it is reached, worker threads wait (up to
+      GUI_EVENT_BACKPRESSURE_MAX_WAIT seconds, so a stalled GUI cannot hang
+      them) for the GUI to catch up. The thread that created the bus, the
+      GUI thread, never waits.
+    """
+
+    def __init__(self, maxsize=GUI_EVENT_QUEUE_MAX_SIZE):
+        self.owner_thread = threading.current_thread()
+        super().__init__(maxsize)
+
+    def _init(self, maxsize):
+        self.queue = deque()
+        self.pending_count = 0
+        self.latest_file_progress = OrderedDict()
+        self.latest_values = {}
+
+    def _qsize(self):
+        return self.pending_count + len(self.latest_file_progress) + len(self.latest_values)
+
+    def _put(self, item):
+        if item.get('type') == 'progress':
+            if self.queue and self.queue[-1]['type'] == LOG_BATCH_EVENT:
+                self.queue[-1]['payload'][0].extend(item.get('payload', ()))
+            else:
+                self.queue.append({'type': LOG_BATCH_EVENT, 'payload': (list(item.get('payload', ())),)})
+        else:
+            self.queue.append(item)
+        self.pending_count += 1
+
+    def _get(self):
+        if not self.queue:
+            if self.latest_file_progress:
+                return {'type': 'file_progress', 'payload': self.latest_file_progress.popitem(last=False)[1]}
+            event_type, payload = self.latest_values.popitem()
+            return {'type': event_type, 'payload': payload}
+        item = self.queue.popleft()
+        if item['type'] == LOG_BATCH_EVENT:
+            self.pending_count -= len(item['payload'][0])
+        else:
+            self.pending_count -= 1
+        return item
+
+    def put(self, item, block=True, timeout=None):
+        event_type = item.get('type')
+        with self.not_full:
+            if event_type in _LATEST_ONLY_EVENTS:
+                payload = item.get('payload', ())
+                if event_type == 'file_progress':
+                    file_key = payload[0] if payload else ""
+                    is_new = self.latest_file_progress.pop(file_key, None) is None
+                    self.latest_file_progress[file_key] = payload
+                else:
+                    is_new = event_type not in self.latest_values
+                    self.latest_values[event_type] = payload
+                if is_new:
+                    self.unfinished_tasks += 1
+                self.not_empty.notify()
+                return
+
+            if block and self.maxsize > 0 and threading.current_thread() is not self.owner_thread:
+                max_wait = GUI_EVENT_BACKPRESSURE_MAX_WAIT if timeout is None else min(timeout, GUI_EVENT_BACKPRESSURE_MAX_WAIT)
+                deadline = time.monotonic() + max_wait
+                while self.pending_count >= self.maxsize:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.not_full.wait(remaining)
+
+            self._put(item)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+
+    def drain(self):
+        """
+        Takes everything pending in one step; meant to be called once per GUI frame.
+
+        Returns:
+            tuple: (events, latest_events). `events` are the ordered events, with
+                   log lines merged into LOG_BATCH_EVENT items; `latest_events` are
+                   the coalesced latest-only events, as {'type', 'payload'} dicts.
+        """
+        with self.mutex:
+            events = list(self.queue)
+            self.queue.clear()
+            self.pending_count = 0
+            latest_events = [
+                {'type': 'file_progress', 'payload': payload} for payload in self.latest_file_progress.values()
+            ]
+            latest_events.extend({'type': event_type, 'payload': payload} for event_type, payload in self.latest_values.items())
+            self.latest_file_progress = OrderedDict()
+            self.latest_values = {}
+            self.unfinished_tasks = 0
+            self.all_tasks_done.notify_all()
+            self.not_full.notify_all()
+        return events, latest_events
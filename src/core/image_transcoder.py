@@ -0,0 +1,173 @@
+# --- Standard Library Imports ---
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# --- Local Application Imports ---
+from ..config.constants import (
+    IMAGE_COMPRESSION_DEFAULT_FORMAT, IMAGE_COMPRESSION_DEFAULT_QUALITY, IMAGE_COMPRESSION_FORMATS,
+    IMAGE_TRANSCODE_MAX_WORKERS, IMAGE_TRANSCODE_QUEUE_DEPTH
+)
+
+
+def transcode_image_file(source_path, target_path, image_format, quality):
+    """
+    Re-encodes an image file into another file. Runs in an encoder process.
+
+    The encoder writes straight to a temporary file next to the target, which
+    is renamed into place once complete, so no encoded copy is held in memory
+    and a failed encode never leaves a partial file under the target name.
+
+    Args:
+        source_path (str): The downloaded image.
+        target_path (str): Where the encoded image goes.
+        image_format (str): A key of IMAGE_COMPRESSION_FORMATS (a Pillow format name).
+        quality (int): Encoder quality, 1-100.
+
+    Returns:
+        int: The size of the encoded file in bytes.
+    """
+    from PIL import Image
+
+    temp_path = target_path + ".transcode"
+    try:
+        with Image.open(source_path) as img:
+            if image_format == "JPEG":
+                if img.mode != 'RGB':
+                    img = img.convert('RGB')
+            elif img.mode not in ('RGB', 'RGBA'):
+                img = img.convert('RGBA')
+            img.save(temp_path, format=image_format, quality=quality)
+        os.replace(temp_path, target_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+        raise
+    return os.path.getsize(target_path)
+
+
+class ImageTranscoder:
+    """
+    The post-download image compression stage.
+
+    Encoding runs on a ProcessPoolExecutor (one process per core by default)
+    instead of inside the download threads, where CPU-bound Pillow work held
+    the GIL and stalled every other transfer. At most `queue_depth` images
+    are queued or encoding at once; `submit` waits for room beyond that, so
+    a fast connection cannot pile up work the encoders will not reach.
+
+    Args:
+        image_format (str): A key of IMAGE_COMPRESSION_FORMATS.
+        quality (int): Encoder quality, 1-100.
+        max_workers (int, optional): Encoder processes; None for one per core.
+        queue_depth (int): Images that may be queued or encoding at once.
+    """
+
+    def __init__(self, image_format=IMAGE_COMPRESSION_DEFAULT_FORMAT, quality=IMAGE_COMPRESSION_DEFAULT_QUALITY,
+                 max_workers=IMAGE_TRANSCODE_MAX_WORKERS, queue_depth=IMAGE_TRANSCODE_QUEUE_DEPTH):
+        self.image_format = IMAGE_COMPRESSION_DEFAULT_FORMAT
+        self.quality = IMAGE_COMPRESSION_DEFAULT_QUALITY
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.queue_slots = threading.BoundedSemaphore(max(1, int(queue_depth)))
+        self.executor = None
+        self.lock = threading.Lock()
+        self.configure(image_format, quality)
+
+    def configure(self, image_format=None, quality=None):
+        """
+        Changes the output format or quality for images submitted from now on.
+
+        Args:
+            image_format (str, optional): A key of IMAGE_COMPRESSION_FORMATS; unknown values are ignored.
+            quality (int, optional): Encoder quality, clamped to 1-100.
+        """
+        if image_format is not None:
+            image_format = str(image_format).upper()
+            if image_format in IMAGE_COMPRESSION_FORMATS:
+                self.image_format = image_format
+        if quality is not None:
+            try:
+                self.quality = max(1, min(100, int(quality)))
+            except (TypeError, ValueError):
+                pass
+
+    @property
+    def extension(self):
+        """The file extension of the current output format, e.g. '.webp'."""
+        return IMAGE_COMPRESSION_FORMATS[self.image_format]
+
+    def _get_executor(self):
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self.executor
+
+    def _handle_done(self, future):
+        self.queue_slots.release()
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            # An encoder process died; the next submit starts a fresh pool.
+            with self.lock:
+                self.executor = None
+
+    def submit(self, source_path, target_path):
+        """
+        Queues an image for encoding, waiting while the queue is full.
+
+        Args:
+            source_path (str): The downloaded image.
+            target_path (str): Where the encoded image goes; use `extension` for its suffix.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the encoded file's size in bytes.
+        """
+        self.queue_slots.acquire()
+        try:
+            future = self._get_executor().submit(
+                transcode_image_file, source_path, target_path, self.image_format, self.quality
+            )
+        except BaseException as exc:
+            self.queue_slots.release()
+            if isinstance(exc, BrokenProcessPool):
+                with self.lock:
+                    self.executor = None
+            raise
+        future.add_done_callback(self._handle_done)
+        return future
+
+    def shutdown(self):
+        """Stops the encoder processes, dropping queued images."""
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# --- Module State ---
+_transcoder = None
+_transcoder_lock = threading.Lock()
+
+
+def get_image_transcoder():
+    """Returns the process-wide image transcoder, creating it on first use."""
+    global _transcoder
+    if _transcoder is not None:
+        return _transcoder
+    with _transcoder_lock:
+        if _transcoder is None:
+            _transcoder = ImageTranscoder()
+        return _transcoder
+
+
+def configure_image_transcoder(image_format=None, quality=None):
+    """Applies a new output format or quality to the shared transcoder (see ImageTranscoder.configure)."""
+    get_image_transcoder().configure(image_format, quality)
+
+
+def shutdown_image_transcoder():
+    """Stops the shared transcoder's encoder processes, if it was ever started."""
+    if _transcoder is not None:
+        _transcoder.shutdown()
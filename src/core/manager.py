@@ -1,7 +1,6 @@
 import threading
 import time
 import os
-import json
 import traceback
 from concurrent.futures import ThreadPoolExecutor, as_completed, Future
 from .api_client import download_from_api
@@ -10,7 +9,7 @@ from ..config.constants import (
     STYLE_DATE_BASED, STYLE_POST_TITLE_GLOBAL_NUMBERING,
     MAX_THREADS
 )
-from ..utils.file_utils import clean_folder_name
+from ..utils.creator_profile_store import get_creator_profile_store
 
 
 class DownloadManager:
@@ -43,6 +42,7 @@ class DownloadManager:
         self.creator_profiles_dir = None
         self.current_creator_name_for_profile = None
         self.current_creator_profile_path = None
+        self.creator_profile_store = None
         self.session_file_path = None
 
     def _log(self, message):
@@ -191,6 +191,8 @@ class DownloadManager:
             if self.thread_pool:
                 self.thread_pool.shutdown(wait=True)
             self.is_running = False
+            if self.creator_profile_store:
+                self.creator_profile_store.flush()
             self._log("🏁 All processing tasks have completed or been cancelled.") 
             self.progress_queue.put({
                 'type': 'finished',
@@ -223,10 +225,7 @@ class DownloadManager:
                         self.progress_queue.put({'type': 'post_processed_history', 'payload': (history,)})
                         post_id = history.get('post_id')
                         if post_id and self.current_creator_profile_path:
-                            profile_data = self._setup_creator_profile({'creator_name_for_profile': self.current_creator_name_for_profile, 'session_file_path': self.session_file_path})
-                            if post_id not in profile_data.get('processed_post_ids', []):
-                                profile_data.setdefault('processed_post_ids', []).append(post_id)
-                                self._save_creator_profile(profile_data)
+                            self.creator_profile_store.add_processed_post(self.current_creator_name_for_profile, post_id)
 
             except Exception as e:
                 self._log(f"❌ Worker task resulted in an exception: {e}")
@@ -242,30 +241,15 @@ class DownloadManager:
 
         appdata_dir = os.path.dirname(config.get('session_file_path', '.'))
         self.creator_profiles_dir = os.path.join(appdata_dir, "creator_profiles")
-        os.makedirs(self.creator_profiles_dir, exist_ok=True)
-
-        safe_filename = clean_folder_name(self.current_creator_name_for_profile) + ".json"
-        self.current_creator_profile_path = os.path.join(self.creator_profiles_dir, safe_filename)
-
-        if os.path.exists(self.current_creator_profile_path):
-            try:
-                with open(self.current_creator_profile_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, OSError) as e:
-                self._log(f"❌ Error loading creator profile '{safe_filename}': {e}. Starting fresh.")
-        return {}
+        self.creator_profile_store = get_creator_profile_store(self.creator_profiles_dir, logger=self._log)
+        self.current_creator_profile_path = self.creator_profile_store.profile_path(self.current_creator_name_for_profile)
+        return self.creator_profile_store.load(self.current_creator_name_for_profile)
 
     def _save_creator_profile(self, data):
-        """Saves the provided data to the current creator's profile file."""
+        """Saves the provided data to the current creator's profile; the file is written in the background."""
         if not self.current_creator_profile_path:
             return
-        try:
-            temp_path = self.current_creator_profile_path + ".tmp"
-            with open(temp_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
-            os.replace(temp_path, self.current_creator_profile_path)
-        except OSError as e:
-            self._log(f"❌ Error saving creator profile to '{self.current_creator_profile_path}': {e}")
+        self.creator_profile_store.save(self.current_creator_name_for_profile, data)
 
     def cancel_session(self):
         """Cancels the current running session."""
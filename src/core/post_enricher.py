@@ -0,0 +1,150 @@
+# --- Standard Library Imports ---
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+# --- Local Application Imports ---
+from .api_client import fetch_post_comments, fetch_single_post_data
+from ..config.constants import (
+    CHAR_SCOPE_COMMENTS, ENRICHMENT_MAX_WORKERS, ENRICHMENT_WINDOW, PREFETCHED_COMMENTS_KEY
+)
+from ..utils.network_utils import prepare_cookies_for_request
+
+
+class PostEnricher:
+    """
+    A pipeline stage between `download_from_api` and the post workers.
+
+    Post listings do not include every field a run may need. When a run
+    needs the post body (external links, content image scan, text export)
+    or the comments (comment-scope character filter, comment export), each
+    post's extra data is fetched here on a small thread pool of its own,
+    up to ENRICHMENT_WINDOW posts ahead of the consumer. Posts then reach the
+    workers complete, so workers no longer wait on these requests between
+    file transfers.
+
+    Comments are stored on the post under PREFETCHED_COMMENTS_KEY. A fetch
+    that fails leaves the post as it was, and the worker falls back to
+    fetching inline.
+    """
+
+    def __init__(self, api_url_input, service, user_id, needs_content, needs_comments, logger,
+                 use_cookie=False, cookie_text="", selected_cookie_file=None, app_base_dir=None,
+                 cancellation_event=None, pause_event=None, max_workers=ENRICHMENT_MAX_WORKERS,
+                 window=ENRICHMENT_WINDOW):
+        self.api_domain = urlparse(api_url_input).netloc
+        self.service = service
+        self.user_id = user_id
+        self.needs_content = needs_content
+        self.needs_comments = needs_comments
+        self.logger = logger
+        self.cancellation_event = cancellation_event
+        self.pause_event = pause_event
+        self.window = max(1, window)
+        self.max_workers = max(1, max_workers)
+        self.cookies = prepare_cookies_for_request(
+            use_cookie, cookie_text, selected_cookie_file, app_base_dir, logger, target_domain=self.api_domain
+        )
+
+    @classmethod
+    def from_worker_args(cls, args, logger):
+        """
+        Builds an enricher from a run's PostProcessorWorker arguments.
+
+        Args:
+            args (dict): The worker argument template of the run.
+            logger (callable): The logging function.
+
+        Returns:
+            PostEnricher or None: The enricher, or None if the run needs no extra data
+                                  (or targets Discord, which has no such endpoints).
+        """
+        if args.get('service') == 'discord' or not args.get('api_url_input'):
+            return None
+        is_text_only = args.get('filter_mode') == 'text_only'
+        needs_content = bool(
+            args.get('show_external_links') or args.get('extract_links_only') or
+            args.get('scan_content_for_images') or (is_text_only and args.get('text_only_scope') == 'content')
+        )
+        filter_holder = args.get('dynamic_character_filter_holder')
+        has_character_filters = bool(
+            args.get('filter_character_list') or (filter_holder and filter_holder.get_filters())
+        )
+        needs_comments = (
+            (has_character_filters and args.get('char_filter_scope') == CHAR_SCOPE_COMMENTS) or
+            (is_text_only and args.get('text_only_scope') == 'comments')
+        )
+        if not needs_content and not needs_comments:
+            return None
+        return cls(
+            args.get('api_url_input'), args.get('service'), args.get('user_id'), needs_content, needs_comments, logger,
+            use_cookie=args.get('use_cookie', False), cookie_text=args.get('cookie_text', ""),
+            selected_cookie_file=args.get('selected_cookie_file'), app_base_dir=args.get('app_base_dir'),
+            cancellation_event=args.get('cancellation_event'), pause_event=args.get('pause_event')
+        )
+
+    def _is_cancelled(self):
+        return bool(self.cancellation_event and self.cancellation_event.is_set())
+
+    def _wait_while_paused(self):
+        while self.pause_event and self.pause_event.is_set() and not self._is_cancelled():
+            time.sleep(0.5)
+
+    def _enrich_post(self, post):
+        """Returns a copy of a post with its body and/or comments filled in."""
+        self._wait_while_paused()
+        if self._is_cancelled():
+            return post
+        service = post.get('service') or self.service
+        user_id = post.get('user') or self.user_id
+        post_id = post.get('id')
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)',
+            'Referer': f"https://{self.api_domain}/{service}/user/{user_id}",
+            'Accept': 'text/css'
+        }
+        enriched_post = dict(post)
+        if self.needs_content and post.get('content') is None:
+            full_post_data = fetch_single_post_data(
+                self.api_domain, service, user_id, post_id, headers, self.logger, cookies_dict=self.cookies
+            )
+            if isinstance(full_post_data, dict):
+                enriched_post.update(full_post_data)
+        if self.needs_comments and PREFETCHED_COMMENTS_KEY not in post:
+            try:
+                comments_data = fetch_post_comments(
+                    self.api_domain, service, user_id, post_id, headers, self.logger,
+                    self.cancellation_event, self.pause_event, cookies_dict=self.cookies
+                )
+                enriched_post[PREFETCHED_COMMENTS_KEY] = comments_data or []
+            except RuntimeError as e:
+                self.logger(f"   ⚠️ Could not prefetch comments for post {post_id}: {e}")
+        return enriched_post
+
+    def enrich(self, posts):
+        """
+        Enriches posts concurrently and yields them in their original order.
+
+        Args:
+            posts (iterable): Post dicts, e.g. flattened `download_from_api` batches.
+
+        Yields:
+            dict: Each post with its extra data. Stops early if the run is cancelled.
+        """
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='PostEnricher_') as enrich_pool:
+            try:
+                for post in posts:
+                    if self._is_cancelled():
+                        return
+                    pending.append(enrich_pool.submit(self._enrich_post, post))
+                    if len(pending) >= self.window:
+                        yield pending.popleft().result()
+                while pending:
+                    if self._is_cancelled():
+                        return
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
@@ -0,0 +1,314 @@
+# --- Standard Library Imports ---
+import bisect
+import itertools
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+# --- Local Application Imports ---
+from ..config.constants import (
+    TRANSFER_MAX_CONCURRENT, TRANSFER_MAX_PER_HOST,
+    TRANSFER_PRIORITY_POST_ORDER, TRANSFER_PRIORITY_SMALLEST_FIRST
+)
+from ..utils.network_utils import get_url_host
+
+
+class _TransferJob:
+    __slots__ = ('sort_key', 'post_key', 'host', 'candidate_hosts', 'fn', 'kwargs', 'future')
+
+    def __init__(self, sort_key, post_key, host, candidate_hosts, fn, kwargs, future):
+        self.sort_key = sort_key
+        self.post_key = post_key
+        # None until a job that picks its own host reports it with `set_transfer_host`.
+        self.host = host
+        self.candidate_hosts = candidate_hosts
+        self.fn = fn
+        self.kwargs = kwargs
+        self.future = future
+
+    def __lt__(self, other):
+        return self.sort_key < other.sort_key
+
+
+class _PostQueue:
+    __slots__ = ('sequence', 'jobs', 'active')
+
+    def __init__(self, sequence):
+        self.sequence = sequence
+        self.jobs = []
+        self.active = 0
+
+
+class TransferScheduler:
+    """
+    One pool of transfer threads shared by every post worker.
+
+    Posts submit their file downloads here instead of opening a pool each.
+    The next job to run is chosen by:
+
+    1. Fair share: the post with the fewest running transfers goes first,
+       so a post with hundreds of attachments uses idle slots without
+       starving the posts queued after it.
+    2. Priority: within that choice, jobs are ordered by post order (the
+       order posts were submitted, then file index) or smallest file first
+       when a size is known.
+    3. Caps: at most `max_concurrent` transfers run at once, and at most
+       `max_per_host` against one host. A transfer whose host is only chosen
+       once it runs (a CDN node lease) is submitted with its candidate hosts
+       and counted against the host it reports with `set_transfer_host`.
+
+    Threads are started on demand, like ThreadPoolExecutor: only when a job
+    is queued and no thread is idle, up to the current limit.
+
+    A transfer that has to wait on non-network work (e.g. image compression)
+    can lend its slot to queued transfers with `detached`.
+    """
+
+    def __init__(self, max_concurrent=TRANSFER_MAX_CONCURRENT, max_per_host=TRANSFER_MAX_PER_HOST,
+                 priority=TRANSFER_PRIORITY_POST_ORDER):
+        self.condition = threading.Condition()
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.max_per_host = max(1, int(max_per_host))
+        self.priority = priority
+        self.posts = {}
+        self.host_active = {}
+        self.active = 0
+        self.detached_count = 0
+        self.queued_count = 0
+        self.idle_threads = 0
+        self.threads = []
+        self.local = threading.local()
+        self.post_sequence = itertools.count()
+        self.job_sequence = itertools.count()
+
+    def configure(self, max_concurrent=None, max_per_host=None, priority=None):
+        """
+        Changes the scheduler's limits or priority policy.
+
+        Already queued jobs keep their position; the new limits apply to
+        the next job that is started.
+
+        Args:
+            max_concurrent (int, optional): Total transfers that may run at once.
+            max_per_host (int, optional): Transfers that may run against one host.
+            priority (str, optional): TRANSFER_PRIORITY_POST_ORDER or
+                                      TRANSFER_PRIORITY_SMALLEST_FIRST.
+        """
+        with self.condition:
+            if max_concurrent is not None:
+                self.max_concurrent = max(1, int(max_concurrent))
+            if max_per_host is not None:
+                self.max_per_host = max(1, int(max_per_host))
+            if priority is not None:
+                self.priority = priority
+            self._adjust_thread_count()
+            self.condition.notify_all()
+
+    def submit(self, post_key, fn, kwargs=None, url=None, size_hint=None, order=0, candidate_hosts=None):
+        """
+        Queues one file transfer.
+
+        Args:
+            post_key (hashable): Identifies the submitting post for fair sharing.
+            fn (callable): The transfer function.
+            kwargs (dict, optional): Keyword arguments for `fn`.
+            url (str, optional): The URL being fetched, used for the per-host cap.
+            size_hint (int, optional): The file size if known, for smallest-first.
+            order (int): The file's position within its post.
+            candidate_hosts (iterable, optional): For a transfer that chooses its host
+                once running; it is held back only while all of these are at the
+                per-host cap, and `url` is not used for the cap.
+
+        Returns:
+            concurrent.futures.Future: Resolves to `fn`'s return value.
+        """
+        future = Future()
+        with self.condition:
+            post_queue = self.posts.get(post_key)
+            if post_queue is None:
+                post_queue = self.posts[post_key] = _PostQueue(next(self.post_sequence))
+            position = (post_queue.sequence, order, next(self.job_sequence))
+            if self.priority == TRANSFER_PRIORITY_SMALLEST_FIRST:
+                size = size_hint if isinstance(size_hint, int) and size_hint >= 0 else float('inf')
+                sort_key = (size,) + position
+            else:
+                sort_key = position
+            if candidate_hosts:
+                job = _TransferJob(sort_key, post_key, None, tuple(candidate_hosts), fn, kwargs or {}, future)
+            else:
+                job = _TransferJob(sort_key, post_key, get_url_host(url or ""), None, fn, kwargs or {}, future)
+            bisect.insort(post_queue.jobs, job)
+            self.queued_count += 1
+            self._adjust_thread_count()
+            self.condition.notify()
+        return future
+
+    def set_transfer_host(self, url_or_host):
+        """
+        Counts the calling transfer against the host it actually connects to.
+
+        Called by a transfer after leasing a CDN node, or after rotating to
+        another one. Outside a transfer run by this scheduler it does nothing.
+
+        Args:
+            url_or_host (str): The URL being fetched, or its host.
+        """
+        job = getattr(self.local, 'job', None)
+        if job is None:
+            return
+        host = get_url_host(url_or_host)
+        with self.condition:
+            if host == job.host:
+                return
+            if not getattr(self.local, 'detached', False):
+                self._release_host(job.host)
+                self.host_active[host] = self.host_active.get(host, 0) + 1
+            job.host = host
+            self.condition.notify_all()
+
+    def saturated_hosts(self):
+        """Returns the hosts that have reached the per-host cap, e.g. to exclude them from a node lease."""
+        with self.condition:
+            return {host for host, count in self.host_active.items() if count >= self.max_per_host}
+
+    def _release_host(self, host):
+        if host is None:
+            return
+        self.host_active[host] -= 1
+        if not self.host_active[host]:
+            del self.host_active[host]
+
+    @contextmanager
+    def detached(self):
+        """
+        Lends the calling transfer's slot to queued transfers for the duration of the block.
+
+        For a transfer thread about to wait on work that does not use the
+        network. The slot is taken back on exit even if that briefly puts the
+        scheduler over its limits. Outside a transfer run by this scheduler it
+        does nothing.
+        """
+        job = getattr(self.local, 'job', None)
+        if job is None or getattr(self.local, 'detached', False):
+            yield
+            return
+        with self.condition:
+            self.active -= 1
+            self._release_host(job.host)
+            self.detached_count += 1
+            self._adjust_thread_count()
+            self.condition.notify_all()
+        self.local.detached = True
+        try:
+            yield
+        finally:
+            self.local.detached = False
+            with self.condition:
+                self.detached_count -= 1
+                self.active += 1
+                if job.host is not None:
+                    self.host_active[job.host] = self.host_active.get(job.host, 0) + 1
+
+    def _adjust_thread_count(self):
+        # Detached transfers keep their threads, so as many extra threads may run.
+        while (self.idle_threads < self.queued_count
+               and len(self.threads) < self.max_concurrent + self.detached_count):
+            thread = threading.Thread(
+                target=self._worker_loop, daemon=True, name=f"Transfer_{len(self.threads)}"
+            )
+            self.threads.append(thread)
+            self.idle_threads += 1
+            thread.start()
+
+    def _is_held_back(self, job):
+        if job.candidate_hosts is not None:
+            return all(self.host_active.get(host, 0) >= self.max_per_host for host in job.candidate_hosts)
+        return self.host_active.get(job.host, 0) >= self.max_per_host
+
+    def _pick_job(self):
+        """Returns the next runnable job and removes it from its queue, or None."""
+        if self.active >= self.max_concurrent:
+            return None
+        best_job, best_rank = None, None
+        for post_queue in self.posts.values():
+            for index, job in enumerate(post_queue.jobs):
+                if self._is_held_back(job):
+                    continue
+                rank = (post_queue.active, job.sort_key)
+                if best_rank is None or rank < best_rank:
+                    best_job, best_rank, best_index = job, rank, index
+                # Later jobs of this post sort after this one.
+                break
+        if best_job is not None:
+            del self.posts[best_job.post_key].jobs[best_index]
+            self.queued_count -= 1
+        return best_job
+
+    def _worker_loop(self):
+        current_thread = threading.current_thread()
+        while True:
+            with self.condition:
+                job = self._pick_job()
+                while job is None:
+                    if self.threads.index(current_thread) >= self.max_concurrent + self.detached_count:
+                        # The limit was lowered; surplus threads leave once idle.
+                        self.threads.remove(current_thread)
+                        self.idle_threads -= 1
+                        return
+                    self.condition.wait()
+                    job = self._pick_job()
+                if not job.future.set_running_or_notify_cancel():
+                    self._forget_post_if_done(job.post_key)
+                    continue
+                self.idle_threads -= 1
+                self.active += 1
+                self.posts[job.post_key].active += 1
+                if job.host is not None:
+                    self.host_active[job.host] = self.host_active.get(job.host, 0) + 1
+            self.local.job = job
+            try:
+                result = job.fn(**job.kwargs)
+            except BaseException as exc:
+                job.future.set_exception(exc)
+            else:
+                job.future.set_result(result)
+            finally:
+                self.local.job = None
+                with self.condition:
+                    self.idle_threads += 1
+                    self.active -= 1
+                    self.posts[job.post_key].active -= 1
+                    self._release_host(job.host)
+                    self._forget_post_if_done(job.post_key)
+                    self.condition.notify_all()
+
+    def _forget_post_if_done(self, post_key):
+        post_queue = self.posts.get(post_key)
+        if post_queue is not None and not post_queue.jobs and not post_queue.active:
+            del self.posts[post_key]
+
+    def active_count(self):
+        """Returns the number of transfers currently running."""
+        with self.condition:
+            return self.active
+
+
+# --- Module State ---
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_transfer_scheduler():
+    """Returns the process-wide transfer scheduler, creating it on first use."""
+    global _scheduler
+    if _scheduler is not None:
+        return _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = TransferScheduler()
+        return _scheduler
+
+
+def configure_transfer_scheduler(max_concurrent=None, max_per_host=None, priority=None):
+    """Applies new limits to the shared transfer scheduler (see TransferScheduler.configure)."""
+    get_transfer_scheduler().configure(max_concurrent, max_per_host, priority)
@@ -8,11 +8,9 @@ import traceback
 import uuid
 import http
 import html
-import json
 from collections import deque, defaultdict
 import hashlib
-from concurrent.futures import ThreadPoolExecutor, as_completed, CancelledError, Future
-from io import BytesIO
+from concurrent.futures import as_completed, CancelledError, Future, wait
 from urllib .parse import urlparse 
 import requests
 import cloudscraper 
@@ -40,7 +38,10 @@ except ImportError:
     Document = None
 from PyQt5 .QtCore import Qt ,QThread ,pyqtSignal ,QMutex ,QMutexLocker ,QObject ,QTimer ,QSettings ,QStandardPaths ,QCoreApplication ,QUrl ,QSize ,QProcess 
 from .api_client import download_from_api, fetch_post_comments, fetch_single_post_data
-from ..services.multipart_downloader import download_file_in_parts, MULTIPART_DOWNLOADER_AVAILABLE
+from .transfer_scheduler import get_transfer_scheduler
+from .image_transcoder import get_image_transcoder
+from .post_enricher import PostEnricher
+from ..services.multipart_downloader import download_file_in_parts, discard_multipart_download, MULTIPART_DOWNLOADER_AVAILABLE
 from ..services.drive_downloader import (
     download_mega_file, download_gdrive_file, download_dropbox_file
 )
@@ -48,14 +49,63 @@ from ..utils.file_utils import (
     is_image, is_video, is_zip, is_rar, is_archive, is_audio, KNOWN_NAMES,
     clean_filename, clean_folder_name
 )
-from ..utils.network_utils import prepare_cookies_for_request, get_link_platform
+from ..utils.network_utils import prepare_cookies_for_request, get_link_platform, get_url_host, parse_content_range
+from ..utils.session_pool import RequestCancelledError, get_session
+from ..utils.cdn_nodes import get_cdn_node_manager
+from ..utils.rate_limiter import get_retry_delay
+from ..utils.session_store import get_session_store
+from ..utils.pdf_spool import append_pdf_spool_record, get_pdf_spool_path
+from ..utils.hash_index import get_hash_index, compute_file_md5
+from ..utils.probe_cache import get_probe_cache, get_resume_validator, probe_from_response
+from ..utils.name_matcher import get_character_filter_matcher
+from ..utils.filter_plan import get_filter_plan, EXTERNAL_LINK_PATTERN, MEGA_KEY_PATTERN
 from ..utils.text_utils import (
-    is_title_match_for_character, is_filename_match_for_character, strip_html_tags,
+    strip_html_tags,
     extract_folder_name_from_title, # This was the function causing the error
     match_folders_from_title, match_folders_from_filename_enhanced
 )
 from ..config.constants import *
 
+# Part files currently being written. Part names are deterministic so they can
+# be resumed later, which means two threads fetching the same URL into the
+# same folder would otherwise share one file.
+_active_part_files = set()
+_active_part_files_lock = threading.Lock()
+
+
+def _claim_part_file_stem(target_folder_path, file_base, file_url):
+    """
+    Returns the on-disk stem for a file's temporary download files.
+
+    The stem is derived from the URL path, so a later attempt or a later app
+    session finds the partial data of an earlier one (subdomain rotation does
+    not change it). If another thread is already downloading the same stem,
+    a random suffix is used instead and that download simply starts fresh.
+
+    Args:
+        target_folder_path (str): The folder the file is saved into.
+        file_base (str): The file name without its extension.
+        file_url (str): The URL being downloaded.
+
+    Returns:
+        str: The full path stem, without extension. Release it with
+             `_release_part_file_stem` when the download is finished.
+    """
+    url_key = urlparse(file_url).path or file_url
+    part_key = hashlib.sha1(url_key.encode('utf-8')).hexdigest()[:12]
+    stem = os.path.join(target_folder_path, f"{file_base}_{part_key}")
+    with _active_part_files_lock:
+        if stem in _active_part_files:
+            stem = f"{stem}_{uuid.uuid4().hex[:8]}"
+        _active_part_files.add(stem)
+    return stem
+
+
+def _release_part_file_stem(stem):
+    with _active_part_files_lock:
+        _active_part_files.discard(stem)
+
+
 def robust_clean_name(name):
     """A more robust function to remove illegal characters for filenames and folders."""
     if not name:
@@ -113,7 +163,6 @@ class PostProcessorWorker:
                  downloaded_hash_counts=None,
                  downloaded_hash_counts_lock=None,
                  session_file_path=None,
-                 session_lock=None,
                  text_only_scope=None,
                  text_export_format='txt',
                  single_pdf_mode=False,
@@ -178,7 +227,6 @@ class PostProcessorWorker:
         self.downloaded_hash_counts = downloaded_hash_counts if downloaded_hash_counts is not None else defaultdict(int)
         self.downloaded_hash_counts_lock = downloaded_hash_counts_lock if downloaded_hash_counts_lock is not None else threading.Lock()
         self.session_file_path = session_file_path
-        self.session_lock = session_lock
         self.text_only_scope = text_only_scope
         self.text_export_format = text_export_format
         self.single_pdf_mode = single_pdf_mode
@@ -188,6 +236,7 @@ class PostProcessorWorker:
         self.multipart_parts_count = multipart_parts_count 
         self.multipart_min_size_mb = multipart_min_size_mb 
         self.skip_file_size_mb = skip_file_size_mb
+        self.filter_plan = get_filter_plan(self.skip_words_list, self.skip_words_scope, self.remove_from_filename_words_list)
         if self.compress_images and Image is None:
             self.logger("⚠️ Image compression disabled: Pillow library not found.")
             self.compress_images = False
@@ -222,36 +271,46 @@ class PostProcessorWorker:
             return self .dynamic_filter_holder .get_filters ()
         return self .filter_character_list_objects_initial 
 
-    def _find_valid_subdomain(self, url: str, max_subdomains: int = 4) -> str:
+    def _find_valid_subdomain(self, url: str, exclude_hosts=()) -> str:
         """
         Attempts to find a working subdomain for a Kemono/Coomer URL that returned a 403 error.
+        All nodes are probed at once and their health is remembered for the session.
         Returns the original URL if no other valid subdomain is found.
         """
+        node_manager = get_cdn_node_manager(url)
+        if node_manager is None:
+            return url
         self.logger(f"    probing for a valid subdomain...")
-        parsed_url = urlparse(url)
-        original_domain = parsed_url.netloc
-
-        for i in range(1, max_subdomains + 1):
-            domain_parts = original_domain.split('.')
-            if len(domain_parts) > 1:
-                base_domain = ".".join(domain_parts[-2:])
-                new_domain = f"n{i}.{base_domain}"
-            else:
-                continue 
+        new_url = node_manager.probe(url, exclude_hosts=exclude_hosts)
+        if new_url:
+            self.logger(f"   ✅ Valid subdomain found: {urlparse(new_url).netloc}")
+            return new_url
 
-            new_url = parsed_url._replace(netloc=new_domain).geturl()
-            
-            try:
-                with requests.head(new_url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=5, allow_redirects=True) as resp:
-                    if resp.status_code == 200:
-                        self.logger(f"   ✅ Valid subdomain found: {new_domain}")
-                        return new_url
-            except requests.RequestException:
-                continue
-        
         self.logger(f"   ⚠️ No other valid subdomain found. Sticking with the original.")
         return url
 
+    def _get_probe_cache(self):
+        """Returns the shared file-metadata cache in the appdata folder, or None."""
+        if not self.app_base_dir:
+            return None
+        return get_probe_cache(os.path.join(self.app_base_dir, "appdata", PROBE_CACHE_FILENAME))
+
+    def _get_file_probe(self, probe_cache, file_url, headers, cookies):
+        """
+        Returns a file's size, range support and ETag, sending a HEAD only on a cache miss.
+
+        Raises:
+            requests.RequestException: If the HEAD request fails.
+        """
+        probe = probe_cache.get(file_url) if probe_cache else None
+        if probe is None:
+            with get_session(file_url, rate_limited=False).head(file_url, headers=headers, timeout=15, cookies=cookies, allow_redirects=True) as head_response:
+                head_response.raise_for_status()
+                probe = probe_from_response(head_response)
+            if probe_cache:
+                probe_cache.record(file_url, probe)
+        return probe
+
     def _download_single_file(self, file_info, target_folder_path, post_page_url, original_post_id_for_log, skip_event,
                                 post_title="", file_index_in_post=0, num_files_in_this_post=1,
                                 manga_date_file_counter_ref=None,
@@ -278,36 +337,28 @@ class PostProcessorWorker:
         if self.use_cookie:
             cookies_to_use_for_file = prepare_cookies_for_request(self.use_cookie, self.cookie_text, self.selected_cookie_file, self.app_base_dir, self.logger)
         
+        probe_cache = self._get_probe_cache()
         if self.skip_file_size_mb is not None:
+            # Only a cached size is used here; otherwise the GET's Content-Length is checked before any data is read.
+            cached_probe = probe_cache.get(file_url) if probe_cache else None
+            if cached_probe:
                 api_original_filename_for_size_check = file_info.get('_original_name_for_log', file_info.get('name'))
-                try:
-                        # Use a stream=True HEAD request to get headers without downloading the body
-                        with requests.head(file_url, headers=file_download_headers, timeout=15, cookies=cookies_to_use_for_file, allow_redirects=True) as head_response:
-                                head_response.raise_for_status()
-                                content_length = head_response.headers.get('Content-Length')
-                                if content_length:
-                                        file_size_bytes = int(content_length)
-                                        file_size_mb = file_size_bytes / (1024 * 1024)
-                                        if file_size_mb < self.skip_file_size_mb:
-                                                self.logger(f"   -> Skip File (Size): '{api_original_filename_for_size_check}' is {file_size_mb:.2f} MB, which is smaller than the {self.skip_file_size_mb} MB limit.")
-                                                return 0, 1, api_original_filename_for_size_check, False, FILE_DOWNLOAD_STATUS_SKIPPED, None
-                                else:
-                                        self.logger(f"   ⚠️ Could not determine file size for '{api_original_filename_for_size_check}' to check against size limit. Proceeding with download.")
-                except requests.RequestException as e:
-                        self.logger(f"   ⚠️ Could not fetch file headers to check size for '{api_original_filename_for_size_check}': {e}. Proceeding with download.")
-                
+                file_size_mb = cached_probe.size / (1024 * 1024)
+                if file_size_mb < self.skip_file_size_mb:
+                    self.logger(f"   -> Skip File (Size): '{api_original_filename_for_size_check}' is {file_size_mb:.2f} MB, which is smaller than the {self.skip_file_size_mb} MB limit.")
+                    return 0, 1, api_original_filename_for_size_check, False, FILE_DOWNLOAD_STATUS_SKIPPED, None
+
         api_original_filename = file_info.get('_original_name_for_log', file_info.get('name'))
         filename_to_save_in_main_path = ""
         if forced_filename_override:
             filename_to_save_in_main_path = forced_filename_override
             self.logger(f"   Retrying with forced filename: '{filename_to_save_in_main_path}'")
         else:
-            if self.skip_words_list and (self.skip_words_scope == SKIP_SCOPE_FILES or self.skip_words_scope == SKIP_SCOPE_BOTH):
-                filename_to_check_for_skip_words = api_original_filename.lower()
-                for skip_word in self.skip_words_list:
-                    if skip_word.lower() in filename_to_check_for_skip_words:
-                        self.logger(f"   -> Skip File (Keyword in Original Name '{skip_word}'): '{api_original_filename}'. Scope: {self.skip_words_scope}")
-                        return 0, 1, api_original_filename, False, FILE_DOWNLOAD_STATUS_SKIPPED, None
+            if self.filter_plan.skip_files:
+                skip_word = self.filter_plan.find_skip_word(api_original_filename)
+                if skip_word is not None:
+                    self.logger(f"   -> Skip File (Keyword in Original Name '{skip_word}'): '{api_original_filename}'. Scope: {self.skip_words_scope}")
+                    return 0, 1, api_original_filename, False, FILE_DOWNLOAD_STATUS_SKIPPED, None
 
             cleaned_original_api_filename = robust_clean_name(api_original_filename)
             original_filename_cleaned_base, original_ext = os.path.splitext(cleaned_original_api_filename)
@@ -464,14 +515,7 @@ class PostProcessorWorker:
 
             if self.remove_from_filename_words_list and filename_to_save_in_main_path:
                 base_name_for_removal, ext_for_removal = os.path.splitext(filename_to_save_in_main_path)
-                modified_base_name = base_name_for_removal
-                for word_to_remove in self.remove_from_filename_words_list:
-                    if not word_to_remove: continue
-                    pattern = re.compile(re.escape(word_to_remove), re.IGNORECASE)
-                    modified_base_name = pattern.sub("", modified_base_name)
-                modified_base_name = re.sub(r'[_.\s-]+', ' ', modified_base_name)
-                modified_base_name = re.sub(r'\s+', ' ', modified_base_name)
-                modified_base_name = modified_base_name.strip()
+                modified_base_name = self.filter_plan.remove_words(base_name_for_removal)
                 if modified_base_name and modified_base_name != ext_for_removal.lstrip('.'):
                     filename_to_save_in_main_path = modified_base_name + ext_for_removal
                 else:
@@ -508,28 +552,26 @@ class PostProcessorWorker:
             return 0, 1, api_original_filename, False, FILE_DOWNLOAD_STATUS_SKIPPED, None
 
         temp_file_base_for_unique_part, temp_file_ext_for_unique_part = os.path.splitext(filename_to_save_in_main_path if filename_to_save_in_main_path else api_original_filename)
-        unique_id_for_part_file = uuid.uuid4().hex[:8]
-        unique_part_file_stem_on_disk = f"{temp_file_base_for_unique_part}_{unique_id_for_part_file}"
-        max_retries = 3
+        hash_index_root = self.override_output_dir or self.download_root
+        hash_index = get_hash_index(hash_index_root, self.app_base_dir) if hash_index_root and self.app_base_dir else None
         if not self.keep_in_post_duplicates:
             final_save_path_check = os.path.join(target_folder_path, filename_to_save_in_main_path)
             if os.path.exists(final_save_path_check):
                 try:
-                    with requests.head(file_url, headers=file_download_headers, timeout=15, cookies=cookies_to_use_for_file, allow_redirects=True) as head_response:
-                        head_response.raise_for_status()
-                        expected_size = int(head_response.headers.get('Content-Length', -1))
+                    file_probe = self._get_file_probe(probe_cache, file_url, file_download_headers, cookies_to_use_for_file)
+                    expected_size = file_probe.size if file_probe else -1
                     
                     actual_size = os.path.getsize(final_save_path_check)
 
                     if expected_size != -1 and actual_size == expected_size:
                         self.logger(f"   -> Skip (File Exists & Complete): '{filename_to_save_in_main_path}' is already on disk with the correct size.")
                         try:
-                            md5_hasher = hashlib.md5()
-                            with open(final_save_path_check, 'rb') as f_verify:
-                                for chunk in iter(lambda: f_verify.read(8192), b""):
-                                    md5_hasher.update(chunk)
+                            if hash_index:
+                                existing_file_hash = hash_index.get_or_compute_hash(final_save_path_check)
+                            else:
+                                existing_file_hash = compute_file_md5(final_save_path_check)
                             with self.downloaded_hash_counts_lock:
-                                self.downloaded_hash_counts[md5_hasher.hexdigest()] += 1
+                                self.downloaded_hash_counts[existing_file_hash] += 1
                         except Exception as hash_exc:
                              self.logger(f"   ⚠️ Could not hash existing file '{filename_to_save_in_main_path}' for session: {hash_exc}")
                         return 0, 1, filename_to_save_in_main_path, was_original_name_kept_flag, FILE_DOWNLOAD_STATUS_SKIPPED, None
@@ -538,352 +580,544 @@ class PostProcessorWorker:
                 except requests.RequestException as e:
                     self.logger(f"   ⚠️ Could not verify size of existing file '{filename_to_save_in_main_path}': {e}. Proceeding with download.")
         
-        max_retries = 3
-        retry_delay = 5
-        downloaded_size_bytes = 0
-        calculated_file_hash = None
-        downloaded_part_file_path = None
-        download_successful_flag = False
-        last_exception_for_retry_later = None
-        is_permanent_error = False
-        data_to_write_io = None
-
-        for attempt_num_single_stream in range(max_retries + 1):
-            response = None
-            if self._check_pause(f"File download attempt for '{api_original_filename}'"): break
-            if self.check_cancel() or (skip_event and skip_event.is_set()): break
-            try:
-                if attempt_num_single_stream > 0:
-                    self.logger(f"   Retrying download for '{api_original_filename}' (Overall Attempt {attempt_num_single_stream + 1}/{max_retries + 1})...")
-                    time.sleep(retry_delay * (2 ** (attempt_num_single_stream - 1)))
-                
-                self._emit_signal('file_download_status', True)
-                
-                current_url_to_try = file_url
-                
-                response = requests.get(current_url_to_try, headers=file_download_headers, timeout=(30, 300), stream=True, cookies=cookies_to_use_for_file)
+        part_file_stem = _claim_part_file_stem(target_folder_path, temp_file_base_for_unique_part, file_url)
+        try:
+            max_retries = 3
+            downloaded_size_bytes = 0
+            calculated_file_hash = None
+            downloaded_part_file_path = None
+            download_successful_flag = False
+            last_exception_for_retry_later = None
+            is_permanent_error = False
+            transcoded_file_path = None
+            md5_hasher = None
+            current_attempt_downloaded_bytes = 0
+            total_size_bytes = 0
+            single_stream_part_path = f"{part_file_stem}{temp_file_ext_for_unique_part}.part"
+            multipart_part_path = f"{part_file_stem}{temp_file_ext_for_unique_part}.multipart.part"
+            node_manager = get_cdn_node_manager(file_url)
+            transfer_scheduler = get_transfer_scheduler()
+
+            for attempt_num_single_stream in range(max_retries + 1):
+                response = None
+                node_lease = None
+                node_transfer_ok = False
+                node_bytes_received = 0
+                node_connection_failed = False
+                if self._check_pause(f"File download attempt for '{api_original_filename}'"): break
+                if self.check_cancel() or (skip_event and skip_event.is_set()): break
+                try:
+                    if attempt_num_single_stream > 0:
+                        self.logger(f"   Retrying download for '{api_original_filename}' (Overall Attempt {attempt_num_single_stream + 1}/{max_retries + 1})...")
+                        time.sleep(get_retry_delay(file_url, attempt_num_single_stream))
                 
-                if response.status_code == 403 and ('kemono.cr' in current_url_to_try or 'coomer.st' in current_url_to_try):
-                    self.logger(f"   ⚠️ Got 403 Forbidden for '{api_original_filename}'. Attempting subdomain rotation...")
-                    new_url = self._find_valid_subdomain(current_url_to_try)
-                    if new_url != current_url_to_try:
-                        self.logger(f"   Retrying with new URL: {new_url}")
-                        file_url = new_url
-                        response.close() # Close the old response
-                        response = requests.get(new_url, headers=file_download_headers, timeout=(30, 300), stream=True, cookies=cookies_to_use_for_file)
-
-                response.raise_for_status()
+                    self._emit_signal('file_download_status', True)
                 
-                # --- REVISED AND MOVED SIZE CHECK LOGIC ---
-                total_size_bytes = int(response.headers.get('Content-Length', 0))
-
-                if self.skip_file_size_mb is not None:
-                    if total_size_bytes > 0:
-                        file_size_mb = total_size_bytes / (1024 * 1024)
-                        if file_size_mb < self.skip_file_size_mb:
-                            self.logger(f"   -> Skip File (Size): '{api_original_filename}' is {file_size_mb:.2f} MB, which is smaller than the {self.skip_file_size_mb} MB limit.")
-                            return 0, 1, api_original_filename, False, FILE_DOWNLOAD_STATUS_SKIPPED, None
-                    # If Content-Length is missing, we can't check, so we no longer log a warning here and just proceed.
-                # --- END OF REVISED LOGIC ---
-
-                num_parts_for_file = min(self.multipart_parts_count, MAX_PARTS_FOR_MULTIPART_DOWNLOAD)
-           
-                file_is_eligible_by_scope = False
-                if self.multipart_scope == 'videos':
-                    if is_video(api_original_filename):
-                        file_is_eligible_by_scope = True
-                elif self.multipart_scope == 'archives':
-                    if is_archive(api_original_filename):
-                        file_is_eligible_by_scope = True
-                elif self.multipart_scope == 'both':
-                    if is_video(api_original_filename) or is_archive(api_original_filename):
-                        file_is_eligible_by_scope = True
-
-                min_size_in_bytes = self.multipart_min_size_mb * 1024 * 1024
-
-                attempt_multipart = (self.allow_multipart_download and MULTIPART_DOWNLOADER_AVAILABLE and
-                                     file_is_eligible_by_scope and
-                                     num_parts_for_file > 1 and total_size_bytes > min_size_in_bytes and 
-                                     'bytes' in response.headers.get('Accept-Ranges', '').lower())
-          
-                if self._check_pause(f"Multipart decision for '{api_original_filename}'"): break
-
-                if attempt_multipart:
-                    response.close() # Close the initial connection before starting multipart
-                    mp_save_path_for_unique_part_stem_arg = os.path.join(target_folder_path, f"{unique_part_file_stem_on_disk}{temp_file_ext_for_unique_part}")
-                    mp_success, mp_bytes, mp_hash, mp_file_handle = download_file_in_parts(
-                        file_url, mp_save_path_for_unique_part_stem_arg, total_size_bytes, num_parts_for_file, file_download_headers, api_original_filename,
-                        emitter_for_multipart=self.emitter, cookies_for_chunk_session=cookies_to_use_for_file,
-                        cancellation_event=self.cancellation_event, skip_event=skip_event, logger_func=self.logger,
-                        pause_event=self.pause_event
-                    )
-                    if mp_success:
+                    current_url_to_try = file_url
+                    if node_manager:
+                        # Spread transfers over the site's numbered nodes by their load and measured speed,
+                        # skipping nodes the transfer scheduler already runs its per-host limit against.
+                        node_lease = node_manager.acquire(file_url, exclude_hosts=transfer_scheduler.saturated_hosts())
+                        if node_lease:
+                            current_url_to_try = node_lease.url
+                        transfer_scheduler.set_transfer_host(current_url_to_try)
+
+                    # A part file left by an earlier attempt (or session) is continued with a Range request,
+                    # but only with a validator: if the file changed since, If-Range makes the server send it whole (200).
+                    resume_offset = os.path.getsize(single_stream_part_path) if os.path.exists(single_stream_part_path) else 0
+                    request_headers = file_download_headers.copy()
+                    if resume_offset > 0:
+                        cached_probe = probe_cache.get(file_url) if probe_cache else None
+                        resume_validator = get_resume_validator(cached_probe)
+                        if resume_validator:
+                            request_headers['Range'] = f"bytes={resume_offset}-"
+                            request_headers['If-Range'] = resume_validator
+                        else:
+                            self.logger(f"   ⚠️ No ETag or Last-Modified known for the part file of '{api_original_filename}'. Starting over.")
+                            os.remove(single_stream_part_path)
+                            resume_offset = 0
+
+                    part_file_already_complete = False
+                    while True:
+                        response = get_session(current_url_to_try, rate_limited=False).get(current_url_to_try, headers=request_headers, timeout=(30, 300), stream=True, cookies=cookies_to_use_for_file, cancellation_event=self.cancellation_event)
+
+                        if node_manager and (response.status_code == 403 or (response.status_code == 404 and node_lease)):
+                            # A 404 from a node we picked may only mean that node lacks the file.
+                            self.logger(f"   ⚠️ Got {response.status_code} for '{api_original_filename}'. Attempting subdomain rotation...")
+                            failed_host = urlparse(current_url_to_try).netloc
+                            if node_lease:
+                                node_manager.release(node_lease, False, status_code=response.status_code)
+                                node_lease = None
+                            new_url = self._find_valid_subdomain(current_url_to_try, exclude_hosts={failed_host})
+                            if new_url != current_url_to_try:
+                                self.logger(f"   Retrying with new URL: {new_url}")
+                                current_url_to_try = new_url
+                                node_lease = node_manager.acquire_node(new_url)
+                                transfer_scheduler.set_transfer_host(new_url)
+                                response.close() # Close the old response
+                                response = get_session(new_url, rate_limited=False).get(new_url, headers=request_headers, timeout=(30, 300), stream=True, cookies=cookies_to_use_for_file, cancellation_event=self.cancellation_event)
+
+                        if response.status_code != 416 or resume_offset == 0:
+                            break
+                        # The part file already holds the whole file, or is larger than it and unusable.
+                        _, _, full_size = parse_content_range(response.headers.get('Content-Range'))
+                        response.close()
+                        if full_size == resume_offset:
+                            part_file_already_complete = True
+                            break
+                        self.logger(f"   ⚠️ Part file for '{api_original_filename}' does not match the server's file. Starting over.")
+                        os.remove(single_stream_part_path)
+                        resume_offset = 0
+                        # The fresh request goes through the same node rotation and lease handling.
+                        request_headers = file_download_headers.copy()
+
+                    if part_file_already_complete:
+                        self.logger(f"   ✅ Part file for '{api_original_filename}' is already complete.")
+                        calculated_file_hash = compute_file_md5(single_stream_part_path)
+                        downloaded_size_bytes = total_size_bytes = resume_offset
+                        downloaded_part_file_path = single_stream_part_path
                         download_successful_flag = True
-                        downloaded_size_bytes = mp_bytes
-                        calculated_file_hash = mp_hash
-                        downloaded_part_file_path = mp_save_path_for_unique_part_stem_arg
-                        if mp_file_handle: mp_file_handle.close()
+                        node_transfer_ok = True
                         break
-                    else:
-                        if attempt_num_single_stream < max_retries:
-                            self.logger(f"   Multi-part download attempt failed for '{api_original_filename}'. Retrying with single stream.")
+
+                    response.raise_for_status()
+                    node_transfer_ok = True
+                    response_probe = probe_from_response(response)
+                    if probe_cache and response_probe:
+                        probe_cache.record(file_url, response_probe)
+                
+                    # --- REVISED AND MOVED SIZE CHECK LOGIC ---
+                    total_size_bytes = int(response.headers.get('Content-Length', 0))
+                    if resume_offset > 0:
+                        if response.status_code == 206:
+                            _, _, full_size = parse_content_range(response.headers.get('Content-Range'))
+                            total_size_bytes = full_size if full_size else resume_offset + total_size_bytes
                         else:
-                            download_successful_flag = False; break
-                else:
-                    self.logger(f"⬇️ Downloading (Single Stream): '{api_original_filename}' (Size: {total_size_bytes / (1024 * 1024):.2f} MB if known) [Base Name: '{filename_to_save_in_main_path}']")
-                    current_single_stream_part_path = os.path.join(target_folder_path, f"{unique_part_file_stem_on_disk}{temp_file_ext_for_unique_part}.part")
-                    current_attempt_downloaded_bytes = 0
-                    md5_hasher = hashlib.md5()
-                    last_progress_time = time.time()
-                    try:
-                        with open(current_single_stream_part_path, 'wb') as f_part:
-                            for chunk in response.iter_content(chunk_size=1 * 1024 * 1024):
-                                if self._check_pause(f"Chunk download for '{api_original_filename}'"): break
-                                if self.check_cancel() or (skip_event and skip_event.is_set()): break
-                                if chunk:
-                                    f_part.write(chunk)
-                                    md5_hasher.update(chunk)
-                                    current_attempt_downloaded_bytes += len(chunk)
-                                    if time.time() - last_progress_time > 1 and total_size_bytes > 0:
-                                        self._emit_signal('file_progress', api_original_filename, (current_attempt_downloaded_bytes, total_size_bytes))
-                                        last_progress_time = time.time()
-                        if self.check_cancel() or (skip_event and skip_event.is_set()) or (self.pause_event and self.pause_event.is_set() and not (current_attempt_downloaded_bytes > 0 or (total_size_bytes == 0 and response.status_code == 200))):
-                            if os.path.exists(current_single_stream_part_path): os.remove(current_single_stream_part_path)
-                            break
-                        attempt_is_complete = False
-                        if response.status_code == 200:
-                            if total_size_bytes > 0:
-                                if current_attempt_downloaded_bytes == total_size_bytes:
-                                    attempt_is_complete = True
-                                else:
-                                    self.logger(f"   ⚠️ Single-stream attempt for '{api_original_filename}' incomplete: received {current_attempt_downloaded_bytes} of {total_size_bytes} bytes.")
-                            elif total_size_bytes == 0:
-                                if current_attempt_downloaded_bytes > 0:
-                                    self.logger(f"   ⚠️ Mismatch for '{api_original_filename}': Server reported 0 bytes, but received {current_attempt_downloaded_bytes} bytes this attempt.")
-                                    attempt_is_complete = True
-                                else:
-                                    attempt_is_complete = True
-                        if attempt_is_complete:
-                            calculated_file_hash = md5_hasher.hexdigest()
-                            downloaded_size_bytes = current_attempt_downloaded_bytes
-                            downloaded_part_file_path = current_single_stream_part_path
+                            self.logger(f"   ⚠️ Server ignored the resume request for '{api_original_filename}'. Downloading from the start.")
+                            resume_offset = 0
+
+                    if self.skip_file_size_mb is not None:
+                        if total_size_bytes > 0:
+                            file_size_mb = total_size_bytes / (1024 * 1024)
+                            if file_size_mb < self.skip_file_size_mb:
+                                self.logger(f"   -> Skip File (Size): '{api_original_filename}' is {file_size_mb:.2f} MB, which is smaller than the {self.skip_file_size_mb} MB limit.")
+                                return 0, 1, api_original_filename, False, FILE_DOWNLOAD_STATUS_SKIPPED, None
+                        # If Content-Length is missing, we can't check, so we no longer log a warning here and just proceed.
+                    # --- END OF REVISED LOGIC ---
+
+                    num_parts_for_file = min(self.multipart_parts_count, MAX_PARTS_FOR_MULTIPART_DOWNLOAD)
+           
+                    file_is_eligible_by_scope = False
+                    if self.multipart_scope == 'videos':
+                        if is_video(api_original_filename):
+                            file_is_eligible_by_scope = True
+                    elif self.multipart_scope == 'archives':
+                        if is_archive(api_original_filename):
+                            file_is_eligible_by_scope = True
+                    elif self.multipart_scope == 'both':
+                        if is_video(api_original_filename) or is_archive(api_original_filename):
+                            file_is_eligible_by_scope = True
+
+                    min_size_in_bytes = self.multipart_min_size_mb * 1024 * 1024
+
+                    attempt_multipart = (self.allow_multipart_download and MULTIPART_DOWNLOADER_AVAILABLE and
+                                         file_is_eligible_by_scope and
+                                         num_parts_for_file > 1 and total_size_bytes > min_size_in_bytes and resume_offset == 0 and
+                                         response_probe is not None and response_probe.accepts_ranges)
+          
+                    if self._check_pause(f"Multipart decision for '{api_original_filename}'"): break
+
+                    if attempt_multipart:
+                        response.close() # Close the initial connection before starting multipart
+                        # Chunks go straight to the URL the GET was redirected to.
+                        mp_success, mp_bytes, mp_hash, mp_file_handle = download_file_in_parts(
+                            response.url or current_url_to_try, multipart_part_path, total_size_bytes, num_parts_for_file, file_download_headers, api_original_filename,
+                            emitter_for_multipart=self.emitter, cookies_for_chunk_session=cookies_to_use_for_file,
+                            cancellation_event=self.cancellation_event, skip_event=skip_event, logger_func=self.logger,
+                            pause_event=self.pause_event, resume_validator=get_resume_validator(response_probe)
+                        )
+                        node_bytes_received = mp_bytes
+                        if mp_success:
                             download_successful_flag = True
+                            downloaded_size_bytes = mp_bytes
+                            calculated_file_hash = mp_hash
+                            downloaded_part_file_path = multipart_part_path
+                            if mp_file_handle: mp_file_handle.close()
                             break
                         else:
-                            if os.path.exists(current_single_stream_part_path):
+                            if attempt_num_single_stream < max_retries:
+                                self.logger(f"   Multi-part download attempt failed for '{api_original_filename}'. Retrying with single stream.")
+                                # The single stream starts its own part file, so the preallocated one would only be left behind.
+                                if not self.check_cancel():
+                                    discard_multipart_download(multipart_part_path)
+                            else:
+                                download_successful_flag = False; break
+                    else:
+                        self.logger(f"⬇️ Downloading (Single Stream): '{api_original_filename}' (Size: {total_size_bytes / (1024 * 1024):.2f} MB if known) [Base Name: '{filename_to_save_in_main_path}']")
+                        # A multipart download of this file from an earlier session will not be resumed now.
+                        discard_multipart_download(multipart_part_path)
+                        current_attempt_downloaded_bytes = resume_offset
+                        md5_hasher = hashlib.md5()
+                        if resume_offset > 0:
+                            self.logger(f"   Resuming '{api_original_filename}' at {resume_offset / (1024 * 1024):.2f} MB.")
+                            # The bytes already on disk are hashed once so the final digest covers the whole file.
+                            with open(single_stream_part_path, 'rb') as f_existing:
+                                for chunk in iter(lambda: f_existing.read(1 * 1024 * 1024), b""):
+                                    md5_hasher.update(chunk)
+                        last_progress_time = time.time()
+                        try:
+                            with open(single_stream_part_path, 'ab' if resume_offset > 0 else 'wb') as f_part:
+                                for chunk in response.iter_content(chunk_size=1 * 1024 * 1024):
+                                    if self._check_pause(f"Chunk download for '{api_original_filename}'"): break
+                                    if self.check_cancel() or (skip_event and skip_event.is_set()): break
+                                    if chunk:
+                                        f_part.write(chunk)
+                                        md5_hasher.update(chunk)
+                                        current_attempt_downloaded_bytes += len(chunk)
+                                        node_bytes_received += len(chunk)
+                                        if time.time() - last_progress_time > 1 and total_size_bytes > 0:
+                                            self._emit_signal('file_progress', api_original_filename, (current_attempt_downloaded_bytes, total_size_bytes))
+                                            last_progress_time = time.time()
+                            if self.check_cancel() or (skip_event and skip_event.is_set()) or (self.pause_event and self.pause_event.is_set() and not (current_attempt_downloaded_bytes > 0 or (total_size_bytes == 0 and response.status_code == 200))):
+                                # A cancelled download keeps its part file so a later session can resume it.
+                                if skip_event and skip_event.is_set() and os.path.exists(single_stream_part_path):
+                                    os.remove(single_stream_part_path)
+                                break
+                            attempt_is_complete = False
+                            if response.status_code in (200, 206):
+                                if total_size_bytes > 0:
+                                    if current_attempt_downloaded_bytes == total_size_bytes:
+                                        attempt_is_complete = True
+                                    else:
+                                        self.logger(f"   ⚠️ Single-stream attempt for '{api_original_filename}' incomplete: received {current_attempt_downloaded_bytes} of {total_size_bytes} bytes.")
+                                elif total_size_bytes == 0:
+                                    if current_attempt_downloaded_bytes > 0:
+                                        self.logger(f"   ⚠️ Mismatch for '{api_original_filename}': Server reported 0 bytes, but received {current_attempt_downloaded_bytes} bytes this attempt.")
+                                        attempt_is_complete = True
+                                    else:
+                                        attempt_is_complete = True
+                            if attempt_is_complete:
+                                calculated_file_hash = md5_hasher.hexdigest()
+                                downloaded_size_bytes = current_attempt_downloaded_bytes
+                                downloaded_part_file_path = single_stream_part_path
+                                download_successful_flag = True
+                                break
+                            elif total_size_bytes > 0 and current_attempt_downloaded_bytes > total_size_bytes:
+                                # More data than the file holds: the part file cannot be resumed.
                                 try:
-                                    os.remove(current_single_stream_part_path)
+                                    os.remove(single_stream_part_path)
                                 except OSError as e_rem_part:
                                     self.logger(f"   -> Failed to remove .part file after failed single stream attempt: {e_rem_part}")
-                    except Exception as e_write:
-                        self.logger(f"   ❌ Error writing single-stream to disk for '{api_original_filename}': {e_write}")
-                        if os.path.exists(current_single_stream_part_path): os.remove(current_single_stream_part_path)
-                        raise
-
-            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout, http.client.IncompleteRead) as e:
-                self.logger(f"   ❌ Download Error (Retryable): {api_original_filename}. Error: {e}")
-                last_exception_for_retry_later = e
-                if isinstance(e, requests.exceptions.ConnectionError) and ("Failed to resolve" in str(e) or "NameResolutionError" in str(e)):
-                    self.logger("   💡 This looks like a DNS resolution problem. Please check your internet connection, DNS settings, or VPN.")
-            except requests.exceptions.RequestException as e:
-                if e.response is not None and e.response.status_code == 403:
-                    self.logger(f"   ⚠️ Download Error (403 Forbidden): {api_original_filename}. This often requires valid cookies.")
-                    self.logger(f"      Will retry... Check your 'Use Cookie' settings if this persists.")
+                        except Exception as e_write:
+                            # The part file is kept; the next attempt resumes from whatever reached the disk.
+                            self.logger(f"   ❌ Error writing single-stream to disk for '{api_original_filename}': {e_write}")
+                            raise
+
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                        requests.exceptions.ChunkedEncodingError, http.client.IncompleteRead) as e:
+                    self.logger(f"   ❌ Download Error (Retryable): {api_original_filename}. Error: {e}")
                     last_exception_for_retry_later = e
-                else:
-                    self.logger(f"   ❌ Download Error (Non-Retryable): {api_original_filename}. Error: {e}")
+                    node_transfer_ok = False
+                    node_connection_failed = True
+                    if isinstance(e, requests.exceptions.ConnectionError) and ("Failed to resolve" in str(e) or "NameResolutionError" in str(e)):
+                        self.logger("   💡 This looks like a DNS resolution problem. Please check your internet connection, DNS settings, or VPN.")
+                except RequestCancelledError:
+                    # Cancelled before the request went out; the cancel check after the loop handles cleanup.
+                    if node_lease:
+                        node_manager.cancel(node_lease)
+                        node_lease = None
+                    break
+                except requests.exceptions.RequestException as e:
+                    if e.response is not None and e.response.status_code == 403:
+                        self.logger(f"   ⚠️ Download Error (403 Forbidden): {api_original_filename}. This often requires valid cookies.")
+                        self.logger(f"      Will retry... Check your 'Use Cookie' settings if this persists.")
+                        last_exception_for_retry_later = e
+                    else:
+                        self.logger(f"   ❌ Download Error (Non-Retryable): {api_original_filename}. Error: {e}")
+                        last_exception_for_retry_later = e
+                        is_permanent_error = True
+                        break
+                except Exception as e:
+                    self.logger(f"   ❌ Unexpected Download Error: {api_original_filename}: {e}\n{traceback.format_exc(limit=2)}")
                     last_exception_for_retry_later = e
-                    is_permanent_error = True
+                    is_permanent_error = True                
                     break
-            except Exception as e:
-                self.logger(f"   ❌ Unexpected Download Error: {api_original_filename}: {e}\n{traceback.format_exc(limit=2)}")
-                last_exception_for_retry_later = e
-                is_permanent_error = True                
-                break
-            finally:
-                if response:
-                    response.close()
-                self._emit_signal('file_download_status', False)
-
-        final_total_for_progress = total_size_bytes if download_successful_flag and total_size_bytes > 0 else downloaded_size_bytes
-        self._emit_signal('file_progress', api_original_filename, (downloaded_size_bytes, final_total_for_progress))
-
-        if (not download_successful_flag and
-                isinstance(last_exception_for_retry_later, http.client.IncompleteRead) and
-                total_size_bytes > 0 and downloaded_part_file_path and os.path.exists(downloaded_part_file_path)):
-            try:
-                actual_size = os.path.getsize(downloaded_part_file_path)
-                if actual_size == total_size_bytes:
-                    self.logger(f"   ✅ Rescued '{api_original_filename}': IncompleteRead error occurred, but file size matches. Proceeding with save.")
-                    download_successful_flag = True
-                    md5_hasher = hashlib.md5()
-                    with open(downloaded_part_file_path, 'rb') as f_verify:
-                        for chunk in iter(lambda: f_verify.read(8192), b""):
-                            md5_hasher.update(chunk)
-                    calculated_file_hash = md5_hasher.hexdigest()
-            except Exception as rescue_exc:
-                self.logger(f"   ⚠️ Failed to rescue file despite matching size. Error: {rescue_exc}")
-
-        if self.check_cancel() or (skip_event and skip_event.is_set()) or (self.pause_event and self.pause_event.is_set() and not download_successful_flag):
-            if downloaded_part_file_path and os.path.exists(downloaded_part_file_path):
+                finally:
+                    if node_lease:
+                        node_manager.release(node_lease, node_transfer_ok, node_bytes_received,
+                                             status_code=None if node_connection_failed or response is None else response.status_code)
+                    if response:
+                        response.close()
+                    self._emit_signal('file_download_status', False)
+
+            final_total_for_progress = total_size_bytes if download_successful_flag and total_size_bytes > 0 else downloaded_size_bytes
+            self._emit_signal('file_progress', api_original_filename, (downloaded_size_bytes, final_total_for_progress))
+
+            if (not download_successful_flag and
+                    isinstance(last_exception_for_retry_later, http.client.IncompleteRead) and
+                    total_size_bytes > 0 and os.path.exists(single_stream_part_path)):
                 try:
-                    os.remove(downloaded_part_file_path)
-                except OSError:
-                    pass
-            return 0, 1, filename_to_save_in_main_path, was_original_name_kept_flag, FILE_DOWNLOAD_STATUS_SKIPPED, None
+                    actual_size = os.path.getsize(single_stream_part_path)
+                    if actual_size == total_size_bytes:
+                        self.logger(f"   ✅ Rescued '{api_original_filename}': IncompleteRead error occurred, but file size matches. Proceeding with save.")
+                        download_successful_flag = True
+                        downloaded_part_file_path = single_stream_part_path
+                        downloaded_size_bytes = actual_size
+                        if md5_hasher is not None and current_attempt_downloaded_bytes == actual_size:
+                            # The stream was hashed as it was written; no need to read the file again.
+                            calculated_file_hash = md5_hasher.hexdigest()
+                        else:
+                            calculated_file_hash = compute_file_md5(downloaded_part_file_path)
+                except Exception as rescue_exc:
+                    self.logger(f"   ⚠️ Failed to rescue file despite matching size. Error: {rescue_exc}")
 
-        if download_successful_flag:
-            if self._check_pause(f"Post-download hash check for '{api_original_filename}'"):
+            if self.check_cancel() or (skip_event and skip_event.is_set()) or (self.pause_event and self.pause_event.is_set() and not download_successful_flag):
+                if downloaded_part_file_path and os.path.exists(downloaded_part_file_path):
+                    try:
+                        os.remove(downloaded_part_file_path)
+                    except OSError:
+                        pass
                 return 0, 1, filename_to_save_in_main_path, was_original_name_kept_flag, FILE_DOWNLOAD_STATUS_SKIPPED, None
 
-            should_skip = False
-            with self.downloaded_hash_counts_lock:
-                current_count = self.downloaded_hash_counts.get(calculated_file_hash, 0)
-                
-                decision_to_skip = False
+            if download_successful_flag:
+                if self._check_pause(f"Post-download hash check for '{api_original_filename}'"):
+                    return 0, 1, filename_to_save_in_main_path, was_original_name_kept_flag, FILE_DOWNLOAD_STATUS_SKIPPED, None
 
-                if self.keep_duplicates_mode == DUPLICATE_HANDLING_HASH:
-                    if current_count >= 1:
-                        decision_to_skip = True
-                        self.logger(f"   -> Skip (Content Duplicate): '{api_original_filename}' is identical to a file already downloaded. Discarding.")
+                should_skip = False
+                existing_duplicate_path = None
+                if self.keep_duplicates_mode == DUPLICATE_HANDLING_HASH and hash_index:
+                    existing_duplicate_path = hash_index.find_existing_file(calculated_file_hash)
+                with self.downloaded_hash_counts_lock:
+                    current_count = self.downloaded_hash_counts.get(calculated_file_hash, 0)
+                
+                    decision_to_skip = False
+
+                    if self.keep_duplicates_mode == DUPLICATE_HANDLING_HASH:
+                        if current_count >= 1:
+                            decision_to_skip = True
+                            self.logger(f"   -> Skip (Content Duplicate): '{api_original_filename}' is identical to a file already downloaded. Discarding.")
+                        elif existing_duplicate_path:
+                            decision_to_skip = True
+                            self.logger(f"   -> Skip (Content Duplicate): '{api_original_filename}' is identical to '{os.path.basename(existing_duplicate_path)}' from a previous download. Discarding.")
                 
-                elif self.keep_duplicates_mode == DUPLICATE_HANDLING_KEEP_ALL and self.keep_duplicates_limit > 0:
-                    if current_count >= self.keep_duplicates_limit:
-                        decision_to_skip = True
-                        self.logger(f"   -> Skip (Duplicate Limit Reached): Limit of {self.keep_duplicates_limit} for this file content has been met. Discarding.")
+                    elif self.keep_duplicates_mode == DUPLICATE_HANDLING_KEEP_ALL and self.keep_duplicates_limit > 0:
+                        if current_count >= self.keep_duplicates_limit:
+                            decision_to_skip = True
+                            self.logger(f"   -> Skip (Duplicate Limit Reached): Limit of {self.keep_duplicates_limit} for this file content has been met. Discarding.")
 
-                if not decision_to_skip:
-                    self.downloaded_hash_counts[calculated_file_hash] = current_count + 1
+                    if not decision_to_skip:
+                        self.downloaded_hash_counts[calculated_file_hash] = current_count + 1
                 
-                should_skip = decision_to_skip
+                    should_skip = decision_to_skip
 
-            if should_skip:
-                if downloaded_part_file_path and os.path.exists(downloaded_part_file_path):
-                    try:
-                        os.remove(downloaded_part_file_path)
-                    except OSError: pass
-                return 0, 1, filename_to_save_in_main_path, was_original_name_kept_flag, FILE_DOWNLOAD_STATUS_SKIPPED, None
+                if should_skip:
+                    if downloaded_part_file_path and os.path.exists(downloaded_part_file_path):
+                        try:
+                            os.remove(downloaded_part_file_path)
+                        except OSError: pass
+                    return 0, 1, filename_to_save_in_main_path, was_original_name_kept_flag, FILE_DOWNLOAD_STATUS_SKIPPED, None
             
-            if (self.compress_images and downloaded_part_file_path and
-                    is_image(api_original_filename) and
-                    os.path.getsize(downloaded_part_file_path) > 1.5 * 1024 * 1024):
-                
-                self.logger(f"   🔄 Compressing '{api_original_filename}' to WebP...")
-                try:
-                    with Image.open(downloaded_part_file_path) as img:
-                        if img.mode not in ('RGB', 'RGBA'):
-                            img = img.convert('RGBA')
-                        
-                        output_buffer = BytesIO()
-                        img.save(output_buffer, format='WebP', quality=85)
-                        
-                        data_to_write_io = output_buffer
-                        
+                if (self.compress_images and downloaded_part_file_path and
+                        is_image(api_original_filename) and
+                        os.path.getsize(downloaded_part_file_path) > IMAGE_COMPRESSION_MIN_BYTES):
+
+                    # Encoding runs in the transcoder's processes; this transfer's slot is
+                    # lent to the next download while it waits.
+                    transcoder = get_image_transcoder()
+                    self.logger(f"   🔄 Compressing '{api_original_filename}' to {transcoder.image_format}...")
+                    compressed_path = f"{os.path.splitext(downloaded_part_file_path)[0]}.compressed{transcoder.extension}"
+                    try:
+                        transcode_future = transcoder.submit(downloaded_part_file_path, compressed_path)
+                        with transfer_scheduler.detached():
+                            compressed_size = transcode_future.result()
+                        transcoded_file_path = compressed_path
+
                         base, _ = os.path.splitext(filename_to_save_in_main_path)
-                        filename_to_save_in_main_path = f"{base}.webp"
-                        self.logger(f"   ✅ Compression successful. New size: {len(data_to_write_io.getvalue()) / (1024*1024):.2f} MB")
+                        filename_to_save_in_main_path = f"{base}{transcoder.extension}"
+                        self.logger(f"   ✅ Compression successful. New size: {compressed_size / (1024*1024):.2f} MB")
 
-                except Exception as e_compress:
-                    self.logger(f"   ⚠️ Failed to compress '{api_original_filename}': {e_compress}. Saving original file instead.")
-                    data_to_write_io = None
+                    except Exception as e_compress:
+                        self.logger(f"   ⚠️ Failed to compress '{api_original_filename}': {e_compress}. Saving original file instead.")
+                        transcoded_file_path = None
             
-            effective_save_folder = target_folder_path
-            base_name, extension = os.path.splitext(filename_to_save_in_main_path)
-            counter = 1
-            final_filename_on_disk = filename_to_save_in_main_path
-            final_save_path = os.path.join(effective_save_folder, final_filename_on_disk)
-
-            while os.path.exists(final_save_path):
-                final_filename_on_disk = f"{base_name}_{counter}{extension}"
+                effective_save_folder = target_folder_path
+                base_name, extension = os.path.splitext(filename_to_save_in_main_path)
+                counter = 1
+                final_filename_on_disk = filename_to_save_in_main_path
                 final_save_path = os.path.join(effective_save_folder, final_filename_on_disk)
-                counter += 1
+
+                while os.path.exists(final_save_path):
+                    final_filename_on_disk = f"{base_name}_{counter}{extension}"
+                    final_save_path = os.path.join(effective_save_folder, final_filename_on_disk)
+                    counter += 1
             
-            if counter > 1:
-                self.logger(f"   ⚠️ Filename collision: Saving as '{final_filename_on_disk}' instead.")
+                if counter > 1:
+                    self.logger(f"   ⚠️ Filename collision: Saving as '{final_filename_on_disk}' instead.")
+
+                try:
+                    if transcoded_file_path:
+                        os.rename(transcoded_file_path, final_save_path)
+                        if downloaded_part_file_path and os.path.exists(downloaded_part_file_path):
+                            try:
+                                os.remove(downloaded_part_file_path)
+                            except OSError as e_rem:
+                                self.logger(f"  -> Failed to remove .part after compression: {e_rem}")
+                    else:
+                        if downloaded_part_file_path and os.path.exists(downloaded_part_file_path):
+                            time.sleep(0.1)
+                            os.rename(downloaded_part_file_path, final_save_path)
+                        else:
+                            raise FileNotFoundError(f"Original .part file not found for saving: {downloaded_part_file_path}")
+                
+                    with self.downloaded_file_hashes_lock:
+                        self.downloaded_file_hashes.add(calculated_file_hash)
+                    if hash_index:
+                        # A compressed image's content differs from the download, so it is hashed as written.
+                        saved_file_hash = compute_file_md5(final_save_path) if transcoded_file_path else calculated_file_hash
+                        hash_index.record(final_save_path, saved_file_hash)
+                
+                    final_filename_saved_for_return = final_filename_on_disk
+                    self.logger(f"✅ Saved: '{final_filename_saved_for_return}' (from '{api_original_filename}', {downloaded_size_bytes / (1024 * 1024):.2f} MB) in '{os.path.basename(effective_save_folder)}'")
+
+                    downloaded_file_details = {
+                        'disk_filename': final_filename_saved_for_return,
+                        'post_title': post_title,
+                        'post_id': original_post_id_for_log,
+                        'upload_date_str': self.post.get('published') or self.post.get('added') or "N/A",
+                        'download_timestamp': time.time(),
+                        'download_path': effective_save_folder,
+                        'service': self.service,
+                        'user_id': self.user_id,
+                        'api_original_filename': api_original_filename,
+                        'folder_context_name': folder_context_name_for_history or os.path.basename(effective_save_folder)
+                    }
+                    self._emit_signal('file_successfully_downloaded', downloaded_file_details)
+                    time.sleep(0.05)
+
+                    return 1, 0, final_filename_saved_for_return, was_original_name_kept_flag, FILE_DOWNLOAD_STATUS_SUCCESS, None
+
+                except Exception as save_err:
+                    self.logger(f"->>Save Fail for '{final_filename_on_disk}': {save_err}")
 
-            try:
-                if data_to_write_io:
-                    with open(final_save_path, 'wb') as f_out:
-                        f_out.write(data_to_write_io.getvalue())
                     if downloaded_part_file_path and os.path.exists(downloaded_part_file_path):
                         try:
                             os.remove(downloaded_part_file_path)
+                            self.logger(f"   Cleaned up temporary file after save error: {os.path.basename(downloaded_part_file_path)}")
                         except OSError as e_rem:
-                            self.logger(f"  -> Failed to remove .part after compression: {e_rem}")
-                else:
-                    if downloaded_part_file_path and os.path.exists(downloaded_part_file_path):
-                        time.sleep(0.1)
-                        os.rename(downloaded_part_file_path, final_save_path)
-                    else:
-                        raise FileNotFoundError(f"Original .part file not found for saving: {downloaded_part_file_path}")
-                
-                with self.downloaded_file_hashes_lock:
-                    self.downloaded_file_hashes.add(calculated_file_hash)
-                
-                final_filename_saved_for_return = final_filename_on_disk
-                self.logger(f"✅ Saved: '{final_filename_saved_for_return}' (from '{api_original_filename}', {downloaded_size_bytes / (1024 * 1024):.2f} MB) in '{os.path.basename(effective_save_folder)}'")
+                            self.logger(f"   ⚠️ Could not clean up temporary file '{os.path.basename(downloaded_part_file_path)}' after save error: {e_rem}")
 
-                downloaded_file_details = {
-                    'disk_filename': final_filename_saved_for_return,
+                    if os.path.exists(final_save_path):
+                        try:
+                            os.remove(final_save_path)
+                        except OSError:
+                            self.logger(f"   -> Failed to remove partially saved file: {final_save_path}")
+
+                    permanent_failure_details = {
+                        'file_info': file_info, 'target_folder_path': target_folder_path, 'headers': file_download_headers,
+                        'original_post_id_for_log': original_post_id_for_log, 'post_title': post_title,
+                        'file_index_in_post': file_index_in_post, 'num_files_in_this_post': num_files_in_this_post,
+                        'forced_filename_override': filename_to_save_in_main_path,
+                    }
+                    return 0, 1, final_filename_saved_for_return, was_original_name_kept_flag, FILE_DOWNLOAD_STATUS_FAILED_PERMANENTLY_THIS_SESSION, permanent_failure_details
+                finally:
+                    if transcoded_file_path and os.path.exists(transcoded_file_path):
+                        try:
+                            os.remove(transcoded_file_path)
+                        except OSError:
+                            pass
+            else:
+                self.logger(f"->>Download Fail for '{api_original_filename}' (Post ID: {original_post_id_for_log}). No successful download after retries.")
+                details_for_failure = {
+                    'file_info': file_info, 
+                    'target_folder_path': target_folder_path, 
+                    'headers': file_download_headers,
+                    'original_post_id_for_log': original_post_id_for_log, 
                     'post_title': post_title,
-                    'post_id': original_post_id_for_log,
-                    'upload_date_str': self.post.get('published') or self.post.get('added') or "N/A",
-                    'download_timestamp': time.time(),
-                    'download_path': effective_save_folder,
-                    'service': self.service,
-                    'user_id': self.user_id,
-                    'api_original_filename': api_original_filename,
-                    'folder_context_name': folder_context_name_for_history or os.path.basename(effective_save_folder)
+                    'file_index_in_post': file_index_in_post, 
+                    'num_files_in_this_post': num_files_in_this_post,
+                    'forced_filename_override': filename_to_save_in_main_path 
                 }
-                self._emit_signal('file_successfully_downloaded', downloaded_file_details)
-                time.sleep(0.05)
+                if is_permanent_error:
+                    return 0, 1, filename_to_save_in_main_path, was_original_name_kept_flag, FILE_DOWNLOAD_STATUS_FAILED_PERMANENTLY_THIS_SESSION, details_for_failure
+                else:
+                    return 0, 1, filename_to_save_in_main_path, was_original_name_kept_flag, FILE_DOWNLOAD_STATUS_FAILED_RETRYABLE_LATER, details_for_failure
+        finally:
+            _release_part_file_stem(part_file_stem)
 
-                return 1, 0, final_filename_saved_for_return, was_original_name_kept_flag, FILE_DOWNLOAD_STATUS_SUCCESS, None
+    def process(self):
+        """
+        Processes the post and returns its 7-item result tuple.
 
-            except Exception as save_err:
-                self.logger(f"->>Save Fail for '{final_filename_on_disk}': {save_err}")
+        File downloads go through the shared transfer scheduler (see
+        transfer_scheduler.py). The async engine (see async_engine.py) drives
+        `_process_steps` itself instead.
+        """
+        steps = self._process_steps()
+        try:
+            file_jobs = next(steps)
+            steps.send(self._run_file_jobs(file_jobs))
+        except StopIteration as finished:
+            return finished.value
 
-                if downloaded_part_file_path and os.path.exists(downloaded_part_file_path):
-                    try:
-                        os.remove(downloaded_part_file_path)
-                        self.logger(f"   Cleaned up temporary file after save error: {os.path.basename(downloaded_part_file_path)}")
-                    except OSError as e_rem:
-                        self.logger(f"   ⚠️ Could not clean up temporary file '{os.path.basename(downloaded_part_file_path)}' after save error: {e_rem}")
+    def _run_file_jobs(self, file_jobs):
+        """
+        Downloads a post's files on the shared transfer scheduler and returns
+        their results in completion order.
 
-                if os.path.exists(final_save_path):
-                    try:
-                        os.remove(final_save_path)
-                    except OSError:
-                        self.logger(f"   -> Failed to remove partially saved file: {final_save_path}")
+        Args:
+            file_jobs (list): Keyword-argument dicts for `_download_single_file`.
 
-                permanent_failure_details = {
-                    'file_info': file_info, 'target_folder_path': target_folder_path, 'headers': file_download_headers,
-                    'original_post_id_for_log': original_post_id_for_log, 'post_title': post_title,
-                    'file_index_in_post': file_index_in_post, 'num_files_in_this_post': num_files_in_this_post,
-                    'forced_filename_override': filename_to_save_in_main_path,
-                }
-                return 0, 1, final_filename_saved_for_return, was_original_name_kept_flag, FILE_DOWNLOAD_STATUS_FAILED_PERMANENTLY_THIS_SESSION, permanent_failure_details
-            finally:
-                if data_to_write_io and hasattr(data_to_write_io, 'close'):
-                    data_to_write_io.close()
-        else:
-            self.logger(f"->>Download Fail for '{api_original_filename}' (Post ID: {original_post_id_for_log}). No successful download after retries.")
-            details_for_failure = {
-                'file_info': file_info, 
-                'target_folder_path': target_folder_path, 
-                'headers': file_download_headers,
-                'original_post_id_for_log': original_post_id_for_log, 
-                'post_title': post_title,
-                'file_index_in_post': file_index_in_post, 
-                'num_files_in_this_post': num_files_in_this_post,
-                'forced_filename_override': filename_to_save_in_main_path 
-            }
-            if is_permanent_error:
-                return 0, 1, filename_to_save_in_main_path, was_original_name_kept_flag, FILE_DOWNLOAD_STATUS_FAILED_PERMANENTLY_THIS_SESSION, details_for_failure
-            else:
-                return 0, 1, filename_to_save_in_main_path, was_original_name_kept_flag, FILE_DOWNLOAD_STATUS_FAILED_RETRYABLE_LATER, details_for_failure
+        Returns:
+            list: One entry per job: the result tuple, or the exception it raised
+                  (CancelledError for jobs dropped after a cancel).
+        """
+        file_results = []
+        if not file_jobs:
+            return file_results
+        futures_list = [self.submit_file_job(job) for job in file_jobs]
+        for future in as_completed(futures_list):
+            if self.check_cancel():
+                for f_to_cancel in futures_list:
+                    if not f_to_cancel.done():
+                        f_to_cancel.cancel()
+                file_results.extend(CancelledError() for f in futures_list if f.cancelled())
+                break
+            try:
+                file_results.append(future.result())
+            except Exception as exc_f:
+                file_results.append(exc_f)
+        # Like the old per-post pool, return only once transfers already running have finished.
+        wait(futures_list)
+        return file_results
+
+    def submit_file_job(self, file_job):
+        """
+        Queues one file job from `_process_steps` on the shared transfer scheduler.
 
-    def process(self):
+        Returns:
+            concurrent.futures.Future: Resolves to `_download_single_file`'s result.
+        """
+        file_info = file_job['file_info']
+        file_url = file_info.get('url')
+        node_manager = get_cdn_node_manager(file_url) if file_url else None
+        # A CDN transfer only picks its node once it runs, so it is capped on the node it leases.
+        candidate_hosts = node_manager.node_hosts() + [get_url_host(file_url)] if node_manager else None
+        return get_transfer_scheduler().submit(
+            id(self), self._download_single_file, kwargs=file_job, url=file_url,
+            size_hint=file_info.get('size'), order=file_job.get('file_index_in_post', 0),
+            candidate_hosts=candidate_hosts
+        )
+
+    def _process_steps(self):
+        """
+        The body of `process`, written as a generator so the file downloads can
+        be driven by different executors.
+
+        It yields once with the list of file jobs for this post, expects the
+        list of their results to be sent back, and returns the result tuple.
+        Posts that are skipped or handled without file downloads (e.g. text
+        only or links only) return before yielding.
+        """
 
         if self.service == 'discord':
             # For Discord, self.post is a MESSAGE object from the API.
@@ -953,6 +1187,7 @@ class PostProcessorWorker:
                 return (0, 0, [], [], [], None, None)
 
             current_character_filters = self._get_current_character_filters()
+            character_filter_matcher = get_character_filter_matcher(current_character_filters) if current_character_filters else None
             kept_original_filenames_for_log = []
             retryable_failures_this_post = []
             permanent_failures_this_post = []
@@ -974,8 +1209,6 @@ class PostProcessorWorker:
                 'Referer': post_page_url, 
                 'Accept': 'text/css'
                 }
-            link_pattern = re.compile(r"""<a\s+.*?href=["'](https?://[^"']+)["'][^>]*>(.*?)</a>""", re.IGNORECASE | re.DOTALL)
-            
             effective_unwanted_keywords_for_folder_naming = self.unwanted_keywords.copy()
             is_full_creator_download_no_char_filter = not self.target_post_id_from_initial_url and not current_character_filters
            
@@ -1009,21 +1242,12 @@ class PostProcessorWorker:
                 if self._check_pause(f"Character title filter for post {post_id}"):
                     result_tuple = (0, num_potential_files_in_post, [], [], [], None, None)
                     return result_tuple
-                for idx, filter_item_obj in enumerate(current_character_filters):
-                    if self.check_cancel(): break
-                    terms_to_check_for_title = list(filter_item_obj["aliases"])
-                    if filter_item_obj["is_group"]:
-                        if filter_item_obj["name"] not in terms_to_check_for_title:
-                            terms_to_check_for_title.append(filter_item_obj["name"])
-                    unique_terms_for_title_check = list(set(terms_to_check_for_title))
-                    for term_to_match in unique_terms_for_title_check:
-                        match_found_for_term = is_title_match_for_character(post_title, term_to_match)
-                        if match_found_for_term:
-                            post_is_candidate_by_title_char_match = True
-                            char_filter_that_matched_title = filter_item_obj
-                            self.logger(f"   Post title matches char filter term '{term_to_match}' (from group/name '{filter_item_obj['name']}', Scope: {self.char_filter_scope}). Post is candidate.")
-                            break
-                    if post_is_candidate_by_title_char_match: break
+                matched_filter_index, term_to_match = character_filter_matcher.find_in_text(post_title)
+                if matched_filter_index is not None:
+                    filter_item_obj = current_character_filters[matched_filter_index]
+                    post_is_candidate_by_title_char_match = True
+                    char_filter_that_matched_title = filter_item_obj
+                    self.logger(f"   Post title matches char filter term '{term_to_match}' (from group/name '{filter_item_obj['name']}', Scope: {self.char_filter_scope}). Post is candidate.")
 
             all_files_from_post_api_for_char_check = []
             api_file_domain_for_char_check = urlparse(self.api_url_input).netloc
@@ -1048,18 +1272,13 @@ class PostProcessorWorker:
                     if self.check_cancel(): break
                     current_api_original_filename_for_check = file_info_item.get('_original_name_for_log')
                     if not current_api_original_filename_for_check: continue
-                    for filter_item_obj in current_character_filters:
-                        terms_to_check = list(filter_item_obj["aliases"])
-                        if filter_item_obj["is_group"] and filter_item_obj["name"] not in terms_to_check:
-                            terms_to_check.append(filter_item_obj["name"])
-                        for term_to_match in terms_to_check:
-                            if is_filename_match_for_character(current_api_original_filename_for_check, term_to_match):
-                                post_is_candidate_by_file_char_match_in_comment_scope = True
-                                char_filter_that_matched_file_in_comment_scope = filter_item_obj
-                                self.logger(f"     Match Found (File in Comments Scope): File '{current_api_original_filename_for_check}' matches char filter term '{term_to_match}' (from group/name '{filter_item_obj['name']}'). Post is candidate.")
-                                break
-                        if post_is_candidate_by_file_char_match_in_comment_scope: break
-                    if post_is_candidate_by_file_char_match_in_comment_scope: break
+                    matched_filter_index, term_to_match = character_filter_matcher.find_in_filename(current_api_original_filename_for_check)
+                    if matched_filter_index is not None:
+                        filter_item_obj = current_character_filters[matched_filter_index]
+                        post_is_candidate_by_file_char_match_in_comment_scope = True
+                        char_filter_that_matched_file_in_comment_scope = filter_item_obj
+                        self.logger(f"     Match Found (File in Comments Scope): File '{current_api_original_filename_for_check}' matches char filter term '{term_to_match}' (from group/name '{filter_item_obj['name']}'). Post is candidate.")
+                        break
                 self.logger(f"   [Char Scope: Comments] Phase 1 Result: post_is_candidate_by_file_char_match_in_comment_scope = {post_is_candidate_by_file_char_match_in_comment_scope}")
 
             if current_character_filters and self.char_filter_scope == CHAR_SCOPE_COMMENTS and self.service != 'discord':
@@ -1074,13 +1293,16 @@ class PostProcessorWorker:
                         if not any(d in api_domain_for_comments.lower() for d in ['kemono.su', 'kemono.party', 'kemono.cr', 'coomer.su', 'coomer.party', 'coomer.st']):
                             self.logger(f"⚠️ Unrecognized domain '{api_domain_for_comments}' for comment API. Defaulting based on service.")
                             api_domain_for_comments = "kemono.cr" if "kemono" in self.service.lower() else "coomer.st"
-                        comments_data = fetch_post_comments(
-                            api_domain_for_comments, self.service, self.user_id, post_id,
-                            headers, self.logger, self.cancellation_event, self.pause_event,
-                            cookies_dict=prepare_cookies_for_request(
-                                self.use_cookie, self.cookie_text, self.selected_cookie_file, self.app_base_dir, self.logger
+                        if PREFETCHED_COMMENTS_KEY in self.post:
+                            comments_data = self.post[PREFETCHED_COMMENTS_KEY]
+                        else:
+                            comments_data = fetch_post_comments(
+                                api_domain_for_comments, self.service, self.user_id, post_id,
+                                headers, self.logger, self.cancellation_event, self.pause_event,
+                                cookies_dict=prepare_cookies_for_request(
+                                    self.use_cookie, self.cookie_text, self.selected_cookie_file, self.app_base_dir, self.logger
+                                )
                             )
-                        )
                         if comments_data:
                             self.logger(f"     Fetched {len(comments_data)} comments for post {post_id}.")
                             for comment_item_idx, comment_item in enumerate(comments_data):
@@ -1089,19 +1311,14 @@ class PostProcessorWorker:
                                 if not raw_comment_content: continue
                                 cleaned_comment_text = strip_html_tags(raw_comment_content)
                                 if not cleaned_comment_text.strip(): continue
-                                for filter_item_obj in current_character_filters:
-                                    terms_to_check_comment = list(filter_item_obj["aliases"])
-                                    if filter_item_obj["is_group"] and filter_item_obj["name"] not in terms_to_check_comment:
-                                        terms_to_check_comment.append(filter_item_obj["name"])
-                                    for term_to_match_comment in terms_to_check_comment:
-                                        if is_title_match_for_character(cleaned_comment_text, term_to_match_comment):
-                                            post_is_candidate_by_comment_char_match = True
-                                            char_filter_that_matched_comment = filter_item_obj
-                                            self.logger(f"     Match Found (Comment in Comments Scope): Comment in post {post_id} matches char filter term '{term_to_match_comment}' (from group/name '{filter_item_obj['name']}'). Post is candidate.")
-                                            self.logger(f"       Matching comment (first 100 chars): '{cleaned_comment_text[:100]}...'")
-                                            break
-                                    if post_is_candidate_by_comment_char_match: break
-                                if post_is_candidate_by_comment_char_match: break
+                                matched_filter_index, term_to_match_comment = character_filter_matcher.find_in_text(cleaned_comment_text)
+                                if matched_filter_index is not None:
+                                    filter_item_obj = current_character_filters[matched_filter_index]
+                                    post_is_candidate_by_comment_char_match = True
+                                    char_filter_that_matched_comment = filter_item_obj
+                                    self.logger(f"     Match Found (Comment in Comments Scope): Comment in post {post_id} matches char filter term '{term_to_match_comment}' (from group/name '{filter_item_obj['name']}'). Post is candidate.")
+                                    self.logger(f"       Matching comment (first 100 chars): '{cleaned_comment_text[:100]}...'")
+                                    break
                         else:
                             self.logger(f"     No comments found or fetched for post {post_id} to check against character filters.")
                     except RuntimeError as e_fetch_comment:
@@ -1308,37 +1525,34 @@ class PostProcessorWorker:
                                 break
                 determined_post_save_path_for_history = os.path.join(base_path_for_post_subfolder, final_post_subfolder_name)
 
-            if self.skip_words_list and (self.skip_words_scope == SKIP_SCOPE_POSTS or self.skip_words_scope == SKIP_SCOPE_BOTH):
+            if self.filter_plan.skip_posts:
                 if self._check_pause(f"Skip words (post title) for post {post_id}"):
                     result_tuple = (0, num_potential_files_in_post, [], [], [], None, None)
                     return result_tuple
-                post_title_lower = post_title.lower()
-                for skip_word in self.skip_words_list:
-                    if skip_word.lower() in post_title_lower:
-                        self.logger(f"   -> Skip Post (Keyword in Title '{skip_word}'): '{post_title[:50]}...'. Scope: {self.skip_words_scope}")
-                        # Create a history object for the skipped post to record its ID
-                        history_data_for_skipped_post = {
-                            'post_id': post_id,
-                            'service': self.service,
-                            'user_id': self.user_id,
-                            'post_title': post_title,
-                            'top_file_name': "N/A (Post Skipped)",
-                            'num_files': num_potential_files_in_post,
-                            'upload_date_str': post_data.get('published') or post_data.get('added') or "Unknown",
-                            'download_location': determined_post_save_path_for_history
-                        }
-                        result_tuple = (0, num_potential_files_in_post, [], [], [], history_data_for_skipped_post, None)
-                        return result_tuple
+                skip_word = self.filter_plan.find_skip_word(post_title)
+                if skip_word is not None:
+                    self.logger(f"   -> Skip Post (Keyword in Title '{skip_word}'): '{post_title[:50]}...'. Scope: {self.skip_words_scope}")
+                    # Create a history object for the skipped post to record its ID
+                    history_data_for_skipped_post = {
+                        'post_id': post_id,
+                        'service': self.service,
+                        'user_id': self.user_id,
+                        'post_title': post_title,
+                        'top_file_name': "N/A (Post Skipped)",
+                        'num_files': num_potential_files_in_post,
+                        'upload_date_str': post_data.get('published') or post_data.get('added') or "Unknown",
+                        'download_location': determined_post_save_path_for_history
+                    }
+                    result_tuple = (0, num_potential_files_in_post, [], [], [], history_data_for_skipped_post, None)
+                    return result_tuple
 
             if self.filter_mode == 'text_only' and not self.extract_links_only:
                 self.logger(f"   Mode: Text Only (Scope: {self.text_only_scope})")
-                post_title_lower = post_title.lower()
-                if self.skip_words_list and (self.skip_words_scope == SKIP_SCOPE_POSTS or self.skip_words_scope == SKIP_SCOPE_BOTH):
-                    for skip_word in self.skip_words_list:
-                        if skip_word.lower() in post_title_lower:
-                            self.logger(f"   -> Skip Post (Keyword in Title '{skip_word}'): '{post_title[:50]}...'.")
-                            result_tuple = (0, num_potential_files_in_post, [], [], [], None, None)
-                            return result_tuple
+                skip_word = self.filter_plan.find_skip_word(post_title) if self.filter_plan.skip_posts else None
+                if skip_word is not None:
+                    self.logger(f"   -> Skip Post (Keyword in Title '{skip_word}'): '{post_title[:50]}...'.")
+                    result_tuple = (0, num_potential_files_in_post, [], [], [], None, None)
+                    return result_tuple
 
                 if current_character_filters and not post_is_candidate_by_title_char_match and not post_is_candidate_by_comment_char_match and not post_is_candidate_by_file_char_match_in_comment_scope:
                     self.logger(f"   -> Skip Post (No character match for text extraction): '{post_title[:50]}...'.")
@@ -1364,7 +1578,10 @@ class PostProcessorWorker:
                     try:
                         parsed_url = urlparse(self.api_url_input)
                         api_domain = parsed_url.netloc
-                        comments_data = fetch_post_comments(api_domain, self.service, self.user_id, post_id, headers, self.logger, self.cancellation_event, self.pause_event)
+                        if PREFETCHED_COMMENTS_KEY in final_post_data:
+                            comments_data = final_post_data[PREFETCHED_COMMENTS_KEY]
+                        else:
+                            comments_data = fetch_post_comments(api_domain, self.service, self.user_id, post_id, headers, self.logger, self.cancellation_event, self.pause_event)
                         if comments_data:
                             comment_texts = []
                             for comment in comments_data:
@@ -1408,15 +1625,12 @@ class PostProcessorWorker:
                         if not cleaned_text.strip(): return (0, 0, [], [], [], None, None)
                         content_data['content'] = cleaned_text
 
-                    temp_dir = os.path.join(self.app_base_dir, "appdata")
-                    os.makedirs(temp_dir, exist_ok=True)
-                    temp_filename = f"tmp_{post_id}_{uuid.uuid4().hex[:8]}.json"
-                    temp_filepath = os.path.join(temp_dir, temp_filename)
+                    # Every post goes into one shared spool; the spool's path is reported like a temp file.
+                    spool_path = get_pdf_spool_path(self.app_base_dir)
                     try:
-                        with open(temp_filepath, 'w', encoding='utf-8') as f:
-                            json.dump(content_data, f, indent=2)
+                        append_pdf_spool_record(spool_path, content_data)
                         self.logger(f"   Saved temporary data for '{post_title}' for single PDF compilation.")
-                        return (0, 0, [], [], [], None, temp_filepath)
+                        return (0, 0, [], [], [], None, spool_path)
                     except Exception as e:
                         self.logger(f"   ❌ Failed to write temporary file for single PDF: {e}")
                         return (0, 0, [], [], [], None, None)
@@ -1525,8 +1739,8 @@ class PostProcessorWorker:
                     return result_tuple
                 for folder_name_to_check in base_folder_names_for_post_content:
                     if not folder_name_to_check: continue
-                    if any(skip_word.lower() in folder_name_to_check.lower() for skip_word in self.skip_words_list):
-                        matched_skip = next((sw for sw in self.skip_words_list if sw.lower() in folder_name_to_check.lower()), "unknown_skip_word")
+                    matched_skip = self.filter_plan.find_skip_word(folder_name_to_check)
+                    if matched_skip is not None:
                         self.logger(f"   -> Skip Post (Folder Keyword): Potential folder '{folder_name_to_check}' contains '{matched_skip}'.")
                         result_tuple = (0, num_potential_files_in_post, [], [], [], None, None)
                         return result_tuple
@@ -1536,9 +1750,8 @@ class PostProcessorWorker:
                     result_tuple = (0, num_potential_files_in_post, [], [], [], None, None)
                     return result_tuple
                 try:
-                    mega_key_pattern = re.compile(r'\b([a-zA-Z0-9_-]{43}|[a-zA-Z0-9_-]{22})\b')
                     unique_links_data = {}
-                    for match in link_pattern.finditer(post_content_html):
+                    for match in EXTERNAL_LINK_PATTERN.finditer(post_content_html):
                         link_url = match.group(1).strip()
                         link_url = html.unescape(link_url)
                         link_inner_text = match.group(2)
@@ -1556,14 +1769,14 @@ class PostProcessorWorker:
                             parsed_mega_url = urlparse(link_url)
                             if parsed_mega_url.fragment:
                                 potential_key_from_fragment = parsed_mega_url.fragment.split('!')[-1]
-                                if mega_key_pattern.fullmatch(potential_key_from_fragment):
+                                if MEGA_KEY_PATTERN.fullmatch(potential_key_from_fragment):
                                     decryption_key_found = potential_key_from_fragment
                             if not decryption_key_found and link_text:
-                                key_match_in_text = mega_key_pattern.search(link_text)
+                                key_match_in_text = MEGA_KEY_PATTERN.search(link_text)
                                 if key_match_in_text:
                                     decryption_key_found = key_match_in_text.group(1)
                             if not decryption_key_found and self.extract_links_only and post_content_html:
-                                key_match_in_content = mega_key_pattern.search(strip_html_tags(post_content_html))
+                                key_match_in_content = MEGA_KEY_PATTERN.search(strip_html_tags(post_content_html))
                                 if key_match_in_content:
                                     decryption_key_found = key_match_in_content.group(1)
                         if platform not in scraped_platforms:
@@ -1738,171 +1951,129 @@ class PostProcessorWorker:
                 return result_tuple
 
             self.logger(f"   Identified {len(files_to_download_info_list)} unique original file(s) for potential download from post {post_id}.")
-            with ThreadPoolExecutor(max_workers=self.num_file_threads, thread_name_prefix=f'P{post_id}File_') as file_pool:
-                futures_list = []
-                for file_idx, file_info_to_dl in enumerate(files_to_download_info_list):
-                    if self._check_pause(f"File processing loop for post {post_id}, file {file_idx}"): break
-                    if self.check_cancel(): break
-                    current_api_original_filename = file_info_to_dl.get('_original_name_for_log')
-                    file_is_candidate_by_char_filter_scope = False
-                    char_filter_info_that_matched_file = None
-                    if not current_character_filters:
-                        file_is_candidate_by_char_filter_scope = True
-                    else:
-                        if self.char_filter_scope == CHAR_SCOPE_FILES:
-                            for filter_item_obj in current_character_filters:
-                                terms_to_check_for_file = list(filter_item_obj["aliases"])
-                                if filter_item_obj["is_group"] and filter_item_obj["name"] not in terms_to_check_for_file:
-                                    terms_to_check_for_file.append(filter_item_obj["name"])
-                                unique_terms_for_file_check = list(set(terms_to_check_for_file))
-                                for term_to_match in unique_terms_for_file_check:
-                                    if is_filename_match_for_character(current_api_original_filename, term_to_match):
-                                        file_is_candidate_by_char_filter_scope = True
-                                        char_filter_info_that_matched_file = filter_item_obj
-                                        self.logger(f"   File '{current_api_original_filename}' matches char filter term '{term_to_match}' (from '{filter_item_obj['name']}'). Scope: Files.")
-                                        break
-                                if file_is_candidate_by_char_filter_scope: break
-                        elif self.char_filter_scope == CHAR_SCOPE_TITLE:
-                            if post_is_candidate_by_title_char_match:
-                                file_is_candidate_by_char_filter_scope = True
-                                char_filter_info_that_matched_file = char_filter_that_matched_title
-                                self.logger(f"   File '{current_api_original_filename}' is candidate because post title matched. Scope: Title.")
-                        elif self.char_filter_scope == CHAR_SCOPE_BOTH:
-                            if post_is_candidate_by_title_char_match:
-                                file_is_candidate_by_char_filter_scope = True
-                                char_filter_info_that_matched_file = char_filter_that_matched_title
-                                self.logger(f"   File '{current_api_original_filename}' is candidate because post title matched. Scope: Both (Title part).")
-                            else:
-                                for filter_item_obj_both_file in current_character_filters:
-                                    terms_to_check_for_file_both = list(filter_item_obj_both_file["aliases"])
-                                    if filter_item_obj_both_file["is_group"] and filter_item_obj_both_file["name"] not in terms_to_check_for_file_both:
-                                        terms_to_check_for_file_both.append(filter_item_obj_both_file["name"])
-                                    unique_terms_for_file_both_check = list(set(terms_to_check_for_file_both))
-                                    for term_to_match in unique_terms_for_file_both_check:
-                                        if is_filename_match_for_character(current_api_original_filename, term_to_match):
-                                            file_is_candidate_by_char_filter_scope = True
-                                            char_filter_info_that_matched_file = filter_item_obj_both_file
-                                            self.logger(f"   File '{current_api_original_filename}' matches char filter term '{term_to_match}' (from '{filter_item_obj['name']}'). Scope: Both (File part).")
-                                            break
-                                    if file_is_candidate_by_char_filter_scope: break
-                        elif self.char_filter_scope == CHAR_SCOPE_COMMENTS:
-                            if post_is_candidate_by_file_char_match_in_comment_scope:
-                                file_is_candidate_by_char_filter_scope = True
-                                char_filter_info_that_matched_file = char_filter_that_matched_file_in_comment_scope
-                                self.logger(f"   File '{current_api_original_filename}' is candidate because a file in this post matched char filter (Overall Scope: Comments).")
-                            elif post_is_candidate_by_comment_char_match:
-                                file_is_candidate_by_char_filter_scope = True
-                                char_filter_info_that_matched_file = char_filter_that_matched_comment
-                                self.logger(f"   File '{current_api_original_filename}' is candidate because post comments matched char filter (Overall Scope: Comments).")
-                    if not file_is_candidate_by_char_filter_scope:
-                        self.logger(f"   -> Skip File (Char Filter Scope '{self.char_filter_scope}'): '{current_api_original_filename}' no match.")
-                        total_skipped_this_post += 1
-                        continue
-
-                    target_base_folders_for_this_file_iteration = []
-                    if current_character_filters:
-                        char_title_subfolder_name = None
-                        if self.target_post_id_from_initial_url and self.custom_folder_name:
-                            char_title_subfolder_name = self.custom_folder_name
-                        elif char_filter_info_that_matched_file:
-                            char_title_subfolder_name = clean_folder_name(char_filter_info_that_matched_file["name"])
-                        elif char_filter_that_matched_title:
-                            char_title_subfolder_name = clean_folder_name(char_filter_that_matched_title["name"])
-                        elif char_filter_that_matched_comment:
-                            char_title_subfolder_name = clean_folder_name(char_filter_that_matched_comment["name"])
-                        if char_title_subfolder_name:
-                            target_base_folders_for_this_file_iteration.append(char_title_subfolder_name)
+            file_jobs = []
+            for file_idx, file_info_to_dl in enumerate(files_to_download_info_list):
+                if self._check_pause(f"File processing loop for post {post_id}, file {file_idx}"): break
+                if self.check_cancel(): break
+                current_api_original_filename = file_info_to_dl.get('_original_name_for_log')
+                file_is_candidate_by_char_filter_scope = False
+                char_filter_info_that_matched_file = None
+                if not current_character_filters:
+                    file_is_candidate_by_char_filter_scope = True
+                else:
+                    if self.char_filter_scope == CHAR_SCOPE_FILES:
+                        matched_filter_index, term_to_match = character_filter_matcher.find_in_filename(current_api_original_filename)
+                        if matched_filter_index is not None:
+                            filter_item_obj = current_character_filters[matched_filter_index]
+                            file_is_candidate_by_char_filter_scope = True
+                            char_filter_info_that_matched_file = filter_item_obj
+                            self.logger(f"   File '{current_api_original_filename}' matches char filter term '{term_to_match}' (from '{filter_item_obj['name']}'). Scope: Files.")
+                    elif self.char_filter_scope == CHAR_SCOPE_TITLE:
+                        if post_is_candidate_by_title_char_match:
+                            file_is_candidate_by_char_filter_scope = True
+                            char_filter_info_that_matched_file = char_filter_that_matched_title
+                            self.logger(f"   File '{current_api_original_filename}' is candidate because post title matched. Scope: Title.")
+                    elif self.char_filter_scope == CHAR_SCOPE_BOTH:
+                        if post_is_candidate_by_title_char_match:
+                            file_is_candidate_by_char_filter_scope = True
+                            char_filter_info_that_matched_file = char_filter_that_matched_title
+                            self.logger(f"   File '{current_api_original_filename}' is candidate because post title matched. Scope: Both (Title part).")
                         else:
-                            self.logger(f"⚠️ File '{current_api_original_filename}' candidate by char filter, but no folder name derived. Using post title.")
-                            target_base_folders_for_this_file_iteration.append(clean_folder_name(post_title))
+                            matched_filter_index, term_to_match = character_filter_matcher.find_in_filename(current_api_original_filename)
+                            if matched_filter_index is not None:
+                                filter_item_obj_both_file = current_character_filters[matched_filter_index]
+                                file_is_candidate_by_char_filter_scope = True
+                                char_filter_info_that_matched_file = filter_item_obj_both_file
+                                self.logger(f"   File '{current_api_original_filename}' matches char filter term '{term_to_match}' (from '{filter_item_obj_both_file['name']}'). Scope: Both (File part).")
+                    elif self.char_filter_scope == CHAR_SCOPE_COMMENTS:
+                        if post_is_candidate_by_file_char_match_in_comment_scope:
+                            file_is_candidate_by_char_filter_scope = True
+                            char_filter_info_that_matched_file = char_filter_that_matched_file_in_comment_scope
+                            self.logger(f"   File '{current_api_original_filename}' is candidate because a file in this post matched char filter (Overall Scope: Comments).")
+                        elif post_is_candidate_by_comment_char_match:
+                            file_is_candidate_by_char_filter_scope = True
+                            char_filter_info_that_matched_file = char_filter_that_matched_comment
+                            self.logger(f"   File '{current_api_original_filename}' is candidate because post comments matched char filter (Overall Scope: Comments).")
+                if not file_is_candidate_by_char_filter_scope:
+                    self.logger(f"   -> Skip File (Char Filter Scope '{self.char_filter_scope}'): '{current_api_original_filename}' no match.")
+                    total_skipped_this_post += 1
+                    continue
+
+                target_base_folders_for_this_file_iteration = []
+                if current_character_filters:
+                    char_title_subfolder_name = None
+                    if self.target_post_id_from_initial_url and self.custom_folder_name:
+                        char_title_subfolder_name = self.custom_folder_name
+                    elif char_filter_info_that_matched_file:
+                        char_title_subfolder_name = clean_folder_name(char_filter_info_that_matched_file["name"])
+                    elif char_filter_that_matched_title:
+                        char_title_subfolder_name = clean_folder_name(char_filter_that_matched_title["name"])
+                    elif char_filter_that_matched_comment:
+                        char_title_subfolder_name = clean_folder_name(char_filter_that_matched_comment["name"])
+                    if char_title_subfolder_name:
+                        target_base_folders_for_this_file_iteration.append(char_title_subfolder_name)
                     else:
-                        if base_folder_names_for_post_content:
-                            target_base_folders_for_this_file_iteration.extend(base_folder_names_for_post_content)
-                        else:
-                            target_base_folders_for_this_file_iteration.append(clean_folder_name(post_title))
-
-                    if not target_base_folders_for_this_file_iteration:
-                        target_base_folders_for_this_file_iteration.append(clean_folder_name(post_title if post_title else "Uncategorized_Post_Content"))
-
-                    for target_base_folder_name_for_instance in target_base_folders_for_this_file_iteration:
-                        current_path_for_file_instance = self.override_output_dir if self.override_output_dir else self.download_root
-                        if self.use_subfolders and target_base_folder_name_for_instance:
-                            current_path_for_file_instance = os.path.join(current_path_for_file_instance, target_base_folder_name_for_instance)
-                        if self.use_post_subfolders:
-                            current_path_for_file_instance = os.path.join(current_path_for_file_instance, final_post_subfolder_name)
-
-                        manga_date_counter_to_pass = self.manga_date_file_counter_ref if self.manga_mode_active and self.manga_filename_style == STYLE_DATE_BASED else None
-                        manga_global_counter_to_pass = self.manga_global_file_counter_ref if self.manga_mode_active and self.manga_filename_style == STYLE_POST_TITLE_GLOBAL_NUMBERING else None
-                        folder_context_for_file = target_base_folder_name_for_instance if self.use_subfolders and target_base_folder_name_for_instance else clean_folder_name(post_title)
-
-                        futures_list.append(file_pool.submit(
-                            self._download_single_file,
-                            file_info=file_info_to_dl,
-                            target_folder_path=current_path_for_file_instance,
-                            post_page_url=post_page_url,  original_post_id_for_log=post_id, skip_event=self.skip_current_file_flag,
-                            post_title=post_title, manga_date_file_counter_ref=manga_date_counter_to_pass,
-                            manga_global_file_counter_ref=manga_global_counter_to_pass, folder_context_name_for_history=folder_context_for_file,
-                            file_index_in_post=file_idx, num_files_in_this_post=len(files_to_download_info_list)
-                        ))
-
-                for future in as_completed(futures_list):
-                    if self.check_cancel():
-                        for f_to_cancel in futures_list:
-                            if not f_to_cancel.done():
-                                f_to_cancel.cancel()
-                        break
-                    try:
-                        dl_count, skip_count, actual_filename_saved, original_kept_flag, status, details_for_dialog_or_retry = future.result()
-                        total_downloaded_this_post += dl_count
-                        total_skipped_this_post += skip_count
-                        if original_kept_flag and dl_count > 0 and actual_filename_saved:
-                            kept_original_filenames_for_log.append(actual_filename_saved)
-                        if status == FILE_DOWNLOAD_STATUS_FAILED_RETRYABLE_LATER and details_for_dialog_or_retry:
-                            retryable_failures_this_post.append(details_for_dialog_or_retry)
-                        elif status == FILE_DOWNLOAD_STATUS_FAILED_PERMANENTLY_THIS_SESSION and details_for_dialog_or_retry:
-                            permanent_failures_this_post.append(details_for_dialog_or_retry)
-                    except CancelledError:
-                        self.logger(f"   File download task for post {post_id} was cancelled.")
-                        total_skipped_this_post += 1
-                    except Exception as exc_f:
-                        self.logger(f"❌ File download task for post {post_id} resulted in error: {exc_f}")
-                        total_skipped_this_post += 1
+                        self.logger(f"⚠️ File '{current_api_original_filename}' candidate by char filter, but no folder name derived. Using post title.")
+                        target_base_folders_for_this_file_iteration.append(clean_folder_name(post_title))
+                else:
+                    if base_folder_names_for_post_content:
+                        target_base_folders_for_this_file_iteration.extend(base_folder_names_for_post_content)
+                    else:
+                        target_base_folders_for_this_file_iteration.append(clean_folder_name(post_title))
+
+                if not target_base_folders_for_this_file_iteration:
+                    target_base_folders_for_this_file_iteration.append(clean_folder_name(post_title if post_title else "Uncategorized_Post_Content"))
+
+                for target_base_folder_name_for_instance in target_base_folders_for_this_file_iteration:
+                    current_path_for_file_instance = self.override_output_dir if self.override_output_dir else self.download_root
+                    if self.use_subfolders and target_base_folder_name_for_instance:
+                        current_path_for_file_instance = os.path.join(current_path_for_file_instance, target_base_folder_name_for_instance)
+                    if self.use_post_subfolders:
+                        current_path_for_file_instance = os.path.join(current_path_for_file_instance, final_post_subfolder_name)
+
+                    manga_date_counter_to_pass = self.manga_date_file_counter_ref if self.manga_mode_active and self.manga_filename_style == STYLE_DATE_BASED else None
+                    manga_global_counter_to_pass = self.manga_global_file_counter_ref if self.manga_mode_active and self.manga_filename_style == STYLE_POST_TITLE_GLOBAL_NUMBERING else None
+                    folder_context_for_file = target_base_folder_name_for_instance if self.use_subfolders and target_base_folder_name_for_instance else clean_folder_name(post_title)
+
+                    file_jobs.append(dict(
+                        file_info=file_info_to_dl,
+                        target_folder_path=current_path_for_file_instance,
+                        post_page_url=post_page_url,  original_post_id_for_log=post_id, skip_event=self.skip_current_file_flag,
+                        post_title=post_title, manga_date_file_counter_ref=manga_date_counter_to_pass,
+                        manga_global_file_counter_ref=manga_global_counter_to_pass, folder_context_name_for_history=folder_context_for_file,
+                        file_index_in_post=file_idx, num_files_in_this_post=len(files_to_download_info_list)
+                    ))
+
+            file_results = yield file_jobs
+            for file_result in file_results:
+                if isinstance(file_result, CancelledError):
+                    self.logger(f"   File download task for post {post_id} was cancelled.")
+                    total_skipped_this_post += 1
+                elif isinstance(file_result, BaseException):
+                    self.logger(f"❌ File download task for post {post_id} resulted in error: {file_result}")
+                    total_skipped_this_post += 1
+                else:
+                    dl_count, skip_count, actual_filename_saved, original_kept_flag, status, details_for_dialog_or_retry = file_result
+                    total_downloaded_this_post += dl_count
+                    total_skipped_this_post += skip_count
+                    if original_kept_flag and dl_count > 0 and actual_filename_saved:
+                        kept_original_filenames_for_log.append(actual_filename_saved)
+                    if status == FILE_DOWNLOAD_STATUS_FAILED_RETRYABLE_LATER and details_for_dialog_or_retry:
+                        retryable_failures_this_post.append(details_for_dialog_or_retry)
+                    elif status == FILE_DOWNLOAD_STATUS_FAILED_PERMANENTLY_THIS_SESSION and details_for_dialog_or_retry:
+                        permanent_failures_this_post.append(details_for_dialog_or_retry)
             self._emit_signal('file_progress', "", None)
 
-            if self.session_file_path and self.session_lock:
+            if self.session_file_path:
                 try:
-                    with self.session_lock:
-                        if os.path.exists(self.session_file_path):
-                            with open(self.session_file_path, 'r', encoding='utf-8') as f:
-                                session_data = json.load(f)
-                        
-                            if 'download_state' not in session_data:
-                                session_data['download_state'] = {}
-                            if not isinstance(session_data['download_state'].get('processed_post_ids'), list):
-                                session_data['download_state']['processed_post_ids'] = []
-                            
-                            session_data['download_state']['processed_post_ids'].append(self.post.get('id'))
-
-                            if 'manga_counters' not in session_data['download_state']:
-                                session_data['download_state']['manga_counters'] = {}
-                            
-                            if self.manga_date_file_counter_ref is not None:
-                                session_data['download_state']['manga_counters']['date_based'] = self.manga_date_file_counter_ref[0]
-                            
-                            if self.manga_global_file_counter_ref is not None:
-                                session_data['download_state']['manga_counters']['global_numbering'] = self.manga_global_file_counter_ref[0]
-                          
-                            if permanent_failures_this_post:
-                                if not isinstance(session_data['download_state'].get('permanently_failed_files'), list):
-                                    session_data['download_state']['permanently_failed_files'] = []
-                                existing_failed_urls = {f.get('file_info', {}).get('url') for f in session_data['download_state']['permanently_failed_files']}
-                                for failure in permanent_failures_this_post:
-                                    if failure.get('file_info', {}).get('url') not in existing_failed_urls:
-                                        session_data['download_state']['permanently_failed_files'].append(failure)
-                            temp_file_path = self.session_file_path + ".tmp"
-                            with open(temp_file_path, 'w', encoding='utf-8') as f_tmp:
-                                json.dump(session_data, f_tmp, indent=2)
-                            os.replace(temp_file_path, self.session_file_path)
+                    session_store = get_session_store(self.session_file_path)
+                    if session_store.exists():
+                        manga_counters = {}
+                        if self.manga_date_file_counter_ref is not None:
+                            manga_counters['date_based'] = self.manga_date_file_counter_ref[0]
+                        if self.manga_global_file_counter_ref is not None:
+                            manga_counters['global_numbering'] = self.manga_global_file_counter_ref[0]
+                        session_store.record_post(self.post.get('id'), manga_counters, permanent_failures_this_post)
                 except Exception as e:
                     self.logger(f"⚠️ Could not update session file for post {post_id}: {e}")
 
@@ -1911,7 +2082,7 @@ class PostProcessorWorker:
                         (self.char_filter_scope == CHAR_SCOPE_TITLE and not post_is_candidate_by_title_char_match) or
                         (self.char_filter_scope == CHAR_SCOPE_COMMENTS and not post_is_candidate_by_file_char_match_in_comment_scope and not post_is_candidate_by_comment_char_match)
                     )) or
-                    (self.skip_words_list and (self.skip_words_scope == SKIP_SCOPE_POSTS or self.skip_words_scope == SKIP_SCOPE_BOTH) and any(sw.lower() in post_title.lower() for sw in self.skip_words_list))
+                    (self.filter_plan.skip_posts and self.filter_plan.find_skip_word(post_title) is not None)
             )):
                 top_file_name_for_history = "N/A"
                 if post_main_file_info and post_main_file_info.get('name'):
@@ -2023,7 +2194,6 @@ class DownloadThread(QThread):
                  downloaded_hash_counts_lock=None,
                  cookie_text="",
                  session_file_path=None,
-                 session_lock=None,
                  text_only_scope=None,
                  text_export_format='txt',
                  single_pdf_mode=False,
@@ -2090,7 +2260,6 @@ class DownloadThread(QThread):
         self.downloaded_hash_counts_lock = downloaded_hash_counts_lock
         self.manga_global_file_counter_ref = manga_global_file_counter_ref
         self.session_file_path = session_file_path
-        self.session_lock = session_lock
         self.history_candidates_buffer = deque(maxlen=8)
         self.text_only_scope = text_only_scope
         self.text_export_format = text_export_format
@@ -2150,101 +2319,108 @@ class DownloadThread(QThread):
                 fetch_all_first=self.fetch_first 
             )
 
-            for posts_batch_data in post_generator:
+            posts_to_process = (post for posts_batch_data in post_generator for post in posts_batch_data)
+            post_enricher = PostEnricher.from_worker_args({
+                'api_url_input': self.api_url_input, 'service': self.service, 'user_id': self.user_id,
+                'filter_mode': self.filter_mode, 'text_only_scope': self.text_only_scope,
+                'show_external_links': self.show_external_links, 'extract_links_only': self.extract_links_only,
+                'scan_content_for_images': self.scan_content_for_images, 'char_filter_scope': self.char_filter_scope,
+                'filter_character_list': self.filter_character_list_objects_initial,
+                'dynamic_character_filter_holder': self.dynamic_filter_holder,
+                'use_cookie': self.use_cookie, 'cookie_text': self.cookie_text,
+                'selected_cookie_file': self.selected_cookie_file, 'app_base_dir': self.app_base_dir,
+                'cancellation_event': self.cancellation_event, 'pause_event': self.pause_event
+            }, self.logger)
+            if post_enricher:
+                # Post bodies/comments are fetched ahead while the current post downloads.
+                posts_to_process = post_enricher.enrich(posts_to_process)
+
+            for individual_post_data in posts_to_process:
                 if self.isInterruptionRequested():
                     was_process_cancelled = True
                     break
 
-                for individual_post_data in posts_batch_data:
-                    if self.isInterruptionRequested():
-                        was_process_cancelled = True
-                        break
-
-                    worker_args = {
-                        'post_data': individual_post_data,
-                        'emitter': worker_signals_obj,
-                        'download_root': self.output_dir,
-                        'known_names': self.known_names,
-                        'filter_character_list': self.filter_character_list_objects_initial,
-                        'dynamic_character_filter_holder': self.dynamic_filter_holder,
-                        'target_post_id_from_initial_url': self.initial_target_post_id,
-                        'num_file_threads': self.num_file_threads_for_worker,
-                        'processed_post_ids': list(self.processed_post_ids_set),
-                        'unwanted_keywords': self.unwanted_keywords,
-                        'filter_mode': self.filter_mode,
-                        'skip_zip': self.skip_zip,
-                        'use_subfolders': self.use_subfolders,
-                        'use_post_subfolders': self.use_post_subfolders,
-                        'custom_folder_name': self.custom_folder_name,
-                        'compress_images': self.compress_images,
-                        'download_thumbnails': self.download_thumbnails,
-                        'service': self.service,
-                        'user_id': self.user_id,
-                        'api_url_input': self.api_url_input,
-                        'pause_event': self.pause_event,
-                        'cancellation_event': self.cancellation_event,
-                        'downloaded_files': self.downloaded_files,
-                        'downloaded_file_hashes': self.downloaded_file_hashes,
-                        'downloaded_files_lock': self.downloaded_files_lock,
-                        'downloaded_file_hashes_lock': self.downloaded_file_hashes_lock,
-                        'skip_words_list': self.skip_words_list,
-                        'skip_words_scope': self.skip_words_scope,
-                        'show_external_links': self.show_external_links,
-                        'extract_links_only': self.extract_links_only,
-                        'skip_current_file_flag': self.skip_current_file_flag,
-                        'manga_mode_active': self.manga_mode_active,
-                        'manga_filename_style': self.manga_filename_style,
-                        'char_filter_scope': self.char_filter_scope,
-                        'remove_from_filename_words_list': self.remove_from_filename_words_list,
-                        'allow_multipart_download': self.allow_multipart_download,
-                        'cookie_text': self.cookie_text,
-                        'use_cookie': self.use_cookie,
-                        'override_output_dir': self.override_output_dir,
-                        'selected_cookie_file': self.selected_cookie_file,
-                        'app_base_dir': self.app_base_dir,
-                        'manga_date_prefix': self.manga_date_prefix,
-                        'manga_date_file_counter_ref': self.manga_date_file_counter_ref,
-                        'scan_content_for_images': self.scan_content_for_images,
-                        'creator_download_folder_ignore_words': self.creator_download_folder_ignore_words,
-                        'manga_global_file_counter_ref': self.manga_global_file_counter_ref,
-                        'use_date_prefix_for_subfolder': self.use_date_prefix_for_subfolder,
-                        'keep_in_post_duplicates': self.keep_in_post_duplicates,
-                        'keep_duplicates_mode': self.keep_duplicates_mode,
-                        'keep_duplicates_limit': self.keep_duplicates_limit,
-                        'downloaded_hash_counts': self.downloaded_hash_counts,
-                        'downloaded_hash_counts_lock': self.downloaded_hash_counts_lock,
-                        'session_file_path': self.session_file_path,
-                        'session_lock': self.session_lock,
-                        'text_only_scope': self.text_only_scope,
-                        'text_export_format': self.text_export_format,
-                        'single_pdf_mode': self.single_pdf_mode,
-                        'multipart_parts_count': self.multipart_parts_count, 
-                        'multipart_min_size_mb': self.multipart_min_size_mb, 
-                        'skip_file_size_mb': self.skip_file_size_mb, 
-                        'project_root_dir': self.project_root_dir,
-                    }
+                worker_args = {
+                    'post_data': individual_post_data,
+                    'emitter': worker_signals_obj,
+                    'download_root': self.output_dir,
+                    'known_names': self.known_names,
+                    'filter_character_list': self.filter_character_list_objects_initial,
+                    'dynamic_character_filter_holder': self.dynamic_filter_holder,
+                    'target_post_id_from_initial_url': self.initial_target_post_id,
+                    'num_file_threads': self.num_file_threads_for_worker,
+                    'processed_post_ids': list(self.processed_post_ids_set),
+                    'unwanted_keywords': self.unwanted_keywords,
+                    'filter_mode': self.filter_mode,
+                    'skip_zip': self.skip_zip,
+                    'use_subfolders': self.use_subfolders,
+                    'use_post_subfolders': self.use_post_subfolders,
+                    'custom_folder_name': self.custom_folder_name,
+                    'compress_images': self.compress_images,
+                    'download_thumbnails': self.download_thumbnails,
+                    'service': self.service,
+                    'user_id': self.user_id,
+                    'api_url_input': self.api_url_input,
+                    'pause_event': self.pause_event,
+                    'cancellation_event': self.cancellation_event,
+                    'downloaded_files': self.downloaded_files,
+                    'downloaded_file_hashes': self.downloaded_file_hashes,
+                    'downloaded_files_lock': self.downloaded_files_lock,
+                    'downloaded_file_hashes_lock': self.downloaded_file_hashes_lock,
+                    'skip_words_list': self.skip_words_list,
+                    'skip_words_scope': self.skip_words_scope,
+                    'show_external_links': self.show_external_links,
+                    'extract_links_only': self.extract_links_only,
+                    'skip_current_file_flag': self.skip_current_file_flag,
+                    'manga_mode_active': self.manga_mode_active,
+                    'manga_filename_style': self.manga_filename_style,
+                    'char_filter_scope': self.char_filter_scope,
+                    'remove_from_filename_words_list': self.remove_from_filename_words_list,
+                    'allow_multipart_download': self.allow_multipart_download,
+                    'cookie_text': self.cookie_text,
+                    'use_cookie': self.use_cookie,
+                    'override_output_dir': self.override_output_dir,
+                    'selected_cookie_file': self.selected_cookie_file,
+                    'app_base_dir': self.app_base_dir,
+                    'manga_date_prefix': self.manga_date_prefix,
+                    'manga_date_file_counter_ref': self.manga_date_file_counter_ref,
+                    'scan_content_for_images': self.scan_content_for_images,
+                    'creator_download_folder_ignore_words': self.creator_download_folder_ignore_words,
+                    'manga_global_file_counter_ref': self.manga_global_file_counter_ref,
+                    'use_date_prefix_for_subfolder': self.use_date_prefix_for_subfolder,
+                    'keep_in_post_duplicates': self.keep_in_post_duplicates,
+                    'keep_duplicates_mode': self.keep_duplicates_mode,
+                    'keep_duplicates_limit': self.keep_duplicates_limit,
+                    'downloaded_hash_counts': self.downloaded_hash_counts,
+                    'downloaded_hash_counts_lock': self.downloaded_hash_counts_lock,
+                    'session_file_path': self.session_file_path,
+                    'text_only_scope': self.text_only_scope,
+                    'text_export_format': self.text_export_format,
+                    'single_pdf_mode': self.single_pdf_mode,
+                    'multipart_parts_count': self.multipart_parts_count, 
+                    'multipart_min_size_mb': self.multipart_min_size_mb, 
+                    'skip_file_size_mb': self.skip_file_size_mb, 
+                    'project_root_dir': self.project_root_dir,
+                }
 
-                    post_processing_worker = PostProcessorWorker(**worker_args)
-
-                    (dl_count, skip_count, kept_originals_this_post,
-                     retryable_failures, permanent_failures,
-                     history_data, temp_filepath) = post_processing_worker.process()
-
-                    grand_total_downloaded_files += dl_count
-                    grand_total_skipped_files += skip_count
-                    if kept_originals_this_post:
-                        grand_list_of_kept_original_filenames.extend(kept_originals_this_post)
-                    if retryable_failures:
-                        self.retryable_file_failed_signal.emit(retryable_failures)
-                    if history_data:
-                        self.post_processed_for_history_signal.emit(history_data)
-                    if permanent_failures:
-                        self.permanent_file_failed_signal.emit(permanent_failures)
-                    if self.single_pdf_mode and temp_filepath:
-                        self.progress_signal.emit(f"TEMP_FILE_PATH:{temp_filepath}")
-
-                if was_process_cancelled:
-                    break
+                post_processing_worker = PostProcessorWorker(**worker_args)
+
+                (dl_count, skip_count, kept_originals_this_post,
+                 retryable_failures, permanent_failures,
+                 history_data, temp_filepath) = post_processing_worker.process()
+
+                grand_total_downloaded_files += dl_count
+                grand_total_skipped_files += skip_count
+                if kept_originals_this_post:
+                    grand_list_of_kept_original_filenames.extend(kept_originals_this_post)
+                if retryable_failures:
+                    self.retryable_file_failed_signal.emit(retryable_failures)
+                if history_data:
+                    self.post_processed_for_history_signal.emit(history_data)
+                if permanent_failures:
+                    self.permanent_file_failed_signal.emit(permanent_failures)
+                if self.single_pdf_mode and temp_filepath:
+                    self.progress_signal.emit(f"TEMP_FILE_PATH:{temp_filepath}")
             
             if not was_process_cancelled and not self.isInterruptionRequested():
                 self.logger("✅ All posts processed or end of content reached by DownloadThread.")
@@ -1,5 +1,4 @@
 # --- Standard Library Imports ---
-# --- Standard Library Imports ---
 import os
 import time
 import hashlib
@@ -7,40 +6,380 @@ import http.client
 import traceback
 import threading
 import queue
+import struct
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # --- Third-Party Library Imports ---
 import requests
+
+# --- Local Application Imports ---
+from ..utils.session_pool import get_session
+from ..utils.rate_limiter import get_retry_delay
+
 MULTIPART_DOWNLOADER_AVAILABLE = True
 
 # --- Module Constants ---
-CHUNK_DOWNLOAD_RETRY_DELAY = 2
-MAX_CHUNK_DOWNLOAD_RETRIES = 1
+MAX_CHUNK_DOWNLOAD_RETRIES = 3
+MAX_SEGMENT_REQUEUES = 3  # Times a failed segment is handed to a fresh thread, resuming at its offset
+MIN_STEAL_BLOCKS = 4  # A running segment is only split if at least this many blocks remain
 DOWNLOAD_CHUNK_SIZE_ITER = 1024 * 256  # 256 KB per iteration chunk
+BITMAP_BLOCK_SIZE = 1024 * 1024  # Resume granularity of the sidecar bitmap (1 MB)
+BITMAP_SAVE_INTERVAL_SECONDS = 2.0
+HASH_PIPELINE_BUFFER_BYTES = 64 * 1024 * 1024  # Out-of-order data held in memory for hashing
+_BITMAP_MAGIC = b"KDMP2"
+_BITMAP_HEADER = struct.Struct(">5sQIH")  # Magic, total size, block size, validator length
 
 
-def _download_individual_chunk(
-    chunk_url, chunk_temp_file_path, start_byte, end_byte, headers,
-    part_num, total_parts, progress_data, cancellation_event,
-    skip_event, pause_event, global_emit_time_ref, cookies_for_chunk,
-    logger_func, emitter=None, api_original_filename=None
+class _BlockBitmap:
+    """
+    Sidecar file that records which fixed-size blocks of a preallocated
+    target file have been written.
+
+    The target is created once at its final size and every chunk thread
+    writes at its own offset, so the bitmap is the only resume state needed:
+    blocks whose bit is set are never requested again. The header stores the
+    server's validator (strong ETag or Last-Modified) for the file; without
+    one, nothing proves a later download is the same file, so no bitmap is
+    written and none is resumed.
+    """
+
+    def __init__(self, sidecar_path, total_size, block_size=BITMAP_BLOCK_SIZE, validator=None):
+        self.sidecar_path = sidecar_path
+        self.total_size = total_size
+        self.block_size = block_size
+        self.validator = validator
+        self.num_blocks = max(1, -(-total_size // block_size))
+        self.bits = bytearray((self.num_blocks + 7) // 8)
+        self.lock = threading.Lock()
+        self.last_save_time = 0.0
+
+    def _validator_bytes(self):
+        return self.validator.encode('utf-8')
+
+    def load(self):
+        """Loads a previous bitmap. Returns True if it matches this file's size, block size and validator."""
+        if self.validator is None:
+            return False
+        try:
+            with open(self.sidecar_path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return False
+        if len(data) < _BITMAP_HEADER.size:
+            return False
+        magic, total_size, block_size, validator_length = _BITMAP_HEADER.unpack_from(data)
+        if magic != _BITMAP_MAGIC or total_size != self.total_size or block_size != self.block_size:
+            return False
+        bits_offset = _BITMAP_HEADER.size + validator_length
+        if data[_BITMAP_HEADER.size:bits_offset] != self._validator_bytes() or len(data) != bits_offset + len(self.bits):
+            return False
+        self.bits = bytearray(data[bits_offset:])
+        return True
+
+    def _block_length(self, block):
+        return min(self.block_size, self.total_size - block * self.block_size)
+
+    def is_done(self, block):
+        return bool(self.bits[block >> 3] & (1 << (block & 7)))
+
+    def mark_done(self, first_block, last_block):
+        """Marks blocks first_block..last_block (inclusive) as written."""
+        with self.lock:
+            for block in range(first_block, last_block + 1):
+                self.bits[block >> 3] |= 1 << (block & 7)
+
+    def completed_bytes(self):
+        with self.lock:
+            return sum(self._block_length(block) for block in range(self.num_blocks) if self.is_done(block))
+
+    def all_done(self):
+        with self.lock:
+            return all(self.is_done(block) for block in range(self.num_blocks))
+
+    def missing_ranges(self):
+        """Returns the (start_byte, end_byte) ranges of consecutive unwritten blocks."""
+        ranges = []
+        with self.lock:
+            run_start = None
+            for block in range(self.num_blocks):
+                if not self.is_done(block):
+                    if run_start is None:
+                        run_start = block
+                elif run_start is not None:
+                    ranges.append((run_start * self.block_size, block * self.block_size - 1))
+                    run_start = None
+            if run_start is not None:
+                ranges.append((run_start * self.block_size, self.total_size - 1))
+        return ranges
+
+    def save(self, force=False):
+        """Writes the bitmap atomically, at most every BITMAP_SAVE_INTERVAL_SECONDS unless forced."""
+        if self.validator is None:
+            return
+        validator_bytes = self._validator_bytes()
+        with self.lock:
+            now = time.time()
+            if not force and now - self.last_save_time < BITMAP_SAVE_INTERVAL_SECONDS:
+                return
+            self.last_save_time = now
+            data = (_BITMAP_HEADER.pack(_BITMAP_MAGIC, self.total_size, self.block_size, len(validator_bytes))
+                    + validator_bytes + bytes(self.bits))
+        temp_path = self.sidecar_path + ".tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, self.sidecar_path)
+        except OSError:
+            pass
+
+    def remove(self):
+        for path in (self.sidecar_path, self.sidecar_path + ".tmp"):
+            if os.path.exists(path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+def _split_range(start, end, num_parts, block_size):
+    """Splits a byte range into up to num_parts block-aligned sub-ranges."""
+    total_blocks = -(-(end - start + 1) // block_size)
+    num_parts = max(1, min(num_parts, total_blocks))
+    blocks_per_part, extra_blocks = divmod(total_blocks, num_parts)
+    sub_ranges = []
+    current = start
+    for i in range(num_parts):
+        part_blocks = blocks_per_part + (1 if i < extra_blocks else 0)
+        part_end = min(end, current + part_blocks * block_size - 1)
+        sub_ranges.append((current, part_end))
+        current = part_end + 1
+    return sub_ranges
+
+
+def _plan_chunk_ranges(missing_ranges, num_parts, block_size):
+    """
+    Distributes the missing byte ranges over num_parts chunk downloads,
+    giving each missing range a share proportional to its size.
+    """
+    total_missing = sum(end - start + 1 for start, end in missing_ranges)
+    planned = []
+    for start, end in missing_ranges:
+        share = max(1, round(num_parts * (end - start + 1) / total_missing)) if total_missing else 1
+        planned.extend(_split_range(start, end, share, block_size))
+    return planned
+
+
+class _OrderedHasher:
+    """
+    Computes the MD5 of a file whose byte ranges are downloaded out of order.
+
+    Chunk threads hand every segment they write to `feed`. Data at the hash
+    frontier is hashed immediately; segments ahead of it are held in memory
+    up to HASH_PIPELINE_BUFFER_BYTES. Only data that did not fit in that
+    budget, or that was already on disk from an earlier attempt, is read
+    back, and only once the frontier reaches it and its blocks are complete.
+    The digest is therefore ready as soon as the last range finishes,
+    without a separate pass over the file.
+    """
+
+    def __init__(self, target_file_path, bitmap):
+        self.target_file_path = target_file_path
+        self.bitmap = bitmap
+        self.md5_hasher = hashlib.md5()
+        self.frontier = 0
+        self.pending = {}
+        self.pending_bytes = 0
+        self.lock = threading.Lock()
+
+    def feed(self, offset, data):
+        """Hands a segment that has just been written at `offset` to the hasher."""
+        with self.lock:
+            if offset <= self.frontier < offset + len(data):
+                self.md5_hasher.update(data[self.frontier - offset:])
+                self.frontier = offset + len(data)
+            elif offset > self.frontier:
+                self._hold(offset, data)
+            self._advance()
+
+    def _hold(self, offset, data):
+        """Buffers a segment ahead of the frontier; a segment re-fed at the same offset replaces the held one."""
+        held = self.pending.get(offset)
+        held_length = len(held) if held is not None else 0
+        if held_length >= len(data):
+            return
+        if self.pending_bytes - held_length + len(data) > HASH_PIPELINE_BUFFER_BYTES:
+            return
+        self.pending[offset] = data
+        self.pending_bytes += len(data) - held_length
+
+    def _advance(self):
+        total_size = self.bitmap.total_size
+        block_size = self.bitmap.block_size
+        while self.frontier < total_size:
+            self._drop_hashed_segments()
+            segment = self.pending.pop(self.frontier, None)
+            if segment is not None:
+                self.pending_bytes -= len(segment)
+                self.md5_hasher.update(segment)
+                self.frontier += len(segment)
+                continue
+            block = self.frontier // block_size
+            if not self.bitmap.is_done(block):
+                return
+            # The frontier's block is complete on disk but was not buffered: read it back.
+            read_end = min(total_size, (block + 1) * block_size)
+            with open(self.target_file_path, 'rb') as f:
+                f.seek(self.frontier)
+                self.md5_hasher.update(f.read(read_end - self.frontier))
+            self.frontier = read_end
+
+    def _drop_hashed_segments(self):
+        if not self.pending:
+            return
+        for offset in [o for o in self.pending if o < self.frontier]:
+            segment = self.pending.pop(offset)
+            self.pending_bytes -= len(segment)
+            if offset + len(segment) > self.frontier:
+                self._hold(self.frontier, segment[self.frontier - offset:])
+
+    def hexdigest(self):
+        """Hashes whatever is still outstanding and returns the file's MD5."""
+        with self.lock:
+            self._advance()
+            if self.frontier != self.bitmap.total_size:
+                raise IOError(f"Hash pipeline stopped at byte {self.frontier} of {self.bitmap.total_size}.")
+            return self.md5_hasher.hexdigest()
+
+
+class _Segment:
+    """A byte range of the target file that one chunk thread downloads at a time."""
+
+    def __init__(self, segment_id, start, end):
+        self.id = segment_id
+        self.start = start
+        self.end = end
+        # First byte not yet committed to the bitmap; retries restart here.
+        self.position = start
+        self.active = False
+        self.failures = 0
+
+    def remaining(self):
+        return self.end + 1 - self.position
+
+
+class _SegmentScheduler:
+    """
+    Hands out segments to chunk threads and rebalances them while they run.
+
+    A thread that finds no idle segment steals work: the active segment with
+    the most bytes left is split at a block boundary and the thread takes
+    its upper half, so one slow connection cannot hold up the whole file.
+    A segment whose thread gave up goes back to the pool and is restarted
+    from its committed offset by the next free thread.
+    """
+
+    def __init__(self, ranges, block_size, progress_data):
+        self.block_size = block_size
+        self.progress_data = progress_data
+        self.lock = threading.Lock()
+        self.segments = []
+        self.failed = False
+        # Set when the server no longer honours ranges for this file, so the data on disk can't be trusted.
+        self.stale = False
+        for start, end in ranges:
+            self._add_segment(start, end)
+
+    def _add_segment(self, start, end):
+        segment = _Segment(len(self.segments), start, end)
+        self.segments.append(segment)
+        with self.progress_data['lock']:
+            self.progress_data['chunks_status'].append({
+                'id': segment.id, 'downloaded': 0, 'total': end - start + 1,
+                'active': False, 'speed_bps': 0.0
+            })
+        return segment
+
+    def next_segment(self):
+        """
+        Returns the next segment for a free thread, splitting a running one if
+        needed, or None when nothing is left to do.
+        """
+        with self.lock:
+            if self.failed:
+                return None
+            idle = [seg for seg in self.segments if not seg.active and seg.remaining() > 0]
+            if idle:
+                segment = min(idle, key=lambda seg: seg.position)
+                segment.active = True
+                return segment
+            active = [seg for seg in self.segments if seg.active]
+            if not active:
+                return None
+            victim = max(active, key=lambda seg: seg.remaining())
+            # The victim's writer may be up to one block plus one read ahead of its
+            # committed position, so the split point keeps two blocks of distance.
+            if victim.remaining() < MIN_STEAL_BLOCKS * self.block_size:
+                return None
+            midpoint = victim.position + victim.remaining() // 2
+            split_at = -(-midpoint // self.block_size) * self.block_size
+            if split_at < victim.position + 2 * self.block_size or split_at > victim.end:
+                return None
+            new_segment = self._add_segment(split_at, victim.end)
+            victim.end = split_at - 1
+            with self.progress_data['lock']:
+                self.progress_data['chunks_status'][victim.id]['total'] = victim.end - victim.start + 1
+            new_segment.active = True
+            return new_segment
+
+    def get_end(self, segment):
+        with self.lock:
+            return segment.end
+
+    def commit(self, segment, position):
+        with self.lock:
+            segment.position = position
+
+    def mark_stale(self):
+        """Stops all segments because the file on the server is not the one the data on disk came from."""
+        with self.lock:
+            self.failed = True
+            self.stale = True
+
+    def release(self, segment, success, retryable=True):
+        """Returns a segment to the pool after its thread has stopped working on it."""
+        with self.lock:
+            segment.active = False
+            if success or segment.remaining() <= 0:
+                return
+            segment.failures += 1
+            if not retryable or segment.failures > MAX_SEGMENT_REQUEUES:
+                self.failed = True
+
+
+def _download_segment(
+    chunk_url, target_file_path, bitmap, ordered_hasher, scheduler, segment, headers,
+    progress_data, cancellation_event, skip_event, pause_event, global_emit_time_ref,
+    cookies_for_chunk, logger_func, emitter=None, api_original_filename=None
 ):
     """
-    Downloads a single segment (chunk) of a larger file to its own unique part file.
-    This function is intended to be run in a separate thread by a ThreadPoolExecutor.
+    Downloads one segment of a larger file directly into the preallocated
+    target file.
 
-    It handles retries, pauses, and cancellations for its specific chunk. If a
-    download fails, the partial chunk file is removed, allowing a clean retry later.
+    The thread uses its own file handle positioned at the segment's offset,
+    so no assembly pass is needed afterwards. Every block that has been fully
+    written is marked in the sidecar bitmap and committed to the segment; a
+    retry restarts from the committed offset instead of from the start. The
+    segment's end is re-read while streaming, because an idle thread may
+    split off its upper half at any time.
 
     Args:
         chunk_url (str): The URL to download the file from.
-        chunk_temp_file_path (str): The unique path to save this specific chunk
-                                    (e.g., 'my_video.mp4.part0').
-        start_byte (int): The starting byte for the Range header.
-        end_byte (int): The ending byte for the Range header.
+        target_file_path (str): The preallocated file all segments write into.
+        bitmap (_BlockBitmap): The sidecar bitmap tracking written blocks.
+        ordered_hasher (_OrderedHasher): Receives every written segment for hashing.
+        scheduler (_SegmentScheduler): The scheduler that owns the segment.
+        segment (_Segment): The segment to download.
         headers (dict): The HTTP headers to use for the request.
-        part_num (int): The index of this chunk (e.g., 0 for the first part).
-        total_parts (int): The total number of chunks for the entire file.
         progress_data (dict): A thread-safe dictionary for sharing progress.
         cancellation_event (threading.Event): Event to signal cancellation.
         skip_event (threading.Event): Event to signal skipping the file.
@@ -53,137 +392,194 @@ def _download_individual_chunk(
         api_original_filename (str): The original filename for UI display.
 
     Returns:
-        tuple: A tuple containing (bytes_downloaded, success_flag).
+        tuple: A tuple containing (success_flag, retryable_flag).
     """
+    label = f"[Segment {segment.id + 1}]"
     # --- Pre-download checks for control events ---
     if cancellation_event and cancellation_event.is_set():
-        logger_func(f"   [Chunk {part_num + 1}/{total_parts}] Download cancelled before start.")
-        return 0, False
+        return False, False
     if skip_event and skip_event.is_set():
-        logger_func(f"   [Chunk {part_num + 1}/{total_parts}] Skip event triggered before start.")
-        return 0, False
+        logger_func(f"   {label} Skip event triggered before start.")
+        return False, False
     if pause_event and pause_event.is_set():
-        logger_func(f"   [Chunk {part_num + 1}/{total_parts}] Download paused before start...")
+        logger_func(f"   {label} Download paused before start...")
         while pause_event.is_set():
             if cancellation_event and cancellation_event.is_set():
-                logger_func(f"   [Chunk {part_num + 1}/{total_parts}] Download cancelled while paused.")
-                return 0, False
+                logger_func(f"   {label} Download cancelled while paused.")
+                return False, False
             time.sleep(0.2)
-        logger_func(f"   [Chunk {part_num + 1}/{total_parts}] Download resumed.")
+        logger_func(f"   {label} Download resumed.")
 
-    # Set this chunk's status to 'active' before starting the download.
+    status = progress_data['chunks_status'][segment.id]
     with progress_data['lock']:
-        progress_data['chunks_status'][part_num]['active'] = True
+        status['active'] = True
 
-    try:
-        # Prepare headers for the specific byte range of this chunk
-        chunk_headers = headers.copy()
-        if end_byte != -1:
-            chunk_headers['Range'] = f"bytes={start_byte}-{end_byte}"
-
-        bytes_this_chunk = 0
-        last_speed_calc_time = time.time()
-        bytes_at_last_speed_calc = 0
+    block_size = bitmap.block_size
+    committed_position = segment.position
 
+    try:
         # --- Retry Loop ---
         for attempt in range(MAX_CHUNK_DOWNLOAD_RETRIES + 1):
             if cancellation_event and cancellation_event.is_set():
-                return bytes_this_chunk, False
+                return False, False
 
             try:
                 if attempt > 0:
-                    logger_func(f"   [Chunk {part_num + 1}/{total_parts}] Retrying (Attempt {attempt + 1}/{MAX_CHUNK_DOWNLOAD_RETRIES + 1})...")
-                    time.sleep(CHUNK_DOWNLOAD_RETRY_DELAY * (2 ** (attempt - 1)))
-                    last_speed_calc_time = time.time()
-                    bytes_at_last_speed_calc = bytes_this_chunk
-
-                logger_func(f"   🚀 [Chunk {part_num + 1}/{total_parts}] Starting download: bytes {start_byte}-{end_byte if end_byte != -1 else 'EOF'}")
-
-                response = requests.get(chunk_url, headers=chunk_headers, timeout=(10, 120), stream=True, cookies=cookies_for_chunk)
+                    logger_func(f"   {label} Retrying from byte {committed_position} (Attempt {attempt + 1}/{MAX_CHUNK_DOWNLOAD_RETRIES + 1})...")
+                    time.sleep(get_retry_delay(chunk_url, attempt))
+
+                end_byte = scheduler.get_end(segment)
+                if committed_position > end_byte:
+                    return True, True
+                chunk_headers = headers.copy()
+                chunk_headers['Range'] = f"bytes={committed_position}-{end_byte}"
+                if bitmap.validator:
+                    # If the file changed since the first chunk, the server answers 200 with the new file.
+                    chunk_headers['If-Range'] = bitmap.validator
+                logger_func(f"   🚀 {label} Starting download: bytes {committed_position}-{end_byte}")
+
+                response = get_session(chunk_url, rate_limited=False).get(chunk_url, headers=chunk_headers, timeout=(10, 120), stream=True, cookies=cookies_for_chunk, cancellation_event=cancellation_event)
                 response.raise_for_status()
+                if response.status_code != 206:
+                    logger_func(f"   ❌ {label} Server answered the range request with HTTP {response.status_code}; the file changed or ranges are not supported.")
+                    response.close()
+                    scheduler.mark_stale()
+                    return False, False
+
+                last_speed_calc_time = time.time()
+                bytes_at_last_speed_calc = committed_position
 
                 # --- Data Writing Loop ---
-                # We open the unique chunk file in write-binary ('wb') mode.
-                # No more seeking is required.
-                with open(chunk_temp_file_path, 'wb') as f:
+                # Each thread has its own handle on the shared target, seeked to its offset.
+                with response, open(target_file_path, 'r+b') as f:
+                    f.seek(committed_position)
+                    position = committed_position
                     for data_segment in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE_ITER):
                         if cancellation_event and cancellation_event.is_set():
-                            return bytes_this_chunk, False
+                            return False, False
+                        if skip_event and skip_event.is_set():
+                            return False, False
                         if pause_event and pause_event.is_set():
                             # Handle pausing during the download stream
-                            logger_func(f"   [Chunk {part_num + 1}/{total_parts}] Paused...")
+                            logger_func(f"   {label} Paused...")
                             while pause_event.is_set():
-                                if cancellation_event and cancellation_event.is_set(): return bytes_this_chunk, False
+                                if cancellation_event and cancellation_event.is_set(): return False, False
                                 time.sleep(0.2)
-                            logger_func(f"   [Chunk {part_num + 1}/{total_parts}] Resumed.")
+                            logger_func(f"   {label} Resumed.")
 
+                        if not data_segment:
+                            continue
+                        # The end may have moved down if another thread stole part of this segment.
+                        end_byte = scheduler.get_end(segment)
+                        data_segment = data_segment[:max(0, end_byte + 1 - position)]
                         if data_segment:
                             f.write(data_segment)
-                            bytes_this_chunk += len(data_segment)
-
-                            # Update shared progress data structure
-                            with progress_data['lock']:
-                                progress_data['total_downloaded_so_far'] += len(data_segment)
-                                progress_data['chunks_status'][part_num]['downloaded'] = bytes_this_chunk
-
-                                # Calculate and update speed for this chunk
-                                current_time = time.time()
-                                time_delta = current_time - last_speed_calc_time
-                                if time_delta > 0.5:
-                                    bytes_delta = bytes_this_chunk - bytes_at_last_speed_calc
-                                    current_speed_bps = (bytes_delta * 8) / time_delta if time_delta > 0 else 0
-                                    progress_data['chunks_status'][part_num]['speed_bps'] = current_speed_bps
-                                    last_speed_calc_time = current_time
-                                    bytes_at_last_speed_calc = bytes_this_chunk
-
-                                # Emit progress signal to the UI via the queue
-                                if emitter and (current_time - global_emit_time_ref[0] > 0.25):
-                                    global_emit_time_ref[0] = current_time
-                                    status_list_copy = [dict(s) for s in progress_data['chunks_status']]
-                                    if isinstance(emitter, queue.Queue):
-                                        emitter.put({'type': 'file_progress', 'payload': (api_original_filename, status_list_copy)})
-                                    elif hasattr(emitter, 'file_progress_signal'):
-                                        emitter.file_progress_signal.emit(api_original_filename, status_list_copy)
-
-                # If we get here, the download for this chunk is successful
-                return bytes_this_chunk, True
-
-            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout, http.client.IncompleteRead) as e:
-                logger_func(f"   ❌ [Chunk {part_num + 1}/{total_parts}] Retryable error: {e}")
+                            segment_offset = position
+                            position += len(data_segment)
+
+                            # Mark every block that is now fully written.
+                            completed_end = end_byte + 1 if position > end_byte else (position // block_size) * block_size
+                            if completed_end > committed_position:
+                                f.flush()
+                                bitmap.mark_done(committed_position // block_size, (completed_end - 1) // block_size)
+                                committed_position = completed_end
+                                scheduler.commit(segment, committed_position)
+                                bitmap.save()
+                            ordered_hasher.feed(segment_offset, data_segment)
+
+                        # Update shared progress data structure
+                        with progress_data['lock']:
+                            status['downloaded'] = position - segment.start
+
+                            # Calculate and update speed for this segment
+                            current_time = time.time()
+                            time_delta = current_time - last_speed_calc_time
+                            if time_delta > 0.5:
+                                status['speed_bps'] = ((position - bytes_at_last_speed_calc) * 8) / time_delta
+                                last_speed_calc_time = current_time
+                                bytes_at_last_speed_calc = position
+
+                            # Emit progress signal to the UI via the queue
+                            if emitter and (current_time - global_emit_time_ref[0] > 0.25):
+                                global_emit_time_ref[0] = current_time
+                                status_list_copy = [dict(s) for s in progress_data['chunks_status']]
+                                if isinstance(emitter, queue.Queue):
+                                    emitter.put({'type': 'file_progress', 'payload': (api_original_filename, status_list_copy)})
+                                elif hasattr(emitter, 'file_progress_signal'):
+                                    emitter.file_progress_signal.emit(api_original_filename, status_list_copy)
+
+                        if position > end_byte:
+                            break
+
+                if committed_position > scheduler.get_end(segment):
+                    return True, True
+                logger_func(f"   ⚠️ {label} Stream ended early at byte {committed_position}.")
+
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                    requests.exceptions.ChunkedEncodingError, http.client.IncompleteRead) as e:
+                logger_func(f"   ❌ {label} Retryable error: {e}")
             except requests.exceptions.RequestException as e:
-                logger_func(f"   ❌ [Chunk {part_num + 1}/{total_parts}] Non-retryable error: {e}")
-                return bytes_this_chunk, False # Break loop on non-retryable errors
+                logger_func(f"   ❌ {label} Non-retryable error: {e}")
+                return False, False
             except Exception as e:
-                logger_func(f"   ❌ [Chunk {part_num + 1}/{total_parts}] Unexpected error: {e}\n{traceback.format_exc(limit=1)}")
-                return bytes_this_chunk, False
+                logger_func(f"   ❌ {label} Unexpected error: {e}\n{traceback.format_exc(limit=1)}")
+                return False, False
 
-        # If the retry loop finishes without a successful download
-        return bytes_this_chunk, False
+        # The retry budget is used up; the scheduler may hand the rest to another thread.
+        return False, True
     finally:
         # This block runs whether the download succeeded or failed
         with progress_data['lock']:
-            progress_data['chunks_status'][part_num]['active'] = False
-            progress_data['chunks_status'][part_num]['speed_bps'] = 0.0
+            status['active'] = False
+            status['speed_bps'] = 0.0
+
+
+def _segment_worker(scheduler, cancellation_event, skip_event, **segment_kwargs):
+    """Chunk thread body: keeps downloading segments until the scheduler has none left."""
+    while not (cancellation_event and cancellation_event.is_set()) and not (skip_event and skip_event.is_set()):
+        segment = scheduler.next_segment()
+        if segment is None:
+            return
+        success, retryable = _download_segment(
+            scheduler=scheduler, segment=segment, cancellation_event=cancellation_event,
+            skip_event=skip_event, **segment_kwargs
+        )
+        scheduler.release(segment, success, retryable)
 
 
 def download_file_in_parts(file_url, save_path, total_size, num_parts, headers, api_original_filename,
                            emitter_for_multipart, cookies_for_chunk_session,
-                           cancellation_event, skip_event, logger_func, pause_event):
+                           cancellation_event, skip_event, logger_func, pause_event, resume_validator=None):
     """
-    Manages a resilient, multipart file download by saving each chunk to a separate file.
+    Manages a resilient, segmented file download into a single preallocated file.
 
     This function orchestrates the download process by:
-    1. Checking for already completed chunk files to resume a previous download.
-    2. Submitting only the missing chunks to a thread pool for parallel download.
-    3. Assembling the final file from the individual chunks upon successful completion.
-    4. Cleaning up temporary chunk files after assembly.
-    5. Leaving completed chunks on disk if the download fails, allowing for a future resume.
+    1. Creating the target file once at its final size, or reopening it
+       when a sidecar bitmap from a previous attempt matches, including the
+       server's validator (`resume_validator`). `save_path` should be a
+       '.part' name; the caller renames it once complete.
+    2. Splitting the blocks that are still missing into up to `num_parts`
+       block-aligned segments, downloaded by `num_parts` threads that each
+       write at their own offset. A thread that runs out of work splits the
+       largest remaining segment, and failed segments restart from their
+       committed offset.
+    3. Recording finished blocks in a small sidecar bitmap ('<save_path>.bitmap'),
+       so a cancelled download, or one that failed and is retried later
+       with the same method, can resume without an assembly pass or an
+       extra copy of the data. Every chunk request sends the validator as
+       If-Range. A download without a validator, a skipped one, one the
+       server answers with 200 instead of 206 (the file changed), or one
+       whose finished data fails to hash is deleted along with its bitmap;
+       callers that fall back to another method delete it with
+       `discard_multipart_download`.
+    4. Hashing the data as it streams in through an ordered hash pipeline,
+       so the MD5 is available without re-reading the finished file.
 
     Args:
         file_url (str): The URL of the file to download.
-        save_path (str): The final desired path for the downloaded file (e.g., 'my_video.mp4').
+        save_path (str): The part file the download is assembled in (e.g., 'my_video.mp4.multipart.part').
         total_size (int): The total size of the file in bytes.
-        num_parts (int): The number of parts to split the download into.
+        num_parts (int): The number of parallel connections to use.
         headers (dict): HTTP headers for the download requests.
         api_original_filename (str): The original filename for UI progress display.
         emitter_for_multipart (queue.Queue or QObject): Emitter for UI signals.
@@ -192,134 +588,120 @@ def download_file_in_parts(file_url, save_path, total_size, num_parts, headers,
         skip_event (threading.Event): Event to signal skipping the file.
         logger_func (function): A function for logging messages.
         pause_event (threading.Event): Event to signal pausing the download.
+        resume_validator (str, optional): The file's strong ETag or Last-Modified
+                                          (see `get_resume_validator`). Without it
+                                          the download cannot be resumed later.
 
     Returns:
         tuple: A tuple containing (success_flag, total_bytes_downloaded, md5_hash, file_handle).
-               The file_handle will be for the final assembled file if successful, otherwise None.
+               The file_handle will be for the completed file if successful, otherwise None.
     """
     logger_func(f"⬇️ Initializing Resumable Multi-part Download ({num_parts} parts) for: '{api_original_filename}' (Size: {total_size / (1024*1024):.2f} MB)")
 
-    # Calculate the byte range for each chunk
-    chunk_size_calc = total_size // num_parts
-    chunks_ranges = []
-    for i in range(num_parts):
-        start = i * chunk_size_calc
-        end = start + chunk_size_calc - 1 if i < num_parts - 1 else total_size - 1
-        if start <= end:
-            chunks_ranges.append((start, end))
-        elif total_size == 0 and i == 0: # Handle zero-byte files
-            chunks_ranges.append((0, -1))
-
-    # Calculate the expected size of each chunk
-    chunk_actual_sizes = []
-    for start, end in chunks_ranges:
-        chunk_actual_sizes.append(end - start + 1 if end != -1 else 0)
-
-    if not chunks_ranges and total_size > 0:
-        logger_func(f"   ⚠️ No valid chunk ranges for multipart download of '{api_original_filename}'. Aborting.")
+    if total_size <= 0:
+        logger_func(f"   ⚠️ Unknown or zero size for multipart download of '{api_original_filename}'. Aborting.")
         return False, 0, None, None
 
-    # --- Resumption Logic: Check for existing complete chunks ---
-    chunks_to_download = []
-    total_bytes_resumed = 0
-    for i, (start, end) in enumerate(chunks_ranges):
-        chunk_part_path = f"{save_path}.part{i}"
-        expected_chunk_size = chunk_actual_sizes[i]
-
-        if os.path.exists(chunk_part_path) and os.path.getsize(chunk_part_path) == expected_chunk_size:
-            logger_func(f"   [Chunk {i + 1}/{num_parts}] Resuming with existing complete chunk file.")
-            total_bytes_resumed += expected_chunk_size
+    # --- Preallocation and Resumption ---
+    bitmap = _BlockBitmap(f"{save_path}.bitmap", total_size, validator=resume_validator)
+    try:
+        if (os.path.exists(save_path) and os.path.getsize(save_path) == total_size and bitmap.load()):
+            logger_func(f"   Resuming with {bitmap.completed_bytes() / (1024*1024):.2f} MB already on disk.")
         else:
-            chunks_to_download.append({'index': i, 'start': start, 'end': end})
+            # A bitmap left for another version of the file (or without a validator) must not be reused.
+            bitmap.remove()
+            with open(save_path, 'wb') as f:
+                f.truncate(total_size)
+            bitmap.save(force=True)
+    except OSError as e:
+        logger_func(f"   ❌ Could not preallocate '{save_path}': {e}")
+        discard_multipart_download(save_path)
+        return False, 0, None, None
+
+    total_bytes_resumed = bitmap.completed_bytes()
+    ordered_hasher = _OrderedHasher(save_path, bitmap)
 
     # Setup the shared progress data structure
     progress_data = {
         'total_file_size': total_size,
-        'total_downloaded_so_far': total_bytes_resumed,
         'chunks_status': [],
         'lock': threading.Lock(),
         'last_global_emit_time': [time.time()]
     }
-    for i in range(num_parts):
-        is_resumed = not any(c['index'] == i for c in chunks_to_download)
+    scheduler = _SegmentScheduler(
+        _plan_chunk_ranges(bitmap.missing_ranges(), num_parts, bitmap.block_size),
+        bitmap.block_size, progress_data
+    )
+    if total_bytes_resumed:
+        # A static entry so the UI's totals include the data resumed from disk.
         progress_data['chunks_status'].append({
-            'id': i,
-            'downloaded': chunk_actual_sizes[i] if is_resumed else 0,
-            'total': chunk_actual_sizes[i],
-            'active': False,
-            'speed_bps': 0.0
+            'id': -1, 'downloaded': total_bytes_resumed, 'total': total_bytes_resumed,
+            'active': False, 'speed_bps': 0.0
         })
 
     # --- Download Phase ---
-    chunk_futures = []
-    all_chunks_successful = True
-    total_bytes_from_threads = 0
-
-    with ThreadPoolExecutor(max_workers=num_parts, thread_name_prefix=f"MPChunk_{api_original_filename[:10]}_") as chunk_pool:
-        for chunk_info in chunks_to_download:
-            if cancellation_event and cancellation_event.is_set():
-                all_chunks_successful = False
-                break
-            
-            i, start, end = chunk_info['index'], chunk_info['start'], chunk_info['end']
-            chunk_part_path = f"{save_path}.part{i}"
-            
-            future = chunk_pool.submit(
-                _download_individual_chunk,
-                chunk_url=file_url,
-                chunk_temp_file_path=chunk_part_path,
-                start_byte=start, end_byte=end, headers=headers, part_num=i, total_parts=num_parts,
-                progress_data=progress_data, cancellation_event=cancellation_event,
-                skip_event=skip_event, global_emit_time_ref=progress_data['last_global_emit_time'],
-                pause_event=pause_event, cookies_for_chunk=cookies_for_chunk_session,
-                logger_func=logger_func, emitter=emitter_for_multipart,
-                api_original_filename=api_original_filename
-            )
-            chunk_futures.append(future)
-
-        for future in as_completed(chunk_futures):
-            if cancellation_event and cancellation_event.is_set():
-                all_chunks_successful = False
-            bytes_downloaded, success = future.result()
-            total_bytes_from_threads += bytes_downloaded
-            if not success:
-                all_chunks_successful = False
-
-    total_bytes_final = total_bytes_resumed + total_bytes_from_threads
+    num_threads = max(1, min(num_parts, len(scheduler.segments) * MIN_STEAL_BLOCKS))
+    if scheduler.segments:
+        with ThreadPoolExecutor(max_workers=num_threads, thread_name_prefix=f"MPChunk_{api_original_filename[:10]}_") as chunk_pool:
+            worker_futures = [
+                chunk_pool.submit(
+                    _segment_worker, scheduler, cancellation_event, skip_event,
+                    chunk_url=file_url, target_file_path=save_path, bitmap=bitmap,
+                    ordered_hasher=ordered_hasher, headers=headers, progress_data=progress_data,
+                    pause_event=pause_event, global_emit_time_ref=progress_data['last_global_emit_time'],
+                    cookies_for_chunk=cookies_for_chunk_session, logger_func=logger_func,
+                    emitter=emitter_for_multipart, api_original_filename=api_original_filename
+                )
+                for _ in range(num_threads)
+            ]
+            for future in as_completed(worker_futures):
+                future.result()
+    bitmap.save(force=True)
+
+    total_bytes_final = bitmap.completed_bytes()
 
     if cancellation_event and cancellation_event.is_set():
         logger_func(f"   Multi-part download for '{api_original_filename}' cancelled by main event.")
-        all_chunks_successful = False
 
-    # --- Assembly and Cleanup Phase ---
-    if all_chunks_successful and (total_bytes_final == total_size or total_size == 0):
-        logger_func(f"   ✅ All {num_parts} chunks complete. Assembling final file...")
-        md5_hasher = hashlib.md5()
+    # --- Completion Phase ---
+    if scheduler.stale:
+        logger_func(f"   ❌ Multi-part download of '{api_original_filename}' no longer matches the server's file. Partial file deleted.")
+        discard_multipart_download(save_path)
+        return False, total_bytes_final, None, None
+    elif bitmap.all_done() and not (cancellation_event and cancellation_event.is_set()):
         try:
-            with open(save_path, 'wb') as final_file:
-                for i in range(num_parts):
-                    chunk_part_path = f"{save_path}.part{i}"
-                    with open(chunk_part_path, 'rb') as chunk_file:
-                        content = chunk_file.read()
-                        final_file.write(content)
-                        md5_hasher.update(content)
-            
-            calculated_hash = md5_hasher.hexdigest()
-            logger_func(f"   ✅ Assembly successful for '{api_original_filename}'. Total bytes: {total_bytes_final}")
-            return True, total_bytes_final, calculated_hash, open(save_path, 'rb')
+            calculated_hash = ordered_hasher.hexdigest()
+            bitmap.remove()
+            logger_func(f"   ✅ Multi-part download successful for '{api_original_filename}' ({len(scheduler.segments)} segments). Total bytes: {total_size}")
+            return True, total_size, calculated_hash, open(save_path, 'rb')
         except Exception as e:
-            logger_func(f"   ❌ Critical error during file assembly: {e}. Cleaning up.")
+            logger_func(f"   ❌ Critical error while finalizing '{api_original_filename}': {e}.")
+            discard_multipart_download(save_path)
             return False, total_bytes_final, None, None
-        finally:
-            # Cleanup all individual chunk files after successful assembly
-            for i in range(num_parts):
-                chunk_part_path = f"{save_path}.part{i}"
-                if os.path.exists(chunk_part_path):
-                    try:
-                        os.remove(chunk_part_path)
-                    except OSError as e:
-                        logger_func(f"    ⚠️ Failed to remove temp part file '{chunk_part_path}': {e}")
+    elif skip_event and skip_event.is_set():
+        logger_func(f"   Multi-part download for '{api_original_filename}' skipped. Partial file deleted.")
+        discard_multipart_download(save_path)
+        return False, total_bytes_final, None, None
+    elif bitmap.validator is None:
+        logger_func(f"   ❌ Multi-part download failed for '{api_original_filename}'. Bytes: {total_bytes_final}/{total_size}. No ETag or Last-Modified to resume with, partial file deleted.")
+        discard_multipart_download(save_path)
+        return False, total_bytes_final, None, None
     else:
-        # If download failed, we do NOT clean up, allowing for resumption later
-        logger_func(f"   ❌ Multi-part download failed for '{api_original_filename}'. Success: {all_chunks_successful}, Bytes: {total_bytes_final}/{total_size}. Partial chunks saved for future resumption.")
+        # If download failed, the target and its bitmap are kept for resumption later
+        logger_func(f"   ❌ Multi-part download failed for '{api_original_filename}'. Bytes: {total_bytes_final}/{total_size}. Partial file kept for future resumption.")
         return False, total_bytes_final, None, None
+
+
+def discard_multipart_download(save_path):
+    """
+    Deletes a multipart download's part file and its sidecar bitmap, if present.
+
+    Args:
+        save_path (str): The part file passed to `download_file_in_parts`.
+    """
+    _BlockBitmap(f"{save_path}.bitmap", 0).remove()
+    if os.path.exists(save_path):
+        try:
+            os.remove(save_path)
+        except OSError:
+            pass
@@ -1,17 +1,17 @@
 # --- Standard Library Imports ---
 import json
 import os
+import queue
 import sys
 import threading
 import time
-import unicodedata
 from collections import defaultdict
 from urllib.parse import urlparse
 
 # --- PyQt5 Imports ---
-from PyQt5.QtCore import pyqtSignal, QCoreApplication, QSize, QThread, QTimer, Qt
+from PyQt5.QtCore import pyqtSignal, QAbstractListModel, QModelIndex, QSize, QThread, QTimer, Qt
 from PyQt5.QtWidgets import (
-    QApplication, QDialog, QHBoxLayout, QLabel, QLineEdit, QListWidget,
+    QApplication, QDialog, QHBoxLayout, QLabel, QLineEdit, QListView, QListWidget,
     QListWidgetItem, QMessageBox, QPushButton, QVBoxLayout, QAbstractItemView,
     QSplitter, QProgressBar, QWidget, QFileDialog  
 )
@@ -20,6 +20,9 @@ from PyQt5.QtWidgets import (
 from ...i18n.translator import get_translation
 from ..main_window import get_app_icon_object
 from ...core.api_client import download_from_api
+from ...utils.creator_index import get_creator_index
+from ...utils.creator_profile_store import get_creator_profile_store
+from ...utils.creator_search import CreatorSearchIndex
 from ...utils.network_utils import extract_post_info, prepare_cookies_for_request
 from ...utils.resolution import get_dark_theme
 
@@ -122,7 +125,6 @@ class PostsFetcherThread (QThread ):
 
             if self .cancellation_flag .is_set ():
                 break 
-            QThread .msleep (200 )
 
         if self .cancellation_flag .is_set ():
             self .status_update .emit (self .parent_dialog ._tr ("post_fetch_cancelled_status_done","Post fetching cancelled."))
@@ -131,10 +133,147 @@ class PostsFetcherThread (QThread ):
         self .finished_signal .emit ()
 
 
+class CreatorSearchThread(QThread):
+    """
+    Loads the creator catalog, builds its search index and answers searches, all off the GUI thread.
+
+    Searches are queued with `request_search`; when several are waiting only
+    the newest is run, and each result carries its request id so the dialog
+    can drop answers to text the user has already changed.
+    """
+    index_ready = pyqtSignal(int)
+    load_failed = pyqtSignal(str)
+    results_ready = pyqtSignal(int, str, object)  # request id, 'all' / 'url' / 'text', creator dicts
+
+    def __init__(self, creator_index, result_limit):
+        super().__init__()
+        self.creator_index = creator_index
+        self.result_limit = result_limit
+        self.requests = queue.Queue()
+
+    def request_search(self, request_id, search_text):
+        self.requests.put((request_id, search_text))
+
+    def stop(self):
+        self.requests.put(None)
+
+    def run(self):
+        all_creators = self.creator_index.all_creators()
+        if self.creator_index.load_error:
+            self.load_failed.emit(self.creator_index.load_error)
+            return
+        search_index = CreatorSearchIndex(all_creators)
+        self.index_ready.emit(len(search_index))
+
+        while True:
+            request = self.requests.get()
+            while request is not None:
+                try:
+                    request = self.requests.get_nowait()
+                except queue.Empty:
+                    break
+            if request is None:
+                return
+            request_id, search_text = request
+            if not search_text.strip():
+                self.results_ready.emit(request_id, 'all', all_creators)
+                continue
+            service, user_id, _ = extract_post_info(search_text)
+            if service and user_id:
+                creator = self.creator_index.get_creator(service, user_id)
+                self.results_ready.emit(request_id, 'url', [creator] if creator else [])
+            else:
+                self.results_ready.emit(request_id, 'text', search_index.search(search_text, self.result_limit))
+
+
+class CreatorListModel(QAbstractListModel):
+    """
+    The creator list as a virtual model.
+
+    Rows are formatted only when the view asks for them, so the whole catalog
+    can be shown without creating an item per creator. Check states live in
+    the dialog's selection dict, keyed by (service, id), and so survive
+    new searches.
+    """
+    check_state_changed = pyqtSignal()
+
+    def __init__(self, selected_creators, parent=None):
+        super().__init__(parent)
+        self.selected_creators = selected_creators
+        self.creators = []
+        self.message = None
+
+    def set_creators(self, creators):
+        self.beginResetModel()
+        self.creators = creators
+        self.message = None
+        self.endResetModel()
+
+    def set_message(self, message):
+        """Replaces the rows with a single, non-checkable line of text (e.g. an error)."""
+        self.beginResetModel()
+        self.creators = []
+        self.message = message
+        self.endResetModel()
+
+    @staticmethod
+    def _selection_key(creator):
+        service = creator.get('service')
+        creator_id = creator.get('id')
+        if service is None or creator_id is None:
+            return None
+        return (str(service), str(creator_id))
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return 1 if self.message else len(self.creators)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if self.message:
+            return self.message if role == Qt.DisplayRole else None
+        creator = self.creators[index.row()]
+        if role == Qt.DisplayRole:
+            creator_name_raw = creator.get('name')
+            display_creator_name = creator_name_raw.strip() if isinstance(creator_name_raw, str) and creator_name_raw.strip() else "Unknown Creator"
+            service_display_name = creator.get('service', 'N/A').capitalize()
+            return f"{display_creator_name} ({service_display_name})"
+        if role == Qt.CheckStateRole:
+            return Qt.Checked if self._selection_key(creator) in self.selected_creators else Qt.Unchecked
+        if role == Qt.UserRole:
+            return creator
+        return None
+
+    def flags(self, index):
+        if not index.isValid() or self.message:
+            return Qt.ItemIsEnabled
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.CheckStateRole or not index.isValid() or self.message:
+            return False
+        creator = self.creators[index.row()]
+        unique_key = self._selection_key(creator)
+        if unique_key is None:
+            print(f"Warning: Creator data in list item missing service or id: {creator.get('name')}")
+            return False
+        if value == Qt.Checked:
+            self.selected_creators[unique_key] = creator
+        else:
+            self.selected_creators.pop(unique_key, None)
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        self.check_state_changed.emit()
+        return True
+
+
 class EmptyPopupDialog (QDialog ):
     """A simple empty popup dialog."""
     SCOPE_CHARACTERS ="Characters"
     INITIAL_LOAD_LIMIT =200 
+    SEARCH_RESULT_LIMIT =20 
+    SEARCH_DEBOUNCE_MS =150 
     SCOPE_CREATORS ="Creators"
 
 
@@ -147,6 +286,7 @@ class EmptyPopupDialog (QDialog ):
         self.setMinimumSize(int(400 * scale_factor), int(300 * scale_factor))
         self.current_scope_mode = self.SCOPE_CREATORS
         self .app_base_dir =app_base_dir 
+        self .creator_index =get_creator_index (app_base_dir )
 
         app_icon =get_app_icon_object ()
         if app_icon and not app_icon .isNull ():
@@ -174,7 +314,11 @@ class EmptyPopupDialog (QDialog ):
 
         search_fetch_layout =QHBoxLayout ()
         self .search_input =QLineEdit ()
-        self .search_input .textChanged .connect (self ._filter_list )
+        self .search_debounce_timer =QTimer (self )
+        self .search_debounce_timer .setSingleShot (True )
+        self .search_debounce_timer .setInterval (self .SEARCH_DEBOUNCE_MS )
+        self .search_debounce_timer .timeout .connect (self ._filter_list )
+        self .search_input .textChanged .connect (lambda :self .search_debounce_timer .start ())
         search_fetch_layout .addWidget (self .search_input ,1 )
         self .fetch_posts_button =QPushButton ()
         self .fetch_posts_button .setEnabled (False )
@@ -188,9 +332,18 @@ class EmptyPopupDialog (QDialog ):
         self .progress_bar .setVisible (False )
         left_pane_layout .addWidget (self .progress_bar )
 
-        self .list_widget =QListWidget ()
-        self .list_widget .itemChanged .connect (self ._handle_item_check_changed )
-        left_pane_layout .addWidget (self .list_widget )
+        self .creator_list_model =CreatorListModel (self .globally_selected_creators ,self )
+        self .creator_list_model .check_state_changed .connect (self ._handle_item_check_changed )
+        self .list_view =QListView ()
+        self .list_view .setUniformItemSizes (True )
+        self .list_view .setModel (self .creator_list_model )
+        left_pane_layout .addWidget (self .list_view )
+
+        self ._search_request_id =0 
+        self .creator_search_thread =CreatorSearchThread (self .creator_index ,self .SEARCH_RESULT_LIMIT )
+        self .creator_search_thread .index_ready .connect (self ._handle_creator_index_ready )
+        self .creator_search_thread .load_failed .connect (self ._handle_creator_index_failed )
+        self .creator_search_thread .results_ready .connect (self ._handle_search_results )
 
 
         left_bottom_buttons_layout =QHBoxLayout ()
@@ -333,6 +486,8 @@ class EmptyPopupDialog (QDialog ):
 
         if filepath:
             try:
+                # Write any processed posts still waiting in memory before reading the file.
+                get_creator_profile_store(profiles_dir).flush()
                 with open(filepath, 'r', encoding='utf-8') as f:
                     data = json.load(f)
                 
@@ -432,220 +587,47 @@ class EmptyPopupDialog (QDialog ):
 
 
     def _load_creators_from_json (self ):
-        """Loads creators from creators.json and populates the list widget."""
-        self .list_widget .clear ()
-
+        """Starts the search thread, which loads the shared creator index and builds the search index."""
         self .progress_bar .setVisible (True )
-        QCoreApplication .processEvents ()
-        if not self .isVisible ():return 
-        # Always resolve project root relative to this file
-        project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../"))
-        creators_file_path = os.path.join(project_root, "data", "creators.json")
-
-        if not os .path .exists (creators_file_path ):
-            self .list_widget .addItem (f"Error: creators.json not found at {creators_file_path }")
-            self .all_creators_data =[]
-            self .progress_bar .setVisible (False )
-            QCoreApplication .processEvents ()
-            return 
-
-        try :
-            with open (creators_file_path ,'r',encoding ='utf-8')as f :
-                data =json .load (f )
-            QCoreApplication .processEvents ()
-            if not self .isVisible ():return 
-
-            raw_data_list =[]
-            if isinstance (data ,list )and len (data )>0 and isinstance (data [0 ],list ):
-                raw_data_list =data [0 ]
-            elif isinstance (data ,list )and all (isinstance (item ,dict )for item in data ):
-                raw_data_list =data 
-            else :
-                self .list_widget .addItem ("Error: Invalid format in creators.json.")
-                self .all_creators_data =[]
-                self .progress_bar .setVisible (False );QCoreApplication .processEvents ();return 
-
-
-            unique_creators_map ={}
-            duplicates_skipped_count =0 
-            for creator_entry in raw_data_list :
-                service =creator_entry .get ('service')
-                creator_id =creator_entry .get ('id')
-                name_for_log =creator_entry .get ('name','Unknown')
-
-                if service and creator_id :
-                    key =(str (service ).lower ().strip (),str (creator_id ).strip ())
-                    if key not in unique_creators_map :
-                        unique_creators_map [key ]=creator_entry 
-                    else :
-                        duplicates_skipped_count +=1 
-                else :
-                    print (f"Warning: Creator entry in creators.json missing service or ID: {name_for_log }")
-
-            self .all_creators_data =list (unique_creators_map .values ())
-            if duplicates_skipped_count >0 :
-                print (f"INFO (Creator Popup): Skipped {duplicates_skipped_count } duplicate creator entries from creators.json based on (service, id).")
-
-            self .all_creators_data .sort (key =lambda c :(-c .get ('favorited',0 ),c .get ('name','').lower ()))
-            QCoreApplication .processEvents ()
-            if not self .isVisible ():return 
-
-        except json .JSONDecodeError :
-            self .list_widget .addItem ("Error: Could not parse creators.json.")
-            self .all_creators_data =[]
-            self .progress_bar .setVisible (False );QCoreApplication .processEvents ();return 
-        except Exception as e :
-            self .list_widget .addItem (f"Error loading creators: {e }")
-            self .all_creators_data =[]
-            self .progress_bar .setVisible (False );QCoreApplication .processEvents ();return 
+        if not self .creator_search_thread .isRunning ():
+            self .creator_search_thread .start ()
 
+    def _handle_creator_index_ready (self ,creator_count ):
         self ._filter_list ()
 
-    def _populate_list_widget (self ,creators_to_display ):
-        """Clears and populates the list widget with the given creator data."""
-        self .list_widget .blockSignals (True )
-        self .list_widget .clear ()
-
-        if not creators_to_display :
-            self .list_widget .blockSignals (False )
-
-
-
-
-
-
-            return 
-
-        CHUNK_SIZE_POPULATE =100 
-        for i in range (0 ,len (creators_to_display ),CHUNK_SIZE_POPULATE ):
-            if not self .isVisible ():
-                self .list_widget .blockSignals (False )
-                return 
-
-            chunk =creators_to_display [i :i +CHUNK_SIZE_POPULATE ]
-            for creator in chunk :
-                creator_name_raw =creator .get ('name')
-                display_creator_name =creator_name_raw .strip ()if isinstance (creator_name_raw ,str )and creator_name_raw .strip ()else "Unknown Creator"
-                service_display_name =creator .get ('service','N/A').capitalize ()
-                display_text =f"{display_creator_name } ({service_display_name })"
-                item =QListWidgetItem (display_text )
-                item .setFlags (item .flags ()|Qt .ItemIsUserCheckable )
-                item .setData (Qt .UserRole ,creator )
-                service =creator .get ('service')
-                creator_id =creator .get ('id')
-                if service is not None and creator_id is not None :
-                    unique_key =(str (service ),str (creator_id ))
-                    if unique_key in self .globally_selected_creators :
-                        item .setCheckState (Qt .Checked )
-                    else :
-                        item .setCheckState (Qt .Unchecked )
-                else :
-                    item .setCheckState (Qt .Unchecked )
-                self .list_widget .addItem (item )
-
-            QCoreApplication .processEvents ()
-
-        self .list_widget .blockSignals (False )
+    def _handle_creator_index_failed (self ,error_message ):
+        self .creator_list_model .set_message (f"Error loading creators: {error_message }")
+        self .progress_bar .setVisible (False )
 
     def _filter_list (self ):
-        """Filters the list widget based on the search input."""
+        """Sends the search text to the search thread; the answer arrives in _handle_search_results."""
+        self ._search_request_id +=1 
         raw_search_input =self .search_input .text ()
-
-
-
-        check_search_text_for_empty =raw_search_input .lower ().strip ()
-
-        QCoreApplication .processEvents ()
-        if not self .isVisible ():return 
-
-        if not check_search_text_for_empty :
-            self .progress_bar .setVisible (False )
-            creators_to_show =self .all_creators_data [:self .INITIAL_LOAD_LIMIT ]
-            self ._populate_list_widget (creators_to_show )
-            self .search_input .setToolTip ("Search by name, service, or paste creator URL...")
-            QCoreApplication .processEvents ()
-        else :
+        if raw_search_input .strip ():
             self .progress_bar .setVisible (True )
-            QCoreApplication .processEvents ()
-            if not self .isVisible ():return 
-
-            norm_search_casefolded =unicodedata .normalize ('NFKC',raw_search_input ).casefold ().strip ()
-
-            scored_matches =[]
+            self .search_input .setToolTip ("Searching by name or service...")
+        self .creator_search_thread .request_search (self ._search_request_id ,raw_search_input )
 
-            parsed_service_from_url ,parsed_user_id_from_url ,_ =extract_post_info (raw_search_input )
-
-            if parsed_service_from_url and parsed_user_id_from_url :
-
-                self .search_input .setToolTip (f"Searching for URL: {raw_search_input [:50 ]}...")
-                for creator_data in self .all_creators_data :
-                    creator_service_lower =creator_data .get ('service','').lower ()
-
-                    creator_id_str_lower =str (creator_data .get ('id','')).lower ()
-
-                    if creator_service_lower ==parsed_service_from_url .lower ()and creator_id_str_lower ==parsed_user_id_from_url .lower ():
-                        scored_matches .append ((5 ,creator_data ))
-
-                        break 
+    def _handle_search_results (self ,request_id ,result_kind ,creators ):
+        """Shows a search's results, unless the search text has changed since it was requested."""
+        if request_id !=self ._search_request_id :
+            return 
+        self .creator_list_model .set_creators (creators )
+        self .progress_bar .setVisible (False )
 
+        raw_search_input =self .search_input .text ()
+        if result_kind =='all':
+            self .search_input .setToolTip ("Search by name, service, or paste creator URL...")
+        elif result_kind =='url':
+            if creators :
+                self .search_input .setToolTip (f"Found creator by URL: {creators [0 ].get ('name')}")
             else :
-
-
-                self .search_input .setToolTip ("Searching by name or service...")
-                norm_search_casefolded =unicodedata .normalize ('NFKC',raw_search_input ).casefold ().strip ()
-
-                CHUNK_SIZE_FILTER =500 
-                for i in range (0 ,len (self .all_creators_data ),CHUNK_SIZE_FILTER ):
-                    if not self .isVisible ():break 
-                    chunk =self .all_creators_data [i :i +CHUNK_SIZE_FILTER ]
-                    for creator_data in chunk :
-                        creator_name_raw =creator_data .get ('name','')
-                        creator_service_raw =creator_data .get ('service','')
-
-
-                        norm_creator_name_casefolded =unicodedata .normalize ('NFKC',creator_name_raw ).casefold ()
-                        norm_service_casefolded =unicodedata .normalize ('NFKC',creator_service_raw ).casefold ()
-
-                        current_score =0 
-
-                        if norm_search_casefolded ==norm_creator_name_casefolded :
-                            current_score =4 
-
-                        elif norm_creator_name_casefolded .startswith (norm_search_casefolded ):
-                            current_score =3 
-
-                        elif norm_search_casefolded in norm_creator_name_casefolded :
-                            current_score =2 
-
-                        elif norm_search_casefolded in norm_service_casefolded :
-                            current_score =1 
-
-                        if current_score >0 :
-                            scored_matches .append ((current_score ,creator_data ))
-
-                    QCoreApplication .processEvents ()
-
-
-
-            scored_matches .sort (key =lambda x :(-x [0 ],unicodedata .normalize ('NFKC',x [1 ].get ('name','')).casefold ()))
-
-
-            final_creators_to_display =[creator_data for score ,creator_data in scored_matches [:20 ]]
-
-            self ._populate_list_widget (final_creators_to_display )
-            self .progress_bar .setVisible (False )
-
-
-            if parsed_service_from_url and parsed_user_id_from_url :
-                if final_creators_to_display :
-                    self .search_input .setToolTip (f"Found creator by URL: {final_creators_to_display [0 ].get ('name')}")
-                else :
-                    self .search_input .setToolTip (f"URL parsed, but no matching creator found in your creators.json.")
+                self .search_input .setToolTip (f"URL parsed, but no matching creator found in your creators.json.")
+        else :
+            if creators :
+                self .search_input .setToolTip (f"Showing top {len (creators )} match(es) for '{raw_search_input [:30 ]}...'")
             else :
-                if final_creators_to_display :
-                    self .search_input .setToolTip (f"Showing top {len (final_creators_to_display )} match(es) for '{raw_search_input [:30 ]}...'")
-                else :
-                    self .search_input .setToolTip (f"No matches found for '{raw_search_input [:30 ]}...'")
+                self .search_input .setToolTip (f"No matches found for '{raw_search_input [:30 ]}...'")
 
     def _toggle_scope_mode (self ):
         """Toggles the scope mode and updates the button text."""
@@ -1015,24 +997,14 @@ class EmptyPopupDialog (QDialog ):
         else :
             QMessageBox .information (self ,"No Selection","No creators selected to add.")
 
-    def _handle_item_check_changed (self ,item ):
-        """Updates the globally_selected_creators dict when an item's check state changes."""
-        creator_data =item .data (Qt .UserRole )
-        if not isinstance (creator_data ,dict ):
-            return 
-
-        service =creator_data .get ('service')
-        creator_id =creator_data .get ('id')
-
-        if service is None or creator_id is None :
-            print (f"Warning: Creator data in list item missing service or id: {creator_data .get ('name')}")
-            return 
-
-        unique_key =(str (service ),str (creator_id ))
-
-        if item .checkState ()==Qt .Checked :
-            self .globally_selected_creators [unique_key ]=creator_data 
-        else :
-            if unique_key in self .globally_selected_creators :
-                del self .globally_selected_creators [unique_key ]
-        self .fetch_posts_button .setEnabled (bool (self .globally_selected_creators ))
\ No newline at end of file
+    def _handle_item_check_changed (self ):
+        """Enables fetching once any creator is checked; the model keeps globally_selected_creators up to date."""
+        self .fetch_posts_button .setEnabled (bool (self .globally_selected_creators ))
+
+    def done (self ,result ):
+        """Stops the search thread before the dialog closes."""
+        self .search_debounce_timer .stop ()
+        if self .creator_search_thread .isRunning ():
+            self .creator_search_thread .stop ()
+            self .creator_search_thread .wait ()
+        super ().done (result )
@@ -6,8 +6,8 @@ import re
 import cloudscraper # MODIFIED: Import cloudscraper
 from PyQt5.QtCore import QCoreApplication, Qt
 from PyQt5.QtWidgets import (
-    QApplication, QDialog, QHBoxLayout, QLabel, QLineEdit, QListWidget,
-    QListWidgetItem, QMessageBox, QPushButton, QVBoxLayout
+    QApplication, QDialog, QHBoxLayout, QLabel, QLineEdit, QListView,
+    QMessageBox, QPushButton, QVBoxLayout
 )
 
 # --- Local Application Imports ---
@@ -15,6 +15,7 @@ from ...i18n.translator import get_translation
 from ..assets import get_app_icon_object 
 from ...utils.network_utils import prepare_cookies_for_request
 from .CookieHelpDialog import CookieHelpDialog
+from .favorites_model import BackgroundRowFilter, CheckableRowsModel, ROW_ITEM
 from ...utils.resolution import get_dark_theme
 
 class FavoriteArtistsDialog (QDialog ):
@@ -29,6 +30,9 @@ class FavoriteArtistsDialog (QDialog ):
         if not app_icon .isNull ():
             self .setWindowIcon (app_icon )
         self .selected_artist_urls =[]
+        self .row_filter =BackgroundRowFilter (self ._build_artist_rows ,self )
+        self .row_filter .rows_ready .connect (self ._handle_artist_rows_ready )
+        self .row_filter .build_failed .connect (lambda error_message :self ._logger (f"Error filtering artists: {error_message }"))
 
         self .setModal (True )
         self .setMinimumSize (500 ,500 )
@@ -71,9 +75,12 @@ class FavoriteArtistsDialog (QDialog ):
         main_layout .addWidget (self .search_input )
 
 
-        self .artist_list_widget =QListWidget ()
+        self .artist_list_model =CheckableRowsModel (self ._artist_key ,self ._artist_display_text ,self )
+        self .artist_list_widget =QListView ()
+        self .artist_list_widget .setUniformItemSizes (True )
+        self .artist_list_widget .setModel (self .artist_list_model )
         self .artist_list_widget .setStyleSheet ("""
-            QListWidget::item {
+            QListView::item {
                 border-bottom: 1px solid #4A4A4A; /* Slightly softer line */
                 padding-top: 4px;
                 padding-bottom: 4px;
@@ -284,47 +291,52 @@ class FavoriteArtistsDialog (QDialog ):
             if fetched_any_successfully and not self .all_fetched_artists :
                  self .status_label .setText (self ._tr ("fav_artists_no_favorites_after_processing","No favorite artists found after processing."))
 
-    def _populate_artist_list_widget (self ,artists_to_display =None ):
-        self .artist_list_widget .clear ()
-        source_list =artists_to_display if artists_to_display is not None else self .all_fetched_artists 
-        for artist_data in source_list :
-            item =QListWidgetItem (f"{artist_data ['name']} ({artist_data .get ('service','N/A').capitalize ()})")
-            item .setFlags (item .flags ()|Qt .ItemIsUserCheckable )
-            item .setCheckState (Qt .Unchecked )
-            item .setData (Qt .UserRole ,artist_data )
-            self .artist_list_widget .addItem (item )
+    @staticmethod
+    def _artist_key (artist_data ):
+        return (artist_data ['service'].lower (),str (artist_data ['id']).lower ())
 
-    def _filter_artist_list_display (self ):
-        search_text =self .search_input .text ().lower ().strip ()
-        if not search_text :
-            self ._populate_artist_list_widget ()
-            return 
+    @staticmethod
+    def _artist_display_text (artist_data ):
+        return f"{artist_data ['name']} ({artist_data .get ('service','N/A').capitalize ()})"
 
-        filtered_artists =[
-        artist for artist in self .all_fetched_artists 
-        if search_text in artist ['name'].lower ()or search_text in artist ['url'].lower ()
+    def _build_artist_rows (self ,search_text ):
+        """Filters the artists into list rows. Runs on the row filter's thread."""
+        search_text =search_text .lower ().strip ()
+        return [
+        (ROW_ITEM ,artist )for artist in self .all_fetched_artists 
+        if not search_text or search_text in artist ['name'].lower ()or search_text in artist ['url'].lower ()
         ]
-        self ._populate_artist_list_widget (filtered_artists )
+
+    def _populate_artist_list_widget (self ):
+        """Rebuilds the list for the current search text on the row filter's thread."""
+        self .row_filter .request (self .search_input .text (),immediate =True )
+
+    def _handle_artist_rows_ready (self ,rows ):
+        self .artist_list_model .set_rows (rows )
+
+    def _filter_artist_list_display (self ):
+        self .row_filter .request (self .search_input .text ())
 
     def _select_all_items (self ):
-        for i in range (self .artist_list_widget .count ()):
-            self .artist_list_widget .item (i ).setCheckState (Qt .Checked )
+        self .artist_list_model .set_visible_checked (True )
 
     def _deselect_all_items (self ):
-        for i in range (self .artist_list_widget .count ()):
-            self .artist_list_widget .item (i ).setCheckState (Qt .Unchecked )
+        self .artist_list_model .set_visible_checked (False )
 
     def _accept_selection_action (self ):
-        self .selected_artists_data =[]
-        for i in range (self .artist_list_widget .count ()):
-            item =self .artist_list_widget .item (i )
-            if item .checkState ()==Qt .Checked :
-                self .selected_artists_data .append (item .data (Qt .UserRole ))
+        self .selected_artists_data =[
+        artist_data for artist_data in self .all_fetched_artists if self .artist_list_model .is_checked (artist_data )
+        ]
 
         if not self .selected_artists_data :
             QMessageBox .information (self ,"No Selection","Please select at least one artist to download.")
             return 
         self .accept ()
 
+    def done (self ,result ):
+        """Stops the row filter's thread before the dialog closes."""
+        self .row_filter .stop ()
+        super ().done (result )
+
     def get_selected_artists (self ):
         return self .selected_artists_data
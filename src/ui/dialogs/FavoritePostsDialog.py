@@ -1,23 +1,22 @@
 import html
-import os
-import sys
 import threading
 import time
 import traceback
-import json
-import re
 from collections import defaultdict
 import cloudscraper # MODIFIED: Import cloudscraper
 from PyQt5.QtCore import QCoreApplication, Qt, pyqtSignal, QThread
 from PyQt5.QtWidgets import (
-    QApplication, QDialog, QHBoxLayout, QLabel, QLineEdit, QListWidget,
-    QListWidgetItem, QMessageBox, QPushButton, QVBoxLayout, QProgressBar,
+    QApplication, QDialog, QHBoxLayout, QLabel, QLineEdit, QListView,
+    QMessageBox, QPushButton, QVBoxLayout, QProgressBar,
     QWidget, QCheckBox
 )
 from ...i18n.translator import get_translation
 from ..assets import get_app_icon_object
+from ...utils.creator_index import CreatorNameLookup, get_creator_index
+from ...utils.name_matcher import get_best_known_name_matcher
 from ...utils.network_utils import prepare_cookies_for_request
 from .CookieHelpDialog import CookieHelpDialog
+from .favorites_model import BackgroundRowFilter, CheckableRowsModel, ROW_HEADER, ROW_ITEM
 from ...core.api_client import download_from_api
 from ...utils.resolution import get_dark_theme
 
@@ -240,8 +239,11 @@ class FavoritePostsDialog (QDialog ):
         self .known_names_list_ref =known_names_list_ref 
         self .target_domain_preference_for_this_fetch =target_domain_preference 
         self .creator_name_cache ={}
-        self .displayable_grouped_posts ={}
+        self .known_name_suffixes ={}# Post key -> ' [Known - name]' or '', filled by the row filter's thread
         self .fetcher_thread =None 
+        self .row_filter =BackgroundRowFilter (self ._build_post_rows ,self )
+        self .row_filter .rows_ready .connect (self ._handle_post_rows_ready )
+        self .row_filter .build_failed .connect (self ._handle_post_rows_failed )
 
         app_icon =get_app_icon_object ()
         if not app_icon .isNull ():
@@ -280,9 +282,12 @@ class FavoritePostsDialog (QDialog ):
         self .search_input .textChanged .connect (self ._filter_post_list_display )
         main_layout .addWidget (self .search_input )
 
-        self .post_list_widget =QListWidget ()
+        self .post_list_model =CheckableRowsModel (self ._post_key ,self ._post_display_text ,self )
+        self .post_list_widget =QListView ()
+        self .post_list_widget .setModel (self .post_list_model )
+        self .post_list_widget .setLayoutMode (QListView .Batched )
         self .post_list_widget .setStyleSheet ("""
-            QListWidget::item {
+            QListView::item {
                 border-bottom: 1px solid #4A4A4A;
                 padding-top: 4px;
                 padding-bottom: 4px;
@@ -333,43 +338,10 @@ class FavoritePostsDialog (QDialog ):
             print (f"[FavPostsDialog] {message }")
 
     def _load_creator_names_from_file (self ):
-        """Loads creator id-name-service mappings from creators.txt."""
-        self ._logger ("Attempting to load creators.json for Favorite Posts Dialog.")
-         
-        if getattr (sys ,'frozen',False )and hasattr (sys ,'_MEIPASS'):
-            base_path_for_creators =sys ._MEIPASS 
-            self ._logger (f"  Running bundled. Using _MEIPASS: {base_path_for_creators }")
-        else :
-            base_path_for_creators =self .parent_app .app_base_dir 
-            self ._logger (f"  Not bundled or _MEIPASS unavailable. Using app_base_dir: {base_path_for_creators }")
-        creators_file_path = os.path.join(base_path_for_creators, "data", "creators.json")
-        self ._logger (f"Full path to creators.json: {creators_file_path }")
-
-        if not os .path .exists (creators_file_path ):
-            self ._logger (f"Warning: 'creators.json' not found at {creators_file_path }. Creator names will not be displayed.")
-            return 
-
-        try :
-            with open (creators_file_path ,'r',encoding ='utf-8')as f :
-                loaded_data =json .load (f )
-
-                if isinstance (loaded_data ,list )and len (loaded_data )>0 and isinstance (loaded_data [0 ],list ):
-                    creators_list =loaded_data [0 ]
-                elif isinstance (loaded_data ,list )and all (isinstance (item ,dict )for item in loaded_data ):
-                    creators_list =loaded_data 
-                else :
-                    self ._logger (f"Warning: 'creators.json' has an unexpected format. Expected a list of lists or a flat list of creator objects.")
-                    return 
-
-                for creator_data in creators_list :
-                    creator_id =creator_data .get ("id")
-                    name =creator_data .get ("name")
-                    service =creator_data .get ("service")
-                    if creator_id and name and service :
-                        self .creator_name_cache [(service .lower (),str (creator_id ))]=name 
-            self ._logger (f"Successfully loaded {len (self .creator_name_cache )} creator names from 'creators.json'.")
-        except Exception as e :
-            self ._logger (f"Error loading 'creators.json': {e }")
+        """Points the name cache at the shared creator index, loading it in the background while posts are fetched."""
+        self .creator_index =get_creator_index (self .parent_app .app_base_dir ,logger =self ._logger )
+        self .creator_name_cache =CreatorNameLookup (self .creator_index )
+        self .creator_index .load_in_background ()
 
     def _start_fetching_favorite_posts (self ):
         self .download_button .setEnabled (False )
@@ -460,13 +432,11 @@ class FavoritePostsDialog (QDialog ):
             self .download_button .setEnabled (False )
             return 
 
+        self .creator_index .load ()
         if not self .creator_name_cache :
             self ._logger ("Warning: Creator name cache is empty. Names will not be resolved from creators.json. Displaying IDs instead.")
         else :
             self ._logger (f"Creator name cache has {len (self .creator_name_cache )} entries. Attempting to resolve names...")
-            sample_keys =list (self .creator_name_cache .keys ())[:3 ]
-            if sample_keys :
-                self ._logger (f"Sample keys from creator_name_cache: {sample_keys }")
 
 
         processed_one_missing_log =False 
@@ -509,124 +479,93 @@ class FavoritePostsDialog (QDialog ):
     def _find_best_known_name_match_in_title (self ,title_raw ):
         if not title_raw or not self .known_names_list_ref :
             return None 
+        return get_best_known_name_matcher (self .known_names_list_ref ).find_best (title_raw )
 
-        title_lower =title_raw .lower ()
-        best_match_known_name_primary =None 
-        longest_match_len =0 
-
-        for known_entry in self .known_names_list_ref :
-            aliases_to_check =set ()
-            for alias_val in known_entry .get ("aliases",[]):
-                aliases_to_check .add (alias_val )
-            if not known_entry .get ("is_group",False ):
-                aliases_to_check .add (known_entry ["name"])
-            sorted_aliases_for_entry =sorted (list (aliases_to_check ),key =len ,reverse =True )
-
-            for alias in sorted_aliases_for_entry :
-                alias_lower =alias .lower ()
-                if not alias_lower :
-                    continue 
-                if re .search (r'\b'+re .escape (alias_lower )+r'\b',title_lower ):
-                    if len (alias_lower )>longest_match_len :
-                        longest_match_len =len (alias_lower )
-                        best_match_known_name_primary =known_entry ["name"]
-                    break 
-        return best_match_known_name_primary 
+    @staticmethod
+    def _post_key (post ):
+        return (post .get ('service'),str (post .get ('creator_id')),str (post .get ('id')))
 
-    def _populate_post_list_widget (self ,posts_to_display =None ):
-        self .post_list_widget .clear ()
+    def _post_display_text (self ,post ):
+        return post .get ('title','Untitled Post')+self .known_name_suffixes .get (self ._post_key (post ),"")
 
-        source_list_for_grouping =posts_to_display if posts_to_display is not None else self .all_fetched_posts 
+    def _group_posts (self ,posts ):
+        """Groups posts by creator, creators by service and ID, each creator's posts newest first."""
         grouped_posts ={}
-        for post in source_list_for_grouping :
-            service =post .get ('service','unknown_service')
-            creator_id =post .get ('creator_id','unknown_id')
-            group_key =(service ,creator_id )
-            if group_key not in grouped_posts :
-                grouped_posts [group_key ]=[]
-            grouped_posts [group_key ].append (post )
-
+        for post in posts :
+            group_key =(post .get ('service','unknown_service'),post .get ('creator_id','unknown_id'))
+            grouped_posts .setdefault (group_key ,[]).append (post )
         sorted_group_keys =sorted (grouped_posts .keys (),key =lambda x :(x [0 ].lower (),x [1 ].lower ()))
-
-        self .displayable_grouped_posts ={
+        return {
         key :sorted (grouped_posts [key ],key =lambda p :(p .get ('added_date')or ''),reverse =True )
         for key in sorted_group_keys 
         }
-        for service ,creator_id_val in sorted_group_keys :
-            creator_name_display =self .creator_name_cache .get (
-            (service .lower (),str (creator_id_val )),
-            str (creator_id_val )
-            )
-            artist_header_display_text =f"{creator_name_display } ({service .capitalize ()} / {creator_id_val })"
-            artist_header_item =QListWidgetItem (f"🎨 {artist_header_display_text }")
-            artist_header_item .setFlags (Qt .NoItemFlags )
-            font =artist_header_item .font ()
-            font .setBold (True )
-            font .setPointSize (font .pointSize ()+1 )
-            artist_header_item .setFont (font )
-            artist_header_item .setForeground (Qt .cyan )
-            self .post_list_widget .addItem (artist_header_item )
-            for post_data in self .displayable_grouped_posts [(service ,creator_id_val )]:
-                post_title_raw =post_data .get ('title','Untitled Post')
-                found_known_name_primary =self ._find_best_known_name_match_in_title (post_title_raw )
-
-                plain_text_title_for_list_item =post_title_raw 
-                if found_known_name_primary :
-                    suffix_text =f" [Known - {found_known_name_primary }]"
-                    post_data ['suffix_for_display']=suffix_text 
-                    plain_text_title_for_list_item =post_title_raw +suffix_text 
-                else :
-                    post_data .pop ('suffix_for_display',None )
-
-                list_item =QListWidgetItem (self .post_list_widget )
-                list_item .setText (plain_text_title_for_list_item )
-                list_item .setFlags (list_item .flags ()|Qt .ItemIsUserCheckable )
-                list_item .setCheckState (Qt .Unchecked )
-                list_item .setData (Qt .UserRole ,post_data )
-                self .post_list_widget .addItem (list_item )
-
-    def _filter_post_list_display (self ):
-        search_text =self .search_input .text ().lower ().strip ()
-        if not search_text :
-            self ._populate_post_list_widget (self .all_fetched_posts )
-            return 
-
-        filtered_posts_to_group =[]
-        for post in self .all_fetched_posts :
-            matches_post_title =search_text in post .get ('title','').lower ()
-            matches_creator_name =search_text in post .get ('creator_name_resolved','').lower ()
-            matches_creator_id =search_text in post .get ('creator_id','').lower ()
-            matches_service =search_text in post ['service'].lower ()
 
-            if matches_post_title or matches_creator_name or matches_creator_id or matches_service :
-                filtered_posts_to_group .append (post )
+    def _build_post_rows (self ,search_text ):
+        """Filters and groups the posts into list rows. Runs on the row filter's thread."""
+        search_text =search_text .lower ().strip ()
+        if search_text :
+            posts =[
+            post for post in self .all_fetched_posts 
+            if search_text in post .get ('title','').lower ()
+            or search_text in post .get ('creator_name_resolved','').lower ()
+            or search_text in post .get ('creator_id','').lower ()
+            or search_text in post ['service'].lower ()
+            ]
+        else :
+            posts =self .all_fetched_posts 
+
+        rows =[]
+        for (service ,creator_id_val ),group_posts in self ._group_posts (posts ).items ():
+            creator_name_display =self .creator_name_cache .get ((service .lower (),str (creator_id_val )),str (creator_id_val ))
+            rows .append ((ROW_HEADER ,f"🎨 {creator_name_display } ({service .capitalize ()} / {creator_id_val })"))
+            for post_data in group_posts :
+                post_key =self ._post_key (post_data )
+                # The post dicts are shared with the GUI thread's model, so the suffix is kept beside them.
+                if post_key not in self .known_name_suffixes :
+                    found_known_name_primary =self ._find_best_known_name_match_in_title (post_data .get ('title','Untitled Post'))
+                    self .known_name_suffixes [post_key ]=f" [Known - {found_known_name_primary }]"if found_known_name_primary else ""
+                rows .append ((ROW_ITEM ,post_data ))
+        return rows 
+
+    def _populate_post_list_widget (self ):
+        """Rebuilds the list for the current search text on the row filter's thread."""
+        self .row_filter .request (self .search_input .text (),immediate =True )
+
+    def _handle_post_rows_ready (self ,rows ):
+        self .post_list_model .set_rows (rows )
+
+    def _handle_post_rows_failed (self ,error_message ):
+        self .status_label .setText (self ._tr ("fav_posts_display_error_status","Error displaying posts: {error}").format (error =error_message .splitlines ()[0 ]))
+        self ._logger (f"Error during _populate_post_list_widget: {error_message }")
+        QMessageBox .critical (self ,self ._tr ("fav_posts_ui_error_title","UI Error"),self ._tr ("fav_posts_ui_error_message","Could not display favorite posts: {error}").format (error =error_message .splitlines ()[0 ]))
+        self .download_button .setEnabled (False )
 
-        self ._populate_post_list_widget (filtered_posts_to_group )
+    def _filter_post_list_display (self ):
+        self .row_filter .request (self .search_input .text ())
 
     def _select_all_items (self ):
-        for i in range (self .post_list_widget .count ()):
-            item =self .post_list_widget .item (i )
-            if item and item .flags ()&Qt .ItemIsUserCheckable :
-                item .setCheckState (Qt .Checked )
+        self .post_list_model .set_visible_checked (True )
 
     def _deselect_all_items (self ):
-        for i in range (self .post_list_widget .count ()):
-            item =self .post_list_widget .item (i )
-            if item and item .flags ()&Qt .ItemIsUserCheckable :
-                item .setCheckState (Qt .Unchecked )
+        self .post_list_model .set_visible_checked (False )
 
     def _accept_selection_action (self ):
-        self .selected_posts_data =[]
-        for i in range (self .post_list_widget .count ()):
-            item =self .post_list_widget .item (i )
-            if item and item .checkState ()==Qt .Checked :
-                post_data_for_download =item .data (Qt .UserRole )
-                self .selected_posts_data .append (post_data_for_download )
+        self .selected_posts_data =[
+        post_data 
+        for group_posts in self ._group_posts (self .all_fetched_posts ).values ()
+        for post_data in group_posts 
+        if self .post_list_model .is_checked (post_data )
+        ]
 
         if not self .selected_posts_data :
             QMessageBox .information (self ,self ._tr ("fav_posts_no_selection_title","No Selection"),self ._tr ("fav_posts_no_selection_message","Please select at least one post to download."))
             return 
         self .accept ()
 
+    def done (self ,result ):
+        """Stops the row filter's thread before the dialog closes."""
+        self .row_filter .stop ()
+        super ().done (result )
+
     def get_selected_posts (self ):
         return self .selected_posts_data 
\ No newline at end of file
@@ -7,7 +7,7 @@ import sys
 from PyQt5.QtCore import Qt, QStandardPaths
 from PyQt5.QtWidgets import (
     QApplication, QDialog, QHBoxLayout, QLabel, QPushButton, QVBoxLayout,
-    QGroupBox, QComboBox, QMessageBox, QGridLayout, QCheckBox
+    QGroupBox, QComboBox, QMessageBox, QGridLayout, QCheckBox, QSpinBox
 )
 
 # --- Local Application Imports ---
@@ -18,7 +18,10 @@ from ...config.constants import (
     THEME_KEY, LANGUAGE_KEY, DOWNLOAD_LOCATION_KEY,
     RESOLUTION_KEY, UI_SCALE_KEY, SAVE_CREATOR_JSON_KEY,
     COOKIE_TEXT_KEY, USE_COOKIE_KEY,
-    FETCH_FIRST_KEY
+    FETCH_FIRST_KEY, ASYNC_ENGINE_KEY, TRANSFER_PRIORITY_KEY,
+    TRANSFER_PRIORITY_POST_ORDER, TRANSFER_PRIORITY_SMALLEST_FIRST,
+    IMAGE_COMPRESSION_FORMAT_KEY, IMAGE_COMPRESSION_QUALITY_KEY, IMAGE_COMPRESSION_FORMATS,
+    IMAGE_COMPRESSION_DEFAULT_FORMAT, IMAGE_COMPRESSION_DEFAULT_QUALITY
 )
 from ...services.updater import UpdateChecker, UpdateDownloader
 
@@ -99,6 +102,28 @@ class FutureSettingsDialog(QDialog):
         self.fetch_first_checkbox.stateChanged.connect(self._fetch_first_setting_changed)
         download_window_layout.addWidget(self.fetch_first_checkbox, 3, 0, 1, 2)
 
+        self.async_engine_checkbox = QCheckBox()
+        self.async_engine_checkbox.stateChanged.connect(self._async_engine_setting_changed)
+        download_window_layout.addWidget(self.async_engine_checkbox, 4, 0, 1, 2)
+
+        self.smallest_first_checkbox = QCheckBox()
+        self.smallest_first_checkbox.stateChanged.connect(self._transfer_priority_setting_changed)
+        download_window_layout.addWidget(self.smallest_first_checkbox, 5, 0, 1, 2)
+
+        self.compression_label = QLabel()
+        compression_layout = QHBoxLayout()
+        self.compression_format_combo_box = QComboBox()
+        for image_format, extension in IMAGE_COMPRESSION_FORMATS.items():
+            self.compression_format_combo_box.addItem(extension.lstrip('.').upper(), image_format)
+        self.compression_format_combo_box.currentIndexChanged.connect(self._compression_setting_changed)
+        self.compression_quality_spin_box = QSpinBox()
+        self.compression_quality_spin_box.setRange(1, 100)
+        self.compression_quality_spin_box.valueChanged.connect(self._compression_setting_changed)
+        compression_layout.addWidget(self.compression_format_combo_box)
+        compression_layout.addWidget(self.compression_quality_spin_box)
+        download_window_layout.addWidget(self.compression_label, 6, 0)
+        download_window_layout.addLayout(compression_layout, 6, 1)
+
         main_layout.addWidget(self.download_window_group_box)
 
         # --- NEW: Update Section ---
@@ -132,6 +157,13 @@ class FutureSettingsDialog(QDialog):
         self.save_creator_json_checkbox.setText(self._tr("save_creator_json_label", "Save Creator.json file"))
         self.fetch_first_checkbox.setText(self._tr("fetch_first_label", "Fetch First (Download after all pages are found)"))
         self.fetch_first_checkbox.setToolTip(self._tr("fetch_first_tooltip", "If checked, the downloader will find all posts from a creator first before starting any downloads.\nThis can be slower to start but provides a more accurate progress bar."))
+        self.async_engine_checkbox.setText(self._tr("async_engine_label", "Use Async Download Engine (fewer threads on large runs)"))
+        self.async_engine_checkbox.setToolTip(self._tr("async_engine_tooltip", "If checked, multi-threaded downloads run posts as asyncio tasks that share one pool of file transfers,\ninstead of one thread per post plus a file pool per post. Takes effect on the next download."))
+        self.smallest_first_checkbox.setText(self._tr("smallest_first_label", "Download smallest files first (when sizes are known)"))
+        self.smallest_first_checkbox.setToolTip(self._tr("smallest_first_tooltip", "If unchecked, queued files are downloaded in post order."))
+        self.compression_label.setText(self._tr("compression_settings_label", "Image Compression:"))
+        self.compression_quality_spin_box.setPrefix(self._tr("compression_quality_prefix", "Quality: "))
+        self.compression_format_combo_box.setToolTip(self._tr("compression_format_tooltip", "Format large images are converted to when 'Compress Images' is checked. Takes effect on the next download."))
         self._update_theme_toggle_button_text()
         self.save_path_button.setText(self._tr("settings_save_cookie_path_button", "Save Cookie + Download Path"))
         self.save_path_button.setToolTip(self._tr("settings_save_cookie_path_tooltip", "Save the current 'Download Location' and Cookie settings for future sessions."))
@@ -201,6 +233,26 @@ class FutureSettingsDialog(QDialog):
         self.fetch_first_checkbox.setChecked(should_fetch_first)
         self.fetch_first_checkbox.blockSignals(False)
 
+        self.async_engine_checkbox.blockSignals(True)
+        use_async_engine = self.parent_app.settings.value(ASYNC_ENGINE_KEY, False, type=bool)
+        self.async_engine_checkbox.setChecked(use_async_engine)
+        self.async_engine_checkbox.blockSignals(False)
+
+        self.smallest_first_checkbox.blockSignals(True)
+        transfer_priority = self.parent_app.settings.value(TRANSFER_PRIORITY_KEY, TRANSFER_PRIORITY_POST_ORDER, type=str)
+        self.smallest_first_checkbox.setChecked(transfer_priority == TRANSFER_PRIORITY_SMALLEST_FIRST)
+        self.smallest_first_checkbox.blockSignals(False)
+
+        self.compression_format_combo_box.blockSignals(True)
+        self.compression_quality_spin_box.blockSignals(True)
+        image_format = self.parent_app.settings.value(IMAGE_COMPRESSION_FORMAT_KEY, IMAGE_COMPRESSION_DEFAULT_FORMAT, type=str)
+        format_index = self.compression_format_combo_box.findData(image_format)
+        self.compression_format_combo_box.setCurrentIndex(max(0, format_index))
+        quality = self.parent_app.settings.value(IMAGE_COMPRESSION_QUALITY_KEY, IMAGE_COMPRESSION_DEFAULT_QUALITY, type=int)
+        self.compression_quality_spin_box.setValue(quality)
+        self.compression_format_combo_box.blockSignals(False)
+        self.compression_quality_spin_box.blockSignals(False)
+
     def _creator_json_setting_changed(self, state):
         is_checked = state == Qt.Checked
         self.parent_app.settings.setValue(SAVE_CREATOR_JSON_KEY, is_checked)
@@ -211,6 +263,21 @@ class FutureSettingsDialog(QDialog):
         self.parent_app.settings.setValue(FETCH_FIRST_KEY, is_checked)
         self.parent_app.settings.sync()
 
+    def _async_engine_setting_changed(self, state):
+        is_checked = state == Qt.Checked
+        self.parent_app.settings.setValue(ASYNC_ENGINE_KEY, is_checked)
+        self.parent_app.settings.sync()
+
+    def _transfer_priority_setting_changed(self, state):
+        priority = TRANSFER_PRIORITY_SMALLEST_FIRST if state == Qt.Checked else TRANSFER_PRIORITY_POST_ORDER
+        self.parent_app.settings.setValue(TRANSFER_PRIORITY_KEY, priority)
+        self.parent_app.settings.sync()
+
+    def _compression_setting_changed(self, _=None):
+        self.parent_app.settings.setValue(IMAGE_COMPRESSION_FORMAT_KEY, self.compression_format_combo_box.currentData())
+        self.parent_app.settings.setValue(IMAGE_COMPRESSION_QUALITY_KEY, self.compression_quality_spin_box.value())
+        self.parent_app.settings.sync()
+
     def _tr(self, key, default_text=""):
         if callable(get_translation) and self.parent_app:
             return get_translation(self.parent_app.current_selected_language, key, default_text)
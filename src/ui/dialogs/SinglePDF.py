@@ -1,3 +1,4 @@
+import itertools
 import os
 import re
 try:
@@ -34,12 +35,18 @@ def strip_html_tags(text):
 def create_single_pdf_from_content(posts_data, output_filename, font_path, logger=print):
     """
     Creates a single, continuous PDF, correctly formatting both descriptions and comments.
+
+    `posts_data` may be a list or any iterable, such as the records streamed
+    from the single-PDF spool; posts are rendered one at a time as they
+    arrive, so the full set of posts is never held in memory.
     """
     if not FPDF_AVAILABLE:
         logger("❌ PDF Creation failed: 'fpdf2' library is not installed. Please run: pip install fpdf2")
         return False
 
-    if not posts_data:
+    posts_iter = iter(posts_data)
+    first_post = next(posts_iter, None)
+    if first_post is None:
         logger("   No text content was collected to create a PDF.")
         return False
 
@@ -62,9 +69,11 @@ def create_single_pdf_from_content(posts_data, output_filename, font_path, logge
     
     pdf.add_page()
 
-    logger(f"   Starting continuous PDF creation with content from {len(posts_data)} posts...")
+    logger("   Starting continuous PDF creation...")
 
-    for i, post in enumerate(posts_data):
+    post_count = 0
+    for i, post in enumerate(itertools.chain((first_post,), posts_iter)):
+        post_count += 1
         if i > 0:
             if 'content' in post:
                 pdf.add_page()
@@ -107,7 +116,7 @@ def create_single_pdf_from_content(posts_data, output_filename, font_path, logge
     
     try:
         pdf.output(output_filename)
-        logger(f"✅ Successfully created single PDF: '{os.path.basename(output_filename)}'")
+        logger(f"✅ Successfully created single PDF: '{os.path.basename(output_filename)}' ({post_count} posts)")
         return True
     except Exception as e:
         logger(f"❌ A critical error occurred while saving the final PDF: {e}")
@@ -0,0 +1,191 @@
+# --- Standard Library Imports ---
+import queue
+import traceback
+
+# --- PyQt5 Imports ---
+from PyQt5.QtCore import pyqtSignal, QAbstractListModel, QModelIndex, QObject, QThread, QTimer, Qt
+from PyQt5.QtGui import QColor
+from PyQt5.QtWidgets import QApplication
+
+# --- Module Constants ---
+ROW_HEADER = "header"
+ROW_ITEM = "item"
+FILTER_DEBOUNCE_MS = 150
+
+
+class CheckableRowsModel(QAbstractListModel):
+    """
+    A virtual, checkable list for the favorites dialogs.
+
+    Rows are (ROW_HEADER, text) or (ROW_ITEM, entry) tuples and are only
+    formatted when the view paints them. Check states are stored by entry
+    key, not by row, so they survive a new filter.
+
+    Args:
+        key_func (callable): Returns the hashable identity of an entry.
+        text_func (callable): Returns the display text of an entry.
+    """
+    check_state_changed = pyqtSignal()
+
+    def __init__(self, key_func, text_func, parent=None):
+        super().__init__(parent)
+        self.key_func = key_func
+        self.text_func = text_func
+        self.rows = []
+        self.checked_keys = set()
+        self._header_font = None
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self.rows = rows
+        self.endResetModel()
+
+    def is_checked(self, entry):
+        return self.key_func(entry) in self.checked_keys
+
+    def set_visible_checked(self, checked):
+        """Checks or unchecks every entry currently shown, like Select All / Deselect All did on the old list."""
+        for kind, payload in self.rows:
+            if kind != ROW_ITEM:
+                continue
+            if checked:
+                self.checked_keys.add(self.key_func(payload))
+            else:
+                self.checked_keys.discard(self.key_func(payload))
+        if self.rows:
+            self.dataChanged.emit(self.index(0), self.index(len(self.rows) - 1), [Qt.CheckStateRole])
+        self.check_state_changed.emit()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        kind, payload = self.rows[index.row()]
+        if kind == ROW_HEADER:
+            if role == Qt.DisplayRole:
+                return payload
+            if role == Qt.FontRole:
+                if self._header_font is None:
+                    self._header_font = QApplication.font()
+                    self._header_font.setBold(True)
+                    self._header_font.setPointSize(self._header_font.pointSize() + 1)
+                return self._header_font
+            if role == Qt.ForegroundRole:
+                return QColor(Qt.cyan)
+            return None
+        if role == Qt.DisplayRole:
+            return self.text_func(payload)
+        if role == Qt.CheckStateRole:
+            return Qt.Checked if self.is_checked(payload) else Qt.Unchecked
+        if role == Qt.UserRole:
+            return payload
+        return None
+
+    def flags(self, index):
+        if not index.isValid() or self.rows[index.row()][0] == ROW_HEADER:
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.CheckStateRole or not index.isValid():
+            return False
+        kind, payload = self.rows[index.row()]
+        if kind != ROW_ITEM:
+            return False
+        if value == Qt.Checked:
+            self.checked_keys.add(self.key_func(payload))
+        else:
+            self.checked_keys.discard(self.key_func(payload))
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        self.check_state_changed.emit()
+        return True
+
+
+class _RowBuilderThread(QThread):
+    """Runs a dialog's row builder for the newest pending search text only."""
+    rows_built = pyqtSignal(int, object)
+    build_failed = pyqtSignal(int, str)
+
+    def __init__(self, build_rows):
+        super().__init__()
+        self.build_rows = build_rows
+        self.requests = queue.Queue()
+
+    def request(self, request_id, search_text):
+        self.requests.put((request_id, search_text))
+
+    def stop(self):
+        self.requests.put(None)
+
+    def run(self):
+        while True:
+            request = self.requests.get()
+            while request is not None:
+                try:
+                    request = self.requests.get_nowait()
+                except queue.Empty:
+                    break
+            if request is None:
+                return
+            request_id, search_text = request
+            try:
+                self.rows_built.emit(request_id, self.build_rows(search_text))
+            except Exception as e:
+                self.build_failed.emit(request_id, f"{e}\n{traceback.format_exc(limit=3)}")
+
+
+class BackgroundRowFilter(QObject):
+    """
+    Debounced filtering off the GUI thread.
+
+    `build_rows(search_text)` runs on a worker thread and returns the rows
+    for a CheckableRowsModel. Only the answer to the latest request is
+    passed on through `rows_ready`; answers to text the user has already
+    changed are dropped.
+    """
+    rows_ready = pyqtSignal(object)
+    build_failed = pyqtSignal(str)
+
+    def __init__(self, build_rows, parent=None):
+        super().__init__(parent)
+        self.request_id = 0
+        self.search_text = ""
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(FILTER_DEBOUNCE_MS)
+        self.debounce_timer.timeout.connect(self._submit)
+        self.builder_thread = _RowBuilderThread(build_rows)
+        self.builder_thread.rows_built.connect(self._handle_rows_built)
+        self.builder_thread.build_failed.connect(self._handle_build_failed)
+
+    def request(self, search_text, immediate=False):
+        """Asks for rows matching the text, after the debounce delay unless `immediate`."""
+        self.search_text = search_text
+        if immediate:
+            self.debounce_timer.stop()
+            self._submit()
+        else:
+            self.debounce_timer.start()
+
+    def _submit(self):
+        self.request_id += 1
+        if not self.builder_thread.isRunning():
+            self.builder_thread.start()
+        self.builder_thread.request(self.request_id, self.search_text)
+
+    def _handle_rows_built(self, request_id, rows):
+        if request_id == self.request_id:
+            self.rows_ready.emit(rows)
+
+    def _handle_build_failed(self, request_id, error_message):
+        if request_id == self.request_id:
+            self.build_failed.emit(error_message)
+
+    def stop(self):
+        """Stops the worker thread; call before the dialog closes."""
+        self.debounce_timer.stop()
+        if self.builder_thread.isRunning():
+            self.builder_thread.stop()
+            self.builder_thread.wait()
@@ -0,0 +1,137 @@
+# --- PyQt5 Imports ---
+from PyQt5.QtCore import QTimer
+from PyQt5.QtGui import QTextBlockFormat, QTextCharFormat, QTextCursor
+from PyQt5.QtWidgets import QTextEdit
+
+# --- Local Application Imports ---
+from ..config.constants import LOG_RENDER_INTERVAL_MS, LOG_VIEW_MAX_BLOCKS
+from ..utils.log_sink import LEVEL_ERROR, LEVEL_SUCCESS, LEVEL_WARNING
+
+# --- Module Constants ---
+# (label, levels shown or None for all) for the log's level filter box.
+LOG_FILTER_CHOICES = (
+    ("All", None),
+    ("Errors", {LEVEL_ERROR}),
+    ("Warnings & Errors", {LEVEL_WARNING, LEVEL_ERROR}),
+    ("Successes", {LEVEL_SUCCESS}),
+)
+
+
+class LogView(QTextEdit):
+    """
+    The main log widget, fed from a LogSink and rendered in bulk.
+
+    New lines are queued and drawn at most every LOG_RENDER_INTERVAL_MS in a
+    single edit, with one scroll adjustment, instead of once per line. The
+    document keeps at most LOG_VIEW_MAX_BLOCKS lines, dropping the oldest;
+    the sink's ring buffer and log file hold the rest. `set_filter` redraws
+    from the ring buffer only the newest lines that match, so filtering
+    costs the same however long the session has run.
+
+    It stays a QTextEdit rather than a QPlainTextEdit because the links view
+    renders HTML titles and separators. `append` and `clear` keep working for
+    existing callers, and go through the same queue so lines stay in order.
+
+    Args:
+        log_sink (LogSink): Where lines are recorded before being shown.
+    """
+
+    def __init__(self, log_sink, parent=None):
+        super().__init__(parent)
+        self.log_sink = log_sink
+        self.pending_records = []
+        self.filter_levels = None
+        self.filter_text = ""
+        self.setReadOnly(True)
+        self.setLineWrapMode(QTextEdit.NoWrap)
+        self.document().setMaximumBlockCount(LOG_VIEW_MAX_BLOCKS)
+        self.render_timer = QTimer(self)
+        self.render_timer.setSingleShot(True)
+        self.render_timer.setInterval(LOG_RENDER_INTERVAL_MS)
+        self.render_timer.timeout.connect(self.flush)
+
+    def append_messages(self, messages, is_html=False):
+        """
+        Records lines in the sink and schedules them to be drawn.
+
+        Args:
+            messages (list): The lines, without any HTML marker prefix.
+            is_html (bool): Whether the lines are HTML fragments.
+        """
+        if not messages:
+            return
+        for record in self.log_sink.write(messages, is_html):
+            if record.matches(self.filter_levels, self.filter_text):
+                self.pending_records.append(record)
+        if self.pending_records and not self.render_timer.isActive():
+            self.render_timer.start()
+
+    def append(self, text):
+        self.append_messages([text])
+
+    def clear(self):
+        self.render_timer.stop()
+        self.pending_records.clear()
+        self.log_sink.mark_view_cleared()
+        super().clear()
+
+    def set_filter(self, levels=None, text=""):
+        """
+        Shows only lines of the given levels that contain the given text.
+
+        Args:
+            levels (set or None): The levels to show, or None for all.
+            text (str): Text the lines must contain (case-insensitive), or "" for any.
+        """
+        self.filter_levels = set(levels) if levels is not None else None
+        self.filter_text = (text or "").strip().lower()
+        matching = [
+            record for record in self.log_sink.records_since_clear()
+            if record.matches(self.filter_levels, self.filter_text)
+        ]
+        self.render_timer.stop()
+        self.pending_records = matching[-LOG_VIEW_MAX_BLOCKS:]
+        super().clear()
+        self.flush()
+
+    def flush(self):
+        """Draws every pending line now, in one edit."""
+        self.render_timer.stop()
+        if not self.pending_records:
+            return
+        records = self.pending_records
+        self.pending_records = []
+
+        scrollbar = self.verticalScrollBar()
+        was_at_bottom = scrollbar.value() >= scrollbar.maximum() - 30
+        document = self.document()
+        cursor = QTextCursor(document)
+        cursor.movePosition(QTextCursor.End)
+        cursor.beginEditBlock()
+        needs_new_block = not document.isEmpty()
+        plain_run = []
+
+        def write_plain_run():
+            nonlocal needs_new_block
+            if not plain_run:
+                return
+            if needs_new_block:
+                cursor.insertBlock(QTextBlockFormat(), QTextCharFormat())
+            cursor.insertText("\n".join(plain_run))
+            plain_run.clear()
+            needs_new_block = True
+
+        for record in records:
+            if not record.is_html:
+                plain_run.append(record.text)
+                continue
+            write_plain_run()
+            if needs_new_block:
+                cursor.insertBlock(QTextBlockFormat(), QTextCharFormat())
+            cursor.insertHtml(record.text)
+            needs_new_block = True
+        write_plain_run()
+        cursor.endEditBlock()
+
+        if was_at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
@@ -1,7 +1,6 @@
 import sys
 import os
 import time
-import queue
 import traceback
 import html
 import http
@@ -35,16 +34,28 @@ from ..core.workers import DownloadThread as BackendDownloadThread
 from ..core.workers import PostProcessorWorker  
 from ..core.workers import PostProcessorSignals
 from ..core.api_client import download_from_api
+from ..core.gui_event_bus import LOG_BATCH_EVENT, GuiEventBus
+from ..core.post_enricher import PostEnricher
 from ..core.discord_client import fetch_server_channels, fetch_channel_messages 
 from ..core.manager import DownloadManager
 from ..core.nhentai_client import fetch_nhentai_gallery
 from ..core.bunkr_client import fetch_bunkr_data
 from ..core.saint2_client import fetch_saint2_data 
 from ..core.erome_client import fetch_erome_data
+from ..core.async_engine import AsyncDownloadEngine
+from ..core.transfer_scheduler import configure_transfer_scheduler
+from ..core.image_transcoder import configure_image_transcoder, shutdown_image_transcoder
 from .assets import get_app_icon_object
+from .log_view import LOG_FILTER_CHOICES, LogView
 from ..config.constants import *
+from ..utils.creator_index import CreatorNameLookup, get_creator_index
+from ..utils.creator_profile_store import get_creator_profile_store
 from ..utils.file_utils import KNOWN_NAMES, clean_folder_name
+from ..utils.log_sink import LogSink
+from ..utils.pdf_spool import iter_pdf_spool_records, remove_pdf_spool
 from ..utils.network_utils import extract_post_info, prepare_cookies_for_request
+from ..utils.session_pool import close_all_sessions, set_pool_size
+from ..utils.session_store import get_session_store
 from ..utils.resolution import setup_ui
 from ..utils.resolution import get_dark_theme
 from ..i18n.translator import get_translation
@@ -135,13 +146,15 @@ class DownloaderApp (QWidget ):
         os.makedirs(user_data_path, exist_ok=True) 
 
         self.config_file = os.path.join(user_data_path, "Known.txt")
-        self.session_file_path = os.path.join(user_data_path, "session.json")
+        self.session_file_path = os.path.join(user_data_path, "session.db")
+        self.legacy_session_file_path = os.path.join(user_data_path, "session.json")
+        self.session_store = get_session_store(self.session_file_path)
+        self.log_sink = LogSink(os.path.join(user_data_path, "logs", LOG_FILE_NAME))
         self.persistent_history_file = os.path.join(user_data_path, "download_history.json")
 
         self.download_thread = None
         self.thread_pool = None
         self.cancellation_event = threading.Event()
-        self.session_lock = threading.Lock()
         self.interrupted_session_data = None
         self.is_restore_pending = False
         self.external_link_download_thread = None
@@ -174,7 +187,7 @@ class DownloaderApp (QWidget ):
         self.selected_cookie_filepath = None
         self.retryable_failed_files_info = []
         self.is_paused = False
-        self.worker_to_gui_queue = queue.Queue()
+        self.worker_to_gui_queue = GuiEventBus()
         self.gui_update_timer = QTimer(self)
         self.actual_gui_signals = PostProcessorSignals()
         self.worker_signals = PostProcessorSignals()
@@ -336,44 +349,23 @@ class DownloaderApp (QWidget ):
         if msg_box.clickedButton() == restart_button:
             self._request_restart_application()
 
+    def _get_creator_profile_store(self, session_file_path):
+        """Returns the shared profile store for the creator_profiles folder next to the session file."""
+        appdata_dir = os.path.dirname(session_file_path)
+        return get_creator_profile_store(os.path.join(appdata_dir, "creator_profiles"), logger=self.log_signal.emit)
+
     def _setup_creator_profile(self, creator_name, session_file_path):
-        """Prepares the path and loads data for the current creator's profile."""
+        """Loads the current creator's profile (read from disk once, then served from memory)."""
         if not creator_name:
             self.log_signal.emit("⚠️ Cannot create creator profile: Name not provided.")
             return {}
-
-        appdata_dir = os.path.dirname(session_file_path)
-        creator_profiles_dir = os.path.join(appdata_dir, "creator_profiles")
-        os.makedirs(creator_profiles_dir, exist_ok=True)
-
-        safe_filename = clean_folder_name(creator_name) + ".json"
-        profile_path = os.path.join(creator_profiles_dir, safe_filename)
-
-        if os.path.exists(profile_path):
-            try:
-                with open(profile_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, OSError) as e:
-                self.log_signal.emit(f"❌ Error loading creator profile '{safe_filename}': {e}. Starting fresh.")
-        return {}
+        return self._get_creator_profile_store(session_file_path).load(creator_name)
 
     def _save_creator_profile(self, creator_name, data, session_file_path):
-        """Saves the provided data to the current creator's profile file."""
+        """Saves the provided data to the current creator's profile; the file is written in the background."""
         if not creator_name:
             return
-        
-        appdata_dir = os.path.dirname(session_file_path)
-        creator_profiles_dir = os.path.join(appdata_dir, "creator_profiles")
-        safe_filename = clean_folder_name(creator_name) + ".json"
-        profile_path = os.path.join(creator_profiles_dir, safe_filename)
-
-        try:
-            temp_path = profile_path + ".tmp"
-            with open(temp_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
-            os.replace(temp_path, profile_path)
-        except OSError as e:
-            self.log_signal.emit(f"❌ Error saving creator profile to '{profile_path}': {e}")
+        self._get_creator_profile_store(session_file_path).save(creator_name, data)
 
     def _create_initial_session_file(self, api_url_for_session, override_output_dir_for_session, remaining_queue=None):
         """Creates the initial session file at the start of a new download."""
@@ -386,21 +378,16 @@ class DownloaderApp (QWidget ):
             output_dir_override=override_output_dir_for_session
         )
 
-        session_data = {
-            "ui_settings": initial_ui_settings,
-            "download_state": {
-                "processed_post_ids": [],
-                "permanently_failed_files": [],
-                "successfully_downloaded_hashes": [], 
-                "last_processed_offset": 0,  
-                "manga_counters": {
-                    "date_based": 1,
-                    "global_numbering": 1
-                }
-            },
-            "remaining_queue": list(remaining_queue) if remaining_queue else []
-        }    
-        self._save_session_file(session_data)
+        try:
+            self.session_store.create(
+                initial_ui_settings,
+                remaining_queue=remaining_queue,
+                manga_counters={"date_based": 1, "global_numbering": 1}
+            )
+            with self.downloaded_file_hashes_lock:
+                self.session_store.add_downloaded_hashes(self.downloaded_file_hashes)
+        except Exception as e:
+            self.log_signal.emit(f"❌ Failed to save session state: {e}")
 
     def get_checkbox_map(self):
         """Returns a mapping of checkbox attribute names to their corresponding settings key."""
@@ -478,14 +465,20 @@ class DownloaderApp (QWidget ):
             self .log_signal .emit (f"⚠️ Found saved download location '{saved_location }', but it's not a valid directory. Ignoring.")
 
     def _check_for_interrupted_session(self):
-        """Checks for an incomplete session file on startup and prepares the UI for restore if found."""
-        if os.path.exists(self.session_file_path):
+        """Checks for an incomplete session on startup and prepares the UI for restore if found."""
+        if os.path.exists(self.legacy_session_file_path):
             try:
-                with open(self.session_file_path, 'r', encoding='utf-8') as f:
-                    session_data = json.load(f)
-                
-                if "ui_settings" not in session_data or "download_state" not in session_data:
-                    raise ValueError("Invalid session file structure.")
+                self.session_store.import_legacy_json(self.legacy_session_file_path)
+                self.log_signal.emit("ℹ️ Converted old session.json to the session database.")
+            except Exception as e:
+                self.log_signal.emit(f"❌ Error reading old session file: {e}. Deleting corrupt session file.")
+                try:
+                    os.remove(self.legacy_session_file_path)
+                except OSError:
+                    pass
+        if self.session_store.exists():
+            try:
+                session_data = self.session_store.load_session_info()
 
                 failed_files_from_session = session_data.get('download_state', {}).get('permanently_failed_files', [])
                 if failed_files_from_session:
@@ -504,8 +497,8 @@ class DownloaderApp (QWidget ):
                 self._prepare_ui_for_restore()
 
             except Exception as e:
-                self.log_signal.emit(f"❌ Error reading session file: {e}. Deleting corrupt session file.")
-                os.remove(self.session_file_path)
+                self.log_signal.emit(f"❌ Error reading session data: {e}. Discarding the interrupted session.")
+                self.session_store.clear()
                 self.interrupted_session_data = None
                 self.is_restore_pending = False
 
@@ -530,31 +523,13 @@ class DownloaderApp (QWidget ):
         self.reset_application_state()
 
     def _clear_session_file(self):
-        """Safely deletes the session file."""
-        if os.path.exists(self.session_file_path):
-            try:
-                os.remove(self.session_file_path)
-                self.log_signal.emit("ℹ️ Interrupted session file cleared.")
-            except Exception as e:
-                self.log_signal.emit(f"❌ Failed to clear session file: {e}")
-
-    def _save_session_file(self, session_data):
-        """Safely saves the session data to the session file using an atomic write pattern."""
-        temp_session_file_path = self.session_file_path + ".tmp"
+        """Safely deletes the stored session."""
         try:
-            if 'download_state' in session_data:
-                with self.downloaded_file_hashes_lock:
-                    session_data['download_state']['successfully_downloaded_hashes'] = list(self.downloaded_file_hashes)
-            with open(temp_session_file_path, 'w', encoding='utf-8') as f:
-                json.dump(session_data, f, indent=2)
-            os.replace(temp_session_file_path, self.session_file_path)
+            if self.session_store.exists():
+                self.session_store.clear()
+                self.log_signal.emit("ℹ️ Interrupted session file cleared.")
         except Exception as e:
-            self.log_signal.emit(f"❌ Failed to save session state: {e}")
-            if os.path.exists(temp_session_file_path):
-                try:
-                    os.remove(temp_session_file_path)
-                except Exception as e_rem:
-                    self.log_signal.emit(f"❌ Failed to remove temp session file: {e_rem}")
+            self.log_signal.emit(f"❌ Failed to clear session file: {e}")
 
     def _update_button_states_and_connections(self):
         try:
@@ -741,7 +716,7 @@ class DownloaderApp (QWidget ):
         args_template['fetch_first'] = False
 
         num_threads = int(self.thread_count_input.text()) if self.use_multithreading_checkbox.isChecked() else 1
-        self.thread_pool = ThreadPoolExecutor(max_workers=num_threads, thread_name_prefix='PostWorker_')
+        self.thread_pool = self._create_post_worker_pool(num_threads, 1, 'PostWorker_')
 
         self.total_posts_to_process = len(self.fetched_posts_for_download)
         self.processed_posts_count = 0
@@ -984,6 +959,15 @@ class DownloaderApp (QWidget ):
         if hasattr (self ,'log_display_mode_toggle_button'):
             self .log_display_mode_toggle_button .clicked .connect (self ._toggle_log_display_mode )
 
+        self.log_filter_timer = QTimer(self)
+        self.log_filter_timer.setSingleShot(True)
+        self.log_filter_timer.setInterval(250)
+        self.log_filter_timer.timeout.connect(self._apply_log_filter)
+        if hasattr(self, 'log_level_filter_combo'):
+            self.log_level_filter_combo.currentIndexChanged.connect(self._apply_log_filter)
+        if hasattr(self, 'log_text_filter_input'):
+            self.log_text_filter_input.textChanged.connect(self.log_filter_timer.start)
+
         if self .manga_rename_toggle_button :self .manga_rename_toggle_button .clicked .connect (self ._toggle_manga_filename_style )
 
         if hasattr (self ,'link_input'):
@@ -1081,41 +1065,38 @@ class DownloaderApp (QWidget ):
         return parsed_character_filter_objects 
 
     def _process_worker_queue (self ):
-        """Processes messages from the worker queue and emits Qt signals from the GUI thread."""
-        while not self .worker_to_gui_queue .empty ():
+        """Drains the worker event bus once per timer tick and dispatches the events on the GUI thread."""
+        events ,latest_events =self .worker_to_gui_queue .drain ()
+        for item in events +latest_events :
             try :
-                item =self .worker_to_gui_queue .get_nowait ()
-                signal_type =item .get ('type')
-                payload =item .get ('payload',tuple ())
-
-                if signal_type =='progress':
-                    self .actual_gui_signals .progress_signal .emit (*payload )
-                elif signal_type =='file_download_status':
-                    self .actual_gui_signals .file_download_status_signal .emit (*payload )
-                elif signal_type =='external_link':
-                    self .actual_gui_signals .external_link_signal .emit (*payload )
-                elif signal_type =='file_progress':
-                    self .actual_gui_signals .file_progress_signal .emit (*payload )
-                elif signal_type =='missed_character_post':
-                    self .actual_gui_signals .missed_character_post_signal .emit (*payload )
-                elif signal_type =='file_successfully_downloaded':
-                    self ._handle_actual_file_downloaded (payload [0 ]if payload else {})
-                elif signal_type =='file_successfully_downloaded':
-                    self ._handle_file_successfully_downloaded (payload [0 ])
-                elif signal_type == 'worker_finished':
-                    self.actual_gui_signals.worker_finished_signal.emit(payload[0] if payload else tuple())
-                elif signal_type == 'set_progress_label' and self.progress_label:
-                    self.progress_label.setText(payload[0] if payload else "")
-                elif signal_type == 'set_ui_enabled':
-                    self.set_ui_enabled(payload[0] if payload else True)
-                else:
-                    self .log_signal .emit (f"⚠️ Unknown signal type from worker queue: {signal_type }")
-                self .worker_to_gui_queue .task_done ()
-            except queue .Empty :
-                break 
+                self ._dispatch_worker_event (item .get ('type'),item .get ('payload',tuple ()))
             except Exception as e :
                 self .log_signal .emit (f"❌ Error processing worker queue: {e }")
 
+    def _dispatch_worker_event (self ,signal_type ,payload ):
+        if signal_type ==LOG_BATCH_EVENT :
+            self .handle_main_log_batch (payload [0 ]if payload else [])
+        elif signal_type =='progress':
+            self .actual_gui_signals .progress_signal .emit (*payload )
+        elif signal_type =='file_download_status':
+            self .actual_gui_signals .file_download_status_signal .emit (*payload )
+        elif signal_type =='external_link':
+            self .actual_gui_signals .external_link_signal .emit (*payload )
+        elif signal_type =='file_progress':
+            self .actual_gui_signals .file_progress_signal .emit (*payload )
+        elif signal_type =='missed_character_post':
+            self .actual_gui_signals .missed_character_post_signal .emit (*payload )
+        elif signal_type =='file_successfully_downloaded':
+            self ._handle_actual_file_downloaded (payload [0 ]if payload else {})
+        elif signal_type == 'worker_finished':
+            self.actual_gui_signals.worker_finished_signal.emit(payload[0] if payload else tuple())
+        elif signal_type == 'set_progress_label' and self.progress_label:
+            self.progress_label.setText(payload[0] if payload else "")
+        elif signal_type == 'set_ui_enabled':
+            self.set_ui_enabled(payload[0] if payload else True)
+        else:
+            self .log_signal .emit (f"⚠️ Unknown signal type from worker queue: {signal_type }")
+
     def load_known_names_from_util (self ):
         global KNOWN_NAMES 
         if os .path .exists (self .config_file ):
@@ -1367,7 +1348,11 @@ class DownloaderApp (QWidget ):
                 self .cancellation_event .set ()
                 self .thread_pool .shutdown (wait =True ,cancel_futures =True )
                 self .thread_pool =None 
+            close_all_sessions ()
+            shutdown_image_transcoder()
+            self._get_creator_profile_store(self.session_file_path).flush()
             self .log_signal .emit ("👋 Exiting application.")
+            self.log_sink.close()
             event .accept ()
 
 
@@ -1458,43 +1443,10 @@ class DownloaderApp (QWidget ):
 
    
     def _load_creator_name_cache_from_json (self ):
-        """Loads creator id-name-service mappings from creators.json into self.creator_name_cache."""
-        self .log_signal .emit ("ℹ️ Attempting to load creators.json for creator name cache.")
-
-        if getattr (sys ,'frozen',False )and hasattr (sys ,'_MEIPASS'):
-            base_path_for_creators =sys ._MEIPASS 
-        else :
-            base_path_for_creators =self .app_base_dir 
-
-        creators_file_path =os .path .join (base_path_for_creators ,"data" ,"creators.json")
-
-        if not os .path .exists (creators_file_path ):
-            self .log_signal .emit (f"⚠️ 'creators.json' not found at {creators_file_path }. Creator name cache will be empty.")
-            self .creator_name_cache .clear ()
-            return 
-
-        try :
-            with open (creators_file_path ,'r',encoding ='utf-8')as f :
-                loaded_data =json .load (f )
-
-            creators_list =[]
-            if isinstance (loaded_data ,list )and len (loaded_data )>0 and isinstance (loaded_data [0 ],list ):
-                creators_list =loaded_data [0 ]
-            elif isinstance (loaded_data ,list )and all (isinstance (item ,dict )for item in loaded_data ):
-                creators_list =loaded_data 
-            else :
-                self .log_signal .emit (f"⚠️ 'creators.json' has an unexpected format. Creator name cache may be incomplete.")
-
-            for creator_data in creators_list :
-                creator_id =creator_data .get ("id")
-                name =creator_data .get ("name")
-                service =creator_data .get ("service")
-                if creator_id and name and service :
-                    self .creator_name_cache [(service .lower (),str (creator_id ))]=name 
-            self .log_signal .emit (f"✅ Successfully loaded {len (self .creator_name_cache )} creator names into cache from 'creators.json'.")
-        except Exception as e :
-            self .log_signal .emit (f"❌ Error loading 'creators.json' for name cache: {e }")
-            self .creator_name_cache .clear ()
+        """Points self.creator_name_cache at the shared creator index and loads the index in the background."""
+        creator_index =get_creator_index (self .app_base_dir ,logger =self .log_signal .emit )
+        self .creator_name_cache =CreatorNameLookup (creator_index )
+        creator_index .load_in_background ()
 
     def _show_download_history_dialog (self ):
         """Shows the dialog with the finalized download history."""
@@ -1874,30 +1826,57 @@ class DownloaderApp (QWidget ):
 
         if message.startswith("TEMP_FILE_PATH:"):
             filepath = message.split(":", 1)[1]
-            if self.single_pdf_setting:
+            if self.single_pdf_setting and filepath not in self.session_temp_files:
                 self.session_temp_files.append(filepath)
             return
             
-        is_html_message = message.startswith(HTML_PREFIX)
-        display_message = message[len(HTML_PREFIX):] if is_html_message else message
-        
-        try:
-            safe_message = str(display_message).replace('\x00', '[NULL]')
-            lines = safe_message.split('\n')
+        self.handle_main_log_batch([message])
 
-            for line in lines:
-                if is_html_message:
-                    self.main_log_output.insertHtml(line + "<br>") 
-                else:
-                    self.main_log_output.append(line)
+    def handle_main_log_batch(self, messages):
+        """
+        Passes a batch of log messages to the log view, one call per run of plain or HTML lines.
+
+        Control messages (MANGA_FETCH_*, TEMP_FILE_PATH:) in the batch are handled
+        individually by handle_main_log, in order. The view records and draws
+        the lines in bulk (see LogView).
+        """
+        run_lines = []
+        run_is_html = False
+
+        def flush_run():
+            if not run_lines:
+                return
+            self.main_log_output.append_messages(list(run_lines), run_is_html)
+            run_lines.clear()
+
+        try:
+            for message in messages:
+                if not isinstance(message, str):
+                    message = str(message)
+                if message.startswith(("MANGA_FETCH_PROGRESS:", "MANGA_FETCH_COMPLETE:", "TEMP_FILE_PATH:")):
+                    flush_run()
+                    self.handle_main_log(message)
+                    continue
+                is_html_message = message.startswith(HTML_PREFIX)
+                display_message = message[len(HTML_PREFIX):] if is_html_message else message
+                if is_html_message != run_is_html:
+                    flush_run()
+                    run_is_html = is_html_message
+                display_message = display_message.replace('\x00', '[NULL]')
+                run_lines.append(display_message.replace('\n', '<br>') if is_html_message else display_message)
+            flush_run()
 
-            scrollbar = self.main_log_output.verticalScrollBar()
-            if scrollbar.value() >= scrollbar.maximum() - 30:
-                scrollbar.setValue(scrollbar.maximum())
-                
         except Exception as e:
-            print(f"GUI Main Log Error: {e}\nOriginal Message: {message}")
+            print(f"GUI Main Log Error: {e}\nOriginal Messages: {messages[:5]}")
   
+    def _apply_log_filter(self):
+        """Re-filters the main log from the level box and filter text."""
+        self.log_filter_timer.stop()
+        if not isinstance(self.main_log_output, LogView):
+            return
+        _, levels = LOG_FILTER_CHOICES[max(0, self.log_level_filter_combo.currentIndex())]
+        self.main_log_output.set_filter(levels, self.log_text_filter_input.text())
+
     def _extract_key_term_from_title (self ,title ):
         if not title :
             return None 
@@ -2173,7 +2152,7 @@ class DownloaderApp (QWidget ):
                 return
             
             for filename in os.listdir(temp_dir):
-                if filename.startswith("tmp_") and filename.endswith(".json"):
+                if filename.startswith("tmp_") and filename.endswith((".json", ".jsonl", ".spool", ".spool.idx")):
                     try:
                         os.remove(os.path.join(temp_dir, filename))
                         self.log_signal.emit(f"   🧹 Removed stale temp file: {filename}")
@@ -2190,8 +2169,7 @@ class DownloaderApp (QWidget ):
         self.log_signal.emit("   Cleaning up temporary files...")
         for filepath in self.session_temp_files:
             try:
-                if os.path.exists(filepath):
-                    os.remove(filepath)
+                remove_pdf_spool(filepath)
             except Exception as e:
                 self.log_signal.emit(f"   ⚠️ Could not delete temp file '{filepath}': {e}")
         self.session_temp_files = []
@@ -3258,9 +3236,9 @@ class DownloaderApp (QWidget ):
         if is_restore and self.interrupted_session_data:
             self.log_signal.emit("   Restoring session state...")
             download_state = self.interrupted_session_data.get("download_state", {})
-            processed_post_ids_for_restore = download_state.get("processed_post_ids", [])
+            processed_post_ids_for_restore = self.session_store.get_processed_post_ids()
             start_offset_for_restore = download_state.get("last_processed_offset", 0)
-            restored_hashes = download_state.get("successfully_downloaded_hashes", [])
+            restored_hashes = self.session_store.get_downloaded_hashes()
             if restored_hashes:
                 with self.downloaded_file_hashes_lock:
                     self.downloaded_file_hashes.update(restored_hashes)
@@ -4176,7 +4154,6 @@ class DownloaderApp (QWidget ):
             'project_root_dir': self.app_base_dir,
             'use_cookie': use_cookie_for_this_run,
             'session_file_path': self.session_file_path,
-            'session_lock': self.session_lock,
             'creator_download_folder_ignore_words': creator_folder_ignore_words_for_run,
             'use_date_prefix_for_subfolder': self.date_prefix_checkbox.isChecked() if hasattr(self, 'date_prefix_checkbox') else False,
             'keep_in_post_duplicates': self.keep_duplicates_checkbox.isChecked(),
@@ -4234,7 +4211,7 @@ class DownloaderApp (QWidget ):
                     'compress_images', 'download_thumbnails', 'service', 'user_id',
                     'downloaded_files', 'downloaded_file_hashes', 'pause_event', 'remove_from_filename_words_list',
                     'downloaded_files_lock', 'downloaded_file_hashes_lock', 'dynamic_character_filter_holder', 'session_file_path',
-                    'session_lock', 'start_offset', 
+                    'start_offset', 
                     'skip_words_list', 'skip_words_scope', 'char_filter_scope',
                     'show_external_links', 'extract_links_only', 'num_file_threads_for_worker',
                     'start_page', 'end_page', 'target_post_id_from_initial_url',
@@ -4369,6 +4346,7 @@ class DownloaderApp (QWidget ):
     def start_single_threaded_download (self ,**kwargs ):
         global BackendDownloadThread 
         try :
+            self ._configure_transfer_scheduler (kwargs .get ('num_file_threads_for_worker',1 ))
             self .download_thread =BackendDownloadThread (**kwargs )
             if self .pause_event :self .pause_event .clear ()
             self .is_paused =False 
@@ -4458,7 +4436,10 @@ class DownloaderApp (QWidget ):
         try :
             worker_instance =PostProcessorWorker (**worker_init_args )
             if self .thread_pool :
-                future =self .thread_pool .submit (worker_instance .process )
+                if isinstance (self .thread_pool ,AsyncDownloadEngine ):
+                    future =self .thread_pool .submit_post (worker_instance )
+                else :
+                    future =self .thread_pool .submit (worker_instance .process )
                 self .active_futures .append (future )
                 return True 
             else :
@@ -4529,6 +4510,38 @@ class DownloaderApp (QWidget ):
         self._update_manga_filename_style_button_text()
         self._update_multipart_toggle_button_text()
 
+    def _configure_transfer_scheduler(self, max_concurrent_files):
+        """
+        Sizes the shared transfer scheduler and the per-host HTTP connection
+        pools for a run, and applies the priority and compression settings.
+        """
+        max_concurrent_files = max(1, min(MAX_THREADS, max_concurrent_files))
+        set_pool_size(max_concurrent_files)
+        configure_transfer_scheduler(
+            max_concurrent=max_concurrent_files,
+            priority=self.settings.value(TRANSFER_PRIORITY_KEY, TRANSFER_PRIORITY_POST_ORDER, type=str)
+        )
+        configure_image_transcoder(
+            image_format=self.settings.value(IMAGE_COMPRESSION_FORMAT_KEY, IMAGE_COMPRESSION_DEFAULT_FORMAT, type=str),
+            quality=self.settings.value(IMAGE_COMPRESSION_QUALITY_KEY, IMAGE_COMPRESSION_DEFAULT_QUALITY, type=int)
+        )
+        return max_concurrent_files
+
+    def _create_post_worker_pool(self, num_post_workers, num_file_threads, thread_name_prefix):
+        """
+        Creates the pool that runs PostProcessorWorker tasks.
+
+        Returns the async engine when it is enabled in the settings, otherwise
+        a thread pool with one thread per post worker. Either way the shared
+        transfer scheduler is sized for the same number of file downloads
+        as before: one set of file threads per post worker.
+        """
+        max_concurrent_files = self._configure_transfer_scheduler(num_post_workers * max(1, num_file_threads))
+        if self.settings.value(ASYNC_ENGINE_KEY, False, type=bool):
+            self.log_signal.emit(f"ℹ️ Async engine: up to {num_post_workers} post(s) and {max_concurrent_files} file transfer(s) at once.")
+            return AsyncDownloadEngine(num_post_workers, thread_name_prefix=thread_name_prefix.rstrip('_'))
+        return ThreadPoolExecutor(max_workers=num_post_workers, thread_name_prefix=thread_name_prefix)
+
     def start_multi_threaded_download(self, num_post_workers, **kwargs):
         """
         Initializes and starts the multi-threaded download process.
@@ -4538,7 +4551,9 @@ class DownloaderApp (QWidget ):
         if self.thread_pool is None:
             if self.pause_event: self.pause_event.clear()
             self.is_paused = False
-            self.thread_pool = ThreadPoolExecutor(max_workers=num_post_workers, thread_name_prefix='PostWorker_')
+            self.thread_pool = self._create_post_worker_pool(
+                num_post_workers, kwargs.get('num_file_threads_for_worker', 1), 'PostWorker_'
+            )
 
         self.active_futures = []
         self.processed_posts_count = 0; self.total_posts_to_process = 0; self.download_counter = 0; self.skip_counter = 0
@@ -4597,6 +4612,8 @@ class DownloaderApp (QWidget ):
             emitter = worker_args_template.get('emitter')
             
             fetch_first_enabled = worker_args_template.get('fetch_first', False)
+            # Post bodies/comments the run needs are fetched concurrently here, ahead of the workers.
+            post_enricher = PostEnricher.from_worker_args(worker_args_template, logger_func)
 
             if fetch_first_enabled:
                 # --- FETCH FIRST LOGIC ---
@@ -4607,7 +4624,7 @@ class DownloaderApp (QWidget ):
                 self.total_posts_to_process = len(all_posts)
                 self.overall_progress_signal.emit(self.total_posts_to_process, self.processed_posts_count)
 
-                for post_data in all_posts:
+                for post_data in (post_enricher.enrich(all_posts) if post_enricher else all_posts):
                     if self.cancellation_event.is_set():
                         break
                     self._submit_post_to_worker_pool(post_data, worker_args_template, num_file_dl_threads, emitter, ppw_expected_keys, {})
@@ -4615,23 +4632,25 @@ class DownloaderApp (QWidget ):
             else:
                 # --- STANDARD CONCURRENT LOGIC ---
                 # Iterate over the batches of posts as they are yielded by the generator.
-                for posts_batch_from_api in post_generator:
+                processed_post_ids_set = set(worker_args_template.get('processed_post_ids', []))
+
+                def new_posts_from_api():
+                    for posts_batch_from_api in post_generator:
+                        if self.cancellation_event.is_set():
+                            return
+                        new_posts_to_process = [
+                            post for post in posts_batch_from_api if post.get('id') not in processed_post_ids_set
+                        ]
+                        if new_posts_to_process:
+                            self.total_posts_to_process += len(new_posts_to_process)
+                            self.overall_progress_signal.emit(self.total_posts_to_process, self.processed_posts_count)
+                        yield from new_posts_to_process
+
+                posts_to_submit = new_posts_from_api()
+                for post_data in (post_enricher.enrich(posts_to_submit) if post_enricher else posts_to_submit):
                     if self.cancellation_event.is_set():
                         break
-
-                    processed_post_ids_set = set(worker_args_template.get('processed_post_ids', []))
-                    new_posts_to_process = [
-                        post for post in posts_batch_from_api if post.get('id') not in processed_post_ids_set
-                    ]
-
-                    if new_posts_to_process:
-                        for post_data in new_posts_to_process:
-                            if self.cancellation_event.is_set():
-                                break
-                            self._submit_post_to_worker_pool(post_data, worker_args_template, num_file_dl_threads, emitter, ppw_expected_keys, {})
-                        
-                        self.total_posts_to_process += len(new_posts_to_process)
-                        self.overall_progress_signal.emit(self.total_posts_to_process, self.processed_posts_count)
+                    self._submit_post_to_worker_pool(post_data, worker_args_template, num_file_dl_threads, emitter, ppw_expected_keys, {})
 
         except Exception as e:
             logger_func(f"❌ Critical error during post fetching: {e}\n{traceback.format_exc(limit=2)}")
@@ -4652,7 +4671,7 @@ class DownloaderApp (QWidget ):
              permanent, history_data,
              temp_filepath) = result_tuple
 
-            if temp_filepath: self.session_temp_files.append(temp_filepath)
+            if temp_filepath and temp_filepath not in self.session_temp_files: self.session_temp_files.append(temp_filepath)
             
             with self.downloaded_files_lock:
                 self.download_counter += downloaded
@@ -4679,20 +4698,12 @@ class DownloaderApp (QWidget ):
             self.finished_signal.emit(self.download_counter, self.skip_counter, self.cancellation_event.is_set(), self.all_kept_original_filenames)
 
     def _trigger_single_pdf_creation(self):
-        """Reads temp files, sorts them by date, then creates the single PDF."""
+        """Streams the spooled posts in date order into the single PDF."""
         self.log_signal.emit("="*40)
         self.log_signal.emit("Creating single PDF from collected text files...")
 
-        posts_content_data = []
-        for temp_filepath in self.session_temp_files:
-            try:
-                with open(temp_filepath, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    posts_content_data.append(data)
-            except Exception as e:
-                self.log_signal.emit(f"   ⚠️ Could not read temp file '{temp_filepath}': {e}")
-        
-        if not posts_content_data:
+        spool_paths = [path for path in self.session_temp_files if os.path.exists(path)]
+        if not spool_paths:
             self.log_signal.emit("   No content was collected. Aborting PDF creation.")
             return
 
@@ -4715,9 +4726,10 @@ class DownloaderApp (QWidget ):
         font_path = os.path.join(base_path, 'data', 'dejavu-sans', 'DejaVuSans.ttf')
         
         self.log_signal.emit("   Sorting collected posts by date (oldest first)...")
-        sorted_content = sorted(posts_content_data, key=lambda x: x.get('published', 'Z'))
-
-        create_single_pdf_from_content(sorted_content, filepath, font_path, logger=self.log_signal.emit)
+        try:
+            create_single_pdf_from_content(iter_pdf_spool_records(spool_paths), filepath, font_path, logger=self.log_signal.emit)
+        except (OSError, ValueError) as e:
+            self.log_signal.emit(f"   ⚠️ Could not read collected posts for the single PDF: {e}")
         self.log_signal.emit("="*40)
 
     def _add_to_history_candidates(self, history_data):
@@ -4729,12 +4741,7 @@ class DownloaderApp (QWidget ):
             if post_id and service and user_id:
                 creator_key = (service.lower(), str(user_id))
                 creator_name = self.creator_name_cache.get(creator_key, f"{service}_{user_id}")
-                
-                profile_data = self._setup_creator_profile(creator_name, self.session_file_path)
-                
-                if post_id not in profile_data.get('processed_post_ids', []):
-                    profile_data.setdefault('processed_post_ids', []).append(post_id)
-                    self._save_creator_profile(creator_name, profile_data, self.session_file_path)
+                self._get_creator_profile_store(self.session_file_path).add_processed_post(creator_name, post_id)
 
         if history_data and len(self.download_history_candidates) < 8:
             history_data['download_date_timestamp'] = time.time()
@@ -5084,6 +5091,7 @@ class DownloaderApp (QWidget ):
             if self.is_finishing:
                 return
             self.is_finishing = True
+            self._get_creator_profile_store(self.session_file_path).request_flush()
 
             if cancelled_by_user:
                 self.log_signal.emit("✅ Cancellation complete. Resetting UI.")
@@ -5419,16 +5427,12 @@ class DownloaderApp (QWidget ):
             self .retry_thread_pool .shutdown (wait =True )
             self .retry_thread_pool =None 
 
-        if os.path.exists(self.session_file_path):
+        if self.session_store.exists():
             try:
-                with self.session_lock:
-                    with open(self.session_file_path, 'r', encoding='utf-8') as f:
-                        session_data = json.load(f)
-                    
-                    if 'download_state' in session_data:
-                        session_data['download_state']['permanently_failed_files'] = self.permanently_failed_files_for_dialog
-                    self._save_session_file(session_data)
-                    self.log_signal.emit("ℹ️ Session file updated with retry results.")
+                self.session_store.replace_failed_files(self.permanently_failed_files_for_dialog)
+                with self.downloaded_file_hashes_lock:
+                    self.session_store.add_downloaded_hashes(self.downloaded_file_hashes)
+                self.log_signal.emit("ℹ️ Session file updated with retry results.")
 
             except Exception as e:
                 self.log_signal.emit(f"⚠️ Could not update session file after retry: {e}")
@@ -5863,7 +5867,6 @@ class DownloaderApp (QWidget ):
             'downloaded_hash_counts': self.downloaded_hash_counts, 
             'downloaded_hash_counts_lock': self.downloaded_hash_counts_lock,
             'session_file_path': self.session_file_path, 
-            'session_lock': self.session_lock,
             'text_only_scope': self.more_filter_scope, 
             'text_export_format': self.text_export_format,
             'single_pdf_mode': self.single_pdf_setting, 
@@ -5873,7 +5876,7 @@ class DownloaderApp (QWidget ):
         }
 
         num_threads = int(self.thread_count_input.text()) if self.use_multithreading_checkbox.isChecked() else 1
-        self.thread_pool = ThreadPoolExecutor(max_workers=num_threads, thread_name_prefix='UpdateWorker_')
+        self.thread_pool = self._create_post_worker_pool(num_threads, 1, 'UpdateWorker_')
         self.total_posts_to_process = len(self.new_posts_for_update)
         self.processed_posts_count = 0
         self.overall_progress_signal.emit(self.total_posts_to_process, 0)
@@ -0,0 +1,273 @@
+# --- Standard Library Imports ---
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+# --- Third-Party Library Imports ---
+import requests
+
+# --- Local Application Imports ---
+from ..config.constants import (
+    CDN_NODE_COUNT, CDN_NODE_MAX_CONCURRENT, CDN_NODE_COOLDOWN_SECONDS,
+    CDN_NODE_MAX_COOLDOWN_SECONDS, CDN_NODE_FILE_EXCLUSIONS_MAX, CDN_NODE_SPEED_SMOOTHING
+)
+from .session_pool import get_session
+
+# --- Module Constants ---
+# Matches 'kemono.cr', 'n3.kemono.cr', 'coomer.st', ... and captures the node number and base domain.
+_NODE_HOST_PATTERN = re.compile(r'^(?:n(\d+)\.)?((?:kemono|coomer)\.(?:cr|st|su|party))$', re.IGNORECASE)
+_UNHEALTHY_STATUS_CODES = {429, 500, 502, 503, 504, 520, 521, 522, 523, 524}
+# These only mean that one node lacks one file; the node stays in use for other files.
+_MISSING_FILE_STATUS_CODES = {403, 404}
+
+
+class _NodeState:
+    __slots__ = ('host', 'active', 'speed_bps', 'failures', 'blocked_until')
+
+    def __init__(self, host):
+        self.host = host
+        self.active = 0
+        self.speed_bps = None
+        self.failures = 0
+        self.blocked_until = 0.0
+
+
+class NodeLease:
+    """A transfer slot on one CDN node. Pass it back to `CdnNodeManager.release`."""
+    __slots__ = ('node', 'url', 'started')
+
+    def __init__(self, node, url):
+        self.node = node
+        self.url = url
+        self.started = time.monotonic()
+
+
+class CdnNodeManager:
+    """
+    Tracks the health and speed of the numbered file nodes of one site.
+
+    Kemono and Coomer serve files from 'n1.<domain>', 'n2.<domain>', ... A
+    transfer asks for a lease and is pointed at the node with the lowest
+    expected load: running transfers divided by the node's measured speed.
+    Each node runs at most CDN_NODE_MAX_CONCURRENT transfers. A node that
+    answers 429/5xx or drops the connection is benched with an exponential
+    cooldown. A 403/404 only means that node lacks that file, so the node is
+    excluded for that file alone (the most recent CDN_NODE_FILE_EXCLUSIONS_MAX
+    files are remembered). State lives for the whole app session, so an
+    overloaded or slow node is learned once instead of once per file.
+    """
+
+    def __init__(self, base_domain):
+        self.base_domain = base_domain.lower()
+        self.lock = threading.Lock()
+        self.nodes = {}
+        self.file_exclusions = OrderedDict()  # File path -> hosts that answered 403/404 for it
+        for node_number in range(1, CDN_NODE_COUNT + 1):
+            self._get_node(f"n{node_number}.{self.base_domain}")
+
+    def _get_node(self, host):
+        node = self.nodes.get(host)
+        if node is None:
+            node = self.nodes[host] = _NodeState(host)
+        return node
+
+    def node_hosts(self):
+        """Returns the hosts of this site's nodes."""
+        with self.lock:
+            return list(self.nodes)
+
+    def _excluded_hosts(self, url, exclude_hosts):
+        excluded = set(exclude_hosts)
+        excluded.update(self.file_exclusions.get(urlparse(url).path, ()))
+        return excluded
+
+    def _exclude_file_on_host(self, url, host):
+        path = urlparse(url).path
+        hosts = self.file_exclusions.pop(path, set())
+        hosts.add(host)
+        self.file_exclusions[path] = hosts
+        while len(self.file_exclusions) > CDN_NODE_FILE_EXCLUSIONS_MAX:
+            self.file_exclusions.popitem(last=False)
+
+    def _bench(self, node):
+        node.failures += 1
+        cooldown = min(CDN_NODE_COOLDOWN_SECONDS * (2 ** (node.failures - 1)), CDN_NODE_MAX_COOLDOWN_SECONDS)
+        node.blocked_until = time.monotonic() + cooldown
+
+    def _expected_load(self, node, fallback_speed):
+        return (node.active + 1) / (node.speed_bps or fallback_speed)
+
+    def acquire(self, url, exclude_hosts=()):
+        """
+        Leases a transfer slot on the best available node for a file URL.
+
+        Args:
+            url (str): The file URL (any node or the bare site domain).
+            exclude_hosts (iterable, optional): Node hosts not to use. Nodes that
+                                                answered 403/404 for this file are
+                                                always left out.
+
+        Returns:
+            NodeLease or None: The lease with the rewritten URL, or None if every
+                               node is benched, full or lacks the file (use the URL as it is).
+        """
+        parsed_url = urlparse(url)
+        now = time.monotonic()
+        with self.lock:
+            excluded = self._excluded_hosts(url, exclude_hosts)
+            candidates = [
+                node for node in self.nodes.values()
+                if node.host not in excluded and node.blocked_until <= now
+                and node.active < CDN_NODE_MAX_CONCURRENT
+            ]
+            if not candidates:
+                return None
+            # Unmeasured nodes are assumed as fast as the best known one, so they get tried.
+            known_speeds = [node.speed_bps for node in self.nodes.values() if node.speed_bps]
+            fallback_speed = max(known_speeds) if known_speeds else 1.0
+            node = min(candidates, key=lambda candidate: self._expected_load(candidate, fallback_speed))
+            node.active += 1
+        return NodeLease(node, parsed_url._replace(netloc=node.host).geturl())
+
+    def acquire_node(self, url):
+        """
+        Leases a slot on the node named in a URL, ignoring the per-node cap.
+
+        Used after a probe has shown that this node serves the file.
+
+        Args:
+            url (str): A URL on one of this site's nodes.
+
+        Returns:
+            NodeLease: The lease for that node.
+        """
+        with self.lock:
+            node = self._get_node(urlparse(url).netloc.lower())
+            node.active += 1
+        return NodeLease(node, url)
+
+    def release(self, lease, success, bytes_transferred=0, status_code=None):
+        """
+        Returns a lease and records how the transfer went.
+
+        Args:
+            lease (NodeLease): The lease from `acquire`.
+            success (bool): True if the node delivered data normally.
+            bytes_transferred (int): Bytes received through this lease.
+            status_code (int, optional): The HTTP status of the response, if any.
+        """
+        elapsed = time.monotonic() - lease.started
+        node = lease.node
+        with self.lock:
+            node.active = max(0, node.active - 1)
+            if not success and status_code in _MISSING_FILE_STATUS_CODES:
+                self._exclude_file_on_host(lease.url, node.host)
+            elif success or (status_code is not None and status_code not in _UNHEALTHY_STATUS_CODES):
+                node.failures = 0
+                if bytes_transferred > 0 and elapsed > 0:
+                    speed = bytes_transferred / elapsed
+                    if node.speed_bps is None:
+                        node.speed_bps = speed
+                    else:
+                        node.speed_bps += CDN_NODE_SPEED_SMOOTHING * (speed - node.speed_bps)
+            else:
+                self._bench(node)
+
+    def cancel(self, lease):
+        """Returns a lease that was never used, without recording anything about the node."""
+        with self.lock:
+            lease.node.active = max(0, lease.node.active - 1)
+
+    def probe(self, url, exclude_hosts=(), headers=None):
+        """
+        Checks every usable node for a file in parallel and returns a working URL.
+
+        Nodes answering 403/404 are remembered as lacking this file only;
+        nodes that are overloaded or unreachable are benched.
+
+        Args:
+            url (str): The file URL that failed.
+            exclude_hosts (iterable, optional): Node hosts not to probe.
+            headers (dict, optional): Headers for the HEAD requests.
+
+        Returns:
+            str or None: The URL on the fastest node that answered 200, or None.
+        """
+        parsed_url = urlparse(url)
+        now = time.monotonic()
+        with self.lock:
+            excluded = self._excluded_hosts(url, exclude_hosts)
+            hosts = [
+                node.host for node in self.nodes.values()
+                if node.host not in excluded and node.blocked_until <= now
+            ]
+        if not hosts:
+            return None
+
+        def head_node(host):
+            node_url = parsed_url._replace(netloc=host).geturl()
+            started = time.monotonic()
+            try:
+                with get_session(node_url, rate_limited=False).head(node_url, headers=headers or {'User-Agent': 'Mozilla/5.0'}, timeout=5, allow_redirects=True) as resp:
+                    return host, node_url, resp.status_code, time.monotonic() - started
+            except requests.RequestException:
+                return host, node_url, None, None
+
+        with ThreadPoolExecutor(max_workers=len(hosts), thread_name_prefix='CdnProbe_') as probe_pool:
+            results = list(probe_pool.map(head_node, hosts))
+
+        best_url, best_latency = None, None
+        with self.lock:
+            for host, node_url, status_code, latency in results:
+                node = self._get_node(host)
+                if status_code == 200:
+                    node.failures = 0
+                    node.blocked_until = 0.0
+                    if best_latency is None or latency < best_latency:
+                        best_url, best_latency = node_url, latency
+                elif status_code in _MISSING_FILE_STATUS_CODES:
+                    self._exclude_file_on_host(url, host)
+                elif status_code is None or status_code in _UNHEALTHY_STATUS_CODES:
+                    self._bench(node)
+        return best_url
+
+    def snapshot(self):
+        """Returns a list of (host, active, speed_bps, benched) tuples for logging."""
+        now = time.monotonic()
+        with self.lock:
+            return [
+                (node.host, node.active, node.speed_bps, node.blocked_until > now)
+                for node in sorted(self.nodes.values(), key=lambda n: n.host)
+            ]
+
+
+# --- Module State ---
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def get_cdn_node_manager(url):
+    """
+    Returns the session-wide node manager for a Kemono/Coomer file URL.
+
+    Args:
+        url (str): A file URL.
+
+    Returns:
+        CdnNodeManager or None: The manager, or None for hosts without numbered nodes.
+    """
+    match = _NODE_HOST_PATTERN.match(urlparse(url).netloc or "")
+    if not match:
+        return None
+    base_domain = match.group(2).lower()
+    manager = _managers.get(base_domain)
+    if manager is not None:
+        return manager
+    with _managers_lock:
+        manager = _managers.get(base_domain)
+        if manager is None:
+            manager = _managers[base_domain] = CdnNodeManager(base_domain)
+        return manager
@@ -0,0 +1,357 @@
+# --- Standard Library Imports ---
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+
+# --- Local Application Imports ---
+from ..config.constants import CREATOR_INDEX_FILENAME, CREATOR_INDEX_READ_CHUNK
+
+# --- Module Constants ---
+_FINGERPRINT_SAMPLE_BYTES = 64 * 1024
+_INSERT_BATCH_SIZE = 5000
+
+
+def get_creators_json_path(app_base_dir):
+    """
+    Returns where the bundled creators.json lives.
+
+    Args:
+        app_base_dir (str): The application's base directory.
+
+    Returns:
+        str: The path to data/creators.json (inside _MEIPASS when frozen).
+    """
+    if getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'):
+        return os.path.join(sys._MEIPASS, "data", "creators.json")
+    return os.path.join(app_base_dir, "data", "creators.json")
+
+
+def _file_fingerprint(path):
+    """Size plus a hash of the first and last bytes; cheap, and unaffected by re-extraction of bundled files."""
+    size = os.path.getsize(path)
+    digest = hashlib.sha1(str(size).encode('ascii'))
+    with open(path, 'rb') as f:
+        digest.update(f.read(_FINGERPRINT_SAMPLE_BYTES))
+        if size > _FINGERPRINT_SAMPLE_BYTES:
+            f.seek(max(_FINGERPRINT_SAMPLE_BYTES, size - _FINGERPRINT_SAMPLE_BYTES))
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def iter_creator_entries(json_path, chunk_size=CREATOR_INDEX_READ_CHUNK):
+    """
+    Streams the creator objects out of creators.json without loading the whole document.
+
+    Both known layouts are accepted: a flat list of creator objects, or a
+    list whose first element is that list (only the first is read).
+
+    Args:
+        json_path (str): The creators.json file.
+        chunk_size (int): Characters read at a time.
+
+    Yields:
+        dict: Each creator object, in file order.
+
+    Raises:
+        ValueError: If the file is not in either layout or is malformed.
+    """
+    decoder = json.JSONDecoder()
+    with open(json_path, 'r', encoding='utf-8') as f:
+        buffer = ""
+        pos = 0
+
+        def read_more():
+            nonlocal buffer, pos
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return False
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            return True
+
+        def peek(skip=" \t\r\n"):
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in skip:
+                    pos += 1
+                if pos < len(buffer):
+                    return buffer[pos]
+                if not read_more():
+                    return ""
+
+        if peek() != '[':
+            raise ValueError("creators.json does not contain a list.")
+        pos += 1
+        nested = peek() == '['
+        if nested:
+            pos += 1
+
+        while True:
+            next_char = peek(" \t\r\n,")
+            if next_char in (']', ''):
+                return
+            if next_char != '{':
+                raise ValueError("creators.json has an unexpected format.")
+            while True:
+                try:
+                    entry, pos = decoder.raw_decode(buffer, pos)
+                    break
+                except json.JSONDecodeError:
+                    # The object runs past the end of the buffer; read on and retry.
+                    if not read_more():
+                        raise
+            yield entry
+
+
+class CreatorIndex:
+    """
+    creators.json converted once into an indexed SQLite table in appdata.
+
+    The JSON holds hundreds of thousands of creators. Parsing it at every
+    start (and again for every dialog that needs names) took seconds on the
+    GUI thread. The index is rebuilt only when the file's fingerprint
+    changes; otherwise opening it costs one query, and lookups touch only
+    the rows they need.
+    """
+
+    def __init__(self, json_path, db_path, logger=print):
+        self.json_path = json_path
+        self.db_path = db_path
+        self.logger = logger
+        self.lock = threading.Lock()
+        self.ready_event = threading.Event()
+        self.load_error = None
+        self._load_thread = None
+        self.conn = None
+
+    def _open(self):
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS creators ("
+                " service_key TEXT NOT NULL, id_key TEXT NOT NULL, service TEXT, creator_id TEXT,"
+                " name TEXT, name_lower TEXT, favorited INTEGER NOT NULL DEFAULT 0,"
+                " PRIMARY KEY (service_key, id_key))"
+            )
+        return conn
+
+    def _rebuild(self, fingerprint):
+        """Replaces the table's contents with the creators streamed from the JSON file."""
+        count = 0
+        duplicates_skipped = 0
+        batch = []
+
+        def flush():
+            nonlocal duplicates_skipped
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO creators"
+                " (service_key, id_key, service, creator_id, name, name_lower, favorited)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)", batch
+            )
+            duplicates_skipped += len(batch) - (self.conn.total_changes - before)
+            batch.clear()
+
+        with self.conn:
+            self.conn.execute("DELETE FROM creators")
+            self.conn.execute("DELETE FROM meta")
+            for entry in iter_creator_entries(self.json_path):
+                if not isinstance(entry, dict):
+                    continue
+                service = entry.get('service')
+                creator_id = entry.get('id')
+                if not service or creator_id is None or creator_id == "":
+                    continue
+                name = entry.get('name')
+                name = name if isinstance(name, str) else ""
+                try:
+                    favorited = int(entry.get('favorited') or 0)
+                except (TypeError, ValueError):
+                    favorited = 0
+                batch.append((
+                    str(service).lower().strip(), str(creator_id).strip(), str(service), str(creator_id),
+                    name, name.lower(), favorited
+                ))
+                count += 1
+                if len(batch) >= _INSERT_BATCH_SIZE:
+                    flush()
+            if batch:
+                flush()
+            self.conn.execute("INSERT INTO meta (key, value) VALUES ('fingerprint', ?)", (fingerprint,))
+        self.logger(
+            f"✅ Built creator index from 'creators.json': {count - duplicates_skipped} creators"
+            f" ({duplicates_skipped} duplicates skipped)."
+        )
+
+    def load(self):
+        """
+        Opens the index, rebuilding it first if creators.json changed. Safe to call repeatedly.
+
+        Returns:
+            bool: True if the index is usable.
+        """
+        if self.ready_event.is_set():
+            return True
+        with self.lock:
+            if self.ready_event.is_set():
+                return True
+            try:
+                if not os.path.exists(self.json_path):
+                    self.load_error = f"'creators.json' not found at {self.json_path}."
+                    self.logger(f"⚠️ {self.load_error} Creator names will not be available.")
+                    return False
+                if self.conn is None:
+                    self.conn = self._open()
+                fingerprint = _file_fingerprint(self.json_path)
+                row = self.conn.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+                if row is None or row[0] != fingerprint:
+                    self.logger("ℹ️ Building creator index from 'creators.json' (first run or file changed)...")
+                    self._rebuild(fingerprint)
+                self.load_error = None
+                self.ready_event.set()
+                return True
+            except (OSError, ValueError, sqlite3.Error) as e:
+                self.load_error = str(e)
+                self.logger(f"❌ Error loading creator index from 'creators.json': {e}")
+                return False
+
+    def load_in_background(self):
+        """Starts `load` on a daemon thread unless it is already done or running."""
+        if self.ready_event.is_set() or (self._load_thread and self._load_thread.is_alive()):
+            return
+        self._load_thread = threading.Thread(target=self.load, name="CreatorIndexLoader", daemon=True)
+        self._load_thread.start()
+
+    @staticmethod
+    def _row_to_creator(row):
+        return {'service': row[0], 'id': row[1], 'name': row[2], 'favorited': row[3]}
+
+    def get_name(self, service, creator_id):
+        """
+        Looks up a creator's name without waiting for the index to load.
+
+        Returns:
+            str or None: The name, or None if unknown, unnamed or not loaded yet.
+        """
+        if not self.ready_event.is_set() or not service or creator_id is None:
+            return None
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT name FROM creators WHERE service_key = ? AND id_key = ?",
+                (str(service).lower().strip(), str(creator_id).strip())
+            ).fetchone()
+        return row[0] if row and row[0] else None
+
+    def get_creator(self, service, creator_id):
+        """
+        Looks up one creator, loading the index first if needed.
+
+        Returns:
+            dict or None: The creator ('service', 'id', 'name', 'favorited'), or None.
+        """
+        if not self.load():
+            return None
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT service, creator_id, name, favorited FROM creators WHERE service_key = ? AND id_key = ?",
+                (str(service).lower().strip(), str(creator_id).strip())
+            ).fetchone()
+        return self._row_to_creator(row) if row else None
+
+    def all_creators(self):
+        """
+        Returns every creator, most favorited first and then by name, loading the index first if needed.
+
+        Returns:
+            list: Creator dicts ('service', 'id', 'name', 'favorited').
+        """
+        if not self.load():
+            return []
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT service, creator_id, name, favorited FROM creators"
+                " ORDER BY favorited DESC, name_lower, rowid"
+            ).fetchall()
+        return [self._row_to_creator(row) for row in rows]
+
+    def count(self):
+        """Returns the number of indexed creators (0 until loaded)."""
+        if not self.ready_event.is_set():
+            return 0
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM creators").fetchone()[0]
+
+
+class CreatorNameLookup:
+    """
+    A read-only, dict-like view of (service, id) -> name over a CreatorIndex.
+
+    Stands in for the old in-memory name caches: `.get(key, default)` and
+    truth testing work as before, but nothing is held in memory and lookups
+    made before the index finishes loading just return the default.
+    """
+
+    def __init__(self, index):
+        self.index = index
+
+    def get(self, key, default=None):
+        if not key or len(key) != 2:
+            return default
+        name = self.index.get_name(key[0], key[1])
+        return name if name is not None else default
+
+    def __getitem__(self, key):
+        name = self.get(key)
+        if name is None:
+            raise KeyError(key)
+        return name
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        return self.index.count()
+
+    def __bool__(self):
+        return self.index.ready_event.is_set() and len(self) > 0
+
+
+# --- Module State ---
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_creator_index(app_base_dir, logger=print):
+    """
+    Returns the shared CreatorIndex for an application directory, creating it on first use.
+
+    The index is not loaded here; call `load` or `load_in_background`.
+
+    Args:
+        app_base_dir (str): The application's base directory (appdata lives under it).
+        logger (callable): Used for build and error messages by the first caller.
+
+    Returns:
+        CreatorIndex: The shared index.
+    """
+    key = os.path.abspath(app_base_dir or ".")
+    index = _indexes.get(key)
+    if index is not None:
+        return index
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = CreatorIndex(
+                get_creators_json_path(key), os.path.join(key, "appdata", CREATOR_INDEX_FILENAME), logger=logger
+            )
+            _indexes[key] = index
+        return index
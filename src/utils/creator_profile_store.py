@@ -0,0 +1,224 @@
+# --- Standard Library Imports ---
+import json
+import os
+import threading
+import time
+
+# --- Local Application Imports ---
+from ..config.constants import CREATOR_PROFILE_FLUSH_DELAY
+from .file_utils import clean_folder_name
+
+
+def _file_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class _CachedProfile:
+    """A profile held in memory: its data, a set mirroring its processed IDs, and whether it awaits a write."""
+    __slots__ = ('data', 'processed_ids', 'dirty', 'disk_mtime')
+
+    def __init__(self, data, disk_mtime):
+        self.data = data
+        processed = data.get('processed_post_ids')
+        if not isinstance(processed, list):
+            processed = list(processed or [])
+            data['processed_post_ids'] = processed
+        self.processed_ids = set(processed)
+        self.dirty = False
+        self.disk_mtime = disk_mtime
+
+
+class CreatorProfileStore:
+    """
+    Creator profiles (appdata/creator_profiles/<name>.json) cached in memory with batched writes.
+
+    Recording a finished post used to read the profile, scan its processed
+    post IDs and rewrite the whole file, once per post and on the GUI thread.
+    Here each profile is read once, membership is a set lookup, and changes
+    are written by a background thread at most every `flush_delay` seconds.
+    The files keep their JSON format, so anything that reads them directly
+    still works; call `flush` before doing so if a write may be pending.
+
+    Args:
+        profiles_dir (str): The creator_profiles directory.
+        logger (callable): Used for load and save errors.
+        flush_delay (float): Seconds changes may wait before being written.
+    """
+
+    def __init__(self, profiles_dir, logger=print, flush_delay=CREATOR_PROFILE_FLUSH_DELAY):
+        self.profiles_dir = profiles_dir
+        self.logger = logger
+        self.flush_delay = flush_delay
+        self.profiles = {}
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.flush_condition = threading.Condition()
+        self.flush_due = None
+        self._writer_thread = None
+
+    def profile_path(self, creator_name):
+        return os.path.join(self.profiles_dir, clean_folder_name(creator_name) + ".json")
+
+    def _read(self, path):
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    return data
+                self.logger(f"❌ Error loading creator profile '{os.path.basename(path)}': not a JSON object. Starting fresh.")
+            except (json.JSONDecodeError, OSError) as e:
+                self.logger(f"❌ Error loading creator profile '{os.path.basename(path)}': {e}. Starting fresh.")
+        return {}
+
+    def _get_cached(self, path):
+        """Returns the cached profile, reading the file if it is not cached or was changed by someone else."""
+        with self.lock:
+            cached = self.profiles.get(path)
+            if cached is not None and (cached.dirty or cached.disk_mtime == _file_mtime(path)):
+                return cached
+        disk_mtime = _file_mtime(path)
+        fresh = _CachedProfile(self._read(path), disk_mtime)
+        with self.lock:
+            cached = self.profiles.get(path)
+            # Keep changes made by another thread while the file was being read.
+            if cached is not None and cached.dirty:
+                return cached
+            self.profiles[path] = fresh
+            return fresh
+
+    def load(self, creator_name):
+        """
+        Returns a copy of a creator's profile, which the caller may modify and pass to `save`.
+
+        Args:
+            creator_name (str): The creator's name (the profile's file name).
+
+        Returns:
+            dict: The profile, or {} if it does not exist yet or could not be read.
+        """
+        os.makedirs(self.profiles_dir, exist_ok=True)
+        cached = self._get_cached(self.profile_path(creator_name))
+        with self.lock:
+            data = dict(cached.data)
+            data['processed_post_ids'] = list(cached.data['processed_post_ids'])
+        return data
+
+    def save(self, creator_name, data):
+        """
+        Replaces a creator's profile; it is written to disk in the background.
+
+        Args:
+            creator_name (str): The creator's name (the profile's file name).
+            data (dict): The complete profile.
+        """
+        path = self.profile_path(creator_name)
+        data = dict(data)
+        data['processed_post_ids'] = list(data.get('processed_post_ids') or [])
+        with self.lock:
+            cached = self.profiles.get(path)
+            replacement = _CachedProfile(data, cached.disk_mtime if cached else _file_mtime(path))
+            replacement.dirty = True
+            self.profiles[path] = replacement
+        self._schedule_flush(self.flush_delay)
+
+    def add_processed_post(self, creator_name, post_id):
+        """
+        Records a post as processed in a creator's profile.
+
+        Args:
+            creator_name (str): The creator's name (the profile's file name).
+            post_id (str): The post's ID.
+
+        Returns:
+            bool: True if the post was new to the profile.
+        """
+        cached = self._get_cached(self.profile_path(creator_name))
+        with self.lock:
+            if post_id in cached.processed_ids:
+                return False
+            cached.processed_ids.add(post_id)
+            cached.data['processed_post_ids'].append(post_id)
+            cached.dirty = True
+        self._schedule_flush(self.flush_delay)
+        return True
+
+    def _schedule_flush(self, delay):
+        with self.flush_condition:
+            due = time.monotonic() + delay
+            if self.flush_due is None or due < self.flush_due:
+                self.flush_due = due
+                self.flush_condition.notify()
+            if self._writer_thread is None or not self._writer_thread.is_alive():
+                self._writer_thread = threading.Thread(target=self._writer_loop, name="CreatorProfileWriter", daemon=True)
+                self._writer_thread.start()
+
+    def request_flush(self):
+        """Asks the background writer to write pending changes now, without waiting for it."""
+        self._schedule_flush(0)
+
+    def _writer_loop(self):
+        while True:
+            with self.flush_condition:
+                while self.flush_due is None:
+                    self.flush_condition.wait()
+                remaining = self.flush_due - time.monotonic()
+                while remaining > 0:
+                    self.flush_condition.wait(remaining)
+                    remaining = self.flush_due - time.monotonic()
+                self.flush_due = None
+            self.flush()
+
+    def flush(self):
+        """Writes every profile with pending changes, on the calling thread."""
+        with self.write_lock:
+            with self.lock:
+                pending = []
+                for path, cached in self.profiles.items():
+                    if cached.dirty:
+                        snapshot = dict(cached.data)
+                        snapshot['processed_post_ids'] = list(cached.data['processed_post_ids'])
+                        pending.append((path, cached, snapshot))
+                        cached.dirty = False
+            for path, cached, snapshot in pending:
+                try:
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    temp_path = path + ".tmp"
+                    with open(temp_path, 'w', encoding='utf-8') as f:
+                        json.dump(snapshot, f, indent=2)
+                    os.replace(temp_path, path)
+                    with self.lock:
+                        cached.disk_mtime = _file_mtime(path)
+                except (OSError, TypeError, ValueError) as e:
+                    self.logger(f"❌ Error saving creator profile to '{path}': {e}")
+
+
+# --- Module State ---
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_creator_profile_store(profiles_dir, logger=print):
+    """
+    Returns the shared CreatorProfileStore for a profiles directory, creating it on first use.
+
+    Args:
+        profiles_dir (str): The creator_profiles directory.
+        logger (callable): Used for load and save errors by the first caller.
+
+    Returns:
+        CreatorProfileStore: The shared store.
+    """
+    key = os.path.abspath(profiles_dir)
+    store = _stores.get(key)
+    if store is not None:
+        return store
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = CreatorProfileStore(key, logger=logger)
+            _stores[key] = store
+        return store
@@ -0,0 +1,102 @@
+# --- Standard Library Imports ---
+import bisect
+import unicodedata
+from array import array
+
+
+def normalize_for_search(text):
+    """NFKC-normalizes and casefolds text, the form both names and queries are compared in."""
+    return unicodedata.normalize('NFKC', text or "").casefold()
+
+
+class CreatorSearchIndex:
+    """
+    Name and service search over the creator catalog.
+
+    Scores match the popup's original linear scan: 4 for an exact name, 3
+    for a name prefix, 2 for a name substring and 1 for a service substring,
+    best score first and then by name. Names are kept sorted, so exact and
+    prefix matches come from one binary search; substring matches come from
+    a trigram index whose postings are in name order, so the first hits found
+    are already the ones that sort first. Build it off the GUI thread: it
+    takes a few seconds for the full catalog.
+    """
+
+    def __init__(self, creators):
+        normalized = [normalize_for_search(creator.get('name', '')) for creator in creators]
+        # Ties keep the catalog's own order (most favorited first).
+        order = sorted(range(len(creators)), key=normalized.__getitem__)
+        self.creators = [creators[i] for i in order]
+        self.names = [normalized[i] for i in order]
+
+        trigram_lists = {}
+        for rank, name in enumerate(self.names):
+            for trigram in {name[i:i + 3] for i in range(len(name) - 2)}:
+                postings = trigram_lists.get(trigram)
+                if postings is None:
+                    trigram_lists[trigram] = postings = []
+                postings.append(rank)
+        self.trigrams = {trigram: array('I', postings) for trigram, postings in trigram_lists.items()}
+
+        self.ranks_by_service = {}
+        for rank, creator in enumerate(self.creators):
+            service = normalize_for_search(creator.get('service', ''))
+            self.ranks_by_service.setdefault(service, []).append(rank)
+
+    def __len__(self):
+        return len(self.creators)
+
+    def _prefix_ranks(self, query):
+        start = bisect.bisect_left(self.names, query)
+        end = bisect.bisect_left(self.names, query + '\U0010ffff', lo=start)
+        return range(start, end)
+
+    def _substring_ranks(self, query, exclude, limit):
+        """Yields up to `limit` ranks, in name order, whose name contains the query."""
+        found = 0
+        if len(query) < 3:
+            candidates = range(len(self.names))
+        else:
+            query_trigrams = {query[i:i + 3] for i in range(len(query) - 2)}
+            # Every match contains every trigram, so the rarest one's postings are the candidates.
+            candidates = min((self.trigrams.get(trigram, ()) for trigram in query_trigrams), key=len)
+        for rank in candidates:
+            if rank not in exclude and query in self.names[rank]:
+                yield rank
+                found += 1
+                if found >= limit:
+                    return
+
+    def search(self, query, limit):
+        """
+        Returns the best-scoring creators for a query.
+
+        Args:
+            query (str): The raw search text.
+            limit (int): The most results to return.
+
+        Returns:
+            list: Creator dicts, best match first.
+        """
+        query = normalize_for_search(query).strip()
+        if not query or limit <= 0:
+            return []
+
+        # An exact name sorts before every longer name it prefixes, so the prefix range is already in score order.
+        prefix_ranks = self._prefix_ranks(query)
+        results = list(prefix_ranks[:limit])
+
+        if len(results) < limit:
+            # Every prefix match fit, so the set is small; those are already counted.
+            results.extend(self._substring_ranks(query, set(prefix_ranks), limit - len(results)))
+
+        if len(results) < limit:
+            taken = set(results)
+            service_ranks = []
+            for service, ranks in self.ranks_by_service.items():
+                if query in service:
+                    service_ranks.extend(rank for rank in ranks if rank not in taken and query not in self.names[rank])
+            service_ranks.sort()
+            results.extend(service_ranks[:limit - len(results)])
+
+        return [self.creators[rank] for rank in results]
@@ -0,0 +1,91 @@
+# --- Standard Library Imports ---
+import re
+from functools import lru_cache
+
+# --- Local Application Imports ---
+from ..config.constants import SKIP_SCOPE_BOTH, SKIP_SCOPE_FILES, SKIP_SCOPE_POSTS
+
+# --- Module Constants ---
+# Anchor tags in post HTML: group 1 is the href, group 2 the inner HTML.
+EXTERNAL_LINK_PATTERN = re.compile(r"""<a\s+.*?href=["'](https?://[^"']+)["'][^>]*>(.*?)</a>""", re.IGNORECASE | re.DOTALL)
+MEGA_KEY_PATTERN = re.compile(r'\b([a-zA-Z0-9_-]{43}|[a-zA-Z0-9_-]{22})\b')
+_SEPARATOR_RUN_PATTERN = re.compile(r'[_.\s-]+')
+_WHITESPACE_RUN_PATTERN = re.compile(r'\s+')
+
+
+class FilterPlan:
+    """
+    A run's skip-word and remove-word settings, compiled once.
+
+    Workers with the same settings share one plan (see `get_filter_plan`).
+    The plan is read-only after construction, so no locking is needed.
+    """
+
+    def __init__(self, skip_words, skip_words_scope, remove_words):
+        self.skip_words = skip_words
+        self.skip_words_lower = tuple(word.lower() for word in skip_words)
+        self.skip_words_regex = (
+            re.compile('|'.join(re.escape(word) for word in self.skip_words_lower)) if skip_words else None
+        )
+        self.skip_files = bool(skip_words) and skip_words_scope in (SKIP_SCOPE_FILES, SKIP_SCOPE_BOTH)
+        self.skip_posts = bool(skip_words) and skip_words_scope in (SKIP_SCOPE_POSTS, SKIP_SCOPE_BOTH)
+        # Applied one after another, as removing one word can expose another.
+        self.remove_word_patterns = tuple(re.compile(re.escape(word), re.IGNORECASE) for word in remove_words if word)
+
+    def find_skip_word(self, text):
+        """
+        Returns the first skip word (in list order) contained in the text, ignoring case.
+
+        Args:
+            text (str): A title, filename or folder name.
+
+        Returns:
+            str or None: The matching skip word as configured, or None.
+        """
+        if self.skip_words_regex is None or text is None:
+            return None
+        text_lower = text.lower()
+        if not self.skip_words_regex.search(text_lower):
+            return None
+        for word, word_lower in zip(self.skip_words, self.skip_words_lower):
+            if word_lower in text_lower:
+                return word
+        return None
+
+    def remove_words(self, base_name):
+        """
+        Removes the configured words from a filename stem and tidies the separators.
+
+        Args:
+            base_name (str): The filename without its extension.
+
+        Returns:
+            str: The cleaned stem (may be empty).
+        """
+        for pattern in self.remove_word_patterns:
+            base_name = pattern.sub("", base_name)
+        base_name = _SEPARATOR_RUN_PATTERN.sub(' ', base_name)
+        base_name = _WHITESPACE_RUN_PATTERN.sub(' ', base_name)
+        return base_name.strip()
+
+
+@lru_cache(maxsize=8)
+def _build_filter_plan(skip_words, skip_words_scope, remove_words):
+    return FilterPlan(skip_words, skip_words_scope, remove_words)
+
+
+def get_filter_plan(skip_words_list, skip_words_scope, remove_from_filename_words_list):
+    """
+    Returns the shared FilterPlan for a set of filter settings, compiling it on first use.
+
+    Args:
+        skip_words_list (list): Words that skip a post or file.
+        skip_words_scope (str): SKIP_SCOPE_FILES, SKIP_SCOPE_POSTS or SKIP_SCOPE_BOTH.
+        remove_from_filename_words_list (list): Words removed from saved filenames.
+
+    Returns:
+        FilterPlan: The plan.
+    """
+    return _build_filter_plan(
+        tuple(skip_words_list or ()), skip_words_scope, tuple(remove_from_filename_words_list or ())
+    )
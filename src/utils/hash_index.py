@@ -0,0 +1,201 @@
+# --- Standard Library Imports ---
+import hashlib
+import os
+import sqlite3
+import threading
+
+# --- Local Application Imports ---
+from ..config.constants import HASH_INDEX_DIRNAME
+
+# --- Module Constants ---
+HASH_READ_CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+
+def compute_file_md5(file_path):
+    """
+    Computes the MD5 hash of a file on disk.
+
+    Args:
+        file_path (str): The file to hash.
+
+    Returns:
+        str: The hex digest.
+    """
+    md5_hasher = hashlib.md5()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_READ_CHUNK_SIZE), b""):
+            md5_hasher.update(chunk)
+    return md5_hasher.hexdigest()
+
+
+class HashIndex:
+    """
+    Persistent content-hash index for the files under one download root.
+
+    Each row stores a file's path (relative to the root when possible), its
+    size, its modification time and its MD5. A stored hash is only trusted
+    while the file's size and mtime still match, so files that were edited or
+    replaced outside the app are re-hashed instead of giving stale answers.
+    The database lives in appdata rather than in the download root itself.
+
+    Args:
+        root_dir (str): The download root whose files are indexed.
+        db_path (str): The index database (see get_hash_index_path).
+    """
+
+    def __init__(self, root_dir, db_path):
+        self.root_dir = os.path.abspath(root_dir)
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                " path TEXT PRIMARY KEY, size INTEGER NOT NULL,"
+                " mtime_ns INTEGER NOT NULL, md5 TEXT NOT NULL)"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_files_md5 ON files (md5)")
+
+    def _key(self, file_path):
+        abs_path = os.path.abspath(file_path)
+        try:
+            if os.path.commonpath([abs_path, self.root_dir]) == self.root_dir:
+                return os.path.relpath(abs_path, self.root_dir)
+        except ValueError:
+            pass
+        return abs_path
+
+    def _full_path(self, key):
+        return key if os.path.isabs(key) else os.path.join(self.root_dir, key)
+
+    def lookup(self, file_path):
+        """
+        Returns the indexed hash of a file if the file is unchanged since it was indexed.
+
+        Returns:
+            str or None: The MD5 hex digest, or None if unknown or stale.
+        """
+        try:
+            stat_result = os.stat(file_path)
+        except OSError:
+            return None
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT size, mtime_ns, md5 FROM files WHERE path = ?", (self._key(file_path),)
+            ).fetchone()
+        if row and row[0] == stat_result.st_size and row[1] == stat_result.st_mtime_ns:
+            return row[2]
+        return None
+
+    def record(self, file_path, file_hash):
+        """
+        Adds or updates the index entry for a file.
+
+        Args:
+            file_path (str): The saved file.
+            file_hash (str): Its MD5 hex digest.
+        """
+        try:
+            stat_result = os.stat(file_path)
+        except OSError:
+            return
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO files (path, size, mtime_ns, md5) VALUES (?, ?, ?, ?)",
+                (self._key(file_path), stat_result.st_size, stat_result.st_mtime_ns, file_hash)
+            )
+
+    def get_or_compute_hash(self, file_path):
+        """Returns a file's hash from the index, hashing and indexing it only if needed."""
+        file_hash = self.lookup(file_path)
+        if file_hash is None:
+            file_hash = compute_file_md5(file_path)
+            self.record(file_path, file_hash)
+        return file_hash
+
+    def find_existing_file(self, file_hash):
+        """
+        Finds a file on disk with the given content hash.
+
+        Entries whose file has disappeared are dropped from the index.
+
+        Returns:
+            str or None: The full path of a matching file, or None.
+        """
+        with self.lock:
+            rows = self.conn.execute("SELECT path, size, mtime_ns FROM files WHERE md5 = ?", (file_hash,)).fetchall()
+        stale_keys = []
+        found_path = None
+        for key, size, mtime_ns in rows:
+            full_path = self._full_path(key)
+            try:
+                stat_result = os.stat(full_path)
+            except OSError:
+                stale_keys.append(key)
+                continue
+            if stat_result.st_size == size and stat_result.st_mtime_ns == mtime_ns:
+                found_path = full_path
+                break
+        if stale_keys:
+            with self.lock, self.conn:
+                self.conn.executemany("DELETE FROM files WHERE path = ?", [(key,) for key in stale_keys])
+        return found_path
+
+    def close(self):
+        """Closes the database connection."""
+        with self.lock:
+            try:
+                self.conn.close()
+            except sqlite3.Error:
+                pass
+
+
+# --- Module State ---
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_hash_index_path(app_base_dir, root_dir):
+    """
+    Returns where the hash index of a download root is kept.
+
+    Args:
+        app_base_dir (str): The application's base directory (appdata lives under it).
+        root_dir (str): The download root folder.
+
+    Returns:
+        str: A database path in appdata, named after a digest of the root's absolute path.
+    """
+    root_key = os.path.normcase(os.path.abspath(root_dir))
+    root_digest = hashlib.sha1(root_key.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(app_base_dir, "appdata", HASH_INDEX_DIRNAME, f"{root_digest}.db")
+
+
+def get_hash_index(root_dir, app_base_dir):
+    """
+    Returns the shared HashIndex for a download root, opening it on first use.
+
+    Args:
+        root_dir (str): The download root folder.
+        app_base_dir (str): The application's base directory; the index is stored in its appdata.
+
+    Returns:
+        HashIndex or None: The index, or None if it cannot be opened
+                           (e.g., a read-only appdata folder).
+    """
+    key = os.path.abspath(root_dir)
+    index = _indexes.get(key)
+    if index is not None:
+        return index
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            try:
+                index = HashIndex(key, get_hash_index_path(app_base_dir, key))
+            except (OSError, sqlite3.Error):
+                return None
+            _indexes[key] = index
+        return index
@@ -0,0 +1,166 @@
+# --- Standard Library Imports ---
+import itertools
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from collections import deque
+
+# --- Local Application Imports ---
+from ..config.constants import LOG_FILE_BACKUP_COUNT, LOG_FILE_MAX_BYTES, LOG_RING_BUFFER_LINES
+from .text_utils import strip_html_tags
+
+# --- Module Constants ---
+LEVEL_ERROR = "error"
+LEVEL_WARNING = "warning"
+LEVEL_SUCCESS = "success"
+LEVEL_INFO = "info"
+LEVEL_DEBUG = "debug"
+LOG_LEVELS = (LEVEL_ERROR, LEVEL_WARNING, LEVEL_SUCCESS, LEVEL_INFO, LEVEL_DEBUG)
+
+_FILE_LOG_LEVELS = {
+    LEVEL_ERROR: logging.ERROR,
+    LEVEL_WARNING: logging.WARNING,
+    LEVEL_SUCCESS: logging.INFO,
+    LEVEL_INFO: logging.INFO,
+    LEVEL_DEBUG: logging.DEBUG,
+}
+_logger_ids = itertools.count()
+
+
+def classify_log_level(text):
+    """
+    Guesses a log line's level from the emoji and prefixes the app's messages use.
+
+    Args:
+        text (str): The log line (plain or HTML).
+
+    Returns:
+        str: One of LOG_LEVELS.
+    """
+    if "❌" in text:
+        return LEVEL_ERROR
+    if "⚠️" in text:
+        return LEVEL_WARNING
+    if "✅" in text:
+        return LEVEL_SUCCESS
+    if text.lstrip().startswith("INTERNAL:"):
+        return LEVEL_DEBUG
+    return LEVEL_INFO
+
+
+class LogRecord:
+    """One line of the main log as kept in the ring buffer."""
+    __slots__ = ('seq', 'level', 'text', 'is_html')
+
+    def __init__(self, seq, level, text, is_html):
+        self.seq = seq
+        self.level = level
+        self.text = text
+        self.is_html = is_html
+
+    def matches(self, levels, search_text):
+        """
+        Returns whether the record passes a view filter.
+
+        Args:
+            levels (set or None): Allowed levels, or None for all.
+            search_text (str): Lowercase text the line must contain, or "" for any.
+        """
+        if levels is not None and self.level not in levels:
+            return False
+        return not search_text or search_text in self.text.lower()
+
+
+class LogSink:
+    """
+    Where every main-log line goes before it is shown.
+
+    Lines are kept in a capped ring buffer (LOG_RING_BUFFER_LINES), so the
+    view can be re-filtered without the widget having to hold the whole
+    session, and are streamed to a rotating file by a background thread, so
+    the full log survives on disk without the GUI thread doing file I/O.
+    Has no Qt dependency; the view reads from it.
+
+    Args:
+        file_path (str or None): The log file, or None to keep lines in memory only.
+        max_lines (int): The ring buffer's capacity.
+    """
+
+    def __init__(self, file_path=None, max_lines=LOG_RING_BUFFER_LINES):
+        self.file_path = file_path
+        self.records = deque(maxlen=max_lines)
+        self.lock = threading.Lock()
+        self.next_seq = 0
+        self.clear_seq = 0
+        self.file_logger = None
+        self.file_listener = None
+        if file_path:
+            self._start_file_writer(file_path)
+
+    def _start_file_writer(self, file_path):
+        try:
+            log_dir = os.path.dirname(file_path)
+            if log_dir:
+                os.makedirs(log_dir, exist_ok=True)
+            file_handler = logging.handlers.RotatingFileHandler(
+                file_path, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUP_COUNT, encoding='utf-8'
+            )
+        except OSError as e:
+            print(f"⚠️ Could not open log file '{file_path}': {e}. Logs will be kept in memory only.")
+            return
+        file_handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
+        # The GUI thread only enqueues; the listener thread does the writes and rotation.
+        records_queue = queue.SimpleQueue()
+        self.file_listener = logging.handlers.QueueListener(records_queue, file_handler)
+        self.file_logger = logging.getLogger(f"{__name__}.{next(_logger_ids)}")
+        self.file_logger.setLevel(logging.DEBUG)
+        self.file_logger.propagate = False
+        self.file_logger.addHandler(logging.handlers.QueueHandler(records_queue))
+        self.file_listener.start()
+
+    def write(self, messages, is_html=False):
+        """
+        Records log lines in the ring buffer and the log file.
+
+        Args:
+            messages (list): The lines, without any HTML marker prefix.
+            is_html (bool): Whether the lines are HTML fragments.
+
+        Returns:
+            list: The new LogRecord objects, in order.
+        """
+        new_records = []
+        with self.lock:
+            for text in messages:
+                new_records.append(LogRecord(self.next_seq, classify_log_level(text), text, is_html))
+                self.next_seq += 1
+            self.records.extend(new_records)
+        if self.file_logger is not None:
+            for record in new_records:
+                file_text = strip_html_tags(record.text) if is_html else record.text
+                if file_text:
+                    self.file_logger.log(_FILE_LOG_LEVELS[record.level], file_text)
+        return new_records
+
+    def mark_view_cleared(self):
+        """Notes that the view was cleared, so re-filtering starts after this point. The file is unaffected."""
+        with self.lock:
+            self.clear_seq = self.next_seq
+
+    def records_since_clear(self):
+        """Returns the buffered records written since the view was last cleared, oldest first."""
+        with self.lock:
+            return [record for record in self.records if record.seq >= self.clear_seq]
+
+    def close(self):
+        """Flushes and closes the log file; call once at shutdown."""
+        if self.file_listener is not None:
+            self.file_listener.stop()
+            for handler in self.file_listener.handlers:
+                handler.close()
+            self.file_listener = None
+        if self.file_logger is not None:
+            self.file_logger.handlers.clear()
+            self.file_logger = None
@@ -0,0 +1,348 @@
+# --- Standard Library Imports ---
+import threading
+from collections import OrderedDict, deque
+
+# --- Local Application Imports ---
+from .file_utils import clean_folder_name
+
+# --- Module Constants ---
+MATCHER_CACHE_SIZE = 8  # Distinct name lists / filter sets kept compiled at once
+
+
+def _is_word_char(ch):
+    """Mirrors the regex \\w class for a single character."""
+    return ch.isalnum() or ch == '_'
+
+
+def _has_word_boundaries(text, start, end):
+    """
+    Tells whether text[start:end] is bounded like a regex \\b...\\b match.
+
+    A \\b holds where a word character meets a non-word character (or the
+    edge of the text), so this depends on the pattern's own first and last
+    characters as well as its neighbours.
+    """
+    before = _is_word_char(text[start - 1]) if start > 0 else False
+    first = _is_word_char(text[start])
+    last = _is_word_char(text[end - 1])
+    after = _is_word_char(text[end]) if end < len(text) else False
+    return before != first and last != after
+
+
+class _Automaton:
+    """
+    An Aho-Corasick automaton over lowercase patterns.
+
+    Finds every occurrence of every pattern, including overlapping ones,
+    in one pass over the text.
+    """
+
+    def __init__(self, patterns):
+        self.pattern_lengths = []
+        self.goto = [{}]
+        self.fail = [0]
+        self.terminal = [[]]
+        for pattern_id, pattern in enumerate(patterns):
+            self.pattern_lengths.append(len(pattern))
+            state = 0
+            for ch in pattern:
+                next_state = self.goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][ch] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.terminal.append([])
+                state = next_state
+            self.terminal[state].append(pattern_id)
+
+        # Breadth-first pass: each state's fail link points at its longest proper suffix in the trie,
+        # and its output collects the patterns ending there, including those of its suffixes.
+        self.output = [list(pattern_ids) for pattern_ids in self.terminal]
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                fallback = self.goto[fallback].get(ch, 0)
+                self.fail[next_state] = fallback if fallback != next_state else 0
+                self.output[next_state].extend(self.output[self.fail[next_state]])
+
+    def iter_matches(self, text):
+        """Yields (start, end, pattern_id) for every occurrence in text."""
+        state = 0
+        for index, ch in enumerate(text):
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+            for pattern_id in self.output[state]:
+                yield index + 1 - self.pattern_lengths[pattern_id], index + 1, pattern_id
+
+    def iter_prefix_matches(self, text):
+        """Yields the id of every pattern that text starts with."""
+        state = 0
+        for ch in text:
+            state = self.goto[state].get(ch)
+            if state is None:
+                return
+            yield from self.terminal[state]
+
+
+class KnownNameMatcher:
+    """
+    Known.txt entries compiled for matching against titles and filenames.
+
+    Built once per name list; every alias of every entry goes into one
+    automaton, so a lookup costs one pass over the title instead of one
+    regex per alias.
+    """
+
+    def __init__(self, names_to_match):
+        aliases = []
+        self.alias_owner = []
+        self.folder_names = []
+        for name_obj in names_to_match:
+            primary_name = name_obj.get("name")
+            name_aliases = name_obj.get("aliases", [])
+            if not primary_name or not name_aliases:
+                continue
+            owner_index = len(self.folder_names)
+            self.folder_names.append(clean_folder_name(primary_name))
+            for alias in name_aliases:
+                alias_lower = alias.lower()
+                if alias_lower:
+                    aliases.append(alias_lower)
+                    self.alias_owner.append(owner_index)
+        self.automaton = _Automaton(aliases)
+
+    def _allowed_names(self, owner_indexes, unwanted_keywords):
+        return sorted({
+            self.folder_names[owner_index] for owner_index in owner_indexes
+            if self.folder_names[owner_index] and self.folder_names[owner_index].lower() not in unwanted_keywords
+        })
+
+    def match_title(self, title_lower, unwanted_keywords):
+        """
+        Returns the cleaned folder names whose aliases occur in the title as whole words.
+
+        Args:
+            title_lower (str): The cleaned, lowercased title.
+            unwanted_keywords (set): Folder names to leave out.
+
+        Returns:
+            list: The matched folder names, sorted.
+        """
+        owners = {
+            self.alias_owner[pattern_id]
+            for start, end, pattern_id in self.automaton.iter_matches(title_lower)
+            if _has_word_boundaries(title_lower, start, end)
+        }
+        return self._allowed_names(owners, unwanted_keywords)
+
+    def match_filename_prefix(self, filename_lower, unwanted_keywords):
+        """
+        Returns the cleaned folder names with an alias the filename starts with.
+
+        Args:
+            filename_lower (str): The lowercased filename.
+            unwanted_keywords (set): Folder names to leave out.
+
+        Returns:
+            list: The matched folder names, sorted.
+        """
+        owners = {self.alias_owner[pattern_id] for pattern_id in self.automaton.iter_prefix_matches(filename_lower)}
+        return self._allowed_names(owners, unwanted_keywords)
+
+
+class CharacterFilterMatcher:
+    """
+    The terms of a set of character filters compiled for one-pass matching.
+
+    A filter's terms are its aliases, plus its name when it is a group. When
+    several filters match, the first one in the list wins, as it would when
+    checking the filters one by one.
+    """
+
+    def __init__(self, filters):
+        terms = []
+        self.term_owner = []
+        self.term_text = []
+        for filter_index, filter_item_obj in enumerate(filters):
+            filter_terms = list(filter_item_obj["aliases"])
+            if filter_item_obj["is_group"] and filter_item_obj["name"] not in filter_terms:
+                filter_terms.append(filter_item_obj["name"])
+            for term in set(filter_terms):
+                term_lower = str(term).strip().lower()
+                if term_lower:
+                    terms.append(term_lower)
+                    self.term_owner.append(filter_index)
+                    self.term_text.append(term)
+        self.automaton = _Automaton(terms)
+
+    def _first_match(self, matches):
+        best_pattern_id = None
+        for pattern_id in matches:
+            if best_pattern_id is None or self.term_owner[pattern_id] < self.term_owner[best_pattern_id]:
+                best_pattern_id = pattern_id
+        if best_pattern_id is None:
+            return None, None
+        return self.term_owner[best_pattern_id], self.term_text[best_pattern_id]
+
+    def find_in_text(self, text):
+        """
+        Finds the first filter with a term in the text as a whole word (titles, comments).
+
+        Returns:
+            tuple: (filter_index, term), or (None, None) if nothing matches.
+        """
+        if not text:
+            return None, None
+        text_lower = text.lower()
+        return self._first_match(
+            pattern_id for start, end, pattern_id in self.automaton.iter_matches(text_lower)
+            if _has_word_boundaries(text_lower, start, end)
+        )
+
+    def find_in_filename(self, filename):
+        """
+        Finds the first filter with a term anywhere in the filename.
+
+        Returns:
+            tuple: (filter_index, term), or (None, None) if nothing matches.
+        """
+        if not filename:
+            return None, None
+        return self._first_match(pattern_id for _, _, pattern_id in self.automaton.iter_matches(filename.lower()))
+
+
+class BestKnownNameMatcher:
+    """
+    Known.txt entries compiled to find the one entry a title is most specifically about.
+
+    An entry's terms are its aliases, plus its name unless it is a group.
+    The entry with the longest whole-word match wins; on a tie, the earlier
+    entry does, as when checking the entries one by one.
+    """
+
+    def __init__(self, names_to_match):
+        terms = []
+        self.term_owner = []
+        self.primary_names = []
+        for owner_index, known_entry in enumerate(names_to_match):
+            self.primary_names.append(known_entry.get("name"))
+            entry_terms = set(known_entry.get("aliases", []))
+            if not known_entry.get("is_group", False):
+                entry_terms.add(known_entry["name"])
+            for term in entry_terms:
+                term_lower = term.lower()
+                if term_lower:
+                    terms.append(term_lower)
+                    self.term_owner.append(owner_index)
+        self.automaton = _Automaton(terms)
+
+    def find_best(self, title):
+        """
+        Returns the primary name of the best-matching entry for a title.
+
+        Args:
+            title (str): The raw post title.
+
+        Returns:
+            str or None: The entry's name, or None if no term occurs as a whole word.
+        """
+        if not title:
+            return None
+        title_lower = title.lower()
+        best = None
+        for start, end, pattern_id in self.automaton.iter_matches(title_lower):
+            if not _has_word_boundaries(title_lower, start, end):
+                continue
+            candidate = (-(end - start), self.term_owner[pattern_id])
+            if best is None or candidate < best:
+                best = candidate
+        return self.primary_names[best[1]] if best else None
+
+
+# --- Module State ---
+_known_name_matchers = OrderedDict()
+_character_filter_matchers = OrderedDict()
+_best_known_name_matchers = OrderedDict()
+_matchers_lock = threading.Lock()
+
+
+def _get_cached(cache, key, build):
+    with _matchers_lock:
+        matcher = cache.get(key)
+        if matcher is not None:
+            cache.move_to_end(key)
+            return matcher
+        matcher = cache[key] = build()
+        while len(cache) > MATCHER_CACHE_SIZE:
+            cache.popitem(last=False)
+        return matcher
+
+
+def _known_names_key(names_to_match):
+    # The GUI edits the global KNOWN_NAMES list in place, so only its content identifies it.
+    return tuple(
+        (known_entry.get("name"), bool(known_entry.get("is_group", False)), tuple(known_entry.get("aliases", [])))
+        for known_entry in names_to_match
+    )
+
+
+def get_known_name_matcher(names_to_match):
+    """
+    Returns the compiled matcher for a Known.txt name list, building it on first use.
+
+    Keyed by the entries' content, so edits to Known.txt (which change the
+    shared list in place) are picked up on the next call.
+
+    Args:
+        names_to_match (list): Known name dicts with 'name' and 'aliases'.
+
+    Returns:
+        KnownNameMatcher: The shared matcher.
+    """
+    return _get_cached(
+        _known_name_matchers, _known_names_key(names_to_match), lambda: KnownNameMatcher(names_to_match)
+    )
+
+
+def get_character_filter_matcher(filters):
+    """
+    Returns the compiled matcher for a list of character filters, building it on first use.
+
+    Filter lists are small and often copied (see the dynamic filter holder),
+    so they are keyed by content.
+
+    Args:
+        filters (list): Filter dicts with 'name', 'is_group' and 'aliases'.
+
+    Returns:
+        CharacterFilterMatcher: The shared matcher.
+    """
+    key = tuple(
+        (filter_item_obj["name"], bool(filter_item_obj["is_group"]), tuple(filter_item_obj["aliases"]))
+        for filter_item_obj in filters
+    )
+    return _get_cached(_character_filter_matchers, key, lambda: CharacterFilterMatcher(filters))
+
+
+def get_best_known_name_matcher(names_to_match):
+    """
+    Returns the compiled best-entry matcher for a Known.txt name list, building it on first use.
+
+    Keyed like `get_known_name_matcher`, by the entries' content.
+
+    Args:
+        names_to_match (list): Known name dicts with 'name', 'is_group' and 'aliases'.
+
+    Returns:
+        BestKnownNameMatcher: The shared matcher.
+    """
+    return _get_cached(
+        _best_known_name_matchers, _known_names_key(names_to_match), lambda: BestKnownNameMatcher(names_to_match)
+    )
@@ -138,6 +138,46 @@ def prepare_cookies_for_request(use_cookie_flag, cookie_text_input, selected_coo
     return None
 
 
+def get_url_host(url_or_host):
+    """
+    Returns the lowercase host of a URL, or of a bare hostname.
+
+    Args:
+        url_or_host (str): A full URL ('https://n1.kemono.cr/data/...') or a
+                           hostname ('kemono.cr').
+
+    Returns:
+        str: The host part, or an empty string if none can be found.
+    """
+    if not url_or_host:
+        return ""
+    if "://" in url_or_host:
+        return urlparse(url_or_host).netloc.lower()
+    return url_or_host.split('/')[0].lower()
+
+
+def parse_content_range(value):
+    """
+    Parses a Content-Range response header.
+
+    Args:
+        value (str): A header such as 'bytes 100-199/1000' or 'bytes */1000'.
+
+    Returns:
+        tuple: (start, end, total). Each item is an int, or None when the
+               header is missing or does not specify it.
+    """
+    match = re.match(r'\s*bytes\s+(?:(\d+)-(\d+)|\*)/(\d+|\*)', value or "")
+    if not match:
+        return None, None, None
+    start, end, total = match.groups()
+    return (
+        int(start) if start is not None else None,
+        int(end) if end is not None else None,
+        int(total) if total and total != '*' else None,
+    )
+
+
 # In src/utils/network_utils.py
 
 def extract_post_info(url_string):
@@ -0,0 +1,161 @@
+# --- Standard Library Imports ---
+import heapq
+import json
+import os
+import tempfile
+import threading
+
+# --- Local Application Imports ---
+from ..config.constants import SINGLE_PDF_SORT_RUN_SIZE, SINGLE_PDF_SPOOL_FILENAME
+
+# --- Module Constants ---
+INDEX_SUFFIX = ".idx"
+_MISSING_DATE_SORT_KEY = "Z"  # Posts without a date sort last, as before
+
+# --- Module State ---
+_spool_states = {}
+_spool_states_lock = threading.Lock()
+
+
+def get_pdf_spool_path(app_base_dir):
+    """
+    Returns the spool file single-PDF mode collects posts into.
+
+    Args:
+        app_base_dir (str): The application's base directory (appdata lives under it).
+
+    Returns:
+        str: The spool's path in appdata.
+    """
+    return os.path.join(app_base_dir, "appdata", SINGLE_PDF_SPOOL_FILENAME)
+
+
+def _get_spool_state(spool_path):
+    key = os.path.abspath(spool_path)
+    with _spool_states_lock:
+        state = _spool_states.get(key)
+        if state is None:
+            state = _spool_states[key] = {'lock': threading.Lock(), 'next_seq': 0}
+        return state
+
+
+def append_pdf_spool_record(spool_path, record):
+    """
+    Appends one post's content to a spool, safe to call from any worker thread.
+
+    The record goes to the spool as one compact JSON line, and its sort key
+    (publish date and arrival order) plus its offset go to the spool's index,
+    so the spool can later be read in date order without loading it.
+
+    Args:
+        spool_path (str): The spool file (see get_pdf_spool_path).
+        record (dict): The post's 'title', 'published' and 'content' or 'comments'.
+    """
+    data = json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b"\n"
+    state = _get_spool_state(spool_path)
+    with state['lock']:
+        spool_dir = os.path.dirname(spool_path)
+        if spool_dir:
+            os.makedirs(spool_dir, exist_ok=True)
+        with open(spool_path, 'ab') as spool_file:
+            offset = spool_file.tell()
+            spool_file.write(data)
+        # The record is written before its index entry, so the index never points past the data.
+        sort_key = record.get('published') or _MISSING_DATE_SORT_KEY
+        with open(spool_path + INDEX_SUFFIX, 'a', encoding='utf-8') as index_file:
+            index_file.write(json.dumps([str(sort_key), state['next_seq'], offset, len(data)]) + "\n")
+        state['next_seq'] += 1
+
+
+def remove_pdf_spool(spool_path):
+    """Deletes a spool and its index, if present."""
+    state = _get_spool_state(spool_path)
+    with state['lock']:
+        for path in (spool_path, spool_path + INDEX_SUFFIX):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def _iter_index_entries(spool_paths):
+    for spool_number, spool_path in enumerate(spool_paths):
+        index_path = spool_path + INDEX_SUFFIX
+        if not os.path.exists(index_path):
+            continue
+        with open(index_path, 'r', encoding='utf-8') as index_file:
+            for line in index_file:
+                try:
+                    sort_key, seq, offset, length = json.loads(line)
+                except ValueError:
+                    continue  # A line cut short by a crash
+                yield (sort_key, spool_number, seq, offset, length)
+
+
+def _write_run(entries, run_dir):
+    handle, run_path = tempfile.mkstemp(prefix="tmp_pdf_run_", suffix=".jsonl", dir=run_dir)
+    with os.fdopen(handle, 'w', encoding='utf-8') as run_file:
+        for entry in entries:
+            run_file.write(json.dumps(entry) + "\n")
+    return run_path
+
+
+def _iter_run(run_path):
+    with open(run_path, 'r', encoding='utf-8') as run_file:
+        for line in run_file:
+            yield tuple(json.loads(line))
+
+
+def iter_pdf_spool_records(spool_paths, run_size=SINGLE_PDF_SORT_RUN_SIZE):
+    """
+    Yields the spooled posts oldest first, holding at most `run_size` index entries and one post in memory.
+
+    The index is sorted externally: it is cut into sorted runs of `run_size`
+    entries written next to the spool, which are then merged; each post is
+    read from the spool only when its turn comes. Posts with the same date
+    keep the order they were spooled in, as the old sort of temp files did.
+
+    Args:
+        spool_paths (list): Spool files, in the order they were started.
+        run_size (int): Index entries sorted in memory at a time.
+
+    Yields:
+        dict: Each post's record.
+    """
+    spool_paths = list(spool_paths)
+    if not spool_paths:
+        return
+    run_dir = os.path.dirname(os.path.abspath(spool_paths[0]))
+    run_paths = []
+    chunk = []
+    try:
+        for entry in _iter_index_entries(spool_paths):
+            chunk.append(entry)
+            if len(chunk) >= run_size:
+                chunk.sort()
+                run_paths.append(_write_run(chunk, run_dir))
+                chunk = []
+        chunk.sort()
+        if run_paths:
+            if chunk:
+                run_paths.append(_write_run(chunk, run_dir))
+                chunk = []
+            ordered_entries = heapq.merge(*(_iter_run(run_path) for run_path in run_paths))
+        else:
+            ordered_entries = iter(chunk)
+
+        spool_files = {}
+        try:
+            for _, spool_number, _, offset, length in ordered_entries:
+                spool_file = spool_files.get(spool_number)
+                if spool_file is None:
+                    spool_file = spool_files[spool_number] = open(spool_paths[spool_number], 'rb')
+                spool_file.seek(offset)
+                yield json.loads(spool_file.read(length).decode('utf-8'))
+        finally:
+            for spool_file in spool_files.values():
+                spool_file.close()
+    finally:
+        for run_path in run_paths:
+            try:
+                os.remove(run_path)
+            except OSError:
+                pass
@@ -0,0 +1,204 @@
+# --- Standard Library Imports ---
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class PostListingCache:
+    """
+    An on-disk cache of creator post listings, keyed by (domain, service, user_id).
+
+    Posts are stored with a rank that mirrors the API's newest-first order, so
+    the tail of a listing can be replayed from disk once a refresh reaches
+    posts that were already seen. A creator's listing is only marked complete
+    after a sync has connected to the cached posts (or reached the end of the
+    feed), which guarantees the cache never has a gap in the middle. Each
+    post's 'edited' value is kept alongside it so a refresh can tell when a
+    cached post has changed.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_tables()
+
+    def _create_tables(self):
+        with self.lock, self.conn:
+            creator_columns = {row[1] for row in self.conn.execute("PRAGMA table_info(creators)")}
+            if creator_columns and 'domain' not in creator_columns:
+                # Listings cached before the domain was part of the key; it is only a cache, so start over.
+                self.conn.execute("DROP TABLE IF EXISTS creators")
+                self.conn.execute("DROP TABLE IF EXISTS posts")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS creators ("
+                " domain TEXT NOT NULL, service TEXT NOT NULL, user_id TEXT NOT NULL,"
+                " newest_post_id TEXT, newest_published TEXT,"
+                " complete INTEGER NOT NULL DEFAULT 0, last_synced REAL,"
+                " PRIMARY KEY (domain, service, user_id))"
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS posts ("
+                " domain TEXT NOT NULL, service TEXT NOT NULL, user_id TEXT NOT NULL, post_id TEXT NOT NULL,"
+                " sort_rank INTEGER NOT NULL, edited TEXT, data TEXT NOT NULL,"
+                " PRIMARY KEY (domain, service, user_id, post_id))"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_posts_rank ON posts (domain, service, user_id, sort_rank)"
+            )
+
+    def get_sync_state(self, domain, service, user_id):
+        """
+        Returns what is known about a creator's cached listing.
+
+        Returns:
+            dict or None: Keys 'newest_post_id', 'newest_published', 'complete',
+                          'last_synced' and 'post_count', or None if the creator
+                          has never been synced.
+        """
+        key = (domain.lower(), service, str(user_id))
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT newest_post_id, newest_published, complete, last_synced FROM creators"
+                " WHERE domain = ? AND service = ? AND user_id = ?", key
+            ).fetchone()
+            if row is None:
+                return None
+            post_count = self.conn.execute(
+                "SELECT COUNT(*) FROM posts WHERE domain = ? AND service = ? AND user_id = ?", key
+            ).fetchone()[0]
+        return {
+            'newest_post_id': row[0],
+            'newest_published': row[1],
+            'complete': bool(row[2]),
+            'last_synced': row[3],
+            'post_count': post_count,
+        }
+
+    def get_known_post_edits(self, domain, service, user_id):
+        """Returns a dict of the post IDs cached for a creator and each post's 'edited' value (or None)."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT post_id, edited FROM posts WHERE domain = ? AND service = ? AND user_id = ?",
+                (domain.lower(), service, str(user_id))
+            ).fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def get_cached_posts(self, domain, service, user_id, exclude_ids=None):
+        """
+        Returns a creator's cached posts in API order (newest first).
+
+        Args:
+            domain (str): The site's API domain (e.g., 'kemono.cr').
+            service (str): The service name (e.g., 'patreon').
+            user_id (str): The creator's user ID.
+            exclude_ids (set, optional): Post IDs to leave out.
+
+        Returns:
+            list: The cached post dictionaries.
+        """
+        exclude_ids = exclude_ids or set()
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT post_id, data FROM posts WHERE domain = ? AND service = ? AND user_id = ? ORDER BY sort_rank",
+                (domain.lower(), service, str(user_id))
+            ).fetchall()
+        posts = []
+        for post_id, data in rows:
+            if post_id in exclude_ids:
+                continue
+            try:
+                posts.append(json.loads(data))
+            except ValueError:
+                continue
+        return posts
+
+    def _post_row(self, key, post, sort_rank):
+        return key + (str(post.get('id')), sort_rank, post.get('edited') or None, json.dumps(post))
+
+    def _mark_complete(self, key):
+        newest = self.conn.execute(
+            "SELECT post_id, data FROM posts WHERE domain = ? AND service = ? AND user_id = ? ORDER BY sort_rank LIMIT 1",
+            key
+        ).fetchone()
+        newest_post_id, newest_published = None, None
+        if newest:
+            newest_post_id = newest[0]
+            try:
+                newest_published = json.loads(newest[1]).get('published')
+            except ValueError:
+                pass
+        self.conn.execute(
+            "INSERT OR REPLACE INTO creators (domain, service, user_id, newest_post_id, newest_published, complete, last_synced)"
+            " VALUES (?, ?, ?, ?, ?, 1, ?)",
+            key + (newest_post_id, newest_published, time.time())
+        )
+
+    def commit_sync(self, domain, service, user_id, new_posts, refreshed_posts=None):
+        """
+        Stores the result of a sync that reached known posts.
+
+        New posts are ranked ahead of everything already cached, keeping the
+        newest-first order. Refreshed posts (already cached, seen again during
+        this sync) only have their data updated.
+
+        Args:
+            domain (str): The site's API domain.
+            service (str): The service name.
+            user_id (str): The creator's user ID.
+            new_posts (list): Posts not previously cached, in API order.
+            refreshed_posts (list, optional): Already-cached posts fetched again.
+        """
+        key = (domain.lower(), service, str(user_id))
+        with self.lock, self.conn:
+            min_rank = self.conn.execute(
+                "SELECT MIN(sort_rank) FROM posts WHERE domain = ? AND service = ? AND user_id = ?", key
+            ).fetchone()[0]
+            first_rank = (min_rank if min_rank is not None else 0) - len(new_posts)
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO posts (domain, service, user_id, post_id, sort_rank, edited, data)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [self._post_row(key, post, first_rank + index) for index, post in enumerate(new_posts)]
+            )
+            if refreshed_posts:
+                self.conn.executemany(
+                    "UPDATE posts SET edited = ?, data = ? WHERE domain = ? AND service = ? AND user_id = ? AND post_id = ?",
+                    [(post.get('edited') or None, json.dumps(post)) + key + (str(post.get('id')),)
+                     for post in refreshed_posts]
+                )
+            self._mark_complete(key)
+
+    def replace_listing(self, domain, service, user_id, posts):
+        """
+        Replaces a creator's cached listing with one fetched in full, dropping posts no longer in it.
+
+        Args:
+            domain (str): The site's API domain.
+            service (str): The service name.
+            user_id (str): The creator's user ID.
+            posts (list): The creator's whole listing, in API order.
+        """
+        key = (domain.lower(), service, str(user_id))
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM posts WHERE domain = ? AND service = ? AND user_id = ?", key)
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO posts (domain, service, user_id, post_id, sort_rank, edited, data)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [self._post_row(key, post, index) for index, post in enumerate(posts)]
+            )
+            self._mark_complete(key)
+
+    def close(self):
+        """Closes the database connection."""
+        with self.lock:
+            try:
+                self.conn.close()
+            except sqlite3.Error:
+                pass
@@ -0,0 +1,167 @@
+# --- Standard Library Imports ---
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+# --- Local Application Imports ---
+from ..config.constants import PROBE_CACHE_MAX_AGE_SECONDS
+from .network_utils import parse_content_range
+
+FileProbe = namedtuple('FileProbe', ['size', 'accepts_ranges', 'etag', 'final_url', 'last_modified'])
+
+
+def probe_from_response(response):
+    """
+    Reads a file's metadata from the headers of a HEAD or GET response.
+
+    Args:
+        response (requests.Response): A 200 or 206 response for the file.
+
+    Returns:
+        FileProbe or None: The metadata, or None if the size cannot be told.
+    """
+    if response.status_code == 206:
+        _, _, size = parse_content_range(response.headers.get('Content-Range'))
+    elif response.status_code == 200:
+        content_length = response.headers.get('Content-Length')
+        size = int(content_length) if content_length and content_length.isdigit() else None
+    else:
+        size = None
+    if size is None:
+        return None
+    return FileProbe(
+        size=size,
+        accepts_ranges=response.status_code == 206 or 'bytes' in response.headers.get('Accept-Ranges', '').lower(),
+        etag=response.headers.get('ETag'),
+        final_url=response.url,
+        last_modified=response.headers.get('Last-Modified')
+    )
+
+
+def get_resume_validator(probe):
+    """
+    Returns the If-Range value that makes resuming a part file safe.
+
+    A strong ETag is preferred; otherwise the Last-Modified date is used. Weak
+    ETags are never valid in If-Range.
+
+    Args:
+        probe (FileProbe or None): The file's metadata from when the part was written.
+
+    Returns:
+        str or None: The validator, or None if the part cannot be resumed safely.
+    """
+    if probe is None:
+        return None
+    if probe.etag and not probe.etag.startswith('W/'):
+        return probe.etag
+    return probe.last_modified or None
+
+
+class ProbeCache:
+    """
+    Persistent per-URL cache of file metadata: size, range support, ETag,
+    Last-Modified and the URL the request was finally redirected to.
+
+    Every download GET already carries these headers, so the cache is filled
+    as a side effect of downloading. Later checks (size filter, "file exists"
+    check, multipart decision) read it instead of sending another HEAD.
+    Kemono/Coomer file URLs name the file by its content hash, so entries
+    stay valid across sessions; they expire after PROBE_CACHE_MAX_AGE_SECONDS
+    as a safety net.
+    """
+
+    def __init__(self, db_path):
+        self.lock = threading.Lock()
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS probes ("
+                " url TEXT PRIMARY KEY, size INTEGER NOT NULL, accepts_ranges INTEGER NOT NULL,"
+                " etag TEXT, final_url TEXT, checked_at REAL NOT NULL, last_modified TEXT)"
+            )
+            columns = {row[1] for row in self.conn.execute("PRAGMA table_info(probes)")}
+            if 'last_modified' not in columns:
+                self.conn.execute("ALTER TABLE probes ADD COLUMN last_modified TEXT")
+
+    def get(self, url):
+        """
+        Returns the cached metadata for a URL.
+
+        Returns:
+            FileProbe or None: The metadata, or None if unknown or expired.
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT size, accepts_ranges, etag, final_url, checked_at, last_modified FROM probes WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None or time.time() - row[4] > PROBE_CACHE_MAX_AGE_SECONDS:
+            return None
+        return FileProbe(size=row[0], accepts_ranges=bool(row[1]), etag=row[2], final_url=row[3], last_modified=row[5])
+
+    def record(self, url, probe):
+        """
+        Stores the metadata for a URL, replacing any older entry.
+
+        Args:
+            url (str): The URL as the post lists it.
+            probe (FileProbe): The metadata to store.
+        """
+        if probe is None:
+            return
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO probes (url, size, accepts_ranges, etag, final_url, checked_at, last_modified)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, probe.size, int(probe.accepts_ranges), probe.etag, probe.final_url, time.time(), probe.last_modified)
+            )
+
+    def forget(self, url):
+        """Drops the entry for a URL, e.g. after the server contradicted it."""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM probes WHERE url = ?", (url,))
+
+    def close(self):
+        """Closes the database connection."""
+        with self.lock:
+            try:
+                self.conn.close()
+            except sqlite3.Error:
+                pass
+
+
+# --- Module State ---
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_probe_cache(db_path):
+    """
+    Returns the shared ProbeCache for a database file, opening it on first use.
+
+    Args:
+        db_path (str): The SQLite file to use.
+
+    Returns:
+        ProbeCache or None: The cache, or None if it cannot be opened.
+    """
+    key = os.path.abspath(db_path)
+    cache = _caches.get(key)
+    if cache is not None:
+        return cache
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            try:
+                cache = ProbeCache(key)
+            except (OSError, sqlite3.Error):
+                return None
+            _caches[key] = cache
+        return cache
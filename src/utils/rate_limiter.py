@@ -0,0 +1,197 @@
+# --- Standard Library Imports ---
+import email.utils
+import threading
+import time
+
+# --- Local Application Imports ---
+from .network_utils import get_url_host
+from ..config.constants import (
+    RATE_LIMIT_INITIAL_RPS, RATE_LIMIT_MIN_RPS, RATE_LIMIT_MAX_RPS,
+    RATE_LIMIT_BURST, RATE_LIMIT_INCREASE_STEP, RATE_LIMIT_DECREASE_FACTOR,
+    RATE_LIMIT_BASE_BACKOFF_SECONDS, RATE_LIMIT_MAX_BACKOFF_SECONDS
+)
+
+# --- Module Constants ---
+# 403 is left out: on the CDN it usually means one node lacks one file, not that the host is throttling.
+THROTTLE_STATUS_CODES = {429, 500, 502, 503, 504, 520, 521, 522, 523, 524}
+_WAIT_SLICE_SECONDS = 0.25
+
+
+def parse_retry_after(value):
+    """
+    Parses a Retry-After header value into a number of seconds.
+
+    Args:
+        value (str): Either delta-seconds ("120") or an HTTP date.
+
+    Returns:
+        float or None: Seconds to wait, or None if the value is missing or invalid.
+    """
+    if not value:
+        return None
+    value = str(value).strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class HostRateLimiter:
+    """
+    An adaptive token bucket for a single host.
+
+    Requests take one token each. The refill rate grows additively while the
+    host answers normally and is cut multiplicatively when it throttles
+    (429/5xx). A throttle also blocks the host until its Retry-After
+    time, or an exponential backoff when the server gives none.
+    """
+
+    def __init__(self, host):
+        self.host = host
+        self.lock = threading.Lock()
+        self.rate = float(RATE_LIMIT_INITIAL_RPS)
+        self.capacity = float(RATE_LIMIT_BURST)
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self.blocked_until = 0.0
+        self.consecutive_throttles = 0
+
+    def _refill(self, now):
+        elapsed = now - self.last_refill
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.last_refill = now
+
+    def acquire(self, cancellation_event=None):
+        """
+        Blocks until a request token is available for this host.
+
+        Returns early, without taking a token, if the cancellation event is set.
+
+        Returns:
+            bool: True if a token was taken, False if cancelled while waiting.
+        """
+        while True:
+            if cancellation_event and cancellation_event.is_set():
+                return False
+            with self.lock:
+                now = time.monotonic()
+                if now >= self.blocked_until:
+                    self._refill(now)
+                    if self.tokens >= 1.0:
+                        self.tokens -= 1.0
+                        return True
+                    wait_time = (1.0 - self.tokens) / self.rate
+                else:
+                    wait_time = self.blocked_until - now
+            time.sleep(min(wait_time, _WAIT_SLICE_SECONDS))
+
+    def record_success(self):
+        """Speeds the bucket up after a healthy response."""
+        with self.lock:
+            self.consecutive_throttles = 0
+            self.rate = min(RATE_LIMIT_MAX_RPS, self.rate + RATE_LIMIT_INCREASE_STEP)
+
+    def record_throttle(self, retry_after=None):
+        """
+        Slows the bucket down and blocks the host after a throttling response.
+
+        Args:
+            retry_after (float, optional): Seconds the server asked us to wait.
+
+        Returns:
+            float: The number of seconds the host is now blocked for.
+        """
+        with self.lock:
+            self.consecutive_throttles += 1
+            self.rate = max(RATE_LIMIT_MIN_RPS, self.rate * RATE_LIMIT_DECREASE_FACTOR)
+            if retry_after is None:
+                backoff = RATE_LIMIT_BASE_BACKOFF_SECONDS * (2 ** (self.consecutive_throttles - 1))
+            else:
+                backoff = retry_after
+            backoff = min(backoff, RATE_LIMIT_MAX_BACKOFF_SECONDS)
+            now = time.monotonic()
+            self.blocked_until = max(self.blocked_until, now + backoff)
+            self.tokens = 0.0
+            self.last_refill = now
+            return self.blocked_until - now
+
+    def remaining_block_time(self):
+        """Returns how many seconds remain before the host accepts requests again."""
+        with self.lock:
+            return max(0.0, self.blocked_until - time.monotonic())
+
+
+# --- Module State ---
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(url_or_host):
+    """
+    Returns the shared rate limiter for the host of a URL.
+
+    Args:
+        url_or_host (str): A full URL or a bare hostname.
+
+    Returns:
+        HostRateLimiter: The limiter for that host, created on first use.
+    """
+    host = get_url_host(url_or_host)
+    limiter = _limiters.get(host)
+    if limiter is not None:
+        return limiter
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = HostRateLimiter(host)
+            _limiters[host] = limiter
+        return limiter
+
+
+def acquire_request_slot(url, cancellation_event=None):
+    """Waits for the host of `url` to allow another request."""
+    return get_rate_limiter(url).acquire(cancellation_event)
+
+
+def report_response(url, status_code, headers=None):
+    """
+    Feeds a response back into the limiter of its host.
+
+    Args:
+        url (str): The URL that was requested.
+        status_code (int): The HTTP status code of the response.
+        headers (Mapping, optional): Response headers, used for Retry-After.
+    """
+    limiter = get_rate_limiter(url)
+    if status_code in THROTTLE_STATUS_CODES:
+        retry_after = parse_retry_after(headers.get('Retry-After')) if headers else None
+        limiter.record_throttle(retry_after)
+    elif status_code < 400:
+        limiter.record_success()
+
+
+def get_retry_delay(url, attempt):
+    """
+    Returns how long to wait before retrying a failed request to `url`.
+
+    If the host is currently blocked (e.g. after a 429 with Retry-After) the
+    remaining block time is used; otherwise a short exponential backoff.
+
+    Args:
+        url (str): The URL that failed.
+        attempt (int): The 1-based number of the retry about to be made.
+
+    Returns:
+        float: Seconds to wait.
+    """
+    exponential = RATE_LIMIT_BASE_BACKOFF_SECONDS * (2 ** max(0, attempt - 1))
+    delay = max(exponential, get_rate_limiter(url).remaining_block_time())
+    return min(delay, RATE_LIMIT_MAX_BACKOFF_SECONDS)
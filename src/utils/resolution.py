@@ -7,7 +7,7 @@ import os
 from PyQt5.QtWidgets import (
     QSplitter, QScrollArea, QFrame, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
     QLineEdit, QPushButton, QStackedWidget, QButtonGroup, QRadioButton, QCheckBox,
-    QListWidget, QTextEdit, QApplication
+    QListWidget, QTextEdit, QApplication, QComboBox
 )
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QIntValidator, QFont # <-- Import QFont
@@ -15,6 +15,7 @@ from PyQt5.QtGui import QIntValidator, QFont # <-- Import QFont
 # --- Local Application Imports ---
 # Assuming execution from project root
 from ..config.constants import *
+from ..ui.log_view import LOG_FILTER_CHOICES, LogView
 
 
 def setup_ui(main_app):
@@ -421,9 +422,7 @@ def setup_ui(main_app):
     right_layout.addLayout(log_title_layout)
     main_app.log_splitter = QSplitter(Qt.Vertical)
     main_app.log_view_stack = QStackedWidget()
-    main_app.main_log_output = QTextEdit()
-    main_app.main_log_output.setReadOnly(True)
-    main_app.main_log_output.setLineWrapMode(QTextEdit.NoWrap)
+    main_app.main_log_output = LogView(main_app.log_sink)
     main_app.log_view_stack.addWidget(main_app.main_log_output)
     main_app.missed_character_log_output = QTextEdit()
     main_app.missed_character_log_output.setReadOnly(True)
@@ -438,6 +437,17 @@ def setup_ui(main_app):
     main_app.log_splitter.setSizes([main_app.height(), 0])
     right_layout.addWidget(main_app.log_splitter, 1)
     export_button_layout = QHBoxLayout()
+    main_app.log_level_filter_combo = QComboBox()
+    for label, _ in LOG_FILTER_CHOICES:
+        main_app.log_level_filter_combo.addItem(label)
+    main_app.log_level_filter_combo.setToolTip("Show only log lines of this kind. The full log is kept in appdata/logs.")
+    main_app.log_level_filter_combo.setFixedWidth(int(140 * scale))
+    export_button_layout.addWidget(main_app.log_level_filter_combo)
+    main_app.log_text_filter_input = QLineEdit()
+    main_app.log_text_filter_input.setPlaceholderText(main_app._tr("log_text_filter_placeholder", "Filter log (e.g. post title)..."))
+    main_app.log_text_filter_input.setClearButtonEnabled(True)
+    main_app.log_text_filter_input.setFixedWidth(int(220 * scale))
+    export_button_layout.addWidget(main_app.log_text_filter_input)
     export_button_layout.addStretch(1)
     main_app.export_links_button = QPushButton(main_app._tr("export_links_button_text", "Export Links"))
     main_app.export_links_button.setFixedWidth(int(100 * scale))
@@ -0,0 +1,163 @@
+# --- Standard Library Imports ---
+import threading
+from http.cookiejar import DefaultCookiePolicy
+
+# --- Third-Party Library Imports ---
+import requests
+import cloudscraper
+from requests.adapters import HTTPAdapter
+
+# --- Local Application Imports ---
+from ..config.constants import HTTP_POOL_MAXSIZE, HTTP_POOL_CONNECTIONS
+from .network_utils import get_url_host
+from .rate_limiter import acquire_request_slot, report_response
+
+
+class RequestCancelledError(requests.exceptions.RequestException):
+    """Raised instead of sending a request when the user cancelled while it waited for its turn."""
+
+
+# --- Module State ---
+# One keep-alive session per (host, kind). Sessions are shared by every
+# PostWorker_/P{id}File_/MPChunk_ thread, so all access goes through the lock.
+_sessions = {}
+_sessions_lock = threading.Lock()
+_pool_maxsize = HTTP_POOL_MAXSIZE
+
+
+def _mount_adapters(session, pool_maxsize):
+    """
+    Mounts fresh adapters with pools of `pool_maxsize` connections on a session.
+
+    cloudscraper sessions get a new CipherSuiteAdapter built from the
+    scraper's own TLS settings, as cloudscraper itself mounts it, so they
+    keep their Cloudflare-friendly handshake. Requests already running
+    finish on the adapters being replaced.
+    """
+    pool_kwargs = {'pool_connections': HTTP_POOL_CONNECTIONS, 'pool_maxsize': pool_maxsize}
+    if isinstance(session, cloudscraper.CloudScraper):
+        https_adapter = cloudscraper.CipherSuiteAdapter(
+            cipherSuite=session.cipherSuite,
+            ecdhCurve=session.ecdhCurve,
+            server_hostname=session.server_hostname,
+            source_address=session.source_address,
+            ssl_context=session.ssl_context,
+            **pool_kwargs
+        )
+    else:
+        https_adapter = HTTPAdapter(**pool_kwargs)
+    session.mount('https://', https_adapter)
+    session.mount('http://', HTTPAdapter(**pool_kwargs))
+
+
+def _report_response_hook(response, *args, **kwargs):
+    """Response hook that feeds every status code into the host's rate limiter."""
+    report_response(response.url, response.status_code, response.headers)
+
+
+def _install_rate_limiting(session, rate_limited):
+    """
+    Routes every request of a session through the per-host rate limiter.
+
+    `session.get(url, ..., cancellation_event=event)` is accepted so callers
+    can stop waiting for a slot when the user cancels; a request cancelled
+    that way raises RequestCancelledError instead of being sent. Sessions
+    for media transfers (`rate_limited=False`) only honour the cancellation.
+    """
+    original_request = session.request
+
+    def rate_limited_request(method, url, *args, cancellation_event=None, **kwargs):
+        if rate_limited:
+            if not acquire_request_slot(url, cancellation_event):
+                raise RequestCancelledError(f"Request cancelled before it was sent: {url}")
+        elif cancellation_event and cancellation_event.is_set():
+            raise RequestCancelledError(f"Request cancelled before it was sent: {url}")
+        return original_request(method, url, *args, **kwargs)
+
+    session.request = rate_limited_request
+    if rate_limited:
+        session.hooks['response'].append(_report_response_hook)
+
+
+def _create_session(use_cloudscraper, rate_limited):
+    """Builds a new pooled session for one host."""
+    if use_cloudscraper:
+        # cloudscraper needs to keep its Cloudflare clearance cookies.
+        session = cloudscraper.create_scraper()
+    else:
+        session = requests.Session()
+        # Cookies are passed explicitly on every call; refusing to store
+        # Set-Cookie headers keeps each request as stateless as a bare requests.get().
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    _mount_adapters(session, _pool_maxsize)
+    _install_rate_limiting(session, rate_limited)
+    return session
+
+
+def get_session(url_or_host, use_cloudscraper=False, rate_limited=True):
+    """
+    Returns the shared keep-alive session for the host of a URL.
+
+    The first call for a host creates the session; later calls from any
+    thread reuse it so TCP and TLS handshakes are paid once per connection
+    instead of once per request. API and page requests made through it are
+    paced by the host's adaptive rate limiter (see rate_limiter.py).
+
+    Args:
+        url_or_host (str): A full URL or a bare hostname.
+        use_cloudscraper (bool): If True, returns a cloudscraper session for
+                                 endpoints that sit behind Cloudflare.
+        rate_limited (bool): False for media byte transfers (file GETs, HEAD
+                             probes and multipart chunks), which are bounded
+                             by the transfer scheduler instead of the limiter.
+
+    Returns:
+        requests.Session: The pooled session for that host.
+    """
+    key = (get_url_host(url_or_host), bool(use_cloudscraper), bool(rate_limited))
+    session = _sessions.get(key)
+    if session is not None:
+        return session
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = _create_session(use_cloudscraper, rate_limited)
+            _sessions[key] = session
+        return session
+
+
+def set_pool_size(pool_maxsize):
+    """
+    Changes how many keep-alive connections each host pool may hold.
+
+    Existing sessions get fresh adapters with the new size; requests
+    already running finish on the old ones.
+
+    Args:
+        pool_maxsize (int): The new maximum number of pooled connections per host.
+    """
+    global _pool_maxsize
+    pool_maxsize = max(1, int(pool_maxsize))
+    with _sessions_lock:
+        if pool_maxsize == _pool_maxsize:
+            return
+        _pool_maxsize = pool_maxsize
+        for session in _sessions.values():
+            _mount_adapters(session, pool_maxsize)
+
+
+def get_pool_size():
+    """Returns the current per-host connection pool size."""
+    return _pool_maxsize
+
+
+def close_all_sessions():
+    """Closes every pooled session and drops their idle connections."""
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        try:
+            session.close()
+        except Exception:
+            pass
@@ -0,0 +1,217 @@
+# --- Standard Library Imports ---
+import json
+import os
+import sqlite3
+import threading
+
+
+class SessionStore:
+    """
+    Transactional store for the state of an interrupted download session.
+
+    Backed by SQLite in WAL mode. Processed post IDs, failed files and
+    downloaded hashes are append-only rows, so recording a finished post is a
+    single small transaction instead of rewriting the whole session file.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.lock, self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS processed_posts (post_id TEXT PRIMARY KEY)")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS failed_files (file_key TEXT PRIMARY KEY, details TEXT NOT NULL)")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS downloaded_hashes (file_hash TEXT PRIMARY KEY)")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS manga_counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+    @staticmethod
+    def _failure_key(failure):
+        url = failure.get('file_info', {}).get('url') if isinstance(failure, dict) else None
+        return url if url else json.dumps(failure, sort_keys=True, default=str)
+
+    def _set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def _insert_failures(self, failures):
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO failed_files (file_key, details) VALUES (?, ?)",
+            [(self._failure_key(failure), json.dumps(failure, default=str)) for failure in failures]
+        )
+
+    def exists(self):
+        """Returns True if the store holds an interrupted session."""
+        with self.lock:
+            row = self.conn.execute("SELECT 1 FROM meta WHERE key = 'ui_settings'").fetchone()
+        return row is not None
+
+    def create(self, ui_settings, remaining_queue=None, manga_counters=None):
+        """
+        Starts a new session, discarding any previous one.
+
+        Args:
+            ui_settings (dict): The UI settings needed to restore the download.
+            remaining_queue (list, optional): Queued favorite items still to download.
+            manga_counters (dict, optional): Initial values of the manga counters.
+        """
+        with self.lock, self.conn:
+            self._clear_tables()
+            self._set_meta('ui_settings', ui_settings)
+            self._set_meta('remaining_queue', list(remaining_queue) if remaining_queue else [])
+            self._set_meta('last_processed_offset', 0)
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO manga_counters (name, value) VALUES (?, ?)",
+                list((manga_counters or {}).items())
+            )
+
+    def _clear_tables(self):
+        for table in ('meta', 'processed_posts', 'failed_files', 'downloaded_hashes', 'manga_counters'):
+            self.conn.execute(f"DELETE FROM {table}")
+
+    def clear(self):
+        """Deletes the stored session."""
+        with self.lock, self.conn:
+            self._clear_tables()
+
+    def record_post(self, post_id, manga_counters=None, permanent_failures=None):
+        """
+        Records a processed post and its side effects in one transaction.
+
+        Args:
+            post_id (str): The ID of the post that finished processing.
+            manga_counters (dict, optional): Current values of the manga counters.
+            permanent_failures (list, optional): Permanently failed file details.
+        """
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO processed_posts (post_id) VALUES (?)", (str(post_id),))
+            if manga_counters:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO manga_counters (name, value) VALUES (?, ?)",
+                    list(manga_counters.items())
+                )
+            if permanent_failures:
+                self._insert_failures(permanent_failures)
+
+    def replace_failed_files(self, failures):
+        """Replaces the stored list of permanently failed files (e.g., after a retry)."""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM failed_files")
+            self._insert_failures(failures)
+
+    def add_downloaded_hashes(self, file_hashes):
+        """Remembers hashes of successfully downloaded files."""
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO downloaded_hashes (file_hash) VALUES (?)",
+                [(file_hash,) for file_hash in file_hashes]
+            )
+
+    def load_session_info(self):
+        """
+        Reads the small part of the session needed to offer a restore.
+
+        Processed post IDs and downloaded hashes are not loaded here; use
+        `get_processed_post_ids` and `get_downloaded_hashes` when restoring.
+
+        Returns:
+            dict or None: A dict with 'ui_settings', 'remaining_queue' and a
+                          'download_state' summary, or None if no session exists.
+        """
+        with self.lock:
+            meta = {key: value for key, value in self.conn.execute("SELECT key, value FROM meta")}
+            if 'ui_settings' not in meta:
+                return None
+            failures = [row[0] for row in self.conn.execute("SELECT details FROM failed_files ORDER BY rowid")]
+            counters = dict(self.conn.execute("SELECT name, value FROM manga_counters"))
+            processed_count = self.conn.execute("SELECT COUNT(*) FROM processed_posts").fetchone()[0]
+        return {
+            'ui_settings': json.loads(meta['ui_settings']),
+            'remaining_queue': json.loads(meta.get('remaining_queue', '[]')),
+            'download_state': {
+                'permanently_failed_files': [json.loads(failure) for failure in failures],
+                'manga_counters': counters,
+                'last_processed_offset': json.loads(meta.get('last_processed_offset', '0')),
+                'processed_post_count': processed_count,
+            }
+        }
+
+    def get_processed_post_ids(self):
+        """Returns the IDs of all posts processed in the stored session."""
+        with self.lock:
+            return [row[0] for row in self.conn.execute("SELECT post_id FROM processed_posts ORDER BY rowid")]
+
+    def get_downloaded_hashes(self):
+        """Returns the hashes of files downloaded in the stored session."""
+        with self.lock:
+            return [row[0] for row in self.conn.execute("SELECT file_hash FROM downloaded_hashes")]
+
+    def import_legacy_json(self, json_path):
+        """
+        Converts an old session.json into this store and deletes the JSON file.
+
+        Args:
+            json_path (str): Path to the legacy session file.
+        """
+        with open(json_path, 'r', encoding='utf-8') as f:
+            session_data = json.load(f)
+        if "ui_settings" not in session_data or "download_state" not in session_data:
+            raise ValueError("Invalid session file structure.")
+        download_state = session_data.get('download_state', {})
+        with self.lock, self.conn:
+            self._clear_tables()
+            self._set_meta('ui_settings', session_data['ui_settings'])
+            self._set_meta('remaining_queue', session_data.get('remaining_queue', []))
+            self._set_meta('last_processed_offset', download_state.get('last_processed_offset', 0))
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO processed_posts (post_id) VALUES (?)",
+                [(str(post_id),) for post_id in download_state.get('processed_post_ids', [])]
+            )
+            self._insert_failures(download_state.get('permanently_failed_files', []))
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO downloaded_hashes (file_hash) VALUES (?)",
+                [(file_hash,) for file_hash in download_state.get('successfully_downloaded_hashes', [])]
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO manga_counters (name, value) VALUES (?, ?)",
+                list(download_state.get('manga_counters', {}).items())
+            )
+        os.remove(json_path)
+
+    def close(self):
+        """Closes the database connection."""
+        with self.lock:
+            try:
+                self.conn.close()
+            except sqlite3.Error:
+                pass
+
+
+# --- Module State ---
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_session_store(db_path):
+    """
+    Returns the shared SessionStore for a database path, opening it on first use.
+
+    Args:
+        db_path (str): Path to the session database.
+
+    Returns:
+        SessionStore: The store for that path.
+    """
+    store = _stores.get(db_path)
+    if store is not None:
+        return store
+    with _stores_lock:
+        store = _stores.get(db_path)
+        if store is None:
+            store = SessionStore(db_path)
+            _stores[db_path] = store
+        return store
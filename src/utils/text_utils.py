@@ -5,6 +5,7 @@ import html
 # --- Local Application Imports ---
 # Import from file_utils within the same package
 from .file_utils import clean_folder_name, FOLDER_NAME_STOP_WORDS
+from .name_matcher import get_known_name_matcher
 
 # --- Module Constants ---
 
@@ -25,6 +26,8 @@ KNOWN_TXT_MATCH_CLEANUP_PATTERNS = [
     r'\bComm\b',
     r'\bPreview\b',
 ]
+# All cleanup patterns as one alternation, so a title is cleaned in a single pass.
+KNOWN_TXT_MATCH_CLEANUP_REGEX = re.compile('|'.join(KNOWN_TXT_MATCH_CLEANUP_PATTERNS), re.IGNORECASE)
 
 # --- Text Matching and Manipulation Utilities ---
 
@@ -133,36 +136,12 @@ def match_folders_from_title(title, names_to_match, unwanted_keywords):
         return []
 
     # Clean the title by removing common tags like [OC], [HD], etc.
-    cleaned_title = title
-    for pat_str in KNOWN_TXT_MATCH_CLEANUP_PATTERNS:
-        cleaned_title = re.sub(pat_str, ' ', cleaned_title, flags=re.IGNORECASE)
+    cleaned_title = KNOWN_TXT_MATCH_CLEANUP_REGEX.sub(' ', title)
     cleaned_title = re.sub(r'\s+', ' ', cleaned_title).strip()
     title_lower = cleaned_title.lower()
 
-    matched_cleaned_names = set()
-    
-    # Sort by name length descending to match longer names first (e.g., "Cloud Strife" before "Cloud")
-    sorted_name_objects = sorted(names_to_match, key=lambda x: len(x.get("name", "")), reverse=True)
-
-    for name_obj in sorted_name_objects:
-        primary_folder_name = name_obj.get("name")
-        aliases = name_obj.get("aliases", [])
-        if not primary_folder_name or not aliases:
-            continue
-            
-        for alias in aliases:
-            alias_lower = alias.lower()
-            if not alias_lower: continue
-            
-            # Use word boundaries for accurate matching
-            pattern = r'\b' + re.escape(alias_lower) + r'\b'
-            if re.search(pattern, title_lower):
-                cleaned_primary_name = clean_folder_name(primary_folder_name)
-                if cleaned_primary_name.lower() not in unwanted_keywords:
-                    matched_cleaned_names.add(cleaned_primary_name)
-                    break # Move to the next name object once a match is found for this one
-                    
-    return sorted(list(matched_cleaned_names))
+    # Every alias is matched as a whole word in one pass of the shared, precompiled matcher.
+    return get_known_name_matcher(names_to_match).match_title(title_lower, unwanted_keywords)
 
 
 def match_folders_from_filename_enhanced(filename, names_to_match, unwanted_keywords):
@@ -180,28 +159,4 @@ def match_folders_from_filename_enhanced(filename, names_to_match, unwanted_keyw
     if not filename or not names_to_match:
         return []
 
-    filename_lower = filename.lower()
-    matched_primary_names = set()
-
-    # Create a flat list of (alias, primary_name) tuples to sort by alias length
-    alias_map_to_primary = []
-    for name_obj in names_to_match:
-        primary_name = name_obj.get("name")
-        if not primary_name: continue
-        
-        cleaned_primary_name = clean_folder_name(primary_name)
-        if not cleaned_primary_name or cleaned_primary_name.lower() in unwanted_keywords:
-            continue
-
-        for alias in name_obj.get("aliases", []):
-            if alias.lower():
-                alias_map_to_primary.append((alias.lower(), cleaned_primary_name))
-    
-    # Sort by alias length, descending, to match longer aliases first
-    alias_map_to_primary.sort(key=lambda x: len(x[0]), reverse=True)
-
-    for alias_lower, primary_name_for_alias in alias_map_to_primary:
-        if filename_lower.startswith(alias_lower):
-            matched_primary_names.add(primary_name_for_alias)
-
-    return sorted(list(matched_primary_names))
+    return get_known_name_matcher(names_to_match).match_filename_prefix(filename.lower(), unwanted_keywords)
@@ -0,0 +1,43 @@
+import time
+from concurrent.futures import Future, wait
+
+from src.core.async_engine import AsyncDownloadEngine
+
+
+class FakeWorker:
+    """Stands in for PostProcessorWorker: one step that asks for files, one that finishes."""
+
+    def __init__(self, post_id, file_count):
+        self.post_id = post_id
+        self.file_count = file_count
+
+    def check_cancel(self):
+        return False
+
+    def submit_file_job(self, file_job):
+        future = Future()
+        future.set_result(file_job * 2)
+        return future
+
+    def _process_steps(self):
+        if not self.file_count:
+            return (self.post_id, [])
+        file_results = yield list(range(self.file_count))
+        return (self.post_id, file_results)
+
+
+def test_posts_run_and_finished_futures_are_dropped():
+    engine = AsyncDownloadEngine(max_concurrent_posts=4)
+    try:
+        futures = [engine.submit_post(FakeWorker(post_id, post_id % 3)) for post_id in range(50)]
+        wait(futures)
+
+        assert [future.result() for future in futures[:3]] == [(0, []), (1, [0]), (2, [0, 2])]
+        # Done callbacks run just after waiters are woken, so give the last ones a moment.
+        deadline = time.monotonic() + 5
+        while engine.post_futures and time.monotonic() < deadline:
+            time.sleep(0.01)
+        with engine.post_futures_lock:
+            assert engine.post_futures == set()
+    finally:
+        engine.shutdown()
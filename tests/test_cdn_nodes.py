@@ -0,0 +1,35 @@
+import pytest
+
+pytest.importorskip("cloudscraper")  # Pulled in by the shared HTTP session pool
+
+from src.utils.cdn_nodes import CdnNodeManager
+
+FILE_URL = "https://kemono.cr/data/ab/cd/file.mp4"
+OTHER_FILE_URL = "https://kemono.cr/data/ef/01/other.mp4"
+
+
+def benched_hosts(manager):
+    return {host for host, _active, _speed, benched in manager.snapshot() if benched}
+
+
+def test_missing_file_excludes_the_node_for_that_file_only():
+    manager = CdnNodeManager("kemono.cr")
+    lease = manager.acquire(FILE_URL)
+    missing_host = lease.node.host
+    manager.release(lease, False, status_code=404)
+
+    assert benched_hosts(manager) == set()
+    file_hosts = {manager.acquire(FILE_URL).node.host for _ in range(len(manager.node_hosts()))}
+    assert missing_host not in file_hosts
+    other_file_lease = manager.acquire(OTHER_FILE_URL, exclude_hosts=set(manager.node_hosts()) - {missing_host})
+    assert other_file_lease.node.host == missing_host
+
+
+@pytest.mark.parametrize("status_code", [429, 503, None])
+def test_overload_and_connection_errors_bench_the_node(status_code):
+    manager = CdnNodeManager("kemono.cr")
+    lease = manager.acquire(FILE_URL)
+    manager.release(lease, False, status_code=status_code)
+
+    assert benched_hosts(manager) == {lease.node.host}
+    assert manager.acquire(OTHER_FILE_URL, exclude_hosts=set(manager.node_hosts()) - {lease.node.host}) is None
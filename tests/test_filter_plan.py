@@ -0,0 +1,79 @@
+import re
+
+import pytest
+
+from src.config.constants import SKIP_SCOPE_BOTH, SKIP_SCOPE_FILES, SKIP_SCOPE_POSTS
+from src.utils.filter_plan import get_filter_plan
+
+
+def old_find_skip_word(skip_words, text):
+    """The per-file/per-post loop the workers ran before the plan existed."""
+    text_lower = text.lower()
+    for skip_word in skip_words:
+        if skip_word.lower() in text_lower:
+            return skip_word
+    return None
+
+
+def old_remove_words(remove_words, base_name):
+    for word_to_remove in remove_words:
+        if not word_to_remove:
+            continue
+        pattern = re.compile(re.escape(word_to_remove), re.IGNORECASE)
+        base_name = pattern.sub("", base_name)
+    base_name = re.sub(r'[_.\s-]+', ' ', base_name)
+    base_name = re.sub(r'\s+', ' ', base_name)
+    return base_name.strip()
+
+
+SKIP_WORDS = ["WIP", "sketch", "c++", "[preview]", "Ärger"]
+TEXTS = [
+    "Final render",
+    "wip_final.png",
+    "Early SKETCH and wip",
+    "notes on C++ (part 2)",
+    "image [PREVIEW].jpg",
+    "ärger im paradies",
+    "",
+]
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_find_skip_word_matches_old_loop(text):
+    plan = get_filter_plan(SKIP_WORDS, SKIP_SCOPE_BOTH, [])
+    assert plan.find_skip_word(text) == old_find_skip_word(SKIP_WORDS, text)
+
+
+def test_find_skip_word_reports_the_first_configured_word():
+    plan = get_filter_plan(["sketch", "wip"], SKIP_SCOPE_FILES, [])
+    assert plan.find_skip_word("WIP sketch") == "sketch"
+
+
+@pytest.mark.parametrize("base_name", [
+    "artist_patreon_image_01",
+    "Patreon-Reward.Pack  v2",
+    "prefix__PATREONpatreon__suffix",
+    "(c) fanbox..exclusive",
+    "nothing to remove",
+])
+def test_remove_words_matches_old_substitutions(base_name):
+    remove_words = ["patreon", "", "(c)", "FANBOX"]
+    plan = get_filter_plan([], SKIP_SCOPE_FILES, remove_words)
+    assert plan.remove_words(base_name) == old_remove_words(remove_words, base_name)
+
+
+def test_scope_selects_files_posts_or_both():
+    files_plan = get_filter_plan(["wip"], SKIP_SCOPE_FILES, [])
+    posts_plan = get_filter_plan(["wip"], SKIP_SCOPE_POSTS, [])
+    both_plan = get_filter_plan(["wip"], SKIP_SCOPE_BOTH, [])
+    empty_plan = get_filter_plan([], SKIP_SCOPE_BOTH, [])
+
+    assert (files_plan.skip_files, files_plan.skip_posts) == (True, False)
+    assert (posts_plan.skip_files, posts_plan.skip_posts) == (False, True)
+    assert (both_plan.skip_files, both_plan.skip_posts) == (True, True)
+    assert (empty_plan.skip_files, empty_plan.skip_posts) == (False, False)
+    assert empty_plan.find_skip_word("wip") is None
+
+
+def test_same_settings_share_one_plan():
+    assert get_filter_plan(["wip"], SKIP_SCOPE_FILES, ["x"]) is get_filter_plan(["wip"], SKIP_SCOPE_FILES, ["x"])
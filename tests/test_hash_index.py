@@ -0,0 +1,37 @@
+import os
+
+from src.utils.hash_index import compute_file_md5, get_hash_index, get_hash_index_path
+
+
+def test_index_is_stored_in_appdata_per_root(tmp_path):
+    app_base_dir = tmp_path / "app"
+    first_root = tmp_path / "downloads_a"
+    second_root = tmp_path / "downloads_b"
+    first_root.mkdir()
+    second_root.mkdir()
+
+    first_index = get_hash_index(str(first_root), str(app_base_dir))
+    second_index = get_hash_index(str(second_root), str(app_base_dir))
+
+    assert first_index is not second_index
+    assert os.listdir(first_root) == []
+    assert first_index.db_path == get_hash_index_path(str(app_base_dir), str(first_root))
+    assert first_index.db_path != second_index.db_path
+    assert os.path.dirname(first_index.db_path).startswith(str(app_base_dir / "appdata"))
+
+
+def test_record_and_find_existing_file(tmp_path):
+    root = tmp_path / "downloads"
+    root.mkdir()
+    saved_file = root / "image.png"
+    saved_file.write_bytes(b"image bytes")
+    index = get_hash_index(str(root), str(tmp_path / "app"))
+
+    file_hash = compute_file_md5(str(saved_file))
+    index.record(str(saved_file), file_hash)
+
+    assert index.lookup(str(saved_file)) == file_hash
+    assert index.find_existing_file(file_hash) == str(saved_file)
+
+    saved_file.write_bytes(b"changed bytes, different size")
+    assert index.lookup(str(saved_file)) is None
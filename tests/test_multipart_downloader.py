@@ -0,0 +1,171 @@
+import hashlib
+import os
+import threading
+
+import pytest
+
+pytest.importorskip("cloudscraper")  # Pulled in by the shared HTTP session pool
+
+from src.services import multipart_downloader
+from src.services.multipart_downloader import _BlockBitmap, _OrderedHasher, discard_multipart_download, download_file_in_parts
+
+BLOCK_SIZE = 16
+VALIDATOR = '"etag-1"'
+
+
+def write_blocks(target_path, data, bitmap, first_block, last_block):
+    """Writes blocks first_block..last_block of `data` to the target and marks them done."""
+    start = first_block * BLOCK_SIZE
+    end = min(len(data), (last_block + 1) * BLOCK_SIZE)
+    with open(target_path, 'r+b') as f:
+        f.seek(start)
+        f.write(data[start:end])
+    bitmap.mark_done(first_block, last_block)
+    return start, data[start:end]
+
+
+@pytest.fixture
+def target(tmp_path):
+    data = bytes(range(256)) * 2 + b"tail"  # 516 bytes: 32 full blocks and a short last one
+    target_path = str(tmp_path / "video.mp4.multipart.part")
+    with open(target_path, 'wb') as f:
+        f.truncate(len(data))
+    return target_path, data
+
+
+def test_bitmap_resume_restores_completed_blocks(target):
+    target_path, data = target
+    bitmap = _BlockBitmap(target_path + ".bitmap", len(data), BLOCK_SIZE, VALIDATOR)
+    bitmap.mark_done(0, 3)
+    bitmap.mark_done(10, 10)
+    bitmap.mark_done(bitmap.num_blocks - 1, bitmap.num_blocks - 1)
+    bitmap.save(force=True)
+
+    resumed = _BlockBitmap(target_path + ".bitmap", len(data), BLOCK_SIZE, VALIDATOR)
+    assert resumed.load()
+    assert resumed.completed_bytes() == 5 * BLOCK_SIZE + 4
+    assert resumed.missing_ranges() == [(4 * BLOCK_SIZE, 10 * BLOCK_SIZE - 1), (11 * BLOCK_SIZE, 32 * BLOCK_SIZE - 1)]
+    assert not resumed.all_done()
+
+
+def test_bitmap_for_another_size_is_not_resumed(target):
+    target_path, data = target
+    bitmap = _BlockBitmap(target_path + ".bitmap", len(data), BLOCK_SIZE, VALIDATOR)
+    bitmap.mark_done(0, 0)
+    bitmap.save(force=True)
+
+    assert not _BlockBitmap(target_path + ".bitmap", len(data) + 1, BLOCK_SIZE, VALIDATOR).load()
+    assert not _BlockBitmap(target_path + ".bitmap", len(data), BLOCK_SIZE * 2, VALIDATOR).load()
+
+
+def test_bitmap_for_another_validator_is_not_resumed(target):
+    target_path, data = target
+    bitmap = _BlockBitmap(target_path + ".bitmap", len(data), BLOCK_SIZE, VALIDATOR)
+    bitmap.mark_done(0, 0)
+    bitmap.save(force=True)
+
+    assert not _BlockBitmap(target_path + ".bitmap", len(data), BLOCK_SIZE, '"etag-2"').load()
+    assert not _BlockBitmap(target_path + ".bitmap", len(data), BLOCK_SIZE).load()
+
+
+def test_bitmap_without_validator_is_never_written(target):
+    target_path, data = target
+    bitmap = _BlockBitmap(target_path + ".bitmap", len(data), BLOCK_SIZE)
+    bitmap.mark_done(0, 0)
+    bitmap.save(force=True)
+
+    assert not os.path.exists(target_path + ".bitmap")
+
+
+def test_discard_removes_part_file_and_bitmap(target):
+    target_path, data = target
+    bitmap = _BlockBitmap(target_path + ".bitmap", len(data), BLOCK_SIZE, VALIDATOR)
+    bitmap.save(force=True)
+
+    discard_multipart_download(target_path)
+
+    assert not os.path.exists(target_path)
+    assert not os.path.exists(target_path + ".bitmap")
+
+
+def test_hasher_matches_md5_for_out_of_order_segments(target):
+    target_path, data = target
+    bitmap = _BlockBitmap(target_path + ".bitmap", len(data), BLOCK_SIZE, VALIDATOR)
+    hasher = _OrderedHasher(target_path, bitmap)
+    for first_block, last_block in [(20, 32), (8, 19), (0, 7)]:
+        hasher.feed(*write_blocks(target_path, data, bitmap, first_block, last_block))
+
+    assert hasher.pending_bytes == 0
+    assert hasher.hexdigest() == hashlib.md5(data).hexdigest()
+
+
+def test_hasher_counts_a_refed_segment_once(target):
+    target_path, data = target
+    bitmap = _BlockBitmap(target_path + ".bitmap", len(data), BLOCK_SIZE, VALIDATOR)
+    hasher = _OrderedHasher(target_path, bitmap)
+
+    segment = write_blocks(target_path, data, bitmap, 4, 7)
+    hasher.feed(*segment)
+    # A retried segment hands the same range to the hasher again.
+    hasher.feed(*segment)
+    assert hasher.pending_bytes == 4 * BLOCK_SIZE
+    assert len(hasher.pending) == 1
+
+    hasher.feed(*write_blocks(target_path, data, bitmap, 8, 32))
+    hasher.feed(*write_blocks(target_path, data, bitmap, 0, 3))
+    assert hasher.pending_bytes == 0
+    assert hasher.pending == {}
+    assert hasher.hexdigest() == hashlib.md5(data).hexdigest()
+
+
+def test_hasher_reads_back_blocks_resumed_from_disk(target):
+    target_path, data = target
+    bitmap = _BlockBitmap(target_path + ".bitmap", len(data), BLOCK_SIZE, VALIDATOR)
+    write_blocks(target_path, data, bitmap, 0, 15)  # On disk from an earlier attempt, never fed
+    hasher = _OrderedHasher(target_path, bitmap)
+
+    hasher.feed(*write_blocks(target_path, data, bitmap, 16, 32))
+
+    assert hasher.hexdigest() == hashlib.md5(data).hexdigest()
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeSession:
+    """Answers every chunk request with 200, as a server does when If-Range no longer matches."""
+
+    def __init__(self):
+        self.sent_headers = []
+        self.lock = threading.Lock()
+
+    def get(self, url, headers=None, **kwargs):
+        with self.lock:
+            self.sent_headers.append(headers)
+        return FakeResponse(200)
+
+
+def test_full_response_to_a_range_request_discards_the_resume_state(target, monkeypatch):
+    target_path, data = target
+    session = FakeSession()
+    monkeypatch.setattr(multipart_downloader, "get_session", lambda url, rate_limited=True: session)
+
+    success, _, md5_hash, file_handle = download_file_in_parts(
+        "https://n1.kemono.cr/data/video.mp4", target_path, 4 * 1024 * 1024, 2, {}, "video.mp4",
+        emitter_for_multipart=None, cookies_for_chunk_session=None, cancellation_event=threading.Event(),
+        skip_event=threading.Event(), logger_func=lambda message: None, pause_event=threading.Event(),
+        resume_validator=VALIDATOR
+    )
+
+    assert (success, md5_hash, file_handle) == (False, None, None)
+    assert session.sent_headers and all(headers['If-Range'] == VALIDATOR for headers in session.sent_headers)
+    assert not os.path.exists(target_path)
+    assert not os.path.exists(target_path + ".bitmap")
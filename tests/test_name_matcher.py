@@ -0,0 +1,145 @@
+import re
+
+import pytest
+
+from src.utils.file_utils import clean_folder_name
+from src.utils.name_matcher import get_best_known_name_matcher, get_character_filter_matcher
+from src.utils.text_utils import (
+    KNOWN_TXT_MATCH_CLEANUP_PATTERNS, is_filename_match_for_character, is_title_match_for_character,
+    match_folders_from_filename_enhanced, match_folders_from_title
+)
+
+KNOWN_NAMES = [
+    {'name': "Cloud Strife", 'is_group': False, 'aliases': ["Cloud Strife", "Cloud"]},
+    {'name': "Tifa", 'is_group': False, 'aliases': ["Tifa", "Tifa Lockhart"]},
+    {'name': "C.C.", 'is_group': False, 'aliases': ["C.C."]},
+    {'name': "Final Fantasy", 'is_group': True, 'aliases': ["Cloud", "Aerith", "FF7"]},
+    {'name': "Aerith", 'is_group': False, 'aliases': ["Aerith"]},
+    {'name': "Noaliases", 'is_group': False, 'aliases': []},
+]
+TITLES = [
+    "Cloud Strife and Tifa Lockhart [OC] HD",
+    "cloudy day with aerith",
+    "C.C. pinup (commission)",
+    "ff7 remake - tifa",
+    "Aerith_sketch 4k",
+    "Noaliases only",
+    "",
+]
+FILENAMES = ["cloud_01.png", "tifa lockhart.jpg", "C.C._wip.png", "ff7.zip", "aerithcloud.png", "other.png"]
+UNWANTED = {"aerith"}
+
+
+def old_match_folders_from_title(title, names_to_match, unwanted_keywords):
+    """The per-alias regex loop that match_folders_from_title ran before the automaton."""
+    if not title or not names_to_match:
+        return []
+    cleaned_title = title
+    for pat_str in KNOWN_TXT_MATCH_CLEANUP_PATTERNS:
+        cleaned_title = re.sub(pat_str, ' ', cleaned_title, flags=re.IGNORECASE)
+    title_lower = re.sub(r'\s+', ' ', cleaned_title).strip().lower()
+    matched_cleaned_names = set()
+    for name_obj in sorted(names_to_match, key=lambda x: len(x.get("name", "")), reverse=True):
+        primary_folder_name = name_obj.get("name")
+        aliases = name_obj.get("aliases", [])
+        if not primary_folder_name or not aliases:
+            continue
+        for alias in aliases:
+            alias_lower = alias.lower()
+            if alias_lower and re.search(r'\b' + re.escape(alias_lower) + r'\b', title_lower):
+                cleaned_primary_name = clean_folder_name(primary_folder_name)
+                if cleaned_primary_name.lower() not in unwanted_keywords:
+                    matched_cleaned_names.add(cleaned_primary_name)
+                    break
+    return sorted(matched_cleaned_names)
+
+
+def old_match_folders_from_filename(filename, names_to_match, unwanted_keywords):
+    if not filename or not names_to_match:
+        return []
+    filename_lower = filename.lower()
+    matched_primary_names = set()
+    for name_obj in names_to_match:
+        primary_name = name_obj.get("name")
+        if not primary_name:
+            continue
+        cleaned_primary_name = clean_folder_name(primary_name)
+        if not cleaned_primary_name or cleaned_primary_name.lower() in unwanted_keywords:
+            continue
+        for alias in name_obj.get("aliases", []):
+            if alias.lower() and filename_lower.startswith(alias.lower()):
+                matched_primary_names.add(cleaned_primary_name)
+    return sorted(matched_primary_names)
+
+
+def old_find_best_known_name(title_raw, names_to_match):
+    """The favorite posts dialog's loop, one regex per alias per entry."""
+    title_lower = title_raw.lower()
+    best_match_known_name_primary = None
+    longest_match_len = 0
+    for known_entry in names_to_match:
+        aliases_to_check = set(known_entry.get("aliases", []))
+        if not known_entry.get("is_group", False):
+            aliases_to_check.add(known_entry["name"])
+        for alias in sorted(aliases_to_check, key=len, reverse=True):
+            alias_lower = alias.lower()
+            if not alias_lower:
+                continue
+            if re.search(r'\b' + re.escape(alias_lower) + r'\b', title_lower):
+                if len(alias_lower) > longest_match_len:
+                    longest_match_len = len(alias_lower)
+                    best_match_known_name_primary = known_entry["name"]
+                break
+    return best_match_known_name_primary
+
+
+def old_first_matching_filter(filters, text, match_term):
+    for filter_index, filter_item_obj in enumerate(filters):
+        terms = list(filter_item_obj["aliases"])
+        if filter_item_obj["is_group"] and filter_item_obj["name"] not in terms:
+            terms.append(filter_item_obj["name"])
+        if any(match_term(text, term) for term in terms):
+            return filter_index
+    return None
+
+
+@pytest.mark.parametrize("title", TITLES)
+def test_title_matching_equals_old_regex_loop(title):
+    assert match_folders_from_title(title, KNOWN_NAMES, UNWANTED) == old_match_folders_from_title(title, KNOWN_NAMES, UNWANTED)
+    best_matcher = get_best_known_name_matcher(KNOWN_NAMES)
+    assert best_matcher.find_best(title) == (old_find_best_known_name(title, KNOWN_NAMES) if title else None)
+
+
+@pytest.mark.parametrize("filename", FILENAMES)
+def test_filename_matching_equals_old_prefix_loop(filename):
+    assert (match_folders_from_filename_enhanced(filename, KNOWN_NAMES, UNWANTED)
+            == old_match_folders_from_filename(filename, KNOWN_NAMES, UNWANTED))
+
+
+@pytest.mark.parametrize("text", TITLES + FILENAMES)
+def test_character_filters_pick_the_same_filter_as_old_loops(text):
+    matcher = get_character_filter_matcher(KNOWN_NAMES)
+    assert matcher.find_in_text(text)[0] == old_first_matching_filter(KNOWN_NAMES, text, is_title_match_for_character)
+    assert matcher.find_in_filename(text)[0] == old_first_matching_filter(KNOWN_NAMES, text, is_filename_match_for_character)
+
+
+def test_in_place_edits_to_the_shared_list_rebuild_the_matchers():
+    known_names = [
+        {'name': "Alice", 'is_group': False, 'aliases': ["Alice"]},
+        {'name': "Bob", 'is_group': False, 'aliases': ["Bob"]},
+    ]
+    assert get_best_known_name_matcher(known_names).find_best("bob pinup") == "Bob"
+    assert match_folders_from_title("bob pinup", known_names, set()) == ["Bob"]
+
+    # Delete Bob and add Carol, as the GUI does: same list object, same length.
+    known_names[:] = [entry for entry in known_names if entry['name'] != "Bob"]
+    known_names.append({'name': "Carol", 'is_group': False, 'aliases': ["Carol"]})
+
+    assert get_best_known_name_matcher(known_names).find_best("bob pinup") is None
+    assert get_best_known_name_matcher(known_names).find_best("carol pinup") == "Carol"
+    assert match_folders_from_title("carol pinup", known_names, set()) == ["Carol"]
+    assert match_folders_from_filename_enhanced("bob_01.png", known_names, set()) == []
+
+    # A reload that only changes an alias is picked up too.
+    known_names[:] = [{'name': "Alice", 'is_group': False, 'aliases': ["Alice", "Ally"]}]
+    assert match_folders_from_title("ally sketch", known_names, set()) == ["Alice"]
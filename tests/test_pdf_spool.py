@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+from src.utils.pdf_spool import INDEX_SUFFIX, append_pdf_spool_record, iter_pdf_spool_records, remove_pdf_spool
+
+POSTS = [
+    ("late", "2024-03-01T00:00:00"),
+    ("undated", None),
+    ("early", "2023-01-01T00:00:00"),
+    ("same day 1", "2023-06-15T00:00:00"),
+    ("middle", "2023-09-01T00:00:00"),
+    ("same day 2", "2023-06-15T00:00:00"),
+    ("same day 3", "2023-06-15T00:00:00"),
+]
+EXPECTED_ORDER = ["early", "same day 1", "same day 2", "same day 3", "middle", "late", "undated"]
+
+
+def spool_posts(spool_path, posts):
+    for title, published in posts:
+        append_pdf_spool_record(spool_path, {'title': title, 'published': published, 'content': f"<p>{title}</p>"})
+
+
+@pytest.mark.parametrize("run_size", [1, 2, 3, 100])
+def test_records_come_back_in_date_order_for_any_run_size(tmp_path, run_size):
+    spool_path = str(tmp_path / "single_pdf_spool.jsonl")
+    spool_posts(spool_path, POSTS)
+
+    records = list(iter_pdf_spool_records([spool_path], run_size=run_size))
+
+    assert [record['title'] for record in records] == EXPECTED_ORDER
+    assert records[0]['content'] == "<p>early</p>"
+    # The sorted runs are temporary and are gone once the merge finishes.
+    assert sorted(os.listdir(tmp_path)) == ["single_pdf_spool.jsonl", "single_pdf_spool.jsonl" + INDEX_SUFFIX]
+
+
+def test_same_date_keeps_spool_order_across_spools(tmp_path):
+    first_spool = str(tmp_path / "first.jsonl")
+    second_spool = str(tmp_path / "second.jsonl")
+    spool_posts(second_spool, [("second a", "2023-06-15"), ("second b", "2023-06-15")])
+    spool_posts(first_spool, [("first a", "2023-06-15"), ("older", "2023-01-01"), ("first b", "2023-06-15")])
+
+    titles = [record['title'] for record in iter_pdf_spool_records([first_spool, second_spool], run_size=2)]
+
+    assert titles == ["older", "first a", "first b", "second a", "second b"]
+
+
+def test_truncated_index_line_is_skipped(tmp_path):
+    spool_path = str(tmp_path / "single_pdf_spool.jsonl")
+    spool_posts(spool_path, POSTS[:3])
+    with open(spool_path + INDEX_SUFFIX, 'a', encoding='utf-8') as index_file:
+        index_file.write('["2020-01-01", 3, 99')
+
+    titles = [record['title'] for record in iter_pdf_spool_records([spool_path], run_size=2)]
+
+    assert titles == ["early", "late", "undated"]
+
+
+def test_remove_deletes_spool_and_index(tmp_path):
+    spool_path = str(tmp_path / "single_pdf_spool.jsonl")
+    spool_posts(spool_path, POSTS[:1])
+
+    remove_pdf_spool(spool_path)
+
+    assert os.listdir(tmp_path) == []
+    assert list(iter_pdf_spool_records([spool_path])) == []
@@ -0,0 +1,41 @@
+import pytest
+
+from src.utils.post_cache import PostListingCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    listing_cache = PostListingCache(str(tmp_path / "post_listing_cache.db"))
+    yield listing_cache
+    listing_cache.close()
+
+
+def make_posts(ids, edited=None):
+    return [{'id': post_id, 'published': f"2024-01-{int(post_id):02d}", 'edited': edited} for post_id in ids]
+
+
+def test_listings_are_kept_per_domain(cache):
+    cache.replace_listing("kemono.cr", "patreon", "1", make_posts(["3", "2"]))
+    cache.replace_listing("coomer.st", "patreon", "1", make_posts(["9"]))
+
+    assert [post['id'] for post in cache.get_cached_posts("kemono.cr", "patreon", "1")] == ["3", "2"]
+    assert [post['id'] for post in cache.get_cached_posts("coomer.st", "patreon", "1")] == ["9"]
+    assert cache.get_sync_state("KEMONO.cr", "patreon", "1")['post_count'] == 2
+
+
+def test_commit_sync_ranks_new_posts_first_and_updates_edits(cache):
+    cache.replace_listing("kemono.cr", "patreon", "1", make_posts(["2", "1"]))
+    refreshed = make_posts(["2"], edited="2024-02-01")
+    cache.commit_sync("kemono.cr", "patreon", "1", make_posts(["4", "3"]), refreshed)
+
+    assert [post['id'] for post in cache.get_cached_posts("kemono.cr", "patreon", "1")] == ["4", "3", "2", "1"]
+    assert cache.get_known_post_edits("kemono.cr", "patreon", "1") == {"4": None, "3": None, "2": "2024-02-01", "1": None}
+    state = cache.get_sync_state("kemono.cr", "patreon", "1")
+    assert state['complete'] and state['newest_post_id'] == "4"
+
+
+def test_replace_listing_drops_deleted_posts(cache):
+    cache.replace_listing("kemono.cr", "patreon", "1", make_posts(["3", "2", "1"]))
+    cache.replace_listing("kemono.cr", "patreon", "1", make_posts(["3", "1"]))
+
+    assert [post['id'] for post in cache.get_cached_posts("kemono.cr", "patreon", "1")] == ["3", "1"]
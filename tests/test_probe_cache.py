@@ -0,0 +1,39 @@
+import sqlite3
+
+from src.utils.probe_cache import FileProbe, ProbeCache, get_resume_validator
+
+
+def make_probe(etag=None, last_modified=None):
+    return FileProbe(size=100, accepts_ranges=True, etag=etag, final_url="https://n1.kemono.cr/data/a.mp4",
+                     last_modified=last_modified)
+
+
+def test_resume_validator_prefers_strong_etag():
+    assert get_resume_validator(make_probe('"abc"', "Wed, 21 Oct 2015 07:28:00 GMT")) == '"abc"'
+
+
+def test_resume_validator_falls_back_to_last_modified_for_weak_etag():
+    assert get_resume_validator(make_probe('W/"abc"', "Wed, 21 Oct 2015 07:28:00 GMT")) == "Wed, 21 Oct 2015 07:28:00 GMT"
+
+
+def test_no_resume_without_validator():
+    assert get_resume_validator(None) is None
+    assert get_resume_validator(make_probe()) is None
+    assert get_resume_validator(make_probe('W/"abc"')) is None
+
+
+def test_cache_round_trips_last_modified_and_upgrades_old_tables(tmp_path):
+    db_path = str(tmp_path / "file_probe_cache.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE probes (url TEXT PRIMARY KEY, size INTEGER NOT NULL, accepts_ranges INTEGER NOT NULL,"
+        " etag TEXT, final_url TEXT, checked_at REAL NOT NULL)"
+    )
+    conn.commit()
+    conn.close()
+
+    cache = ProbeCache(db_path)
+    probe = make_probe(last_modified="Wed, 21 Oct 2015 07:28:00 GMT")
+    cache.record("https://kemono.cr/data/a.mp4", probe)
+    assert cache.get("https://kemono.cr/data/a.mp4") == probe
+    cache.close()
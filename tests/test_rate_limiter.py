@@ -0,0 +1,115 @@
+import threading
+
+import pytest
+
+from src.config.constants import (
+    RATE_LIMIT_BASE_BACKOFF_SECONDS, RATE_LIMIT_BURST, RATE_LIMIT_DECREASE_FACTOR,
+    RATE_LIMIT_INCREASE_STEP, RATE_LIMIT_INITIAL_RPS, RATE_LIMIT_MAX_BACKOFF_SECONDS, RATE_LIMIT_MIN_RPS
+)
+from src.utils import rate_limiter
+from src.utils.rate_limiter import HostRateLimiter, THROTTLE_STATUS_CODES, parse_retry_after
+
+
+class FakeClock:
+    """A monotonic clock that only moves when told to, including through `sleep`."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", fake.monotonic)
+    monkeypatch.setattr(rate_limiter.time, "sleep", fake.sleep)
+    return fake
+
+
+def test_burst_is_served_without_waiting(clock):
+    limiter = HostRateLimiter("example.com")
+    for _ in range(RATE_LIMIT_BURST):
+        assert limiter.acquire()
+    assert clock.now == 1000.0
+
+
+def test_empty_bucket_waits_for_refill(clock):
+    limiter = HostRateLimiter("example.com")
+    for _ in range(RATE_LIMIT_BURST):
+        limiter.acquire()
+    assert limiter.acquire()
+    assert clock.now - 1000.0 == pytest.approx(1.0 / RATE_LIMIT_INITIAL_RPS)
+
+
+def test_throttle_cuts_rate_and_blocks_with_doubling_backoff(clock):
+    limiter = HostRateLimiter("example.com")
+    first_block = limiter.record_throttle()
+    assert first_block == pytest.approx(RATE_LIMIT_BASE_BACKOFF_SECONDS)
+    assert limiter.rate == pytest.approx(RATE_LIMIT_INITIAL_RPS * RATE_LIMIT_DECREASE_FACTOR)
+    assert limiter.tokens == 0.0
+
+    clock.sleep(first_block)
+    second_block = limiter.record_throttle()
+    assert second_block == pytest.approx(RATE_LIMIT_BASE_BACKOFF_SECONDS * 2)
+    assert limiter.rate == pytest.approx(RATE_LIMIT_INITIAL_RPS * RATE_LIMIT_DECREASE_FACTOR ** 2)
+
+
+def test_throttle_honours_retry_after_and_caps_it(clock):
+    limiter = HostRateLimiter("example.com")
+    assert limiter.record_throttle(retry_after=7) == pytest.approx(7)
+    clock.sleep(7)
+    assert limiter.record_throttle(retry_after=10 * RATE_LIMIT_MAX_BACKOFF_SECONDS) == pytest.approx(RATE_LIMIT_MAX_BACKOFF_SECONDS)
+
+
+def test_rate_never_drops_below_minimum(clock):
+    limiter = HostRateLimiter("example.com")
+    for _ in range(50):
+        limiter.record_throttle(retry_after=0)
+    assert limiter.rate == pytest.approx(RATE_LIMIT_MIN_RPS)
+
+
+def test_acquire_waits_out_the_block(clock):
+    limiter = HostRateLimiter("example.com")
+    block = limiter.record_throttle()
+    assert limiter.acquire()
+    assert clock.now - 1000.0 >= block
+
+
+def test_recovery_after_throttle(clock):
+    limiter = HostRateLimiter("example.com")
+    limiter.record_throttle()
+    limiter.record_throttle()
+    throttled_rate = limiter.rate
+    for _ in range(10):
+        limiter.record_success()
+    assert limiter.consecutive_throttles == 0
+    assert limiter.rate == pytest.approx(throttled_rate + 10 * RATE_LIMIT_INCREASE_STEP)
+
+    # The backoff starts over once the host has recovered.
+    clock.sleep(RATE_LIMIT_MAX_BACKOFF_SECONDS)
+    assert limiter.record_throttle() == pytest.approx(RATE_LIMIT_BASE_BACKOFF_SECONDS)
+
+
+def test_acquire_returns_false_when_cancelled_while_blocked(clock):
+    limiter = HostRateLimiter("example.com")
+    limiter.record_throttle(retry_after=60)
+    cancellation_event = threading.Event()
+    cancellation_event.set()
+    assert limiter.acquire(cancellation_event) is False
+
+
+def test_403_is_not_treated_as_throttling():
+    assert 403 not in THROTTLE_STATUS_CODES
+    assert 429 in THROTTLE_STATUS_CODES
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after("") is None
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
@@ -0,0 +1,138 @@
+import threading
+import time
+
+from src.config.constants import TRANSFER_PRIORITY_SMALLEST_FIRST
+from src.core.transfer_scheduler import TransferScheduler
+
+
+class Gate:
+    """A transfer body that records when it starts and blocks until released."""
+
+    def __init__(self):
+        self.started = []
+        self.lock = threading.Lock()
+        self.release_event = threading.Event()
+
+    def transfer(self, name, host=None, scheduler=None):
+        if host is not None:
+            scheduler.set_transfer_host(host)
+        with self.lock:
+            self.started.append(name)
+        self.release_event.wait(5)
+        return name
+
+
+def record(names, name):
+    names.append(name)
+
+
+def wait_until(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.005)
+
+
+def submit_blocked_first(scheduler):
+    """Occupies the only slot so later submissions queue up before anything else runs."""
+    blocker = threading.Event()
+    future = scheduler.submit("blocker", blocker.wait, kwargs={'timeout': 5}, url="https://other.example/x")
+    wait_until(lambda: scheduler.active_count() == 1)
+    return blocker, future
+
+
+def test_fair_share_gives_a_free_slot_to_the_post_with_fewest_running():
+    scheduler = TransferScheduler(max_concurrent=2, max_per_host=10)
+    gate = Gate()
+    blocker, blocker_future = submit_blocked_first(scheduler)
+    futures = [
+        scheduler.submit(post, gate.transfer, kwargs={'name': f"{post}{index}"}, order=index)
+        for post in ("a", "b") for index in range(3)
+    ]
+
+    # "a" was submitted first, but once it runs a transfer the next slot goes to "b".
+    wait_until(lambda: len(gate.started) == 1)
+    blocker.set()
+    wait_until(lambda: len(gate.started) == 2)
+    assert gate.started == ["a0", "b0"]
+
+    gate.release_event.set()
+    for future in futures + [blocker_future]:
+        future.result(timeout=5)
+    assert sorted(gate.started) == ["a0", "a1", "a2", "b0", "b1", "b2"]
+
+
+def test_smallest_first_orders_within_fair_share():
+    scheduler = TransferScheduler(max_concurrent=1, priority=TRANSFER_PRIORITY_SMALLEST_FIRST)
+    order = []
+    blocker, blocker_future = submit_blocked_first(scheduler)
+    futures = [
+        scheduler.submit("a", record, kwargs={'names': order, 'name': name}, size_hint=size, order=index)
+        for index, (name, size) in enumerate([("big", 300), ("small", 10), ("unknown", None)])
+    ]
+    blocker.set()
+    for future in futures + [blocker_future]:
+        future.result(timeout=5)
+
+    assert order == ["small", "big", "unknown"]
+
+
+def test_per_host_cap_holds_back_only_that_host():
+    scheduler = TransferScheduler(max_concurrent=4, max_per_host=2)
+    gate = Gate()
+    futures = [
+        scheduler.submit("a", gate.transfer, kwargs={'name': f"slow{index}"}, url="https://slow.example/f", order=index)
+        for index in range(4)
+    ]
+    futures.append(scheduler.submit("a", gate.transfer, kwargs={'name': "fast"}, url="https://fast.example/f", order=4))
+
+    wait_until(lambda: len(gate.started) == 3)
+    time.sleep(0.05)
+    assert sorted(gate.started) == ["fast", "slow0", "slow1"]
+    assert scheduler.saturated_hosts() == {"slow.example"}
+
+    gate.release_event.set()
+    assert sorted(future.result(timeout=5) for future in futures) == ["fast", "slow0", "slow1", "slow2", "slow3"]
+
+
+def test_candidate_host_jobs_are_counted_on_the_reported_host():
+    scheduler = TransferScheduler(max_concurrent=4, max_per_host=1)
+    gate = Gate()
+    nodes = ["n1.kemono.cr", "n2.kemono.cr"]
+
+    def submit(index):
+        return scheduler.submit("a", gate.transfer, kwargs={'name': f"file{index}", 'host': nodes[index % 2], 'scheduler': scheduler},
+                                url="https://kemono.cr/data/f", candidate_hosts=nodes, order=index)
+
+    futures = [submit(0), submit(1)]
+    wait_until(lambda: len(gate.started) == 2)
+    futures.append(submit(2))
+    time.sleep(0.05)
+    # Both nodes are at their cap of one, so the third transfer waits.
+    assert len(gate.started) == 2
+    assert scheduler.saturated_hosts() == set(nodes)
+
+    gate.release_event.set()
+    for future in futures:
+        future.result(timeout=5)
+    assert scheduler.saturated_hosts() == set()
+
+
+def test_threads_are_started_on_demand():
+    scheduler = TransferScheduler(max_concurrent=50)
+    assert scheduler.threads == []
+
+    for index in range(3):
+        scheduler.submit("a", lambda: None, order=index).result(timeout=5)
+
+    # Sequential jobs reuse the idle thread instead of starting new ones.
+    assert len(scheduler.threads) == 1
+
+    gate = Gate()
+    futures = [scheduler.submit("b", gate.transfer, kwargs={'name': index}, order=index) for index in range(5)]
+    wait_until(lambda: len(gate.started) == 5)
+    assert len(scheduler.threads) == 5
+    gate.release_event.set()
+    for future in futures:
+        future.result(timeout=5)